@@ -0,0 +1,136 @@
+################################################
+## Project: ASS/NSS API
+## Author: David Michalica, Team 1
+## Date: 2024
+##
+## Documentation: https://docs.python.org/3/library/logging.handlers.html#queuelistener
+#################################################
+
+"""
+Cost of a log call in the calling thread.
+
+Compares the former setup (basicConfig with a StreamHandler and a
+FileHandler, messages built with f-strings) with the queue-based setup of
+Log_Writer (lazy %-formatting, background writer, rotation), and a
+sampled debug log on a hot path. Console output goes to os.devnull, the
+log file to a temporary directory.
+
+Usage:
+    python -m Benchmarks.Logging_Benchmark
+    python -m Benchmarks.Logging_Benchmark --calls 50000 --output logging.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from BussinessLayer.Log_Writer import configure_logging
+
+FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+
+@contextmanager
+def _quiet_stderr() -> Iterator[None]:
+    stderr = sys.stderr
+    with open(os.devnull, "w") as devnull:
+        sys.stderr = devnull
+        try:
+            yield
+        finally:
+            sys.stderr = stderr
+
+
+def _reset_logging() -> None:
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handler.close()
+    for name in ("benchmark.capture", "benchmark.hot"):
+        logging.getLogger(name).filters.clear()
+
+
+def _time_calls(log: Callable[[int], None], calls: int) -> float:
+    start = time.perf_counter()
+    for i in range(calls):
+        log(i)
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def measure(calls: int = 20000) -> Dict[str, Any]:
+    """
+    Measure the per-call cost in the calling thread.
+
+    Args:
+        calls (int, optional): Log calls per scenario. Defaults to 20000.
+
+    Returns:
+        Dict[str, Any]: Microseconds per call for each scenario and the time the
+        background writer needed to drain the queue
+    """
+    capture = logging.getLogger("benchmark.capture")
+    hot = logging.getLogger("benchmark.hot")
+    results: Dict[str, Any] = {"calls": calls}
+
+    with tempfile.TemporaryDirectory() as tmp, _quiet_stderr():
+        log_file = os.path.join(tmp, "app.log")
+
+        _reset_logging()
+        logging.basicConfig(
+            level=logging.DEBUG,
+            format=FORMAT,
+            handlers=[logging.StreamHandler(), logging.FileHandler(log_file)],
+            force=True,
+        )
+        results["sync_fstring_us"] = _time_calls(
+            lambda i: capture.info(f"Captured frame {i + 1}/{calls} to /data/frame_{i}.png"), calls
+        )
+        results["sync_debug_fstring_us"] = _time_calls(
+            lambda i: hot.debug(f"Stored frame {i + 1}/{calls} in /data/frame_{i}.png"), calls
+        )
+
+        _reset_logging()
+        listener = configure_logging(
+            logging.DEBUG, FORMAT, log_file=log_file, sampling={"benchmark.hot": 0.01}
+        )
+        results["queue_lazy_us"] = _time_calls(
+            lambda i: capture.info("Captured frame %d/%d to /data/frame_%d.png", i + 1, calls, i),
+            calls,
+        )
+        results["queue_debug_sampled_us"] = _time_calls(
+            lambda i: hot.debug("Stored frame %d/%d in /data/frame_%d.png", i + 1, calls, i), calls
+        )
+        start = time.perf_counter()
+        listener.stop()
+        results["queue_drain_s"] = time.perf_counter() - start
+        _reset_logging()
+
+    results["speedup"] = results["sync_fstring_us"] / results["queue_lazy_us"]
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--calls", type=int, default=20000, help="Log calls per scenario")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    results = measure(args.calls)
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
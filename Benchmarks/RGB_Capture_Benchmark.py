@@ -0,0 +1,399 @@
+################################################
+## Project: ASS/NSS API
+## Author: David Michalica, Team 1
+## Date: 2024
+##
+## Documentation: https://docs.baslerweb.com/camera-emulation
+#################################################
+
+"""
+Benchmark and regression suite for the RGB capture path.
+
+Runs RGB_Camera_Controller against pylon's software camera emulation, so no
+physical Basler camera is needed; PYLON_CAMEMU is set for the run unless it
+is set already. Results are written as JSON and can be
+compared against a stored baseline; the exit code is non-zero when a metric
+regressed by more than the tolerance.
+
+Usage:
+    python -m Benchmarks.RGB_Capture_Benchmark --output bench.json
+    python -m Benchmarks.RGB_Capture_Benchmark --baseline bench.json --tolerance 0.2
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from importlib import metadata
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from pypylon import pylon  # noqa: E402
+
+from BussinessLayer.RGB_Camera_Controller import RGB_Camera_Controller  # noqa: E402
+
+DEFAULT_RESOLUTIONS = ["640x480", "1280x720", "1920x1080"]
+DEFAULT_FORMATS = list(RGB_Camera_Controller.save_functions.keys())
+
+# Metric name suffix -> (higher is better, smallest absolute change that counts)
+METRIC_DIRECTIONS = {
+    "_mb_per_s": (True, 0.0),
+    "_fps": (True, 0.0),
+    "_mb": (False, 1.0),
+    "_s": (False, 0.001),
+}
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def _process_peak_rss_mb() -> float:
+    # ru_maxrss is the high-water mark of the whole process, in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+@contextlib.contextmanager
+def camera_emulation(cameras: int = 1) -> Iterator[None]:
+    """
+    Provide emulated cameras unless PYLON_CAMEMU is set already, and restore it afterwards.
+
+    pylon reads the variable when it enumerates devices, so it only has to be
+    set around the run.
+
+    Args:
+        cameras (int, optional): Number of emulated cameras. Defaults to 1.
+    """
+    previous = os.environ.get("PYLON_CAMEMU")
+    if previous is None:
+        os.environ["PYLON_CAMEMU"] = str(cameras)
+    try:
+        yield
+    finally:
+        if previous is None:
+            os.environ.pop("PYLON_CAMEMU", None)
+
+
+def _parse_resolution(resolution: str) -> Tuple[int, int]:
+    width, height = resolution.lower().split("x")
+    return int(width), int(height)
+
+
+def _connect(width: int, height: int) -> RGB_Camera_Controller:
+    controller = RGB_Camera_Controller(camera_width=width, camera_height=height)
+    controller.Connect()
+    return controller
+
+
+def _measure(func: Callable[[], Any], repeat: int) -> List[float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def bench_connect(repeat: int) -> Dict[str, float]:
+    """
+    Measure the time of Connect() followed by release_camera().
+
+    Args:
+        repeat (int): Number of connect cycles
+
+    Returns:
+        Dict[str, float]: Median and p95 connect time in seconds
+    """
+
+    def cycle():
+        _connect(640, 480).release_camera()
+
+    timings = _measure(cycle, repeat)
+    return {
+        "connect_median_s": statistics.median(timings),
+        "connect_p95_s": _percentile(timings, 0.95),
+    }
+
+
+def bench_single_shot(controller: RGB_Camera_Controller, repeat: int) -> Dict[str, float]:
+    """
+    Measure the latency of acquire_image(), including the grab restart it performs.
+
+    Args:
+        controller (RGB_Camera_Controller): Connected controller
+        repeat (int): Number of single shots
+
+    Returns:
+        Dict[str, float]: Median and p95 latency in seconds
+    """
+    timings = _measure(controller.acquire_image, repeat)
+    return {
+        "acquire_image_median_s": statistics.median(timings),
+        "acquire_image_p95_s": _percentile(timings, 0.95),
+    }
+
+
+def bench_continuous(controller: RGB_Camera_Controller, repeat: int) -> Dict[str, float]:
+    """
+    Measure the latency of acquire_image() answered from the continuous-grab ring buffer.
+
+    Args:
+        controller (RGB_Camera_Controller): Connected controller
+        repeat (int): Number of single shots
+
+    Returns:
+        Dict[str, float]: Median and p95 latency in seconds
+    """
+    controller.start_continuous()
+    try:
+        # The first frame includes the grab start, like a warm server the ring is filled already
+        controller.acquire_image(after=0.0)
+        timings = _measure(controller.acquire_image, repeat)
+    finally:
+        controller.stop_continuous()
+    return {
+        "acquire_image_continuous_median_s": statistics.median(timings),
+        "acquire_image_continuous_p95_s": _percentile(timings, 0.95),
+    }
+
+
+def bench_capture(
+    controller: RGB_Camera_Controller, image_format: str, count: int, out_dir: str
+) -> Dict[str, float]:
+    """
+    Measure sustained capture_image() throughput for one format.
+
+    Args:
+        controller (RGB_Camera_Controller): Connected controller
+        image_format (str): Image format to save
+        count (int): Number of frames to capture
+        out_dir (str): Directory receiving the files
+
+    Returns:
+        Dict[str, float]: Frames per second, write bandwidth and Python allocation peak
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = controller.capture_image(
+        path=out_dir + os.sep, name=f"bench_{image_format}", count=count,
+        image_format=image_format,
+    )
+    elapsed = time.perf_counter() - start
+    _, python_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    written = sum(os.path.getsize(f) for f in result["files"])
+    for filename in result["files"]:
+        os.remove(filename)
+
+    return {
+        "capture_fps": result["count"] / elapsed,
+        "capture_mb_per_s": written / elapsed / 1e6,
+        "capture_python_peak_mb": python_peak / 1e6,
+    }
+
+
+def bench_writer(
+    controller: RGB_Camera_Controller, image_format: str, count: int, out_dir: str
+) -> Dict[str, float]:
+    """
+    Measure save throughput of one grabbed frame, independent of the camera frame rate.
+
+    Args:
+        controller (RGB_Camera_Controller): Connected controller
+        image_format (str): Image format to save
+        count (int): Number of saves
+        out_dir (str): Directory receiving the files
+
+    Returns:
+        Dict[str, float]: Saves per second and write bandwidth
+    """
+    camera = controller.camera
+    if camera.IsGrabbing():
+        camera.StopGrabbing()
+    camera.StartGrabbing(pylon.GrabStrategy_LatestImageOnly)
+    img = pylon.PylonImage()
+    # Fresh file names: overwriting an existing file measures the file system, not the writer
+    filenames = [os.path.join(out_dir, f"writer_{i}.{image_format}") for i in range(count)]
+    with camera.RetrieveResult(5000, pylon.TimeoutHandling_ThrowException) as grab:
+        start = time.perf_counter()
+        for filename in filenames:
+            RGB_Camera_Controller.save_grab_result(img, grab, filename, image_format, 100)
+        elapsed = time.perf_counter() - start
+    camera.StopGrabbing()
+
+    written = sum(os.path.getsize(f) for f in filenames)
+    for filename in filenames:
+        os.remove(filename)
+
+    return {
+        "writer_fps": count / elapsed,
+        "writer_mb_per_s": written / elapsed / 1e6,
+    }
+
+
+def run_suite(
+    resolutions: List[str], formats: List[str], frames: int, repeat: int
+) -> Dict[str, Any]:
+    """
+    Run the whole benchmark suite.
+
+    Args:
+        resolutions (List[str]): Resolutions as "WIDTHxHEIGHT"
+        formats (List[str]): Image formats to benchmark
+        frames (int): Frames per capture / writer measurement
+        repeat (int): Repetitions of the connect and single-shot measurements
+
+    Returns:
+        Dict[str, Any]: Environment information and flat metric dictionary
+    """
+    metrics: Dict[str, float] = {}
+    metrics.update(bench_connect(repeat))
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        for resolution in resolutions:
+            width, height = _parse_resolution(resolution)
+            controller = _connect(width, height)
+            try:
+                measured = bench_single_shot(controller, repeat)
+                measured.update(bench_continuous(controller, repeat))
+                for name, value in measured.items():
+                    metrics[f"{resolution}.{name}"] = value
+                for image_format in formats:
+                    prefix = f"{resolution}.{image_format}"
+                    measured = bench_capture(controller, image_format, frames, out_dir)
+                    measured.update(bench_writer(controller, image_format, frames, out_dir))
+                    for name, value in measured.items():
+                        metrics[f"{prefix}.{name}"] = value
+            finally:
+                controller.release_camera()
+
+    # The RSS high-water mark cannot be reset between measurements, so it is
+    # reported once for the whole run rather than attributed to one capture
+    metrics["process_rss_peak_mb"] = _process_peak_rss_mb()
+
+    return {
+        "environment": {
+            "timestamp": time.time(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "pypylon": metadata.version("pypylon"),
+            "pylon": pylon.GetPylonVersionString(),
+            "camera_emulation": os.environ.get("PYLON_CAMEMU"),
+        },
+        "parameters": {
+            "resolutions": resolutions,
+            "formats": formats,
+            "frames": frames,
+            "repeat": repeat,
+        },
+        "metrics": metrics,
+    }
+
+
+def metric_direction(metric: str) -> Optional[Tuple[bool, float]]:
+    """
+    Return the direction and noise floor of a metric from its name suffix.
+
+    Args:
+        metric (str): Metric name
+
+    Returns:
+        Optional[Tuple[bool, float]]: Whether higher is better and the smallest absolute
+        change that counts, or None for unknown metrics
+    """
+    for suffix in sorted(METRIC_DIRECTIONS, key=len, reverse=True):
+        if metric.endswith(suffix):
+            return METRIC_DIRECTIONS[suffix]
+    return None
+
+
+def compare(
+    current: Dict[str, float], baseline: Dict[str, float], tolerance: float
+) -> List[Dict[str, Any]]:
+    """
+    Compare metrics against a baseline.
+
+    Args:
+        current (Dict[str, float]): Metrics of this run
+        baseline (Dict[str, float]): Metrics of the baseline run
+        tolerance (float): Allowed relative degradation, e.g. 0.2 for 20 %
+
+    Returns:
+        List[Dict[str, Any]]: One entry per metric present in both runs, with the
+        relative change (positive is better) and a regression flag
+    """
+    report = []
+    for metric, base_value in sorted(baseline.items()):
+        if metric not in current or not base_value:
+            continue
+        direction = metric_direction(metric)
+        if direction is None:
+            continue
+        higher_better, noise_floor = direction
+        difference = current[metric] - base_value
+        change = difference / abs(base_value)
+        if not higher_better:
+            change = -change
+        report.append(
+            {
+                "metric": metric,
+                "baseline": base_value,
+                "current": current[metric],
+                "change": change,
+                "regression": change < -tolerance and abs(difference) >= noise_floor,
+            }
+        )
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--resolutions", nargs="+", default=DEFAULT_RESOLUTIONS)
+    parser.add_argument("--formats", nargs="+", default=DEFAULT_FORMATS)
+    parser.add_argument("--frames", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Compare against this JSON result file")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    with camera_emulation():
+        results = run_suite(args.resolutions, args.formats, args.frames, args.repeat)
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        results["comparison"] = compare(
+            results["metrics"], baseline["metrics"], args.tolerance
+        )
+        regressions = [r for r in results["comparison"] if r["regression"]]
+        for regression in regressions:
+            print(
+                f"REGRESSION {regression['metric']}: {regression['baseline']:.4g} -> "
+                f"{regression['current']:.4g} ({regression['change']:+.1%})",
+                file=sys.stderr,
+            )
+        exit_code = 1 if regressions else 0
+
+    output = json.dumps(results, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    else:
+        print(output)
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+################################################
+## Project: ASS/NSS API
+## Author: David Michalica, Team 1
+## Date: 2024
+##
+## Documentation: https://docs.python.org/3/using/cmdline.html#cmdoption-X
+#################################################
+
+"""
+Cold-start benchmark of the API process.
+
+Imports app in fresh interpreters and reports the time until the first
+request is answered, the peak resident memory and which native libraries
+were loaded. ENABLED_DRIVERS is passed through, so different node
+configurations can be compared.
+
+Usage:
+    python -m Benchmarks.Startup_Benchmark
+    ENABLED_DRIVERS=acoustic python -m Benchmarks.Startup_Benchmark --output startup.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from typing import Any, Dict, List, Optional
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Native libraries whose import dominates the startup time
+HEAVY_MODULES = ["pypylon", "cv2", "numpy"]
+
+_CHILD = """
+import json, resource, sys, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+app.app.test_client().get("/health")
+answered = time.perf_counter()
+print(json.dumps({
+    "import_s": imported - start,
+    "first_request_s": answered - start,
+    "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "loaded": [name for name in %r if name in sys.modules],
+}))
+""" % (HEAVY_MODULES,)
+
+
+def measure_once() -> Dict[str, Any]:
+    """
+    Start one interpreter, import app and answer /health.
+
+    Returns:
+        Dict[str, Any]: import_s, first_request_s, peak_rss_mb and loaded modules
+    """
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+    # A scratch working directory keeps app.log and ./storage out of the repository
+    with tempfile.TemporaryDirectory() as cwd:
+        output = subprocess.run(
+            [sys.executable, "-c", _CHILD],
+            cwd=cwd,
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run_suite(repeat: int = 5) -> Dict[str, Any]:
+    """
+    Measure the cold start several times.
+
+    Args:
+        repeat (int, optional): Number of fresh interpreters. Defaults to 5.
+
+    Returns:
+        Dict[str, Any]: Median metrics, the loaded native libraries and the driver setting
+    """
+    runs: List[Dict[str, Any]] = [measure_once() for _ in range(repeat)]
+    return {
+        "enabled_drivers": os.environ.get("ENABLED_DRIVERS", "<default>"),
+        "import_median_s": statistics.median(run["import_s"] for run in runs),
+        "first_request_median_s": statistics.median(run["first_request_s"] for run in runs),
+        "peak_rss_median_mb": statistics.median(run["peak_rss_mb"] for run in runs),
+        "loaded": runs[-1]["loaded"],
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters to start")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.repeat)
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
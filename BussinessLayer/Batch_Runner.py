@@ -0,0 +1,202 @@
+################################################
+## Project: ASS/NSS API
+## Author: David Michalica, Team 1
+## Date: 2024
+##
+## Documentation: https://docs.python.org/3/library/concurrent.futures.html#concurrent.futures.wait
+#################################################
+
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Tuple
+
+from BussinessLayer.Tracing import span
+from data.Batch import Batch_Step
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+class Batch_Session:
+    """
+    Device connections shared by the steps of a batch.
+
+    The first step using a device opens the connection and later steps
+    reuse it; all of them are closed when the batch ends. Steps on the same
+    device never run at the same time, so a connection is used by one
+    thread at a time.
+    """
+
+    def __init__(self):
+        """Initialize the session."""
+        self._connections: Dict[str, Tuple[Any, Callable[[Any], None]]] = {}
+        self._lock = threading.Lock()
+
+    def connection(self, key: str, connect: Callable[[], Any], close: Callable[[Any], None]) -> Any:
+        """
+        Return the connection to a device, opening it on first use.
+
+        Args:
+            key (str): Device key, e.g. 'acoustic:192.168.1.10:1234'
+            connect (Callable[[], Any]): Opens the connection
+            close (Callable[[Any], None]): Closes it when the batch ends
+
+        Returns:
+            Any: The connection
+        """
+        with self._lock:
+            entry = self._connections.get(key)
+        if entry is None:
+            entry = (connect(), close)
+            with self._lock:
+                self._connections[key] = entry
+        return entry[0]
+
+    def close(self) -> None:
+        """Close all connections."""
+        with self._lock:
+            connections, self._connections = self._connections, {}
+        for key, (connection, close) in connections.items():
+            try:
+                close(connection)
+            except Exception as e:
+                logger.warning("Error closing the batch connection to %s: %s", key, e)
+
+
+class Batch_Runner:
+    """
+    Runs the steps of a batch in order, overlapping independent ones.
+
+    A step starts once the steps listed in its 'after' have succeeded and
+    the previous step on its device has finished; steps on different devices
+    with nothing to wait for run in parallel, up to max_parallel at a time.
+    A step whose prerequisite failed is skipped. With stop_on_error, the
+    first failure skips every step that has not started yet and asks the
+    running ones to stop through their should_stop callback.
+
+    Attributes:
+        max_parallel (int): Steps running at the same time
+    """
+
+    def __init__(self, max_parallel: int = 4):
+        """
+        Initialize the runner.
+
+        Args:
+            max_parallel (int, optional): Steps running at the same time. Defaults to 4.
+        """
+        self.max_parallel = max_parallel
+
+    def run(self, steps: List[Batch_Step], stop_on_error: bool = True) -> Dict[str, Any]:
+        """
+        Run a batch.
+
+        Args:
+            steps (List[Batch_Step]): Steps in request order; 'after' may only name earlier steps
+            stop_on_error (bool, optional): Stop the batch at the first failure. Defaults to True.
+
+        Returns:
+            Dict[str, Any]: The steps with their status, result or error and timings,
+            the number of steps per status, whether the batch was stopped and its
+            duration in milliseconds
+        """
+        # Steps on one device keep their order, whether or not the earlier one succeeded
+        device_predecessor: Dict[str, str] = {}
+        previous_on_device: Dict[str, str] = {}
+        for step in steps:
+            if step.device is not None:
+                if step.device in previous_on_device:
+                    device_predecessor[step.step_id] = previous_on_device[step.device]
+                previous_on_device[step.device] = step.step_id
+
+        session = Batch_Session()
+        stop = threading.Event()
+        failed_step = None
+        # Outcomes of the finished steps, recorded by this thread only, so a pass over
+        # the pending steps sees a consistent state while workers finish steps
+        finished: Dict[str, str] = {}
+        start = time.perf_counter()
+        pending = list(steps)
+        running: Dict[Future, Batch_Step] = {}
+        try:
+            with span("batch", steps=len(steps)), ThreadPoolExecutor(
+                max_workers=max(1, min(self.max_parallel, len(steps))),
+                thread_name_prefix="batch",
+            ) as executor:
+                while pending:
+                    for step in list(pending):
+                        blocked = next(
+                            (
+                                step_id
+                                for step_id in step.after
+                                if finished.get(step_id) in ("failed", "skipped")
+                            ),
+                            None,
+                        )
+                        if failed_step is not None:
+                            self._skip(step, f"Batch stopped after step {failed_step} failed")
+                        elif blocked is not None:
+                            self._skip(step, f"Step {blocked} did not succeed")
+                        elif self._ready(step, finished, device_predecessor):
+                            step.status = "running"
+                            future = executor.submit(self._run_step, step, session, stop, start)
+                            running[future] = step
+                        else:
+                            continue
+                        pending.remove(step)
+                        if step.status == "skipped":
+                            finished[step.step_id] = step.status
+                    if not running:
+                        break
+
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        step = running.pop(future)
+                        finished[step.step_id] = step.status
+                        if step.status == "failed" and stop_on_error and failed_step is None:
+                            failed_step = step.step_id
+                            stop.set()
+        finally:
+            session.close()
+
+        counts = {status: 0 for status in ("succeeded", "failed", "skipped")}
+        for step in steps:
+            counts[step.status] = counts.get(step.status, 0) + 1
+        return {
+            "steps": [step.to_dict() for step in steps],
+            **counts,
+            "stopped": failed_step is not None,
+            "duration_ms": (time.perf_counter() - start) * 1000,
+        }
+
+    @staticmethod
+    def _ready(
+        step: Batch_Step, finished: Dict[str, str], device_predecessor: Dict[str, str]
+    ) -> bool:
+        predecessor = device_predecessor.get(step.step_id)
+        if predecessor is not None and predecessor not in finished:
+            return False
+        return all(finished.get(step_id) == "succeeded" for step_id in step.after)
+
+    @staticmethod
+    def _skip(step: Batch_Step, reason: str) -> None:
+        step.status = "skipped"
+        step.error = reason
+
+    @staticmethod
+    def _run_step(
+        step: Batch_Step, session: Batch_Session, stop: threading.Event, batch_start: float
+    ) -> None:
+        started = time.perf_counter()
+        step.start = (started - batch_start) * 1000
+        try:
+            step.result = step.work(session, stop.is_set)
+            step.status = "succeeded"
+        except Exception as e:
+            logger.warning("Batch step %s (%s) failed: %s", step.step_id, step.operation, e)
+            step.status = "failed"
+            step.error = str(e)
+        finally:
+            step.duration = (time.perf_counter() - started) * 1000
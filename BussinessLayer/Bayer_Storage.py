@@ -0,0 +1,275 @@
+################################################
+## Project: ASS/NSS API
+## Author: David Michalica, Team 1
+## Date: 2024
+##
+## Documentation: https://docs.opencv.org/4.x/de/d25/imgproc_color_conversions.html#color_convert_bayer
+#################################################
+
+import json
+import logging
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import cv2
+import numpy as np
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+BAYER_METADATA_SUFFIX = ".bayer.json"
+
+# GenICam names the pattern by its first row, OpenCV by the second row of the
+# 2x2 cell, so e.g. BayerRG (RGGB) needs COLOR_BayerBG2RGB
+BAYER_CONVERSIONS = {
+    "RG": cv2.COLOR_BayerBG2RGB,
+    "BG": cv2.COLOR_BayerRG2RGB,
+    "GR": cv2.COLOR_BayerGB2RGB,
+    "GB": cv2.COLOR_BayerGR2RGB,
+}
+
+
+def bayer_pattern(pixel_format: str) -> Optional[str]:
+    """
+    Return the Bayer pattern of a GenICam pixel format.
+
+    Args:
+        pixel_format (str): Pixel format, e.g. "BayerRG8"
+
+    Returns:
+        Optional[str]: Pattern such as "RG", or None for non-Bayer formats
+    """
+    if pixel_format.startswith("Bayer") and pixel_format[5:7] in BAYER_CONVERSIONS:
+        return pixel_format[5:7]
+    return None
+
+
+def demosaic(mosaic: np.ndarray, pattern: str) -> np.ndarray:
+    """
+    Convert a Bayer mosaic to an RGB image.
+
+    Args:
+        mosaic (np.ndarray): (height, width) mosaic, 8 or 16 bit
+        pattern (str): Bayer pattern, e.g. "RG"
+
+    Returns:
+        np.ndarray: (height, width, 3) RGB image with the dtype of the mosaic
+    """
+    return cv2.cvtColor(mosaic, BAYER_CONVERSIONS[pattern])
+
+
+def demosaic_file(mosaic_file: str, pattern: str, output_file: str) -> str:
+    """
+    Demosaic a stored mosaic and write it as an image file.
+
+    Module-level so it can run in a worker process.
+
+    Args:
+        mosaic_file (str): Path of the .npy mosaic
+        pattern (str): Bayer pattern, e.g. "RG"
+        output_file (str): Path of the image file, the extension selects the format
+
+    Returns:
+        str: Path of the written image file
+    """
+    rgb = demosaic(np.load(mosaic_file), pattern)
+    if not cv2.imwrite(output_file, cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR)):
+        raise RuntimeError(f"Failed to write {output_file}")
+    return output_file
+
+
+class Bayer_Sequence_Writer:
+    """
+    Store raw Bayer mosaics of a capture sequence.
+
+    Each frame is written unconverted as a .npy file, one byte per pixel for
+    8-bit formats. A metadata file records the pixel format, the Bayer
+    pattern and the format the frames replace, so they can be demosaiced
+    later, lazily with read_bayer_frame or in bulk with Bayer_Demosaic_Pool.
+
+    Attributes:
+        path (str): Directory path of the sequence files
+        name (str): Name prefix of the sequence files
+        pixel_format (str): Bayer pixel format the frames were grabbed in
+        original_format (str): Pixel format the camera was configured with before
+    """
+
+    def __init__(self, path: str, name: str, pixel_format: str, original_format: str):
+        """
+        Initialize the writer.
+
+        Args:
+            path (str): Directory path of the sequence files
+            name (str): Name prefix of the sequence files
+            pixel_format (str): Bayer pixel format, e.g. "BayerRG8"
+            original_format (str): Previous camera pixel format, e.g. "RGB8"
+
+        Raises:
+            ValueError: If pixel_format is not a Bayer format
+        """
+        pattern = bayer_pattern(pixel_format)
+        if pattern is None:
+            raise ValueError(f"{pixel_format} is not a Bayer pixel format")
+
+        self.path = path
+        self.name = name
+        self.pixel_format = pixel_format
+        self.pattern = pattern
+        self.original_format = original_format
+        self._frames: List[Dict[str, Any]] = []
+        self._shape: Optional[List[int]] = None
+        self._dtype: Optional[str] = None
+
+    @property
+    def metadata_file(self) -> str:
+        return f"{self.path}{self.name}{BAYER_METADATA_SUFFIX}"
+
+    def add(self, mosaic: np.ndarray, frame: int) -> str:
+        """
+        Store one mosaic.
+
+        Args:
+            mosaic (np.ndarray): (height, width) Bayer mosaic
+            frame (int): Frame number
+
+        Returns:
+            str: Path of the written file
+        """
+        filename = f"{self.path}{self.name}_{frame}.npy"
+        np.save(filename, mosaic)
+        self._shape = list(mosaic.shape)
+        self._dtype = mosaic.dtype.str
+        self._frames.append({"frame": frame, "file": os.path.basename(filename)})
+        return filename
+
+    def close(self) -> Dict[str, Any]:
+        """
+        Write the metadata file.
+
+        Returns:
+            Dict[str, Any]: The metadata including the path of the metadata file
+        """
+        metadata = {
+            "version": 1,
+            "pixel_format": self.pixel_format,
+            "bayer_pattern": self.pattern,
+            "original_format": self.original_format,
+            "shape": self._shape,
+            "dtype": self._dtype,
+            "frames": self._frames,
+        }
+        tmp_file = f"{self.metadata_file}.tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(metadata, f)
+        os.replace(tmp_file, self.metadata_file)
+
+        metadata["metadata_file"] = self.metadata_file
+        return metadata
+
+
+def load_bayer_metadata(metadata_file: str) -> Dict[str, Any]:
+    """
+    Read the metadata of a stored Bayer sequence.
+
+    Args:
+        metadata_file (str): Path of the .bayer.json file
+
+    Returns:
+        Dict[str, Any]: Metadata with the frame files resolved to full paths
+    """
+    with open(metadata_file, "r", encoding="utf-8") as f:
+        metadata = json.load(f)
+    directory = os.path.dirname(metadata_file)
+    for entry in metadata["frames"]:
+        entry["file"] = os.path.join(directory, entry["file"])
+    return metadata
+
+
+def read_bayer_frame(metadata_file: str, frame: int) -> np.ndarray:
+    """
+    Demosaic one stored frame on demand.
+
+    Args:
+        metadata_file (str): Path of the .bayer.json file
+        frame (int): Frame number
+
+    Returns:
+        np.ndarray: (height, width, 3) RGB image
+
+    Raises:
+        KeyError: If the frame is not part of the sequence
+    """
+    metadata = load_bayer_metadata(metadata_file)
+    for entry in metadata["frames"]:
+        if entry["frame"] == frame:
+            return demosaic(np.load(entry["file"]), metadata["bayer_pattern"])
+    raise KeyError(frame)
+
+
+class Bayer_Demosaic_Pool:
+    """
+    Background demosaicing of stored Bayer sequences in a process pool.
+
+    Demosaicing runs outside the capture path and outside the API process's
+    GIL. The pool is created on first use.
+
+    Attributes:
+        workers (Optional[int]): Number of worker processes, None for one per CPU
+    """
+
+    def __init__(self, workers: Optional[int] = None):
+        """
+        Initialize the pool.
+
+        Args:
+            workers (Optional[int], optional): Number of worker processes. Defaults to one per CPU.
+        """
+        self.workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def submit_sequence(
+        self, metadata_file: str, image_format: str = "png"
+    ) -> List[Future]:
+        """
+        Queue all frames of a sequence for demosaicing.
+
+        Args:
+            metadata_file (str): Path of the .bayer.json file
+            image_format (str, optional): Extension of the RGB images. Defaults to "png".
+
+        Returns:
+            List[Future]: One future per frame, resolving to the written image path
+        """
+        metadata = load_bayer_metadata(metadata_file)
+        executor = self._get_executor()
+        futures = []
+        for entry in metadata["frames"]:
+            output_file = f"{os.path.splitext(entry['file'])[0]}.{image_format}"
+            future = executor.submit(
+                demosaic_file, entry["file"], metadata["bayer_pattern"], output_file
+            )
+            future.add_done_callback(self._log_failure)
+            futures.append(future)
+        logger.info("Queued %s frames of %s for demosaicing", len(futures), metadata_file)
+        return futures
+
+    def shutdown(self) -> None:
+        """Wait for queued frames and stop the worker processes."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+    @staticmethod
+    def _log_failure(future: Future) -> None:
+        if not future.cancelled() and future.exception() is not None:
+            logger.error("Demosaicing failed: %s", future.exception())
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            return self._executor
@@ -0,0 +1,239 @@
+################################################
+## Project: ASS/NSS API
+## Author: David Michalica, Team 1
+## Date: 2024
+##
+## Documentation: https://docs.python.org/3/library/concurrent.futures.html#threadpoolexecutor
+#################################################
+
+import contextlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from BussinessLayer.Tracing import Tracer
+from data.Capture_job import Capture_Job
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Runs a capture; receives the progress and should_stop callbacks and returns the result
+Capture_Work = Callable[..., Dict[str, Any]]
+
+
+class Capture_Job_Manager:
+    """
+    Runs long captures as background jobs.
+
+    Jobs are executed by a small thread pool, so an HTTP request only
+    validates the capture and returns the job ID. The capture reports
+    every stored frame through a progress callback and polls a stop
+    callback between frames, which makes cancellation take effect after the
+    current frame. Watchers block on a condition until the job changes.
+
+    Records of finished jobs are kept for inspection, up to history jobs;
+    the oldest finished jobs are dropped first, active jobs never. With a
+    tracer, each capture is traced and the job records the trace ID.
+
+    Attributes:
+        history (int): Number of finished jobs kept
+        tracer (Tracer, optional): Tracer recording the spans of each capture
+    """
+
+    def __init__(self, workers: int = 2, history: int = 100, tracer: Optional[Tracer] = None):
+        """
+        Initialize the manager.
+
+        Args:
+            workers (int, optional): Number of captures running at the same time. Defaults to 2.
+            history (int, optional): Number of finished jobs kept. Defaults to 100.
+            tracer (Optional[Tracer], optional): Trace the captures. Defaults to None.
+        """
+        self.history = history
+        self.tracer = tracer
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="capture-job")
+        self._condition = threading.Condition()
+        self._jobs: "OrderedDict[str, Capture_Job]" = OrderedDict()
+        self._futures: Dict[str, Future] = {}
+        self._file_sizes: Dict[str, Dict[str, int]] = {}
+
+    def submit(self, job: Capture_Job, work: Capture_Work) -> Dict[str, Any]:
+        """
+        Queue a job.
+
+        Args:
+            job (Capture_Job): Job record
+            work (Capture_Work): Runs the capture, called with the keyword arguments
+                progress(frame, filename, nbytes=None) and should_stop()
+
+        Returns:
+            Dict[str, Any]: The job description
+        """
+        with self._condition:
+            self._jobs[job.job_id] = job
+            self._file_sizes[job.job_id] = {}
+            self._futures[job.job_id] = self._executor.submit(self._run, job, work)
+            logger.info(
+                "Queued %s capture job %s for %s frame(s)", job.job_type, job.job_id, job.total
+            )
+            return job.to_dict(include_files=False)
+
+    def get_job(self, job_id: str, include_files: bool = True) -> Dict[str, Any]:
+        """
+        Return one job.
+
+        Args:
+            job_id (str): Job identifier
+            include_files (bool, optional): Include the files written so far and the result.
+                Defaults to True.
+
+        Returns:
+            Dict[str, Any]: The job description
+
+        Raises:
+            KeyError: If the job does not exist
+        """
+        with self._condition:
+            return self._jobs[job_id].to_dict(include_files)
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        """
+        Return all known jobs without their file lists.
+
+        Returns:
+            List[Dict[str, Any]]: Job descriptions, oldest first
+        """
+        with self._condition:
+            return [job.to_dict(include_files=False) for job in self._jobs.values()]
+
+    def cancel_job(self, job_id: str) -> Dict[str, Any]:
+        """
+        Cancel a job.
+
+        A queued job is cancelled at once; a running capture stops after the
+        frame it is storing and keeps the frames stored so far.
+
+        Args:
+            job_id (str): Job identifier
+
+        Returns:
+            Dict[str, Any]: The job description
+
+        Raises:
+            KeyError: If the job does not exist
+        """
+        with self._condition:
+            job = self._jobs[job_id]
+            if job.active:
+                job.cancel_requested = True
+                if job.state == "queued" and self._futures[job_id].cancel():
+                    self._finish(job, "cancelled")
+                self._touch(job)
+                logger.info("Capture job %s cancelled", job_id)
+            return job.to_dict(include_files=False)
+
+    def wait_for_progress(self, job_id: str, version: int, timeout: float) -> Dict[str, Any]:
+        """
+        Wait until a job has changed since the given version.
+
+        Args:
+            job_id (str): Job identifier
+            version (int): Last version seen by the caller, -1 for none
+            timeout (float): Maximum seconds to wait
+
+        Returns:
+            Dict[str, Any]: The progress of the job; its version equals the given one on timeout
+
+        Raises:
+            KeyError: If the job does not exist (any more)
+        """
+        with self._condition:
+            self._condition.wait_for(
+                lambda: job_id not in self._jobs or self._jobs[job_id].version != version,
+                timeout,
+            )
+            return self._jobs[job_id].progress()
+
+    def shutdown(self) -> None:
+        """Cancel all jobs and wait for running captures to stop."""
+        with self._condition:
+            for job_id in list(self._jobs):
+                self.cancel_job(job_id)
+        self._executor.shutdown(wait=True)
+
+    def _run(self, job: Capture_Job, work: Capture_Work) -> None:
+        with self._condition:
+            if job.cancel_requested:
+                self._finish(job, "cancelled")
+                self._touch(job)
+                return
+
+        trace = (
+            self.tracer.trace(f"job {job.job_type} {job.job_id}")
+            if self.tracer
+            else contextlib.nullcontext()
+        )
+        try:
+            with trace as active_trace:
+                with self._condition:
+                    job.state = "running"
+                    job.started_at = time.time()
+                    job.trace_id = active_trace.trace_id if active_trace else None
+                    self._touch(job)
+                result = work(
+                    progress=lambda frame, filename, nbytes=None: self._record_frame(
+                        job, filename, nbytes
+                    ),
+                    should_stop=lambda: job.cancel_requested,
+                )
+        except Exception as e:
+            logger.error("Capture job %s failed: %s", job.job_id, e)
+            with self._condition:
+                job.error = str(e)
+                self._finish(job, "failed")
+                self._touch(job)
+            return
+
+        with self._condition:
+            job.result = result
+            self._finish(job, "cancelled" if job.cancel_requested else "completed")
+            self._touch(job)
+        logger.info(
+            "Capture job %s %s: %s/%s frames", job.job_id, job.state, job.frames_done, job.total
+        )
+
+    def _record_frame(self, job: Capture_Job, filename: str, nbytes: Optional[int]) -> None:
+        if nbytes is None:
+            # Sequence files grow with every frame, so track the size of each file
+            try:
+                size = os.path.getsize(filename)
+            except OSError:
+                size = 0
+            with self._condition:
+                sizes = self._file_sizes.get(job.job_id, {})
+                nbytes = size - sizes.get(filename, 0)
+                sizes[filename] = size
+        with self._condition:
+            job.frames_done += 1
+            job.bytes_written += nbytes
+            if not job.files or job.files[-1] != filename:
+                job.files.append(filename)
+            self._touch(job)
+
+    def _finish(self, job: Capture_Job, state: str) -> None:
+        job.state = state
+        job.finished_at = time.time()
+        self._futures.pop(job.job_id, None)
+        self._file_sizes.pop(job.job_id, None)
+
+        finished = [job_id for job_id, other in self._jobs.items() if not other.active]
+        for job_id in finished[: max(0, len(finished) - self.history)]:
+            del self._jobs[job_id]
+
+    def _touch(self, job: Capture_Job) -> None:
+        job.version += 1
+        self._condition.notify_all()
@@ -0,0 +1,302 @@
+################################################
+## Project: ASS/NSS API
+## Author: David Michalica, Team 1
+## Date: 2024
+##
+## Documentation: https://docs.python.org/3/library/threading.html#condition-objects
+#################################################
+
+import json
+import logging
+import math
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from BussinessLayer.RGB_Camera_Controller import RGB_Camera_Controller
+from data.Capture_schedule import Interval_Capture_Job
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+class Capture_Scheduler:
+    """
+    Runs interval (timelapse) capture jobs on the shared, warm RGB camera.
+
+    A single worker thread serves the due slots of all active jobs. Slot
+    times are computed from the job start time, so timing does not drift.
+    The start time is mapped onto the monotonic clock once, when the job is
+    added or loaded, so changes of the wall clock neither shift slots nor
+    make them burst.
+    A slot that cannot be served within half a period is counted as missed
+    and skipped. Job state is persisted to a JSON file, so jobs survive
+    restarts of the API.
+
+    Attributes:
+        state_file (str): Path of the JSON file holding the job state
+        camera_provider (Callable): Returns the shared, connected camera controller
+        persist_interval (float): Minimum seconds between state writes caused by captures
+    """
+
+    def __init__(
+        self,
+        state_file: str,
+        camera_provider: Callable[[], RGB_Camera_Controller],
+        persist_interval: float = 1.0,
+    ):
+        """
+        Initialize the scheduler and load persisted jobs.
+
+        Args:
+            state_file (str): Path of the JSON file holding the job state
+            camera_provider (Callable[[], RGB_Camera_Controller]): Returns the shared camera controller
+            persist_interval (float, optional): Minimum seconds between state writes. Defaults to 1.0.
+        """
+        self.state_file = state_file
+        self.camera_provider = camera_provider
+        self.persist_interval = persist_interval
+
+        self._condition = threading.Condition()
+        self._jobs: Dict[str, Interval_Capture_Job] = {}
+        # time.monotonic() value of each job's start_at
+        self._anchors: Dict[str, float] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+        self._last_persist = 0.0
+
+        self._load()
+
+    def start(self) -> None:
+        """Start the worker thread if it is not running yet."""
+        with self._condition:
+            if self._thread is not None:
+                return
+            self._stopped = False
+            self._thread = threading.Thread(
+                target=self._run, name="capture-scheduler", daemon=True
+            )
+            self._thread.start()
+        logger.info("Capture scheduler started with %s job(s)", len(self._jobs))
+
+    def stop(self) -> None:
+        """Stop the worker thread and persist the job state."""
+        with self._condition:
+            self._stopped = True
+            thread = self._thread
+            self._condition.notify_all()
+        if thread is not None:
+            thread.join()
+        with self._condition:
+            self._thread = None
+            self._persist(force=True)
+
+    def add_job(self, job: Interval_Capture_Job) -> Dict[str, Any]:
+        """
+        Schedule a new interval capture job.
+
+        Args:
+            job (Interval_Capture_Job): Job to schedule
+
+        Returns:
+            Dict[str, Any]: The job description including statistics
+        """
+        with self._condition:
+            # Anchor first, so a job that cannot be anchored is not left registered
+            self._anchor(job)
+            self._jobs[job.job_id] = job
+            self._persist(force=True)
+            self._condition.notify_all()
+        logger.info(
+            "Scheduled capture job %s: every %ss, count=%s", job.job_id, job.period, job.count
+        )
+        return self._describe(job)
+
+    def cancel_job(self, job_id: str) -> Dict[str, Any]:
+        """
+        Cancel a job.
+
+        Args:
+            job_id (str): Job identifier
+
+        Returns:
+            Dict[str, Any]: The job description including statistics
+
+        Raises:
+            KeyError: If the job does not exist
+        """
+        with self._condition:
+            job = self._jobs[job_id]
+            if job.active:
+                job.state = "cancelled"
+                self._persist(force=True)
+                self._condition.notify_all()
+            logger.info("Capture job %s cancelled", job_id)
+            return self._describe(job)
+
+    def get_job(self, job_id: str) -> Dict[str, Any]:
+        """
+        Return one job.
+
+        Args:
+            job_id (str): Job identifier
+
+        Returns:
+            Dict[str, Any]: The job description including statistics
+
+        Raises:
+            KeyError: If the job does not exist
+        """
+        with self._condition:
+            return self._describe(self._jobs[job_id])
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        """
+        Return all known jobs.
+
+        Returns:
+            List[Dict[str, Any]]: Job descriptions including statistics
+        """
+        with self._condition:
+            return [self._describe(job) for job in self._jobs.values()]
+
+    @staticmethod
+    def _describe(job: Interval_Capture_Job) -> Dict[str, Any]:
+        description = job.to_dict()
+        for key in ("lateness_mean", "lateness_m2", "lateness_max"):
+            description.pop(key)
+        description["next_slot_at"] = (
+            job.slot_time(job.next_slot) if job.active else None
+        )
+        description["stats"] = job.stats()
+        return description
+
+    def _anchor(self, job: Interval_Capture_Job) -> None:
+        self._anchors[job.job_id] = time.monotonic() - (time.time() - job.start_at)
+
+    def _due(self, job: Interval_Capture_Job, slot: int) -> float:
+        """Return the time.monotonic() value at which a slot is due."""
+        return self._anchors[job.job_id] + slot * job.period
+
+    def _next_due_job(self) -> Optional[Interval_Capture_Job]:
+        active = [job for job in self._jobs.values() if job.active]
+        if not active:
+            return None
+        return min(active, key=lambda job: self._due(job, job.next_slot))
+
+    def _run(self) -> None:
+        """Serve due slots until the scheduler is stopped."""
+        while True:
+            with self._condition:
+                if self._stopped:
+                    return
+                job = self._next_due_job()
+                if job is None:
+                    self._condition.wait()
+                    continue
+                delay = self._due(job, job.next_slot) - time.monotonic()
+                if delay > 0:
+                    # Re-evaluate after waking: a job may have been added or cancelled
+                    self._condition.wait(timeout=delay)
+                    continue
+                slot = self._claim_slot(job)
+
+            if slot is not None:
+                self._capture_slot(job, slot)
+
+    def _claim_slot(self, job: Interval_Capture_Job) -> Optional[int]:
+        """
+        Pick the slot to capture for a due job, skipping slots that are too late.
+
+        Returns:
+            Optional[int]: Slot index to capture, or None if the job has finished
+        """
+        now = time.monotonic()
+        slot = job.next_slot
+        late_slots = math.ceil((now - self._due(job, slot)) / job.period - 0.5)
+        if late_slots > 0:
+            if job.count is not None:
+                late_slots = min(late_slots, job.count - slot)
+            job.missed_slots += late_slots
+            slot += late_slots
+            logger.warning("Capture job %s missed %s slot(s)", job.job_id, late_slots)
+
+        if job.is_exhausted(slot):
+            job.next_slot = slot
+            job.state = "completed"
+            self._persist(force=True)
+            logger.info("Capture job %s completed", job.job_id)
+            return None
+
+        job.next_slot = slot + 1
+        if self._due(job, slot) > now:
+            # The skipped slots were late, this one is still ahead of us
+            job.next_slot = slot
+            return None
+        job.state = "running"
+        return slot
+
+    def _capture_slot(self, job: Interval_Capture_Job, slot: int) -> None:
+        filename = f"{job.path}{job.name}_{slot + 1}.{job.image_format}"
+        try:
+            controller = self.camera_provider()
+            controller.capture_latest_image(
+                filename, quality=job.quality, image_format=job.image_format
+            )
+            lateness = time.monotonic() - self._due(job, slot)
+        except Exception as e:
+            logger.error("Capture job %s slot %s failed: %s", job.job_id, slot + 1, e)
+            with self._condition:
+                job.failed_slots += 1
+                job.error = str(e)
+                self._persist()
+            return
+
+        with self._condition:
+            # Wall-clock capture time as measured on the monotonic clock
+            slot_time = job.slot_time(slot)
+            job.record_capture(slot_time, slot_time + lateness, filename)
+            if job.active and job.is_exhausted(job.next_slot):
+                job.state = "completed"
+                logger.info("Capture job %s completed", job.job_id)
+                self._persist(force=True)
+            else:
+                self._persist()
+
+    def _load(self) -> None:
+        """Load persisted jobs from the state file."""
+        if not os.path.exists(self.state_file):
+            return
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                stored_jobs = json.load(f)
+            for data in stored_jobs:
+                job = Interval_Capture_Job.from_dict(data)
+                if job.state == "running":
+                    job.state = "scheduled"
+                self._anchor(job)
+                self._jobs[job.job_id] = job
+            logger.info("Loaded %s capture job(s) from %s", len(self._jobs), self.state_file)
+        except Exception as e:
+            logger.error("Failed to load capture jobs from %s: %s", self.state_file, e)
+
+    def _persist(self, force: bool = False) -> None:
+        """
+        Write the job state to disk atomically. Caller must hold the condition.
+
+        Args:
+            force (bool, optional): Write even if the last write was recent. Defaults to False.
+        """
+        now = time.monotonic()
+        if not force and now - self._last_persist < self.persist_interval:
+            return
+        self._last_persist = now
+
+        tmp_file = f"{self.state_file}.tmp"
+        try:
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump([job.to_dict() for job in self._jobs.values()], f, indent=2)
+            os.replace(tmp_file, self.state_file)
+        except Exception as e:
+            logger.error("Failed to persist capture jobs: %s", e)
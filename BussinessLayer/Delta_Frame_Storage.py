@@ -0,0 +1,310 @@
+################################################
+## Project: ASS/NSS API
+## Author: David Michalica, Team 1
+## Date: 2024
+##
+## Documentation: https://numpy.org/doc/stable/reference/generated/numpy.savez_compressed.html
+#################################################
+
+import json
+import logging
+import os
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+DELTA_INDEX_SUFFIX = ".delta.json"
+
+
+def _pad_to_tiles(image: np.ndarray, tile_size: int) -> np.ndarray:
+    """Pad a (height, width, channels) image with edge pixels to a multiple of the tile size."""
+    pad_y = -image.shape[0] % tile_size
+    pad_x = -image.shape[1] % tile_size
+    if pad_y or pad_x:
+        image = np.pad(image, ((0, pad_y), (0, pad_x), (0, 0)), mode="edge")
+    return image
+
+
+def _tiles(image: np.ndarray, tile_size: int) -> np.ndarray:
+    """
+    View a padded (height, width, channels) image as a grid of tiles.
+
+    Returns:
+        np.ndarray: (tiles_y, tiles_x, tile_size, tile_size, channels) view
+    """
+    height, width, channels = image.shape
+    return image.reshape(
+        height // tile_size, tile_size, width // tile_size, tile_size, channels
+    ).swapaxes(1, 2)
+
+
+class Delta_Frame_Writer:
+    """
+    Store a frame sequence as periodic keyframes plus per-tile deltas.
+
+    Every frame is compared tile by tile with the current keyframe. Only the
+    tiles whose largest per-pixel difference exceeds the threshold are stored,
+    compressed, in a delta file. A new keyframe is written every
+    keyframe_interval frames, or earlier when too much of the frame changed
+    for a delta to pay off. An index file lists all frames of the sequence.
+
+    Deltas always refer to a keyframe, never to the previous delta, so any
+    frame can be rebuilt from two files.
+
+    Attributes:
+        path (str): Directory path of the sequence files
+        name (str): Name prefix of the sequence files
+        keyframe_interval (int): Maximum number of frames per keyframe
+        tile_size (int): Edge length of the compared tiles in pixels
+        threshold (int): Largest per-pixel difference treated as unchanged, 0 is lossless
+        max_changed_ratio (float): Changed-tile ratio above which a keyframe is written instead
+    """
+
+    def __init__(
+        self,
+        path: str,
+        name: str,
+        keyframe_interval: int = 50,
+        tile_size: int = 32,
+        threshold: int = 0,
+        max_changed_ratio: float = 0.5,
+    ):
+        """
+        Initialize the writer.
+
+        Args:
+            path (str): Directory path of the sequence files
+            name (str): Name prefix of the sequence files
+            keyframe_interval (int, optional): Maximum frames per keyframe. Defaults to 50.
+            tile_size (int, optional): Tile edge length in pixels. Defaults to 32.
+            threshold (int, optional): Largest per-pixel difference treated as unchanged. Defaults to 0.
+            max_changed_ratio (float, optional): Changed-tile ratio forcing a keyframe. Defaults to 0.5.
+
+        Raises:
+            ValueError: If a parameter is out of range
+        """
+        if keyframe_interval < 1:
+            raise ValueError("keyframe_interval must be at least 1")
+        if tile_size < 1:
+            raise ValueError("tile_size must be at least 1")
+        if threshold < 0:
+            raise ValueError("threshold must not be negative")
+
+        self.path = path
+        self.name = name
+        self.keyframe_interval = keyframe_interval
+        self.tile_size = tile_size
+        self.threshold = threshold
+        self.max_changed_ratio = max_changed_ratio
+
+        self._keyframe: Optional[np.ndarray] = None
+        self._keyframe_number = 0
+        self._frames_since_keyframe = 0
+        self._entries: List[Dict[str, Any]] = []
+        self._shape: Optional[List[int]] = None
+        self._dtype: Optional[str] = None
+        self._bytes_written = 0
+        self._raw_bytes = 0
+
+    @property
+    def index_file(self) -> str:
+        return f"{self.path}{self.name}{DELTA_INDEX_SUFFIX}"
+
+    def add(self, image: np.ndarray, frame: int) -> str:
+        """
+        Store one frame.
+
+        Args:
+            image (np.ndarray): Frame as (height, width) or (height, width, channels) array
+            frame (int): Frame number
+
+        Returns:
+            str: File the frame was written to
+        """
+        shape = list(image.shape)
+        if image.ndim == 2:
+            image = image[:, :, np.newaxis]
+
+        changed = None
+        if (
+            self._keyframe is not None
+            and self._shape == shape
+            and self._dtype == image.dtype.str
+            and self._frames_since_keyframe < self.keyframe_interval
+        ):
+            changed = self._changed_tiles(image)
+            if changed.mean() > self.max_changed_ratio:
+                changed = None
+
+        if changed is None:
+            filename = self._write_keyframe(image, frame)
+            self._shape = shape
+        else:
+            filename = self._write_delta(image, frame, changed)
+        self._raw_bytes += image.nbytes
+        self._bytes_written += os.path.getsize(filename)
+        return filename
+
+    def close(self) -> Dict[str, Any]:
+        """
+        Write the index file.
+
+        Returns:
+            Dict[str, Any]: Index file, frame counts and the achieved storage ratio
+        """
+        index = {
+            "version": 1,
+            "shape": self._shape,
+            "dtype": self._dtype,
+            "tile_size": self.tile_size,
+            "threshold": self.threshold,
+            "frames": self._entries,
+        }
+        tmp_file = f"{self.index_file}.tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(index, f)
+        os.replace(tmp_file, self.index_file)
+
+        keyframes = sum(1 for entry in self._entries if entry["type"] == "key")
+        summary = {
+            "index_file": self.index_file,
+            "keyframes": keyframes,
+            "deltas": len(self._entries) - keyframes,
+            "bytes_written": self._bytes_written,
+            "raw_bytes": self._raw_bytes,
+            "storage_ratio": (
+                round(self._bytes_written / self._raw_bytes, 4) if self._raw_bytes else None
+            ),
+        }
+        logger.info("Delta sequence %s stored: %s", self.name, summary)
+        return summary
+
+    def _changed_tiles(self, image: np.ndarray) -> np.ndarray:
+        """
+        Compare a frame with the keyframe tile by tile.
+
+        Returns:
+            np.ndarray: (tiles_y, tiles_x) boolean mask of changed tiles
+        """
+        difference = np.abs(
+            _pad_to_tiles(image, self.tile_size).astype(np.int32) - self._keyframe
+        )
+        return _tiles(difference, self.tile_size).max(axis=(2, 3, 4)) > self.threshold
+
+    def _write_keyframe(self, image: np.ndarray, frame: int) -> str:
+        filename = f"{self.path}{self.name}_{frame}.key.npz"
+        np.savez_compressed(filename, image=image)
+
+        # Keep the keyframe padded and widened, so the tile diff needs no per-frame conversion
+        self._keyframe = _pad_to_tiles(image, self.tile_size).astype(np.int32)
+        self._keyframe_number = frame
+        self._frames_since_keyframe = 1
+        self._dtype = image.dtype.str
+        self._entries.append(
+            {"frame": frame, "type": "key", "file": os.path.basename(filename)}
+        )
+        return filename
+
+    def _write_delta(self, image: np.ndarray, frame: int, changed: np.ndarray) -> str:
+        filename = f"{self.path}{self.name}_{frame}.delta.npz"
+        tiles = _tiles(_pad_to_tiles(image, self.tile_size), self.tile_size)
+        np.savez_compressed(
+            filename,
+            index=np.argwhere(changed).astype(np.uint16),
+            tiles=tiles[changed],
+        )
+        self._frames_since_keyframe += 1
+        self._entries.append(
+            {
+                "frame": frame,
+                "type": "delta",
+                "file": os.path.basename(filename),
+                "keyframe": self._keyframe_number,
+                "changed_tiles": int(changed.sum()),
+            }
+        )
+        return filename
+
+
+class Delta_Frame_Reader:
+    """
+    Rebuild frames of a sequence written by Delta_Frame_Writer.
+
+    Decoded keyframes are kept in a small LRU cache, so reading consecutive
+    frames only decompresses the delta files.
+
+    Attributes:
+        index_file (str): Path of the sequence index file
+        cache_size (int): Number of decoded keyframes kept in memory
+    """
+
+    def __init__(self, index_file: str, cache_size: int = 4):
+        """
+        Open a stored sequence.
+
+        Args:
+            index_file (str): Path of the sequence index file
+            cache_size (int, optional): Number of cached keyframes. Defaults to 4.
+        """
+        self.index_file = index_file
+        self.cache_size = max(1, cache_size)
+        self._directory = os.path.dirname(index_file)
+        with open(index_file, "r", encoding="utf-8") as f:
+            self._index = json.load(f)
+        self._entries = {entry["frame"]: entry for entry in self._index["frames"]}
+        self._keyframes: "OrderedDict[int, np.ndarray]" = OrderedDict()
+
+    def frames(self) -> List[int]:
+        """Return the frame numbers of the sequence."""
+        return sorted(self._entries)
+
+    def read(self, frame: int) -> np.ndarray:
+        """
+        Rebuild one frame.
+
+        Args:
+            frame (int): Frame number
+
+        Returns:
+            np.ndarray: Frame in its original shape and dtype
+
+        Raises:
+            KeyError: If the frame is not part of the sequence
+        """
+        entry = self._entries[frame]
+        if entry["type"] == "key":
+            return self._restore_shape(self._load_keyframe(frame).copy())
+
+        tile_size = self._index["tile_size"]
+        keyframe = self._load_keyframe(entry["keyframe"])
+        image = _pad_to_tiles(keyframe, tile_size)
+        if image is keyframe:
+            image = keyframe.copy()
+        with np.load(os.path.join(self._directory, entry["file"])) as delta:
+            index = delta["index"].astype(np.intp)
+            _tiles(image, tile_size)[index[:, 0], index[:, 1]] = delta["tiles"]
+
+        image = image[: keyframe.shape[0], : keyframe.shape[1]]
+        return self._restore_shape(image)
+
+    def _load_keyframe(self, frame: int) -> np.ndarray:
+        if frame in self._keyframes:
+            self._keyframes.move_to_end(frame)
+            return self._keyframes[frame]
+
+        entry = self._entries[frame]
+        with np.load(os.path.join(self._directory, entry["file"])) as data:
+            image = data["image"]
+        if image.ndim == 2:
+            image = image[:, :, np.newaxis]
+        self._keyframes[frame] = image
+        if len(self._keyframes) > self.cache_size:
+            self._keyframes.popitem(last=False)
+        return image
+
+    def _restore_shape(self, image: np.ndarray) -> np.ndarray:
+        return image.reshape(self._index["shape"])
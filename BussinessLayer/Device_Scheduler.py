@@ -0,0 +1,254 @@
+################################################
+## Project: ASS/NSS API
+## Author: David Michalica, Team 1
+## Date: 2024
+##
+## Documentation: https://datatracker.ietf.org/doc/html/rfc6585#section-4
+#################################################
+
+import contextlib
+import itertools
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional
+
+from BussinessLayer.Tracing import span
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Priority classes, served in this order
+INTERACTIVE = 0
+BULK = 1
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BULK: "bulk"}
+
+# Waits and service times kept per device for the metrics
+_METRIC_WINDOW = 1000
+# Clients remembered per device for fair ordering
+_CLIENT_MEMORY = 256
+
+
+class Device_Busy_Error(RuntimeError):
+    """
+    Raised when a request is not admitted to a device.
+
+    Attributes:
+        device (str): Device key
+        retry_after (int): Suggested seconds until the client retries
+    """
+
+    def __init__(self, device: str, message: str, retry_after: int):
+        super().__init__(f"Device {device} is busy: {message}")
+        self.device = device
+        self.retry_after = retry_after
+
+
+class _Ticket:
+    """Request waiting for a device."""
+
+    __slots__ = ("priority", "client", "seq", "enqueued_at")
+
+    def __init__(self, priority: int, client: str, seq: int):
+        self.priority = priority
+        self.client = client
+        self.seq = seq
+        self.enqueued_at = time.perf_counter()
+
+
+class _Device_Queue:
+    """Waiting requests, holder and counters of one device."""
+
+    def __init__(self):
+        self.busy = False
+        self.holder_since = 0.0
+        self.waiting: List[_Ticket] = []
+        self.last_served: "OrderedDict[str, int]" = OrderedDict()
+        self.served = itertools.count()
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.waits: Deque[float] = deque(maxlen=_METRIC_WINDOW)
+        self.services: Deque[float] = deque(maxlen=_METRIC_WINDOW)
+
+    def next_ticket(self) -> Optional[_Ticket]:
+        # Highest priority first; within a priority the client served longest ago, then FIFO
+        return min(
+            self.waiting,
+            key=lambda ticket: (
+                ticket.priority,
+                self.last_served.get(ticket.client, -1),
+                ticket.seq,
+            ),
+            default=None,
+        )
+
+    def grant(self, client: str, waited: float) -> None:
+        self.busy = True
+        self.holder_since = time.perf_counter()
+        self.admitted += 1
+        self.waits.append(waited)
+        self.last_served[client] = next(self.served)
+        self.last_served.move_to_end(client)
+        if len(self.last_served) > _CLIENT_MEMORY:
+            self.last_served.popitem(last=False)
+
+
+class Device_Scheduler:
+    """
+    Admits requests to physical devices one at a time, fairly and bounded.
+
+    Every device (a camera by serial number, an acoustic sensor by address)
+    serves one admitted request at a time. Others wait in a bounded queue
+    and are admitted by priority class (interactive reads before bulk
+    captures), then round-robin across clients, then in arrival order. A
+    request that finds the queue full, or has already queued as many
+    requests as a client may, is rejected at once with a Retry-After
+    estimate instead of piling up behind the device; so is one that waited
+    longer than the timeout.
+
+    Attributes:
+        max_waiting (int): Requests allowed to wait per device
+        max_waiting_per_client (int): Waiting requests allowed per client and device
+        timeout (float): Seconds a request waits at most
+    """
+
+    def __init__(
+        self, max_waiting: int = 8, max_waiting_per_client: int = 4, timeout: float = 30.0
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            max_waiting (int, optional): Requests allowed to wait per device. Defaults to 8.
+            max_waiting_per_client (int, optional): Waiting requests allowed per client and
+                device. Defaults to 4.
+            timeout (float, optional): Seconds a request waits at most. Defaults to 30.0.
+        """
+        self.max_waiting = max_waiting
+        self.max_waiting_per_client = max_waiting_per_client
+        self.timeout = timeout
+        self._condition = threading.Condition()
+        self._queues: Dict[str, _Device_Queue] = {}
+        self._seq = itertools.count()
+
+    @contextlib.contextmanager
+    def admit(
+        self, devices: Iterable[str], client: str, priority: int = BULK
+    ) -> Iterator[None]:
+        """
+        Hold the given devices for the enclosed block.
+
+        Several devices are acquired in sorted order, so requests needing
+        overlapping sets of devices cannot deadlock.
+
+        Args:
+            devices (Iterable[str]): Device keys, e.g. 'rgb:40012345'
+            client (str): Client identity used for fair ordering
+            priority (int, optional): INTERACTIVE or BULK. Defaults to BULK.
+
+        Raises:
+            Device_Busy_Error: If a device queue is full or the wait timed out
+        """
+        acquired: List[str] = []
+        try:
+            with span("device.admission"):
+                for device in sorted(set(devices)):
+                    self._acquire(device, client, priority)
+                    acquired.append(device)
+            yield
+        finally:
+            for device in reversed(acquired):
+                self._release(device)
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Return queue depth, wait and service times per device.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Per device whether it is busy, the waiting requests
+            (also per priority class), admission counters and wait and service
+            times in milliseconds over the last admitted requests
+        """
+        with self._condition:
+            return {device: self._describe(queue) for device, queue in self._queues.items()}
+
+    def _acquire(self, device: str, client: str, priority: int) -> None:
+        with self._condition:
+            queue = self._queues.setdefault(device, _Device_Queue())
+            if not queue.busy and not queue.waiting:
+                queue.grant(client, 0.0)
+                return
+
+            if len(queue.waiting) >= self.max_waiting:
+                queue.rejected += 1
+                raise Device_Busy_Error(device, "queue is full", self._retry_after(queue))
+            if (
+                sum(ticket.client == client for ticket in queue.waiting)
+                >= self.max_waiting_per_client
+            ):
+                queue.rejected += 1
+                raise Device_Busy_Error(
+                    device, "too many queued requests of this client", self._retry_after(queue)
+                )
+
+            ticket = _Ticket(priority, client, next(self._seq))
+            queue.waiting.append(ticket)
+            try:
+                granted = self._condition.wait_for(
+                    lambda: not queue.busy and queue.next_ticket() is ticket, self.timeout
+                )
+            finally:
+                queue.waiting.remove(ticket)
+                # Another ticket may be at the head now
+                self._condition.notify_all()
+            if not granted:
+                queue.timed_out += 1
+                logger.warning(
+                    "Request of %s waited %s s for %s without being admitted",
+                    client,
+                    self.timeout,
+                    device,
+                )
+                raise Device_Busy_Error(device, "wait timed out", self._retry_after(queue))
+            queue.grant(client, time.perf_counter() - ticket.enqueued_at)
+
+    def _release(self, device: str) -> None:
+        with self._condition:
+            queue = self._queues[device]
+            queue.busy = False
+            queue.services.append(time.perf_counter() - queue.holder_since)
+            self._condition.notify_all()
+
+    @staticmethod
+    def _retry_after(queue: _Device_Queue) -> int:
+        # Time until the waiting requests and the current one are likely served
+        average = sum(queue.services) / len(queue.services) if queue.services else 1.0
+        return max(1, math.ceil(average * (len(queue.waiting) + 1)))
+
+    @staticmethod
+    def _describe(queue: _Device_Queue) -> Dict[str, Any]:
+        waits = sorted(queue.waits)
+        services = queue.services
+        return {
+            "busy": queue.busy,
+            "waiting": len(queue.waiting),
+            "waiting_by_priority": {
+                name: sum(ticket.priority == priority for ticket in queue.waiting)
+                for priority, name in PRIORITY_NAMES.items()
+            },
+            "admitted": queue.admitted,
+            "rejected": queue.rejected,
+            "timed_out": queue.timed_out,
+            "wait_ms": {
+                "avg": 1000 * sum(waits) / len(waits) if waits else None,
+                "p95": 1000 * waits[int(0.95 * (len(waits) - 1))] if waits else None,
+                "max": 1000 * waits[-1] if waits else None,
+            },
+            "service_ms": {
+                "avg": 1000 * sum(services) / len(services) if services else None,
+                "max": 1000 * max(services) if services else None,
+            },
+        }
@@ -0,0 +1,205 @@
+################################################
+## Project: ASS/NSS API
+## Author: David Michalica, Team 1
+## Date: 2024
+##
+## Documentation: https://docs.python.org/3/library/importlib.html#importlib.util.find_spec
+#################################################
+
+import importlib
+import importlib.util
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from types import ModuleType
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Driver:
+    """
+    Device driver that can be loaded on demand.
+
+    Attributes:
+        name (str): Driver name used in ENABLED_DRIVERS
+        module (str): Module imported when the driver is first used
+        requires (Tuple[str, ...]): Third-party packages the driver needs
+        description (str): Human-readable description
+        settings (Tuple[str, ...]): Configuration settings that must be set to use the driver
+    """
+
+    name: str
+    module: str
+    requires: Tuple[str, ...] = ()
+    description: str = ""
+    settings: Tuple[str, ...] = ()
+
+
+DRIVERS: Dict[str, Driver] = {
+    "rgb": Driver(
+        "rgb",
+        "BussinessLayer.RGB_Camera_Controller",
+        ("pypylon", "cv2", "numpy"),
+        "Basler RGB cameras through pylon",
+    ),
+    "multispectral": Driver(
+        "multispectral",
+        "BussinessLayer.MultiSpectral_Camera_Controller",
+        ("numpy",),
+        "Multispectral cameras",
+        ("MULTISPECTRAL_BACKEND",),
+    ),
+    "acoustic": Driver(
+        "acoustic",
+        "BussinessLayer.SensorController",
+        (),
+        "Acoustic sensors over TCP",
+    ),
+}
+
+
+class Driver_Disabled_Error(RuntimeError):
+    """Raised when a driver that is not enabled on this node is used."""
+
+
+class Driver_Registry:
+    """
+    Registry of the device drivers enabled on this node.
+
+    Drivers are imported on first use, so a node only pays for the native
+    libraries (pylon runtime, OpenCV, NumPy) of the devices it actually
+    drives, and the API starts without importing any of them. With "auto"
+    a driver is enabled when its packages are installed; this is checked
+    with importlib.util.find_spec, which does not import them. An enabled
+    driver whose required settings are empty in the configuration cannot be
+    used until they are set.
+
+    Attributes:
+        enabled (Tuple[str, ...]): Names of the enabled drivers
+    """
+
+    def __init__(self, enabled: Optional[Iterable[str]] = None, config: Any = None):
+        """
+        Initialize the registry.
+
+        Args:
+            enabled (Optional[Iterable[str]], optional): Driver names, or None / ["auto"]
+                to enable every driver whose packages are installed. Defaults to None.
+            config (Any, optional): Configuration object holding the settings the drivers
+                need, read on every check. Defaults to None to skip the settings check.
+
+        Raises:
+            ValueError: If an unknown driver is named
+        """
+        names = [name.strip() for name in enabled or ["auto"] if name.strip()]
+        if names == ["auto"]:
+            names = [name for name, driver in DRIVERS.items() if self._installed(driver)]
+        unknown = [name for name in names if name not in DRIVERS]
+        if unknown:
+            raise ValueError(f"Unknown drivers: {unknown}. Available drivers: {list(DRIVERS)}")
+
+        self.enabled = tuple(names)
+        self._config = config
+        self._modules: Dict[str, ModuleType] = {}
+        self._load_times: Dict[str, Dict[str, float]] = {name: {} for name in DRIVERS}
+        self._lock = threading.Lock()
+
+    def is_enabled(self, name: str) -> bool:
+        """Return whether a driver is enabled on this node and its settings are set."""
+        return name in self.enabled and not self.missing_settings(name)
+
+    def missing_settings(self, name: str) -> List[str]:
+        """
+        List the required settings of a driver that are not set.
+
+        Args:
+            name (str): Driver name
+
+        Returns:
+            List[str]: Names of the empty settings
+        """
+        if self._config is None or name not in DRIVERS:
+            return []
+        return [
+            setting
+            for setting in DRIVERS[name].settings
+            if not getattr(self._config, setting, None)
+        ]
+
+    def require(self, name: str) -> None:
+        """
+        Check that a driver is enabled and configured.
+
+        Args:
+            name (str): Driver name
+
+        Raises:
+            Driver_Disabled_Error: If the driver is not enabled or a required setting is empty
+        """
+        if name not in self.enabled:
+            raise Driver_Disabled_Error(f"The {name} driver is not enabled on this node")
+        missing = self.missing_settings(name)
+        if missing:
+            raise Driver_Disabled_Error(
+                f"The {name} driver is not configured on this node, set {', '.join(missing)}"
+            )
+
+    def load(self, name: str, module: Optional[str] = None) -> ModuleType:
+        """
+        Import a driver module on first use.
+
+        Args:
+            name (str): Driver name
+            module (Optional[str], optional): Module belonging to the driver, e.g. a
+                controller built on it. Defaults to the driver module.
+
+        Returns:
+            ModuleType: The imported module
+
+        Raises:
+            Driver_Disabled_Error: If the driver is not enabled
+        """
+        self.require(name)
+        module = module or DRIVERS[name].module
+        loaded = self._modules.get(module)
+        if loaded is not None:
+            return loaded
+
+        # Imports hold Python's import lock anyway, this only keeps the timing honest
+        with self._lock:
+            if module not in self._modules:
+                start = time.perf_counter()
+                self._modules[module] = importlib.import_module(module)
+                elapsed = time.perf_counter() - start
+                self._load_times[name][module] = elapsed
+                logger.info("Loaded %s for the %s driver in %.3f s", module, name, elapsed)
+            return self._modules[module]
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Describe every known driver.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Per driver whether it is enabled and loaded,
+            its required settings that are not set, its description and the import
+            time of its modules in seconds
+        """
+        with self._lock:
+            return {
+                name: {
+                    "enabled": self.is_enabled(name),
+                    "missing_settings": self.missing_settings(name),
+                    "loaded": driver.module in self._modules,
+                    "description": driver.description,
+                    "load_time_s": dict(self._load_times[name]),
+                }
+                for name, driver in DRIVERS.items()
+            }
+
+    @staticmethod
+    def _installed(driver: Driver) -> bool:
+        return all(importlib.util.find_spec(package) is not None for package in driver.requires)
@@ -0,0 +1,357 @@
+################################################
+## Project: ASS/NSS API
+## Author: David Michalica, Team 1
+## Date: 2024
+##
+## Documentation: https://numpy.org/doc/stable/reference/routines.statistics.html
+#################################################
+
+import logging
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+class Frame_Analyzer:
+    """
+    On-line per-frame statistics for a capture sequence.
+
+    Frames are subsampled while the grab buffer is still attached and copied
+    into a preallocated batch. Statistics are computed for a whole batch at
+    once with vectorized NumPy: per-channel mean and percentiles, a
+    per-channel histogram, the saturation ratio and a Laplacian-variance
+    sharpness score.
+
+    Attributes:
+        subsample (int): Only every n-th pixel in both directions is analysed
+        batch_size (int): Number of frames analysed together
+        bins (int): Number of histogram bins per channel
+        percentiles (Sequence[float]): Percentiles reported per channel
+        max_value (Optional[int]): Saturation level, defaults to the dtype maximum
+    """
+
+    def __init__(
+        self,
+        subsample: int = 4,
+        batch_size: int = 16,
+        bins: int = 32,
+        percentiles: Sequence[float] = (5, 50, 95),
+        max_value: Optional[int] = None,
+    ):
+        """
+        Initialize the analyzer.
+
+        Args:
+            subsample (int, optional): Pixel step in both directions. Defaults to 4.
+            batch_size (int, optional): Frames analysed together. Defaults to 16.
+            bins (int, optional): Histogram bins per channel. Defaults to 32.
+            percentiles (Sequence[float], optional): Reported percentiles. Defaults to (5, 50, 95).
+            max_value (Optional[int], optional): Saturation level. Defaults to the dtype maximum.
+        """
+        self.subsample = max(1, subsample)
+        self.batch_size = max(1, batch_size)
+        self.bins = bins
+        self.percentiles = list(percentiles)
+        self.max_value = max_value
+
+        self._batch: Optional[np.ndarray] = None
+        self._batch_frames: List[int] = []
+        self._rows: List[List[Any]] = []
+        self._histograms: List[List[List[int]]] = []
+        self._channels = 0
+
+    def add(self, image: np.ndarray, frame: Optional[int] = None) -> None:
+        """
+        Queue a frame for analysis. Only a subsampled copy is kept.
+
+        Args:
+            image (np.ndarray): Frame as (height, width) or (height, width, channels) array
+            frame (Optional[int], optional): Frame number for the table. Defaults to a running count.
+        """
+        view = image[:: self.subsample, :: self.subsample]
+        if view.ndim == 2:
+            view = view[:, :, np.newaxis]
+
+        if self._batch is None or self._batch.shape[1:] != view.shape:
+            self.flush()
+            self._batch = np.empty((self.batch_size,) + view.shape, dtype=view.dtype)
+            self._channels = view.shape[2]
+
+        index = len(self._batch_frames)
+        self._batch[index] = view
+        self._batch_frames.append(
+            frame if frame is not None else len(self._rows) + index + 1
+        )
+        if len(self._batch_frames) == self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Analyse all queued frames."""
+        if not self._batch_frames:
+            return
+        batch = self._batch[: len(self._batch_frames)]
+        stats = self.analyze_batch(batch)
+
+        for i, frame in enumerate(self._batch_frames):
+            row = [frame]
+            row.extend(stats["mean"][i])
+            for percentile_values in stats["percentiles"]:
+                row.extend(percentile_values[i])
+            row.append(stats["saturation_ratio"][i])
+            row.append(stats["sharpness"][i])
+            self._rows.append(row)
+            self._histograms.append(stats["histogram"][i])
+        self._batch_frames = []
+
+    def analyze_batch(self, batch: np.ndarray) -> Dict[str, Any]:
+        """
+        Compute statistics for a batch of frames.
+
+        Args:
+            batch (np.ndarray): Frames as (frames, height, width, channels) array
+
+        Returns:
+            Dict[str, Any]: Per-frame mean, percentiles, histogram, saturation ratio and sharpness
+        """
+        frames, height, width, channels = batch.shape
+        max_value = self._max_value(batch.dtype)
+        pixels = batch.reshape(frames, height * width, channels)
+
+        mean = pixels.mean(axis=1, dtype=np.float64)
+        percentiles = np.percentile(pixels, self.percentiles, axis=1)
+        saturation_ratio = (pixels >= max_value).any(axis=2).mean(axis=1)
+
+        # One bincount for all frames and channels: offset every bin index by its frame/channel slot
+        bin_index = (pixels.astype(np.int64) * self.bins) // (max_value + 1)
+        np.clip(bin_index, 0, self.bins - 1, out=bin_index)
+        slots = (
+            np.arange(frames)[:, np.newaxis, np.newaxis] * channels
+            + np.arange(channels)[np.newaxis, np.newaxis, :]
+        ) * self.bins
+        histogram = np.bincount(
+            (bin_index + slots).ravel(), minlength=frames * channels * self.bins
+        ).reshape(frames, channels, self.bins)
+
+        sharpness = self._laplacian_variance(batch)
+
+        return {
+            "mean": np.round(mean, 3).tolist(),
+            "percentiles": [np.round(p, 3).tolist() for p in percentiles],
+            "histogram": histogram.tolist(),
+            "saturation_ratio": np.round(saturation_ratio, 6).tolist(),
+            "sharpness": np.round(sharpness, 3).tolist(),
+        }
+
+    def result(self) -> Dict[str, Any]:
+        """
+        Flush pending frames and return the per-sequence table.
+
+        Returns:
+            Dict[str, Any]: Column names, one row per frame, histogram bin edges and
+            the per-frame, per-channel histogram counts
+        """
+        self.flush()
+        max_value = self._max_value(self._batch.dtype) if self._batch is not None else 255
+        return {
+            "columns": self._columns(),
+            "rows": self._rows,
+            "subsample": self.subsample,
+            "histogram_edges": np.linspace(0, max_value + 1, self.bins + 1).tolist(),
+            "histograms": self._histograms,
+        }
+
+    def frame_stats(self, index: int) -> Dict[str, Any]:
+        """
+        Return the statistics of one analysed frame as a dictionary.
+
+        Args:
+            index (int): Position of the frame in the table
+
+        Returns:
+            Dict[str, Any]: Column name to value, plus the histogram
+        """
+        self.flush()
+        stats = dict(zip(self._columns(), self._rows[index]))
+        stats["histogram"] = self._histograms[index]
+        return stats
+
+    def _columns(self) -> List[str]:
+        channels = [f"c{c}" for c in range(self._channels)]
+        columns = ["frame"]
+        columns.extend(f"mean_{c}" for c in channels)
+        for percentile in self.percentiles:
+            columns.extend(f"p{percentile:g}_{c}" for c in channels)
+        columns.extend(["saturation_ratio", "sharpness"])
+        return columns
+
+    def _max_value(self, dtype: np.dtype) -> int:
+        if self.max_value is not None:
+            return self.max_value
+        if np.issubdtype(dtype, np.integer):
+            return int(np.iinfo(dtype).max)
+        return 1
+
+    @staticmethod
+    def _laplacian_variance(batch: np.ndarray) -> np.ndarray:
+        """
+        Focus score: variance of the 4-neighbour Laplacian of the luminance.
+
+        Args:
+            batch (np.ndarray): Frames as (frames, height, width, channels) array
+
+        Returns:
+            np.ndarray: One score per frame
+        """
+        luminance = batch.mean(axis=3, dtype=np.float32)
+        if luminance.shape[1] < 3 or luminance.shape[2] < 3:
+            return np.zeros(luminance.shape[0])
+        laplacian = 4 * luminance[:, 1:-1, 1:-1]
+        laplacian -= luminance[:, :-2, 1:-1]
+        laplacian -= luminance[:, 2:, 1:-1]
+        laplacian -= luminance[:, 1:-1, :-2]
+        laplacian -= luminance[:, 1:-1, 2:]
+        return laplacian.reshape(laplacian.shape[0], -1).var(axis=1)
+
+
+class Frame_Quality_Gate:
+    """
+    Cheap per-frame checks deciding whether a frame is worth encoding.
+
+    Runs on a subsampled luminance image before the frame is handed to the
+    writer, so rejected frames cost neither an encode nor a disk write. A
+    threshold set to None disables its check.
+
+    Attributes:
+        min_sharpness (Optional[float]): Minimum Laplacian variance, lower is rejected as "blurry"
+        max_clipped_ratio (Optional[float]): Maximum ratio of clipped pixels, higher is rejected as "saturated"
+        min_difference (Optional[float]): Minimum mean absolute difference from the last kept
+            frame in pixel values, lower is rejected as "duplicate"
+        subsample (int): Pixel step of the analysed image in both directions
+    """
+
+    reasons = ("blurry", "saturated", "duplicate")
+
+    def __init__(
+        self,
+        min_sharpness: Optional[float] = None,
+        max_clipped_ratio: Optional[float] = None,
+        min_difference: Optional[float] = None,
+        subsample: int = 8,
+    ):
+        """
+        Initialize the quality gate.
+
+        Args:
+            min_sharpness (Optional[float], optional): Minimum Laplacian variance. Defaults to None.
+            max_clipped_ratio (Optional[float], optional): Maximum clipped-pixel ratio. Defaults to None.
+            min_difference (Optional[float], optional): Minimum difference from the last kept frame. Defaults to None.
+            subsample (int, optional): Pixel step in both directions. Defaults to 8.
+        """
+        self.min_sharpness = min_sharpness
+        self.max_clipped_ratio = max_clipped_ratio
+        self.min_difference = min_difference
+        self.subsample = max(1, subsample)
+
+        self._last_kept: Optional[np.ndarray] = None
+        self._rejected: Dict[str, int] = {reason: 0 for reason in self.reasons}
+        self._rejected_frames: List[Dict[str, Any]] = []
+        self._checked = 0
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "Frame_Quality_Gate":
+        """
+        Create a gate from a request configuration.
+
+        Args:
+            config (Dict[str, Any]): Threshold names and values
+
+        Returns:
+            Frame_Quality_Gate: Configured gate
+
+        Raises:
+            ValueError: If the configuration is not an object, contains unknown keys or
+                a value of the wrong type or range
+        """
+        if not isinstance(config, dict):
+            raise ValueError("The quality gate settings must be an object")
+        allowed = {"min_sharpness", "max_clipped_ratio", "min_difference", "subsample"}
+        unknown = set(config) - allowed
+        if unknown:
+            raise ValueError(
+                f"Unknown quality gate settings: {sorted(unknown)}. Supported settings: {sorted(allowed)}"
+            )
+
+        for name in ("min_sharpness", "max_clipped_ratio", "min_difference"):
+            value = config.get(name)
+            if value is None:
+                continue
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+                raise ValueError(f"{name} must be a non-negative number or null, got {value!r}")
+        if config.get("max_clipped_ratio") is not None and config["max_clipped_ratio"] > 1:
+            raise ValueError("max_clipped_ratio must be between 0 and 1")
+        subsample = config.get("subsample", 8)
+        if isinstance(subsample, bool) or not isinstance(subsample, int) or subsample < 1:
+            raise ValueError(f"subsample must be a positive integer, got {subsample!r}")
+        return cls(**config)
+
+    def check(self, image: np.ndarray, frame: Optional[int] = None) -> List[str]:
+        """
+        Check one frame. A frame that passes becomes the reference for the duplicate check.
+
+        Args:
+            image (np.ndarray): Frame as (height, width) or (height, width, channels) array
+            frame (Optional[int], optional): Frame number for the report. Defaults to a running count.
+
+        Returns:
+            List[str]: Rejection reasons, empty if the frame should be kept
+        """
+        self._checked += 1
+        view = image[:: self.subsample, :: self.subsample]
+        if view.ndim == 2:
+            view = view[:, :, np.newaxis]
+        luminance = view.mean(axis=2, dtype=np.float32)
+
+        reasons = []
+        if self.min_sharpness is not None:
+            sharpness = Frame_Analyzer._laplacian_variance(view[np.newaxis])[0]
+            if sharpness < self.min_sharpness:
+                reasons.append("blurry")
+        if self.max_clipped_ratio is not None:
+            max_value = (
+                np.iinfo(view.dtype).max if np.issubdtype(view.dtype, np.integer) else 1
+            )
+            clipped = (view >= max_value).any(axis=2).mean()
+            if clipped > self.max_clipped_ratio:
+                reasons.append("saturated")
+        if self.min_difference is not None and self._last_kept is not None:
+            if self._last_kept.shape == luminance.shape:
+                difference = np.abs(luminance - self._last_kept).mean()
+                if difference < self.min_difference:
+                    reasons.append("duplicate")
+
+        if reasons:
+            for reason in reasons:
+                self._rejected[reason] += 1
+            self._rejected_frames.append(
+                {"frame": frame if frame is not None else self._checked, "reasons": reasons}
+            )
+        else:
+            self._last_kept = luminance
+        return reasons
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Return the rejection statistics.
+
+        Returns:
+            Dict[str, Any]: Frames checked and rejected, rejections per reason and the rejected frames
+        """
+        return {
+            "checked": self._checked,
+            "rejected": len(self._rejected_frames),
+            "reasons": dict(self._rejected),
+            "rejected_frames": self._rejected_frames,
+        }
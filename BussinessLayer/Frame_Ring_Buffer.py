@@ -0,0 +1,185 @@
+################################################
+## Project: ASS/NSS API
+## Author: David Michalica, Team 1
+## Date: 2024
+##
+## Documentation: https://github.com/basler/pypylon/blob/master/samples/grabstrategies.py
+#################################################
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
+
+
+@dataclass
+class Ring_Frame:
+    """
+    One frame taken from a Frame_Ring_Buffer.
+
+    Attributes:
+        image (np.ndarray): Pixel data, a copy or a read-only view into the ring
+        sequence (int): Running frame number, starting at 1
+        camera_timestamp (int): Camera timestamp of the frame in ticks
+        host_time (float): time.time() when the frame was received
+    """
+
+    image: np.ndarray
+    sequence: int
+    camera_timestamp: int
+    host_time: float
+
+
+class Frame_Ring_Buffer:
+    """
+    Fixed-size ring of the most recent frames of a continuous grab.
+
+    The slots are allocated once, so storing a frame is a single copy into
+    preallocated memory. Readers get either a private copy or a read-only
+    view into the slot. A view stays valid until the writer wraps around to
+    the slot again, i.e. for size - 1 further frames; is_valid() tells
+    whether that already happened.
+
+    Attributes:
+        size (int): Number of frames kept
+    """
+
+    def __init__(self, size: int = 4):
+        """
+        Initialize the ring.
+
+        Args:
+            size (int, optional): Number of frames kept. Defaults to 4.
+
+        Raises:
+            ValueError: If size is smaller than 2
+        """
+        if size < 2:
+            raise ValueError("Ring size must be at least 2")
+        self.size = size
+        self._condition = threading.Condition()
+        self._slots: Optional[np.ndarray] = None
+        self._sequences = [0] * size
+        self._camera_timestamps = [0] * size
+        self._host_times = [0.0] * size
+        self._sequence = 0
+
+    def put(self, image: np.ndarray, camera_timestamp: int, host_time: Optional[float] = None) -> int:
+        """
+        Store a frame, overwriting the oldest one.
+
+        Args:
+            image (np.ndarray): Frame, typically a zero-copy view of a grab buffer
+            camera_timestamp (int): Camera timestamp of the frame
+            host_time (Optional[float], optional): Receive time. Defaults to now.
+
+        Returns:
+            int: Sequence number of the stored frame
+        """
+        if host_time is None:
+            host_time = time.time()
+        with self._condition:
+            if (
+                self._slots is None
+                or self._slots.shape[1:] != image.shape
+                or self._slots.dtype != image.dtype
+            ):
+                # New geometry or pixel format, older frames are no longer comparable
+                self._slots = np.empty((self.size,) + image.shape, dtype=image.dtype)
+                self._sequences = [0] * self.size
+
+            self._sequence += 1
+            slot = self._sequence % self.size
+            # Invalidate the slot first, readers checking a view must not see a torn frame as valid
+            self._sequences[slot] = 0
+            np.copyto(self._slots[slot], image)
+            self._sequences[slot] = self._sequence
+            self._camera_timestamps[slot] = camera_timestamp
+            self._host_times[slot] = host_time
+            self._condition.notify_all()
+            return self._sequence
+
+    def latest(self, copy: bool = True) -> Optional[Ring_Frame]:
+        """
+        Return the newest frame.
+
+        Args:
+            copy (bool, optional): Return a private copy instead of a view. Defaults to True.
+
+        Returns:
+            Optional[Ring_Frame]: The newest frame, or None if the ring is empty
+        """
+        with self._condition:
+            if self._sequence == 0 or self._slots is None:
+                return None
+            return self._frame(self._sequence % self.size, copy)
+
+    def wait_after(
+        self, host_time: float, timeout: float = 5.0, copy: bool = True
+    ) -> Optional[Ring_Frame]:
+        """
+        Return the first frame received after a point in time, waiting for it if needed.
+
+        Args:
+            host_time (float): time.time() value the frame must be newer than
+            timeout (float, optional): Longest wait in seconds. Defaults to 5.0.
+            copy (bool, optional): Return a private copy instead of a view. Defaults to True.
+
+        Returns:
+            Optional[Ring_Frame]: The frame, or None on timeout
+        """
+        with self._condition:
+            slot = None
+
+            def find() -> bool:
+                nonlocal slot
+                slot = self._first_slot_after(host_time)
+                return slot is not None
+
+            if not self._condition.wait_for(find, timeout=timeout):
+                return None
+            return self._frame(slot, copy)
+
+    def is_valid(self, frame: Ring_Frame) -> bool:
+        """
+        Check whether a view returned with copy=False still holds its frame.
+
+        Args:
+            frame (Ring_Frame): Frame returned by latest() or wait_after()
+
+        Returns:
+            bool: False once the slot was overwritten
+        """
+        with self._condition:
+            return self._sequences[frame.sequence % self.size] == frame.sequence
+
+    def sequence(self) -> int:
+        """Return the sequence number of the newest frame, 0 if none was stored."""
+        with self._condition:
+            return self._sequence
+
+    def _first_slot_after(self, host_time: float) -> Optional[int]:
+        candidates: List[int] = [
+            slot
+            for slot in range(self.size)
+            if self._sequences[slot] and self._host_times[slot] > host_time
+        ]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda slot: self._sequences[slot])
+
+    def _frame(self, slot: int, copy: bool) -> Ring_Frame:
+        image = self._slots[slot]
+        if copy:
+            image = image.copy()
+        else:
+            image = image.view()
+            image.flags.writeable = False
+        return Ring_Frame(
+            image=image,
+            sequence=self._sequences[slot],
+            camera_timestamp=self._camera_timestamps[slot],
+            host_time=self._host_times[slot],
+        )
@@ -0,0 +1,117 @@
+################################################
+## Project: ASS/NSS API
+## Author: David Michalica, Team 1
+## Date: 2024
+##
+## Documentation: https://www.rfc-editor.org/rfc/rfc2046#section-5.1
+#################################################
+
+from typing import Any, Dict, Iterable, Iterator, Literal, Tuple
+
+import cv2
+import numpy as np
+
+from BussinessLayer.Bayer_Storage import bayer_pattern, demosaic
+
+FRAME_BOUNDARY = "frame"
+
+FRAME_ENCODINGS = ("raw", "jpeg")
+
+
+def frame_encoder(
+    encoding: Literal["raw", "jpeg"], jpeg_quality: int = 90
+) -> Any:
+    """
+    Return a function turning a frame into bytes for the HTTP response.
+
+    "raw" copies the pixels once into the response body. "jpeg" encodes
+    straight from the (possibly zero-copy) frame view; RGB frames are
+    reordered for OpenCV and Bayer mosaics are demosaiced first.
+
+    Args:
+        encoding (Literal["raw", "jpeg"]): Body encoding
+        jpeg_quality (int, optional): JPEG quality (0-100). Defaults to 90.
+
+    Returns:
+        Callable[[np.ndarray, str], bytes]: Encoder taking the frame and its pixel format
+
+    Raises:
+        ValueError: If the encoding is not supported or the JPEG quality is not an integer 0-100
+    """
+    if isinstance(jpeg_quality, bool) or not isinstance(jpeg_quality, int) or not (
+        0 <= jpeg_quality <= 100
+    ):
+        raise ValueError(f"jpeg_quality must be an integer between 0 and 100, got {jpeg_quality!r}")
+    if encoding == "raw":
+        return lambda image, pixel_format: np.ascontiguousarray(image).tobytes()
+    if encoding != "jpeg":
+        raise ValueError(
+            f"Unsupported encoding: {encoding}. Supported encodings: {list(FRAME_ENCODINGS)}"
+        )
+
+    def encode_jpeg(image: np.ndarray, pixel_format: str) -> bytes:
+        pattern = bayer_pattern(pixel_format or "")
+        if pattern:
+            image = cv2.cvtColor(demosaic(image, pattern), cv2.COLOR_RGB2BGR)
+        elif image.ndim == 3 and (pixel_format or "RGB").startswith("RGB"):
+            image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+        if image.dtype != np.uint8:
+            image = (image >> (8 * image.dtype.itemsize - 8)).astype(np.uint8)
+        ok, encoded = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality])
+        if not ok:
+            raise RuntimeError("Failed to encode frame as JPEG")
+        return encoded.tobytes()
+
+    return encode_jpeg
+
+
+def content_type(encoding: Literal["raw", "jpeg"]) -> str:
+    """Return the MIME type of one encoded frame."""
+    return "image/jpeg" if encoding == "jpeg" else "application/octet-stream"
+
+
+def frame_headers(meta: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Describe a frame in HTTP headers.
+
+    Args:
+        meta (Dict[str, Any]): Frame metadata from RGB_Camera_Controller.read_frame
+            or Multispectral_Camera_Controller.read_frame
+
+    Returns:
+        Dict[str, str]: X-Frame-* headers with shape, dtype, pixel format, timestamps
+        and, for multispectral frames, the band wavelengths
+    """
+    headers = {
+        "X-Frame-Shape": ",".join(str(n) for n in meta["shape"]),
+        "X-Frame-Dtype": meta["dtype"],
+        "X-Frame-Pixel-Format": meta["pixel_format"] or "",
+        "X-Frame-Camera-Timestamp": str(meta["camera_timestamp"]),
+        "X-Frame-Host-Time": f"{meta['host_time']:.6f}",
+    }
+    if "wavelengths" in meta:
+        headers["X-Frame-Wavelengths"] = ",".join(f"{w:g}" for w in meta["wavelengths"])
+    return headers
+
+
+def multipart_frames(
+    frames: Iterable[Tuple[bytes, Dict[str, Any]]], encoding: Literal["raw", "jpeg"]
+) -> Iterator[bytes]:
+    """
+    Yield encoded frames as multipart/mixed body parts.
+
+    Args:
+        frames (Iterable[Tuple[bytes, Dict[str, Any]]]): Encoded frames with metadata
+        encoding (Literal["raw", "jpeg"]): Encoding of the frames
+
+    Returns:
+        Iterator[bytes]: Body chunks, one per frame, followed by the closing boundary
+    """
+    for payload, meta in frames:
+        headers = {"Content-Type": content_type(encoding), "Content-Length": str(len(payload))}
+        headers.update(frame_headers(meta))
+        head = f"--{FRAME_BOUNDARY}\r\n" + "".join(
+            f"{name}: {value}\r\n" for name, value in headers.items()
+        )
+        yield (head + "\r\n").encode("ascii") + payload + b"\r\n"
+    yield f"--{FRAME_BOUNDARY}--\r\n".encode("ascii")
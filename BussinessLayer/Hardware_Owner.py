@@ -0,0 +1,385 @@
+################################################
+## Project: ASS/NSS API
+## Author: David Michalica, Team 1
+## Date: 2024
+##
+## Documentation: https://docs.python.org/3/library/multiprocessing.html#module-multiprocessing.connection
+##                https://docs.python.org/3/library/multiprocessing.shared_memory.html
+#################################################
+
+import logging
+import os
+import threading
+from multiprocessing import resource_tracker
+from multiprocessing.connection import Client, Connection, Listener
+from multiprocessing.shared_memory import SharedMemory
+from typing import Callable, Iterable, Iterator, List, Optional, Set, Tuple
+
+from werkzeug.test import EnvironBuilder, run_wsgi_app
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Response chunks of at least this many bytes go through shared memory
+SHARED_MEMORY_THRESHOLD = 64 * 1024
+
+# Shared memory segments grow in steps of this size
+_SEGMENT_STEP = 1024 * 1024
+
+# Seconds between checks whether the server was closed while a worker is idle
+_IDLE_POLL_INTERVAL = 0.5
+
+# Segments created by servers in this process, see _attach_shared_memory
+_created_segments: Set[str] = set()
+
+
+class Hardware_Owner_Error(RuntimeError):
+    """Raised when the hardware owner fails a request or cannot be reached."""
+
+
+class Hardware_Owner_Server:
+    """
+    Hardware-owner side of the device IPC channel.
+
+    One process owns the cameras and sensors and serves the device requests
+    of any number of API worker processes. Workers connect over a Unix
+    socket authenticated with a shared key; each connection is served by its
+    own thread, which dispatches forwarded HTTP requests to the WSGI app of
+    this process, so the device endpoints and their locking stay exactly
+    as in a single-process deployment.
+
+    Responses are streamed back chunk by chunk as the worker asks for them.
+    Small chunks travel over the socket; larger ones (frames, JPEGs) are
+    written into a shared memory segment of the connection and only their
+    size is sent, so a frame is copied once into the segment and once out of
+    it instead of being pickled through the socket.
+
+    Attributes:
+        address (str): Path of the Unix socket
+    """
+
+    def __init__(
+        self,
+        wsgi_app: Callable,
+        address: str,
+        authkey: bytes,
+        shared_memory_threshold: int = SHARED_MEMORY_THRESHOLD,
+    ):
+        """
+        Initialize the server and start listening.
+
+        Args:
+            wsgi_app (Callable): WSGI application handling the forwarded requests
+            address (str): Path of the Unix socket, a stale socket file is replaced
+            authkey (bytes): Key workers must authenticate with
+            shared_memory_threshold (int, optional): Chunk size from which shared memory
+                is used. Defaults to SHARED_MEMORY_THRESHOLD.
+
+        Raises:
+            ValueError: If the key is empty
+        """
+        if not authkey:
+            raise ValueError("The hardware owner needs a non-empty authentication key")
+        self.wsgi_app = wsgi_app
+        self.address = address
+        self._threshold = shared_memory_threshold
+        if os.path.exists(address):
+            os.unlink(address)
+        # Only this user may connect; the socket is created with these permissions,
+        # so there is no window in which other users can reach it
+        umask = os.umask(0o177)
+        try:
+            self._listener = Listener(address, family="AF_UNIX", authkey=authkey)
+        finally:
+            os.umask(umask)
+        self._closed = threading.Event()
+        self._segments: Set[SharedMemory] = set()
+        self._segments_lock = threading.Lock()
+        logger.info("Hardware owner listening on %s", address)
+
+    def serve_forever(self) -> None:
+        """Accept worker connections until close() is called."""
+        while not self._closed.is_set():
+            try:
+                conn = self._listener.accept()
+            except OSError:
+                if self._closed.is_set():
+                    break
+                logger.exception("Failed to accept a worker connection")
+                continue
+            except Exception as e:
+                # Failed authentication, the listener stays usable
+                logger.warning("Rejected worker connection: %s", e)
+                continue
+            threading.Thread(
+                target=self._serve, args=(conn,), name="hardware-owner-conn", daemon=True
+            ).start()
+
+    def close(self) -> None:
+        """
+        Stop serving workers.
+
+        The socket is removed and the shared memory unlinked; idle worker
+        connections are closed within _IDLE_POLL_INTERVAL.
+        """
+        self._closed.set()
+        self._listener.close()
+        with self._segments_lock:
+            segments, self._segments = self._segments, set()
+        for shm in segments:
+            # Mappings stay valid until the connection threads release them
+            shm.unlink()
+            _created_segments.discard(shm.name)
+        logger.info("Hardware owner stopped")
+
+    def _serve(self, conn: Connection) -> None:
+        # Shared memory segment of this connection, reused across responses
+        segment: List[SharedMemory] = []
+        try:
+            while not self._closed.is_set():
+                if not conn.poll(_IDLE_POLL_INTERVAL) or self._closed.is_set():
+                    continue
+                try:
+                    message = conn.recv()
+                except EOFError:
+                    break
+                if not isinstance(message, tuple) or message[0] != "request":
+                    conn.send(("error", f"Unexpected message: {message!r}"))
+                    continue
+
+                _, method, path, query_string, headers, body, remote_addr = message
+                try:
+                    environ = EnvironBuilder(
+                        path=path,
+                        method=method,
+                        # WSGI carries the raw query string as latin-1
+                        query_string=query_string.decode("latin-1"),
+                        headers=headers,
+                        data=body,
+                        environ_base={"REMOTE_ADDR": remote_addr},
+                    ).get_environ()
+                    app_iter, status, response_headers = run_wsgi_app(
+                        self.wsgi_app, environ, buffered=False
+                    )
+                except Exception as e:
+                    logger.exception("Failed to dispatch %s %s", method, path)
+                    conn.send(("error", str(e)))
+                    continue
+
+                conn.send(("start", status, response_headers.to_wsgi_list()))
+                self._stream(conn, app_iter, segment)
+        except (EOFError, OSError):
+            # The worker went away mid-response
+            pass
+        finally:
+            conn.close()
+            for shm in segment:
+                self._release_segment(shm)
+
+    def _stream(
+        self, conn: Connection, app_iter: Iterable[bytes], segment: List[SharedMemory]
+    ) -> None:
+        chunks = iter(app_iter)
+        try:
+            while conn.recv() == "next":
+                try:
+                    chunk = next((chunk for chunk in chunks if chunk), None)
+                except Exception as e:
+                    logger.exception("Response failed while streaming to a worker")
+                    conn.send(("error", str(e)))
+                    return
+                if chunk is None:
+                    conn.send(("end",))
+                    return
+                if len(chunk) < self._threshold:
+                    conn.send(("data", chunk))
+                    continue
+                if not segment or segment[0].size < len(chunk):
+                    for shm in segment:
+                        self._release_segment(shm)
+                    segment.clear()
+                    segment.append(self._create_segment(len(chunk)))
+                segment[0].buf[: len(chunk)] = chunk
+                conn.send(("shm", segment[0].name, len(chunk)))
+
+            # The worker stopped reading, e.g. its client disconnected
+            conn.send(("end",))
+        finally:
+            close = getattr(app_iter, "close", None)
+            if close is not None:
+                close()
+
+    def _create_segment(self, size: int) -> SharedMemory:
+        shm = SharedMemory(create=True, size=-(-size // _SEGMENT_STEP) * _SEGMENT_STEP)
+        with self._segments_lock:
+            self._segments.add(shm)
+        _created_segments.add(shm.name)
+        return shm
+
+    def _release_segment(self, shm: SharedMemory) -> None:
+        with self._segments_lock:
+            owned = shm in self._segments
+            self._segments.discard(shm)
+        shm.close()
+        if owned:
+            shm.unlink()
+        _created_segments.discard(shm.name)
+
+
+class Hardware_Owner_Client:
+    """
+    Worker side of the device IPC channel.
+
+    Every thread keeps its own connection to the hardware owner, so
+    concurrent requests of a threaded worker never interleave on one
+    socket. Connections are opened on first use and reopened after the
+    owner restarted.
+
+    Attributes:
+        address (str): Path of the Unix socket of the hardware owner
+    """
+
+    def __init__(self, address: str, authkey: bytes):
+        """
+        Initialize the client.
+
+        Args:
+            address (str): Path of the Unix socket of the hardware owner
+            authkey (bytes): Key shared with the hardware owner
+
+        Raises:
+            ValueError: If the key is empty
+        """
+        if not authkey:
+            raise ValueError("The hardware owner needs a non-empty authentication key")
+        self.address = address
+        self._authkey = authkey
+        self._local = threading.local()
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        query_string: bytes = b"",
+        headers: Optional[List[Tuple[str, str]]] = None,
+        body: bytes = b"",
+        remote_addr: Optional[str] = None,
+    ) -> Tuple[str, List[Tuple[str, str]], Iterator[bytes]]:
+        """
+        Forward an HTTP request to the hardware owner.
+
+        The body iterator must be consumed or closed before the same thread
+        sends the next request; an abandoned response is detected and its
+        connection replaced.
+
+        Args:
+            method (str): HTTP method
+            path (str): Request path
+            query_string (bytes, optional): Raw query string. Defaults to b"".
+            headers (Optional[List[Tuple[str, str]]], optional): Request headers. Defaults to None.
+            body (bytes, optional): Request body. Defaults to b"".
+            remote_addr (Optional[str], optional): Address of the HTTP client. Defaults to None.
+
+        Returns:
+            Tuple[str, List[Tuple[str, str]], Iterator[bytes]]: Status line, response
+            headers and an iterator over the response body
+
+        Raises:
+            Hardware_Owner_Error: If the owner cannot be reached or fails the request
+        """
+        message = ("request", method, path, query_string, headers or [], body, remote_addr)
+        for attempt in range(2):
+            conn = self._connection()
+            try:
+                conn.send(message)
+                reply = conn.recv()
+                break
+            except (EOFError, OSError) as e:
+                # A connection from before an owner restart fails on first use
+                self._disconnect()
+                if attempt:
+                    raise Hardware_Owner_Error(f"Hardware owner unavailable: {str(e)}")
+
+        if reply[0] != "start":
+            raise Hardware_Owner_Error(reply[1])
+        self._local.pending = True
+        return reply[1], reply[2], self._body(conn)
+
+    def _body(self, conn: Connection) -> Iterator[bytes]:
+        finished = False
+        try:
+            while True:
+                conn.send("next")
+                reply = conn.recv()
+                if reply[0] == "end":
+                    finished = True
+                    return
+                if reply[0] == "data":
+                    yield reply[1]
+                elif reply[0] == "shm":
+                    _, name, size = reply
+                    yield bytes(self._segment(name).buf[:size])
+                else:
+                    finished = True
+                    raise Hardware_Owner_Error(reply[1])
+        except (EOFError, OSError) as e:
+            self._disconnect()
+            raise Hardware_Owner_Error(f"Hardware owner connection lost: {str(e)}")
+        finally:
+            if not finished and getattr(self._local, "conn", None) is conn:
+                # Tell the owner to stop the response, e.g. a preview stream
+                try:
+                    conn.send("close")
+                    conn.recv()
+                    finished = True
+                except (EOFError, OSError):
+                    self._disconnect()
+            if finished:
+                self._local.pending = False
+
+    def _connection(self) -> Connection:
+        if getattr(self._local, "pending", False):
+            # The previous response was abandoned unread, its connection is out of step
+            self._disconnect()
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            try:
+                conn = Client(self.address, family="AF_UNIX", authkey=self._authkey)
+            except (OSError, EOFError) as e:
+                raise Hardware_Owner_Error(f"Hardware owner unavailable: {str(e)}")
+            self._local.conn = conn
+        return conn
+
+    def _disconnect(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+        self._local.conn = None
+        self._local.pending = False
+        segment = getattr(self._local, "segment", None)
+        if segment is not None:
+            segment.close()
+            self._local.segment = None
+
+    def _segment(self, name: str) -> SharedMemory:
+        segment = getattr(self._local, "segment", None)
+        if segment is not None and segment.name == name:
+            return segment
+        if segment is not None:
+            # The owner replaced the segment with a larger one
+            segment.close()
+        segment = _attach_shared_memory(name)
+        self._local.segment = segment
+        return segment
+
+
+def _attach_shared_memory(name: str) -> SharedMemory:
+    try:
+        return SharedMemory(name=name, track=False)
+    except TypeError:
+        # Before Python 3.13 attaching registers the segment with this process's
+        # resource tracker, which would unlink the owner's segment when we exit
+        segment = SharedMemory(name=name)
+        if name not in _created_segments:
+            resource_tracker.unregister(segment._name, "shared_memory")
+        return segment
@@ -0,0 +1,16 @@
+################################################
+## Project: ASS/NSS API
+## Author: David Michalica, Team 1
+## Date: 2024
+##
+## Documentation: https://docs.python.org/3/library/stdtypes.html#str.endswith
+#################################################
+
+# Image files of the storage directory. This module has no third-party imports,
+# so the storage listing can mark images without loading OpenCV or NumPy
+IMAGE_EXTENSIONS = (".png", ".tiff", ".tif", ".jpg", ".jpeg", ".bmp")
+
+
+def is_image_file(filename: str) -> bool:
+    """Return whether thumbnails can be made of a file, judged by its extension."""
+    return filename.lower().endswith(IMAGE_EXTENSIONS)
@@ -0,0 +1,222 @@
+################################################
+## Project: ASS/NSS API
+## Author: David Michalica, Team 1
+## Date: 2024
+##
+## Documentation: https://docs.python.org/3/howto/logging-cookbook.html#dealing-with-handlers-that-block
+#################################################
+
+import atexit
+import itertools
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+# Attributes every LogRecord has; anything else was passed through extra=
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+# Listener and formatter of the last configure_logging call, used by the exit and fork hooks
+_current: Dict[str, Any] = {}
+
+
+class Deferred_Queue_Handler(logging.handlers.QueueHandler):
+    """
+    Queue handler that leaves all formatting to the writer thread.
+
+    The stock QueueHandler formats the message in the logging thread so
+    records can be pickled. This queue never leaves the process, so the
+    record is enqueued as it is and the %-style message is only built by
+    the background writer. A log call in a request thread costs a record
+    creation and a queue put. Arguments are formatted when the record is
+    written, so pass values rather than objects that change right after
+    the call.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class JSON_Formatter(logging.Formatter):
+    """
+    Formats records as one JSON object per line.
+
+    The object holds the time in ISO 8601 (UTC), level, logger, thread,
+    message and exception, plus every field passed with extra=, e.g.
+    logger.info("Captured %d frames", count, extra={"job_id": job_id}).
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        data: Dict[str, Any] = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            data["exception"] = self.formatException(record.exc_info)
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and key not in data:
+                data[key] = value
+        return json.dumps(data, default=str)
+
+
+class Sampling_Filter(logging.Filter):
+    """
+    Passes only every n-th low-level record of a logger.
+
+    Meant for debug logs on hot paths (per frame, per RPC): they stay
+    available in production at a fraction of the volume. Records at or
+    above the level are always passed.
+
+    Attributes:
+        rate (float): Fraction of the low-level records passed, 0 < rate <= 1
+        level (int): Records below this level are sampled
+    """
+
+    def __init__(self, rate: float, level: int = logging.INFO):
+        """
+        Initialize the filter.
+
+        Args:
+            rate (float): Fraction of the low-level records passed, e.g. 0.01
+            level (int, optional): Records below this level are sampled. Defaults to INFO.
+
+        Raises:
+            ValueError: If rate is not in (0, 1]
+        """
+        super().__init__()
+        if not 0 < rate <= 1:
+            raise ValueError("Sampling rate must be in (0, 1]")
+        self.rate = rate
+        self.level = level
+        self._every = round(1 / rate)
+        self._counter = itertools.count()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= self.level:
+            return True
+        # next() on itertools.count is atomic under the GIL
+        return next(self._counter) % self._every == 0
+
+
+def parse_sampling(value: str) -> Dict[str, float]:
+    """
+    Parse a LOG_SAMPLING setting.
+
+    Args:
+        value (str): Comma-separated logger=rate pairs, e.g.
+            "BussinessLayer.RGB_Camera_Controller=0.01"
+
+    Returns:
+        Dict[str, float]: Sampling rate per logger name
+
+    Raises:
+        ValueError: If a pair is malformed
+    """
+    sampling = {}
+    for pair in filter(None, (part.strip() for part in value.split(","))):
+        name, separator, rate = pair.partition("=")
+        if not separator or not name.strip():
+            raise ValueError(f"Invalid sampling entry: {pair}. Use logger=rate")
+        sampling[name.strip()] = float(rate)
+    return sampling
+
+
+def configure_logging(
+    level: int,
+    fmt: str,
+    log_file: Optional[str] = None,
+    max_bytes: int = 10 * 1024 * 1024,
+    backup_count: int = 5,
+    rotate_when: Optional[str] = None,
+    json_format: bool = False,
+    sampling: Optional[Dict[str, float]] = None,
+    stderr: bool = True,
+) -> logging.handlers.QueueListener:
+    """
+    Route all logging through a queue to a background writer thread.
+
+    The root logger gets a single Deferred_Queue_Handler. A QueueListener
+    thread formats the records and writes them to stderr and, if log_file
+    is set, to a rotating log file. Rotation is by size, or by time when
+    rotate_when is set. Calling it again replaces the previous listener.
+    The current listener is stopped, flushing the queue, at interpreter exit.
+
+    Args:
+        level (int): Level of the root logger
+        fmt (str): Format string of the text formatter
+        log_file (Optional[str], optional): Log file path, None for stderr only. Defaults to None.
+        max_bytes (int, optional): Size at which the log file is rotated. Defaults to 10 MiB.
+        backup_count (int, optional): Number of rotated files kept. Defaults to 5.
+        rotate_when (Optional[str], optional): Rotate by time instead, e.g. "midnight" or "H"
+            (see TimedRotatingFileHandler). Defaults to None.
+        json_format (bool, optional): Write JSON lines instead of text. Defaults to False.
+        sampling (Optional[Dict[str, float]], optional): Sampling rate of debug records per
+            logger name. Defaults to None.
+        stderr (bool, optional): Also write to stderr. Defaults to True.
+
+    Returns:
+        logging.handlers.QueueListener: The running listener
+    """
+    formatter = JSON_Formatter() if json_format else logging.Formatter(fmt)
+    handlers: List[logging.Handler] = [logging.StreamHandler(sys.stderr)] if stderr else []
+    if log_file:
+        if rotate_when:
+            handlers.append(
+                logging.handlers.TimedRotatingFileHandler(
+                    log_file, when=rotate_when, backupCount=backup_count, encoding="utf-8"
+                )
+            )
+        else:
+            handlers.append(
+                logging.handlers.RotatingFileHandler(
+                    log_file, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+                )
+            )
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handler.close()
+    if "listener" in _current:
+        _stop_listener(_current["listener"])
+    root.addHandler(Deferred_Queue_Handler(queue.SimpleQueue()))
+    root.setLevel(level)
+
+    for name, rate in (sampling or {}).items():
+        logging.getLogger(name).addFilter(Sampling_Filter(rate))
+
+    listener = logging.handlers.QueueListener(
+        root.handlers[0].queue, *handlers, respect_handler_level=True
+    )
+    listener.start()
+    if not _current:
+        atexit.register(lambda: _stop_listener(_current["listener"]))
+        # Forked workers (e.g. the demosaicing pool) have no writer thread and log to stderr directly
+        os.register_at_fork(after_in_child=lambda: _log_to_stderr(_current["formatter"]))
+    _current.update(listener=listener, formatter=formatter)
+    return listener
+
+
+def _stop_listener(listener: logging.handlers.QueueListener) -> None:
+    # QueueListener.stop fails when called twice, e.g. by the application and at exit
+    if listener._thread is not None:
+        listener.stop()
+
+
+def _log_to_stderr(formatter: logging.Formatter) -> None:
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        if isinstance(handler, Deferred_Queue_Handler):
+            root.removeHandler(handler)
+            stream = logging.StreamHandler(sys.stderr)
+            stream.setFormatter(formatter)
+            root.addHandler(stream)
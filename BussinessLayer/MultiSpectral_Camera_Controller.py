@@ -6,68 +6,289 @@
 ## Documentation: https://docs.alliedvision.com/Vimba_X/VmbC_Function_Reference/index.html
 #################################################
 
-import cv2
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
 
-# import numpy as np
-# from mvIMPACT import acquire
+import numpy as np
+
+from BussinessLayer.Multispectral_Backend import (
+    Multispectral_Backend,
+    Simulated_Multispectral_Backend,
+)
+from BussinessLayer.Spectral_Cube import Spectral_Cube_Writer
+from data.Multispectral_camera import Multispectral_Frame_Format
+
+# Set up logging
+logger = logging.getLogger(__name__)
 
 
-# Implementace rozhraní pro multispektrální kameru
 class Multispectral_Camera_Controller:
-    def __init__(self):
-        pass
-        # Inicializace systému kamery
-
-
-#        self.system = acquire.DeviceManager()
-#      self.system.updateDeviceList()
-#       self.device = self.system.getDevice(0)
-
-# Otevření komunikace s kamerou
-#      self.device.open()
-#      self.function_interface = self.device.getRemoteControl()
-
-# def acquire_image(self):
-
-# Získání snímku z kamery
-#    try:
-#        request = self.function_interface.requestSingle()
-#        if request.isOK:
-#            img_data = np.array(request.getBuffer())
-#            img_data = img_data.reshape((request.imageHeight(), request.imageWidth()))
-#            img_data = cv2.cvtColor(img_data, cv2.COLOR_GRAY2BGR)  # Pokud je jednobarevný
-#            return img_data
-#        else:
-#            print("Chyba při požadování snímku.")
-#            return None
-#    except Exception as e:
-#        print("Chyba při získávání snímku:", e)
-#        return None
-#
-# def save_image(self, image, filename):
-# Uložení snímku na disk
-#     try:
-#         cv2.imwrite(filename, image)
-#         print("Snímek uložen jako", filename)
-#     except Exception as e:
-#         print("Chyba při ukládání snímku:", e)
-#
-# def release_camera(self):
-#     # Uvolnění kamery
-#     self.device.close()
-
-# Příklad použití třídy
-if __name__ == "__main__":
-    camera_controller = Multispectral_Camera_Controller()
+    """
+    Controller for multispectral camera operations.
+
+    The device is accessed through a Multispectral_Backend. Frames are
+    (bands, height, width) arrays; captures go into a preallocated
+    memory-mapped cube (see Spectral_Cube_Writer), single frames into a
+    reusable buffer.
+
+    Attributes:
+        backend (Multispectral_Backend): Device backend
+        lock (threading.RLock): Serializes camera access between request threads
+    """
+
+    def __init__(self, backend: Multispectral_Backend):
+        """
+        Initialize the Multispectral Camera Controller.
+
+        Args:
+            backend (Multispectral_Backend): Device backend, opened by Connect()
+        """
+        self.backend = backend
+        self.lock = threading.RLock()
+        self._format: Optional[Multispectral_Frame_Format] = None
+        self._buffer: Optional[np.ndarray] = None
+        logger.info(
+            "Multispectral_Camera_Controller initialized with %s", type(backend).__name__
+        )
+
+    def Connect(self) -> bool:
+        """
+        Open the device and allocate the frame buffer.
+
+        Returns:
+            bool: True if connection was successful
+
+        Raises:
+            RuntimeError: If camera connection fails
+        """
+        with self.lock:
+            try:
+                self.backend.open()
+                self._format = self.backend.describe()
+                self._buffer = np.empty(self._format.shape, dtype=self._format.dtype)
+                logger.info(
+                    "Multispectral camera connected: %s bands, %sx%s",
+                    self._format.bands,
+                    self._format.width,
+                    self._format.height,
+                )
+                return True
+            except Exception as e:
+                logger.error("Failed to connect to multispectral camera: %s", e)
+                raise RuntimeError(f"Multispectral camera connection failed: {str(e)}")
+
+    def is_connected(self) -> bool:
+        """
+        Check whether the camera is open.
+
+        Returns:
+            bool: True if the camera is open
+        """
+        return self._format is not None and self.backend.is_open()
+
+    def get_frame_format(self) -> Multispectral_Frame_Format:
+        """
+        Return the frame format of the connected camera.
+
+        Returns:
+            Multispectral_Frame_Format: Band wavelengths, size and pixel type
+
+        Raises:
+            RuntimeError: If the camera is not connected
+        """
+        if self._format is None:
+            raise RuntimeError("Camera not connected. Call Connect() first.")
+        return self._format
+
+    def acquire_cube(self, copy: bool = True) -> np.ndarray:
+        """
+        Acquire one (bands, height, width) frame.
+
+        Args:
+            copy (bool, optional): Return a private copy. With False a read-only view
+                of the reusable buffer is returned, valid until the next acquisition.
+                Defaults to True.
+
+        Returns:
+            np.ndarray: The frame
 
-    # Získání a zobrazení snímku
-    image = camera_controller.acquire_image()
-    if image is not None:
-        cv2.imshow("Multispektrální kamera", image)
-        cv2.waitKey(0)
+        Raises:
+            RuntimeError: If the camera is not connected
+        """
+        with self.lock:
+            frame, _ = self._acquire_into_buffer()
+            if copy:
+                return frame.copy()
+            frame = frame.view()
+            frame.flags.writeable = False
+            return frame
 
-        # Uložení snímku
-        camera_controller.save_image(image, "multispectral_image.png")
+    def read_frame(
+        self, bands: Optional[Sequence[int]] = None
+    ) -> Tuple[bytes, Dict[str, Any]]:
+        """
+        Acquire one frame and return its pixels as bytes for an HTTP response.
+
+        The bytes are taken from the reusable buffer while the camera lock is
+        held, so the only copy is the one into the response.
+
+        Args:
+            bands (Optional[Sequence[int]], optional): Band indices to return. Defaults to all bands.
+
+        Returns:
+            Tuple[bytes, Dict[str, Any]]: Pixels in (bands, height, width) order and metadata
+            (shape, dtype, pixel_format, wavelengths, camera_timestamp, host_time)
+
+        Raises:
+            ValueError: If bands is not a list of integers or a band index is out of range
+        """
+        if bands is not None and (
+            not isinstance(bands, (list, tuple))
+            or not all(isinstance(band, int) and not isinstance(band, bool) for band in bands)
+        ):
+            raise ValueError(f"bands must be a list of band indices, got {bands!r}")
+        with self.lock:
+            frame_format = self.get_frame_format()
+            wavelengths = frame_format.wavelengths
+            if bands is not None:
+                bands = list(bands)
+                for band in bands:
+                    if not 0 <= band < frame_format.bands:
+                        raise ValueError(
+                            f"Band index {band} out of range 0..{frame_format.bands - 1}"
+                        )
+                wavelengths = [wavelengths[band] for band in bands]
+
+            frame, timestamp = self._acquire_into_buffer()
+            host_time = time.time()
+            if bands is not None:
+                frame = frame[bands]
+            payload = np.ascontiguousarray(frame).tobytes()
+
+        return payload, {
+            "shape": list(frame.shape),
+            "dtype": str(frame.dtype),
+            "pixel_format": frame_format.pixel_format,
+            "wavelengths": wavelengths,
+            "camera_timestamp": timestamp,
+            "host_time": host_time,
+        }
+
+    def capture_cube(
+        self,
+        path: str,
+        name: str,
+        count: int = 1,
+        progress: Optional[Callable[[int, str, int], Any]] = None,
+        should_stop: Optional[Callable[[], bool]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Capture frames into a memory-mapped spectral cube.
+
+        Args:
+            path (str): Directory path where to save the cube, created if missing
+            name (str): Name of the cube files (without extension)
+            count (int, optional): Number of frames to capture. Defaults to 1.
+            progress (Optional[Callable[[int, str, int], Any]], optional): Called with the
+                frame number, cube file and frame size in bytes after each frame. Defaults to None.
+            should_stop (Optional[Callable[[], bool]], optional): Polled before each frame;
+                when it returns True the capture ends early with the frames stored so far
+                and "stopped" set in the result. Defaults to None.
+
+        Returns:
+            Dict[str, Any]: Dictionary with status and file information and the cube
+            metadata under "storage"
+
+        Raises:
+            RuntimeError: If the camera is not connected
+        """
+        # The cube files are named path + name, so path ends in a separator
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self.lock:
+            frame_format = self.get_frame_format()
+            writer = Spectral_Cube_Writer(
+                path,
+                name,
+                count,
+                frame_format.bands,
+                frame_format.height,
+                frame_format.width,
+                frame_format.dtype,
+                frame_format.wavelengths,
+            )
+
+            captured_count = 0
+            stopped = False
+            for i in range(count):
+                if should_stop and should_stop():
+                    logger.info("Cube capture stopped after %s/%s frames", i, count)
+                    stopped = True
+                    break
+                try:
+                    # Frames fill the cube slots in order, failed grabs leave no gap
+                    buffer = writer.frame_buffer(captured_count)
+                    timestamp = self.backend.read_into(buffer)
+                    writer.commit(captured_count, frame=i + 1, timestamp=timestamp)
+                    captured_count += 1
+                    if progress:
+                        progress(i + 1, writer.cube_file, buffer.nbytes)
+                except Exception as e:
+                    logger.error("Error capturing cube frame %s/%s: %s", i + 1, count, e)
+                    continue
+
+            storage = writer.close()
+            logger.info("Captured %s/%s multispectral frames", captured_count, count)
+            result = {
+                "success": captured_count > 0,
+                "files": [storage["cube_file"], storage["metadata_file"]],
+                "count": captured_count,
+                "path": path,
+                "format": "cube",
+                "storage": storage,
+            }
+            if stopped:
+                result["stopped"] = True
+            return result
+
+    def _acquire_into_buffer(self) -> Tuple[np.ndarray, int]:
+        if self._buffer is None:
+            raise RuntimeError("Camera not connected. Call Connect() first.")
+        timestamp = self.backend.read_into(self._buffer)
+        return self._buffer, timestamp
+
+    def release_camera(self) -> None:
+        """
+        Release camera resources.
+
+        This method should be called when done with the camera to properly release resources.
+        """
+        with self.lock:
+            try:
+                self.backend.close()
+                self._format = None
+                self._buffer = None
+                logger.info("Multispectral camera released successfully")
+            except Exception as e:
+                logger.error("Error releasing multispectral camera: %s", e)
+                raise
+
+
+# Example usage (only run if this file is executed directly)
+if __name__ == "__main__":
+    # Configure logging for standalone execution
+    logging.basicConfig(level=logging.INFO)
 
-    camera_controller.release_camera()
-    cv2.destroyAllWindows()
+    camera_controller = Multispectral_Camera_Controller(Simulated_Multispectral_Backend())
+    try:
+        camera_controller.Connect()
+        result = camera_controller.capture_cube("./", "test_cube")
+        print(f"Capture result: {result}")
+    except Exception as e:
+        print(f"Error: {str(e)}")
+    finally:
+        camera_controller.release_camera()
@@ -0,0 +1,174 @@
+################################################
+## Project: ASS/NSS API
+## Author: David Michalica, Team 1
+## Date: 2024
+##
+## Documentation: https://docs.alliedvision.com/Vimba_X/VmbC_Function_Reference/index.html
+#################################################
+
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Sequence, Type
+
+import numpy as np
+
+from data.Multispectral_camera import Multispectral_Frame_Format
+
+
+class Multispectral_Backend(ABC):
+    """
+    Device interface used by Multispectral_Camera_Controller.
+
+    A backend delivers frames by filling a caller-provided
+    (bands, height, width) array in place, so frames can be written straight
+    into a memory-mapped cube or a reusable buffer.
+    """
+
+    @staticmethod
+    def enumerate_devices() -> List[Dict[str, str]]:
+        """List the devices this backend can open."""
+        return []
+
+    @abstractmethod
+    def open(self) -> None:
+        """Open the device."""
+
+    @abstractmethod
+    def close(self) -> None:
+        """Close the device."""
+
+    @abstractmethod
+    def is_open(self) -> bool:
+        """Return whether the device is open."""
+
+    @abstractmethod
+    def describe(self) -> Multispectral_Frame_Format:
+        """Return the format of the frames read_into() delivers."""
+
+    @abstractmethod
+    def read_into(self, out: np.ndarray, timeout_ms: int = 5000) -> int:
+        """
+        Acquire one frame into a preallocated array.
+
+        Args:
+            out (np.ndarray): Writable array with the shape and dtype of describe()
+            timeout_ms (int, optional): Longest wait for the frame. Defaults to 5000.
+
+        Returns:
+            int: Device timestamp of the frame in ns
+        """
+
+
+class Simulated_Multispectral_Backend(Multispectral_Backend):
+    """
+    Multispectral camera simulation for development and tests.
+
+    The scene has vegetation on the left half (dark in the visible, bright
+    in the near infrared) and soil on the right half, under an illumination
+    gradient from top to bottom. The pattern drifts by a few counts per
+    frame so consecutive frames differ.
+
+    Attributes:
+        frame_rate (float): Simulated frame rate, 0 to deliver frames immediately
+    """
+
+    def __init__(
+        self,
+        width: int = 640,
+        height: int = 512,
+        wavelengths: Optional[Sequence[float]] = None,
+        frame_rate: float = 30.0,
+    ):
+        """
+        Initialize the simulation.
+
+        Args:
+            width (int, optional): Frame width in pixels. Defaults to 640.
+            height (int, optional): Frame height in pixels. Defaults to 512.
+            wavelengths (Optional[Sequence[float]], optional): Band center wavelengths in nm.
+                Defaults to 8 bands from 450 to 850 nm.
+            frame_rate (float, optional): Simulated frame rate. Defaults to 30.0.
+        """
+        if wavelengths is None:
+            wavelengths = [450.0, 500.0, 550.0, 600.0, 650.0, 700.0, 750.0, 850.0]
+        self._format = Multispectral_Frame_Format(
+            wavelengths=[float(w) for w in wavelengths],
+            width=width,
+            height=height,
+            dtype="uint16",
+            pixel_format="Mono12",
+        )
+        self.frame_rate = frame_rate
+        self._pattern: Optional[np.ndarray] = None
+        self._frame = 0
+        self._next_frame_at = 0.0
+
+    @staticmethod
+    def enumerate_devices() -> List[Dict[str, str]]:
+        return [{"serial_number": "SIM-MS-0", "model": "Simulated multispectral camera"}]
+
+    def open(self) -> None:
+        wavelengths = np.asarray(self._format.wavelengths)
+        vegetation = np.where(wavelengths > 700, 0.8, 0.1)
+        soil = 0.2 + 0.3 * (wavelengths - 400) / 500
+        reflectance = np.empty((self._format.bands, self._format.width))
+        half = self._format.width // 2
+        reflectance[:, :half] = vegetation[:, None]
+        reflectance[:, half:] = soil[:, None]
+        illumination = np.linspace(1.0, 0.5, self._format.height)
+
+        # Leave headroom for the drift below the 12-bit maximum
+        pattern = 4000 * reflectance[:, None, :] * illumination[None, :, None]
+        self._pattern = pattern.astype(np.uint16)
+        self._frame = 0
+        self._next_frame_at = time.monotonic()
+
+    def close(self) -> None:
+        self._pattern = None
+
+    def is_open(self) -> bool:
+        return self._pattern is not None
+
+    def describe(self) -> Multispectral_Frame_Format:
+        return self._format
+
+    def read_into(self, out: np.ndarray, timeout_ms: int = 5000) -> int:
+        if self._pattern is None:
+            raise RuntimeError("Simulated camera is not open")
+        if self.frame_rate > 0:
+            delay = self._next_frame_at - time.monotonic()
+            if delay > timeout_ms / 1000:
+                raise TimeoutError("No frame within the timeout")
+            if delay > 0:
+                time.sleep(delay)
+            self._next_frame_at = max(self._next_frame_at, time.monotonic()) + 1 / self.frame_rate
+
+        self._frame += 1
+        np.add(self._pattern, self._frame % 64, out=out, casting="unsafe")
+        return time.monotonic_ns()
+
+
+MULTISPECTRAL_BACKENDS: Dict[str, Type[Multispectral_Backend]] = {
+    "simulated": Simulated_Multispectral_Backend,
+}
+
+
+def create_multispectral_backend(name: str, **options: Any) -> Multispectral_Backend:
+    """
+    Create a multispectral camera backend by name.
+
+    Args:
+        name (str): Key of MULTISPECTRAL_BACKENDS
+        **options: Keyword arguments of the backend class
+
+    Returns:
+        Multispectral_Backend: The backend, not yet opened
+
+    Raises:
+        ValueError: If the backend is unknown
+    """
+    if name not in MULTISPECTRAL_BACKENDS:
+        raise ValueError(
+            f"Unknown multispectral backend: {name}. Available backends: {list(MULTISPECTRAL_BACKENDS)}"
+        )
+    return MULTISPECTRAL_BACKENDS[name](**options)
@@ -0,0 +1,283 @@
+################################################
+## Project: ASS/NSS API
+## Author: David Michalica, Team 1
+## Date: 2024
+##
+## Documentation: https://github.com/basler/pypylon/blob/master/samples/grabmultiplecameras.py
+#################################################
+
+import logging
+import queue
+import threading
+from typing import Any, Dict, List, Literal, Optional
+
+from pypylon import pylon
+
+from BussinessLayer.RGB_Camera_Controller import RGB_Camera_Controller
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+class RGB_Camera_Array_Controller:
+    """
+    Parallel acquisition from several Basler cameras via pylon.InstantCameraArray.
+
+    All cameras grab at the same time. Every camera has its own writer
+    thread, so encoding and saving of one camera never holds back the
+    grabbing of the others, and throughput scales with the number of
+    cameras.
+
+    Attributes:
+        serial_numbers (List[str]): Serial numbers of the cameras in the array
+        camera_width (int): Width of the camera images in pixels
+        camera_height (int): Height of the camera images in pixels
+    """
+
+    def __init__(
+        self,
+        serial_numbers: Optional[List[str]] = None,
+        camera_width: int = 1920,
+        camera_height: int = 1080,
+    ):
+        """
+        Initialize the camera array controller.
+
+        Args:
+            serial_numbers (List[str], optional): Cameras to use. Defaults to all attached cameras.
+            camera_width (int, optional): Width of the camera images in pixels. Defaults to 1920.
+            camera_height (int, optional): Height of the camera images in pixels. Defaults to 1080.
+        """
+        if serial_numbers is None:
+            serial_numbers = [
+                device["serial_number"]
+                for device in RGB_Camera_Controller.enumerate_devices()
+            ]
+        self.serial_numbers = list(serial_numbers)
+        self.camera_width = camera_width
+        self.camera_height = camera_height
+        self.cameras = None
+
+    def Connect(self) -> bool:
+        """
+        Attach and open all cameras of the array.
+
+        Returns:
+            bool: True if connection was successful
+
+        Raises:
+            RuntimeError: If no camera is selected or a camera cannot be opened
+        """
+        if not self.serial_numbers:
+            raise RuntimeError("No cameras found")
+
+        try:
+            factory = pylon.TlFactory.GetInstance()
+            devices = {
+                device.GetSerialNumber(): device
+                for device in factory.EnumerateDevices()
+            }
+            missing = [serial for serial in self.serial_numbers if serial not in devices]
+            if missing:
+                raise RuntimeError(f"Cameras not found: {missing}")
+
+            self.cameras = pylon.InstantCameraArray(len(self.serial_numbers))
+            for index, serial in enumerate(self.serial_numbers):
+                camera = self.cameras[index]
+                camera.Attach(factory.CreateDevice(devices[serial]))
+                camera.SetCameraContext(index)
+
+            self.cameras.Open()
+            for index in range(len(self.serial_numbers)):
+                self.cameras[index].Width.Value = self.camera_width
+                self.cameras[index].Height.Value = self.camera_height
+
+            logger.info("Camera array connected: %s", self.serial_numbers)
+            return True
+        except Exception as e:
+            logger.error("Failed to connect camera array: %s", e)
+            self.release_cameras()
+            raise RuntimeError(f"Camera array connection failed: {str(e)}")
+
+    def capture_images(
+        self,
+        path: str,
+        name: str,
+        count: int = 1,
+        quality: int = 100,
+        image_format: Literal["tiff", "png", "raw"] = "png",
+        timeout_ms: int = 5000,
+        max_failures: int = 3,
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Capture images from all cameras in parallel and save them.
+
+        Args:
+            path (str): Directory path where to save the images
+            name (str): Name prefix of the image files; the serial number is appended
+            count (int, optional): Number of images per camera. Defaults to 1.
+            quality (int, optional): Image quality (0-100). Defaults to 100.
+            image_format (Literal["tiff", "png", "raw"], optional): Format of the saved images. Defaults to "png".
+            timeout_ms (int, optional): Longest wait for the next frame of any camera. Defaults to 5000.
+            max_failures (int, optional): Failed grabs in a row after which a camera is given up. Defaults to 3.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Capture result per camera serial number; a camera
+            that was given up has success False and an error
+
+        Raises:
+            ValueError: If an unsupported image format or a count below 1 is specified
+            RuntimeError: If the cameras are not connected
+        """
+        if count < 1:
+            raise ValueError(f"count must be at least 1, got {count}")
+        if not self.cameras:
+            logger.error("Camera array not connected. Call Connect() first.")
+            raise RuntimeError("Camera array not connected. Call Connect() first.")
+
+        if image_format not in RGB_Camera_Controller.save_functions:
+            raise ValueError(
+                f"Unsupported image format: {image_format}. Supported formats: {list(RGB_Camera_Controller.save_functions.keys())}"
+            )
+
+        results = {
+            serial: {
+                "success": False,
+                "files": [],
+                "count": 0,
+                "path": path,
+                "format": image_format,
+            }
+            for serial in self.serial_numbers
+        }
+        writers = [
+            _Camera_Writer(serial, results[serial], quality, image_format)
+            for serial in self.serial_numbers
+        ]
+        grabbed = [0] * len(self.serial_numbers)
+        failures = [0] * len(self.serial_numbers)
+        # Cameras still grabbing: not yet at count and not given up
+        active = set(range(len(self.serial_numbers)))
+
+        try:
+            for writer in writers:
+                writer.start()
+            self.cameras.StartGrabbing()
+
+            while active:
+                grab_result = self.cameras.RetrieveResult(
+                    timeout_ms, pylon.TimeoutHandling_Return
+                )
+                if not grab_result.IsValid():
+                    # No camera delivered a frame in time, give up on the unfinished ones
+                    for index in active:
+                        results[self.serial_numbers[index]]["error"] = (
+                            f"No frame within {timeout_ms} ms"
+                        )
+                    logger.warning(
+                        "Camera array timed out waiting for %s",
+                        [self.serial_numbers[index] for index in sorted(active)],
+                    )
+                    break
+
+                index = grab_result.GetCameraContext()
+                if index not in active:
+                    grab_result.Release()
+                    continue
+                if not grab_result.GrabSucceeded():
+                    serial = self.serial_numbers[index]
+                    logger.warning(
+                        "Failed to grab image on %s: %s", serial, grab_result.ErrorDescription
+                    )
+                    failures[index] += 1
+                    if failures[index] >= max_failures:
+                        results[serial]["error"] = (
+                            f"Grab failed {failures[index]} times in a row: "
+                            f"{grab_result.ErrorDescription}"
+                        )
+                        active.discard(index)
+                    grab_result.Release()
+                    continue
+
+                failures[index] = 0
+                grabbed[index] += 1
+                if grabbed[index] >= count:
+                    active.discard(index)
+                filename = f"{path}{name}_{self.serial_numbers[index]}_{grabbed[index]}.{image_format}"
+                # The writer releases the grab result once the image is saved
+                writers[index].put(grab_result, filename)
+        except Exception as e:
+            logger.error("Error in camera array capture: %s", e)
+            raise
+        finally:
+            # Drain the writers first, they still hold grab result buffers
+            for writer in writers:
+                writer.finish()
+            self.cameras.StopGrabbing()
+
+        for result in results.values():
+            result["success"] = result["count"] > 0 and "error" not in result
+        logger.info(
+            "Camera array captured %s images from %s cameras",
+            sum(r["count"] for r in results.values()),
+            len(results),
+        )
+        return results
+
+    def release_cameras(self) -> None:
+        """Stop grabbing and close all cameras of the array."""
+        try:
+            if self.cameras is not None:
+                if self.cameras.IsGrabbing():
+                    self.cameras.StopGrabbing()
+                self.cameras.Close()
+                self.cameras.DetachDevice()
+                logger.info("Camera array released successfully")
+        except Exception as e:
+            logger.error("Error releasing camera array: %s", e)
+        finally:
+            self.cameras = None
+
+
+class _Camera_Writer:
+    """Writer thread saving the grab results of one camera."""
+
+    def __init__(
+        self, serial: str, result: Dict[str, Any], quality: int, image_format: str
+    ):
+        self.serial = serial
+        self.result = result
+        self.quality = quality
+        self.image_format = image_format
+        self._queue: queue.Queue = queue.Queue()
+        self._thread = threading.Thread(
+            target=self._run, name=f"rgb-writer-{serial}", daemon=True
+        )
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def put(self, grab_result: Any, filename: str) -> None:
+        self._queue.put((grab_result, filename))
+
+    def finish(self) -> None:
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self) -> None:
+        img = pylon.PylonImage()
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            grab_result, filename = item
+            try:
+                RGB_Camera_Controller.save_grab_result(
+                    img, grab_result, filename, self.image_format, self.quality
+                )
+                self.result["files"].append(filename)
+                self.result["count"] += 1
+            except Exception as e:
+                logger.error("Error saving %s from %s: %s", filename, self.serial, e)
+            finally:
+                grab_result.Release()
@@ -6,14 +6,56 @@
 ## Documentation: https://github.com/basler/pypylon
 #################################################
 
+import atexit
+import functools
+import itertools
 import logging
-from typing import Any, Dict, List, Literal, Optional
+import threading
+import time
+from typing import Any, Callable, Dict, List, Literal, Optional, Tuple
 
-from pypylon import pylon
+from pypylon import genicam, pylon
+
+from BussinessLayer.Bayer_Storage import Bayer_Sequence_Writer, bayer_pattern
+from BussinessLayer.Delta_Frame_Storage import Delta_Frame_Writer
+from BussinessLayer.Frame_Analysis import Frame_Analyzer, Frame_Quality_Gate
+from BussinessLayer.Frame_Ring_Buffer import Frame_Ring_Buffer, Ring_Frame
+from BussinessLayer.Tracing import span
+from data.RGB_camera import RGB_Camera_ROI, RGB_Camera_Snapshot
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# Snapshot versions, unique across all controllers of the process
+_snapshot_versions = itertools.count(1)
+
+
+def _with_camera_lock(method: Callable) -> Callable:
+    """
+    Decorator that runs a controller method while holding the camera lock.
+
+    Time spent waiting for a lock held by another request is traced as
+    'rgb.lock_wait'.
+
+    Args:
+        method (Callable): Controller method to wrap
+
+    Returns:
+        Callable: Wrapped method
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not self.lock.acquire(blocking=False):
+            with span("rgb.lock_wait", method=method.__name__):
+                self.lock.acquire()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self.lock.release()
+
+    return wrapper
+
 
 class RGB_Camera_Controller:
     """
@@ -26,6 +68,8 @@ class RGB_Camera_Controller:
         save_functions (Dict): Mapping of image formats to Pylon image format constants
         camera_width (int): Width of the camera image in pixels
         camera_height (int): Height of the camera image in pixels
+        serial_number (Optional[str]): Serial number of the camera, None for the first camera found
+        lock (threading.RLock): Serializes camera access between request threads
     """
 
     save_functions = {
@@ -34,11 +78,53 @@ class RGB_Camera_Controller:
         "tiff": pylon.ImageFileFormat_Tiff,
     }
 
+    # Pylon formats that accept a quality setting
+    quality_formats = {pylon.ImageFileFormat_Jpeg}
+
+    # Features that change the pixel count read from the sensor, applied before the ROI
+    reduction_features = [
+        "BinningHorizontal",
+        "BinningVertical",
+        "DecimationHorizontal",
+        "DecimationVertical",
+    ]
+
+    # GenICam features kept in the cached node-map snapshot; features the
+    # camera does not implement (e.g. the *Abs/*Raw variants of older models) are skipped
+    snapshot_features = [
+        "Width",
+        "Height",
+        "OffsetX",
+        "OffsetY",
+        "WidthMax",
+        "HeightMax",
+        "SensorWidth",
+        "SensorHeight",
+        "PixelFormat",
+        "ExposureAuto",
+        "ExposureTime",
+        "ExposureTimeAbs",
+        "GainAuto",
+        "Gain",
+        "GainRaw",
+        "AcquisitionFrameRateEnable",
+        "AcquisitionFrameRate",
+        "AcquisitionFrameRateAbs",
+        "ResultingFrameRate",
+        "ResultingFrameRateAbs",
+        "BinningHorizontal",
+        "BinningVertical",
+        "DecimationHorizontal",
+        "DecimationVertical",
+    ]
+
     def __init__(
         self,
         camera_width: int = 1920,
         camera_height: int = 1080,
         camera_format: str = "RGB8",
+        serial_number: Optional[str] = None,
+        snapshot_interval: float = 0.0,
     ):
         """
         Initialize the RGB Camera Controller.
@@ -47,15 +133,67 @@ class RGB_Camera_Controller:
             camera_width (int, optional): Width of the camera image in pixels. Defaults to 1920.
             camera_height (int, optional): Height of the camera image in pixels. Defaults to 1080.
             camera_format (str, optional): Format of the camera image. Defaults to "RGB8".
+            serial_number (str, optional): Serial number of the camera to use. Defaults to the first camera found.
+            snapshot_interval (float, optional): Seconds between background node-map snapshot
+                refreshes, 0 to refresh only when parameters are written. Defaults to 0.0.
         """
         self.camera_width = camera_width
         self.camera_height = camera_height
         self.camera_format = camera_format
+        self.serial_number = serial_number
         self.camera = None
+        self.lock = threading.RLock()
+        self._frame_trigger_armed = False
+        self.snapshot_interval = snapshot_interval
+        self._snapshot = RGB_Camera_Snapshot()
+        self._snapshot_thread: Optional[threading.Thread] = None
+        self._snapshot_stop = threading.Event()
+        # time.time() after which every frame still queued by the grab read_frame
+        # uses outside continuous mode was completed
+        self._latest_frames_since: Optional[float] = None
+        self._ring: Optional[Frame_Ring_Buffer] = None
+        self._continuous_thread: Optional[threading.Thread] = None
+        self._continuous_stop = threading.Event()
         logger.info(
-            f"RGB_Camera_Controller initialized with resolution {camera_width}x{camera_height}"
+            "RGB_Camera_Controller initialized with resolution %sx%s", camera_width, camera_height
         )
 
+    @staticmethod
+    def enumerate_devices() -> List[Dict[str, str]]:
+        """
+        List the cameras attached to this node.
+
+        Returns:
+            List[Dict[str, str]]: Serial number, model, vendor and names of each camera
+        """
+        return [
+            {
+                "serial_number": device.GetSerialNumber(),
+                "model": device.GetModelName(),
+                "vendor": device.GetVendorName(),
+                "device_class": device.GetDeviceClass(),
+                "friendly_name": device.GetFriendlyName(),
+                "user_defined_name": device.GetUserDefinedName(),
+            }
+            for device in pylon.TlFactory.GetInstance().EnumerateDevices()
+        ]
+
+    def _create_device(self) -> Any:
+        """
+        Create the pylon device selected by serial number, or the first one.
+
+        Returns:
+            Any: pylon device to attach to an InstantCamera
+        """
+        factory = pylon.TlFactory.GetInstance()
+        if self.serial_number is None:
+            return factory.CreateFirstDevice()
+
+        device_info = pylon.DeviceInfo()
+        device_info.SetSerialNumber(self.serial_number)
+        return factory.CreateFirstDevice(device_info)
+
+    @_with_camera_lock
     def Connect(self) -> bool:
         """
         Initialize and connect to the camera.
@@ -68,31 +206,489 @@ class RGB_Camera_Controller:
         """
         try:
             # Initialize camera
-            self.camera = pylon.InstantCamera(
-                pylon.TlFactory.GetInstance().CreateFirstDevice()
-            )
-            self.camera.Open()
+            with span("rgb.open"):
+                self.camera = pylon.InstantCamera(self._create_device())
+                self.camera.Open()
 
             # Set camera parameters
-            self.camera.Width.Value = self.camera_width
-            self.camera.Height.Value = self.camera_height
+            with span("rgb.set_size", width=self.camera_width, height=self.camera_height):
+                self.camera.Width.Value = self.camera_width
+                self.camera.Height.Value = self.camera_height
+
+            self.refresh_snapshot()
+            self._start_snapshot_refresher()
 
             logger.info("Camera connected successfully")
             return True
         except Exception as e:
-            logger.error(f"Failed to connect to camera: {str(e)}")
+            logger.error("Failed to connect to camera: %s", e)
             raise RuntimeError(f"Camera connection failed: {str(e)}")
 
-    def acquire_image(self) -> Optional[Any]:
+    def get_snapshot(self) -> RGB_Camera_Snapshot:
+        """
+        Return the cached node-map snapshot without touching the device.
+
+        Returns:
+            RGB_Camera_Snapshot: The most recent snapshot (empty before the first Connect)
+        """
+        return self._snapshot
+
+    @_with_camera_lock
+    def refresh_snapshot(self) -> RGB_Camera_Snapshot:
+        """
+        Read the snapshot features from the camera and replace the cached snapshot.
+
+        Returns:
+            RGB_Camera_Snapshot: The new snapshot
+
+        Raises:
+            RuntimeError: If the camera is not connected
+        """
+        if not self.camera:
+            logger.error("Camera not connected. Call Connect() first.")
+            raise RuntimeError("Camera not connected. Call Connect() first.")
+
+        with span("rgb.read_features"):
+            node_map = self.camera.GetNodeMap()
+            features = {}
+            for name in self.snapshot_features:
+                try:
+                    node = node_map.GetNode(name)
+                    if node is None or not genicam.IsReadable(node):
+                        continue
+                    features[name] = self._describe_node(node)
+                except Exception as e:
+                    logger.debug("Skipping feature %s in snapshot: %s", name, e)
+
+        # Keep the version while the camera reports the same features
+        version = (
+            self._snapshot.version
+            if self._snapshot.version and features == self._snapshot.features
+            else next(_snapshot_versions)
+        )
+        self._snapshot = RGB_Camera_Snapshot(
+            features=features, taken_at=time.time(), version=version
+        )
+        return self._snapshot
+
+    @_with_camera_lock
+    def set_features(self, values: Dict[str, Any]) -> RGB_Camera_Snapshot:
+        """
+        Write GenICam features in the given order and refresh the snapshot.
+
+        Args:
+            values (Dict[str, Any]): Feature name to new value
+
+        Returns:
+            RGB_Camera_Snapshot: The snapshot after the write
+
+        Raises:
+            RuntimeError: If the camera is not connected
+            ValueError: If a feature does not exist or is not writable
+        """
+        if not self.camera:
+            logger.error("Camera not connected. Call Connect() first.")
+            raise RuntimeError("Camera not connected. Call Connect() first.")
+
+        node_map = self.camera.GetNodeMap()
+        try:
+            for name, value in values.items():
+                node = node_map.GetNode(name)
+                if (
+                    node is not None
+                    and not genicam.IsWritable(node)
+                    and self.camera.IsGrabbing()
+                ):
+                    # Geometry and format features are locked while grabbing; the grab
+                    # loops (preview, continuous, latest image) restart it on their next frame
+                    self.camera.StopGrabbing()
+                if node is None or not genicam.IsWritable(node):
+                    raise ValueError(f"Camera feature {name} is not writable")
+                with span("rgb.set_feature", feature=name):
+                    node.SetValue(value)
+        finally:
+            self.refresh_snapshot()
+        return self._snapshot
+
+    @_with_camera_lock
+    def apply_roi(self, roi: RGB_Camera_ROI) -> Dict[str, Any]:
+        """
+        Apply a region of interest with binning and decimation on the camera.
+
+        The request is validated against the cached snapshot before anything
+        is written, and only features whose value differs are reconfigured,
+        so switching between presets touches as few nodes as possible.
+
+        Args:
+            roi (RGB_Camera_ROI): Requested region
+
+        Returns:
+            Dict[str, Any]: Applied feature values and the names of the changed features
+
+        Raises:
+            RuntimeError: If the camera is not connected
+            ValueError: If the region does not fit the camera limits or increments
+        """
+        if not self.camera:
+            logger.error("Camera not connected. Call Connect() first.")
+            raise RuntimeError("Camera not connected. Call Connect() first.")
+
+        snapshot = self.get_snapshot()
+        targets = self.plan_roi(roi, snapshot, self.camera_width, self.camera_height)
+        changed = []
+
+        # Binning and decimation first, cameras rescale size and offsets when they change
+        reduction = {
+            name: targets[name]
+            for name in self.reduction_features
+            if name in targets and snapshot.value(name) != targets[name]
+        }
+        if reduction:
+            snapshot = self.set_features(reduction)
+            changed.extend(reduction)
+
+        geometry = {}
+        for size_name, offset_name in (("Width", "OffsetX"), ("Height", "OffsetY")):
+            # Move the offset first when it shrinks, so size + offset never exceeds the sensor
+            order = (
+                (offset_name, size_name)
+                if targets[offset_name] < snapshot.value(offset_name, 0)
+                else (size_name, offset_name)
+            )
+            for name in order:
+                if snapshot.value(name) != targets[name]:
+                    geometry[name] = targets[name]
+        if geometry:
+            self.set_features(geometry)
+            changed.extend(geometry)
+
+        if changed:
+            logger.info("Camera ROI applied: %s", targets)
+        return {"features": targets, "changed": changed}
+
+    @staticmethod
+    def select_bayer_format(snapshot: RGB_Camera_Snapshot) -> str:
+        """
+        Choose the Bayer pixel format for raw capture, preferring 8 bit.
+
+        Args:
+            snapshot (RGB_Camera_Snapshot): Snapshot with the PixelFormat symbolics
+
+        Returns:
+            str: Bayer pixel format, the current one if the camera already uses Bayer
+
+        Raises:
+            ValueError: If the camera offers no Bayer pixel format
+        """
+        current = snapshot.value("PixelFormat", "")
+        if bayer_pattern(current):
+            return current
+        symbolics = snapshot.features.get("PixelFormat", {}).get("symbolics", [])
+        bayer_formats = [name for name in symbolics if bayer_pattern(name)]
+        if not bayer_formats:
+            raise ValueError("Camera offers no Bayer pixel format")
+        eight_bit = [name for name in bayer_formats if name.endswith("8")]
+        return (eight_bit or bayer_formats)[0]
+
+    @classmethod
+    def plan_roi(
+        cls,
+        roi: RGB_Camera_ROI,
+        snapshot: RGB_Camera_Snapshot,
+        default_width: int,
+        default_height: int,
+    ) -> Dict[str, int]:
+        """
+        Translate a region into feature values and check them against the camera limits.
+
+        Args:
+            roi (RGB_Camera_ROI): Requested region
+            snapshot (RGB_Camera_Snapshot): Snapshot with limits and increments
+            default_width (int): Unbinned width used when the region has none
+            default_height (int): Unbinned height used when the region has none
+
+        Returns:
+            Dict[str, int]: Feature name to value
+
+        Raises:
+            ValueError: If the region does not fit the camera limits or increments
+        """
+        targets = {}
+        requested = {
+            "BinningHorizontal": roi.binning_horizontal,
+            "BinningVertical": roi.binning_vertical,
+            "DecimationHorizontal": roi.decimation_horizontal,
+            "DecimationVertical": roi.decimation_vertical,
+        }
+        for name, value in requested.items():
+            feature = snapshot.features.get(name)
+            if feature is None:
+                if value != 1:
+                    raise ValueError(f"Camera does not support {name}")
+                continue
+            cls._check_integer(name, value, feature["min"], feature["max"], feature["inc"])
+            targets[name] = value
+
+        axes = (
+            ("Width", "OffsetX", "Horizontal", roi.width, roi.offset_x, default_width),
+            ("Height", "OffsetY", "Vertical", roi.height, roi.offset_y, default_height),
+        )
+        for size_name, offset_name, axis, size, offset, default_size in axes:
+            size_feature = snapshot.features[size_name]
+            offset_feature = snapshot.features.get(offset_name, {"min": 0, "inc": 1})
+            reduction = requested[f"Binning{axis}"] * requested[f"Decimation{axis}"]
+
+            # Full sensor size in unbinned pixels, WidthMax/HeightMax already include the current binning
+            sensor_size = snapshot.value(f"Sensor{size_name}")
+            if sensor_size is None:
+                sensor_size = snapshot.value(f"{size_name}Max", size_feature["max"]) * (
+                    snapshot.value(f"Binning{axis}", 1) * snapshot.value(f"Decimation{axis}", 1)
+                )
+            max_size = sensor_size // reduction
+
+            size_min, size_inc = size_feature["min"], size_feature["inc"]
+            if size is None:
+                size = min(default_size // reduction, max_size)
+                size -= (size - size_min) % size_inc
+            cls._check_integer(size_name, size, size_min, max_size, size_inc)
+
+            if offset is None:
+                offset = (max_size - size) // 2 if roi.center else 0
+                offset -= offset % offset_feature["inc"]
+            cls._check_integer(
+                offset_name, offset, offset_feature["min"], max_size - size, offset_feature["inc"]
+            )
+
+            targets[size_name] = size
+            targets[offset_name] = offset
+        return targets
+
+    @staticmethod
+    def _check_integer(name: str, value: int, minimum: int, maximum: int, inc: int) -> None:
+        if not minimum <= value <= maximum:
+            raise ValueError(f"{name} must be between {minimum} and {maximum}, got {value}")
+        if inc and (value - minimum) % inc:
+            raise ValueError(
+                f"{name} must be {minimum} plus a multiple of {inc}, got {value}"
+            )
+
+    @staticmethod
+    def _describe_node(node: Any) -> Dict[str, Any]:
+        """
+        Read value, limits, increment and writability of one GenICam node.
+
+        Args:
+            node (Any): GenICam node
+
+        Returns:
+            Dict[str, Any]: Feature description for the snapshot
+        """
+        description = {"value": node.GetValue(), "writable": genicam.IsWritable(node)}
+        if isinstance(node, genicam.IInteger):
+            description.update(
+                {"min": node.GetMin(), "max": node.GetMax(), "inc": node.GetInc()}
+            )
+        elif isinstance(node, genicam.IFloat):
+            description.update(
+                {
+                    "min": node.GetMin(),
+                    "max": node.GetMax(),
+                    "inc": node.GetInc() if node.HasInc() else None,
+                    "unit": node.GetUnit(),
+                }
+            )
+        elif isinstance(node, genicam.IEnumeration):
+            description["symbolics"] = list(node.Symbolics)
+        return description
+
+    def _start_snapshot_refresher(self) -> None:
+        """Start the background snapshot refresh thread once, if enabled."""
+        if self.snapshot_interval <= 0 or self._snapshot_thread is not None:
+            return
+        self._snapshot_stop.clear()
+        self._snapshot_thread = threading.Thread(
+            target=self._refresh_snapshot_periodically,
+            name="rgb-snapshot",
+            daemon=True,
+        )
+        self._snapshot_thread.start()
+
+    def _stop_snapshot_refresher(self) -> None:
+        """Stop the background snapshot refresh thread and wait for it to exit."""
+        self._snapshot_stop.set()
+        thread = self._snapshot_thread
+        # The refresher never blocks on the camera lock, so it exits within one refresh
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        self._snapshot_thread = None
+
+    def _refresh_snapshot_periodically(self) -> None:
+        while not self._snapshot_stop.wait(self.snapshot_interval):
+            # Never delay a capture for a refresh, try again next period
+            if not self.lock.acquire(blocking=False):
+                continue
+            try:
+                if self.is_connected():
+                    self.refresh_snapshot()
+            except Exception as e:
+                logger.warning("Periodic snapshot refresh failed: %s", e)
+            finally:
+                self.lock.release()
+
+    def acquire_image(
+        self, after: Optional[float] = None, copy: bool = True, timeout_ms: int = 5000
+    ) -> Optional[Any]:
         """
         Acquire a single image from the camera.
 
+        In continuous mode (start_continuous) the frame is taken from the ring
+        buffer without touching the grab engine: the newest frame, or the
+        first frame received after the given time. Otherwise the grab is
+        restarted for a single frame.
+
+        Must not be called while holding the camera lock in continuous mode,
+        the grab thread needs the lock to deliver the frame.
+
+        Args:
+            after (Optional[float], optional): time.time() value the frame must be newer than,
+                continuous mode only. Defaults to None for the newest frame.
+            copy (bool, optional): In continuous mode, return a private copy instead of a
+                read-only view into the ring. Defaults to True.
+            timeout_ms (int, optional): Longest wait for a frame in milliseconds. Defaults to 5000.
+
         Returns:
             Optional[Any]: The acquired image as a numpy array, or None if acquisition failed
 
         Raises:
             RuntimeError: If the camera is not connected
         """
+        frame = self.acquire_ring_frame(after, copy, timeout_ms)
+        if frame is not None:
+            return frame.image
+        if self.is_continuous():
+            logger.error("No frame received from the continuous grab")
+            return None
+        return self._acquire_single_image()
+
+    def acquire_ring_frame(
+        self, after: Optional[float] = None, copy: bool = True, timeout_ms: int = 5000
+    ) -> Optional[Ring_Frame]:
+        """
+        Take a timestamped frame from the continuous grab.
+
+        Args:
+            after (Optional[float], optional): time.time() value the frame must be newer than.
+                Defaults to None for the newest frame.
+            copy (bool, optional): Return a private copy instead of a read-only view. Defaults to True.
+            timeout_ms (int, optional): Longest wait for a frame in milliseconds. Defaults to 5000.
+
+        Returns:
+            Optional[Ring_Frame]: The frame, or None if continuous mode is off or no frame arrived
+        """
+        ring = self._ring
+        if ring is None or not self.is_continuous():
+            return None
+        frame = ring.latest(copy) if after is None else None
+        if frame is None:
+            frame = ring.wait_after(after or 0.0, timeout_ms / 1000, copy)
+        return frame
+
+    def read_frame(
+        self,
+        encode: Callable[[Any, str], Any],
+        after: Optional[float] = None,
+        timeout_ms: int = 2000,
+        use_ring: bool = True,
+    ) -> Tuple[Any, Dict[str, Any]]:
+        """
+        Encode the newest frame straight from memory, without any file.
+
+        In continuous mode the frame comes from a read-only view into the
+        ring buffer; it is encoded again if the ring overwrote the slot
+        meanwhile. Otherwise a LatestImageOnly grab is kept running (as for
+        capture_latest_image) and the frame is encoded from a zero-copy view
+        of the grab buffer; the grab is restarted when the buffered frame may
+        be older than after.
+
+        Args:
+            encode (Callable[[Any, str], Any]): Turns the frame and its pixel format into the payload
+            after (Optional[float], optional): time.time() value the frame must be newer than.
+                Defaults to None for the newest frame.
+            timeout_ms (int, optional): Grab timeout in milliseconds. Defaults to 2000.
+            use_ring (bool, optional): Take the frame from the continuous grab if it runs.
+                Pass False while holding the camera lock, which the continuous grab needs
+                to fill the ring; the frame is then grabbed directly. Defaults to True.
+
+        Returns:
+            Tuple[Any, Dict[str, Any]]: Payload, and shape, dtype, pixel format and timestamps of the frame
+
+        Raises:
+            RuntimeError: If the camera is not connected or no frame arrives
+        """
+        pixel_format = self.get_snapshot().value("PixelFormat")
+        while use_ring and self.is_continuous():
+            frame = self.acquire_ring_frame(after, copy=False, timeout_ms=timeout_ms)
+            if frame is None:
+                raise RuntimeError("No frame received from the continuous grab")
+            payload = encode(frame.image, pixel_format)
+            if self._ring.is_valid(frame):
+                return payload, self._frame_meta(
+                    frame.image, pixel_format, frame.camera_timestamp, frame.host_time
+                )
+        return self._read_latest_frame(encode, pixel_format, after, timeout_ms)
+
+    @_with_camera_lock
+    def _read_latest_frame(
+        self,
+        encode: Callable[[Any, str], Any],
+        pixel_format: str,
+        after: Optional[float],
+        timeout_ms: int,
+    ) -> Tuple[Any, Dict[str, Any]]:
+        if not self.camera:
+            logger.error("Camera not connected. Call Connect() first.")
+            raise RuntimeError("Camera not connected. Call Connect() first.")
+
+        stale = after is not None and (
+            self._latest_frames_since is None or after > self._latest_frames_since
+        )
+        if stale and self.camera.IsGrabbing():
+            # The buffered frame may predate 'after', only frames of a new grab are newer
+            self.camera.StopGrabbing()
+        if not self.camera.IsGrabbing():
+            self._latest_frames_since = time.time()
+            self.camera.StartGrabbing(pylon.GrabStrategy_LatestImageOnly)
+
+        with self.camera.RetrieveResult(
+            timeout_ms, pylon.TimeoutHandling_ThrowException
+        ) as grab_result:
+            if not grab_result.GrabSucceeded():
+                raise RuntimeError(
+                    f"Image acquisition failed: {grab_result.ErrorDescription}"
+                )
+            host_time = time.time()
+            # LatestImageOnly keeps no older frame once this one is retrieved
+            self._latest_frames_since = host_time
+            with grab_result.GetArrayZeroCopy() as image:
+                payload = encode(image, pixel_format)
+                return payload, self._frame_meta(
+                    image, pixel_format, grab_result.TimeStamp, host_time
+                )
+
+    @staticmethod
+    def _frame_meta(
+        image: Any, pixel_format: str, camera_timestamp: int, host_time: float
+    ) -> Dict[str, Any]:
+        return {
+            "shape": list(image.shape),
+            "dtype": image.dtype.name,
+            "pixel_format": pixel_format,
+            "camera_timestamp": camera_timestamp,
+            "host_time": host_time,
+        }
+
+    @_with_camera_lock
+    def _acquire_single_image(self) -> Optional[Any]:
         if not self.camera:
             logger.error("Camera not connected. Call Connect() first.")
             raise RuntimeError("Camera not connected. Call Connect() first.")
@@ -101,11 +697,13 @@ class RGB_Camera_Controller:
             if self.camera.IsGrabbing():
                 self.camera.StopGrabbing()
 
-            self.camera.StartGrabbing(pylon.GrabStrategy_LatestImageOnly)
+            with span("rgb.start_grabbing"):
+                self.camera.StartGrabbing(pylon.GrabStrategy_LatestImageOnly)
 
-            grab_result = self.camera.RetrieveResult(
-                5000, pylon.TimeoutHandling_ThrowException
-            )
+            with span("rgb.retrieve_result"):
+                grab_result = self.camera.RetrieveResult(
+                    5000, pylon.TimeoutHandling_ThrowException
+                )
 
             if grab_result.GrabSucceeded():
                 image = grab_result.Array
@@ -114,14 +712,172 @@ class RGB_Camera_Controller:
                 return image
             else:
                 logger.error(
-                    f"Image acquisition failed: {grab_result.ErrorDescription}"
+                    "Image acquisition failed: %s", grab_result.ErrorDescription
                 )
                 grab_result.Release()
                 return None
         except Exception as e:
-            logger.error(f"Error acquiring image: {str(e)}")
+            logger.error("Error acquiring image: %s", e)
             return None
 
+    def is_connected(self) -> bool:
+        """
+        Check whether the camera is connected and open.
+
+        Returns:
+            bool: True if the camera is open, False otherwise
+        """
+        try:
+            return self.camera is not None and self.camera.IsOpen()
+        except Exception:
+            return False
+
+    def start_continuous(self, ring_size: int = 4) -> None:
+        """
+        Start a background grab that keeps the newest frames in a ring buffer.
+
+        While it runs, acquire_image and acquire_preview_frame are answered
+        from the ring instead of restarting the grab engine. Captures that
+        need their own grab strategy still work: they take the camera lock,
+        and the background grab restarts once they released it.
+
+        Must not be called while holding the camera lock.
+
+        Args:
+            ring_size (int, optional): Number of frames kept. Defaults to 4.
+
+        Raises:
+            RuntimeError: If the camera is not connected
+        """
+        if not self.camera:
+            logger.error("Camera not connected. Call Connect() first.")
+            raise RuntimeError("Camera not connected. Call Connect() first.")
+        if self.is_continuous() and not self._continuous_stop.is_set():
+            return
+        # A grab thread that is still winding down after release_camera must not share the new ring
+        self.stop_continuous()
+
+        self._ring = Frame_Ring_Buffer(ring_size)
+        self._continuous_stop.clear()
+        self._continuous_thread = threading.Thread(
+            target=self._grab_continuously, name="rgb-continuous-grab", daemon=True
+        )
+        self._continuous_thread.start()
+        # A daemon thread torn down inside a pylon call aborts the interpreter at exit
+        atexit.register(self.stop_continuous)
+        logger.info("Continuous grab started with %s frame ring buffer", ring_size)
+
+    def stop_continuous(self) -> None:
+        """
+        Stop the background grab started by start_continuous.
+
+        Must not be called while holding the camera lock.
+        """
+        self._continuous_stop.set()
+        thread = self._continuous_thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        self._continuous_thread = None
+        atexit.unregister(self.stop_continuous)
+
+    def is_continuous(self) -> bool:
+        """
+        Check whether the background grab is running.
+
+        Returns:
+            bool: True while start_continuous is active
+        """
+        thread = self._continuous_thread
+        return thread is not None and thread.is_alive()
+
+    def _grab_continuously(self) -> None:
+        """Copy every new frame into the ring, holding the camera lock only for the copy."""
+        ring = self._ring
+        while not self._continuous_stop.is_set():
+            try:
+                with self.lock:
+                    if not self.is_connected():
+                        break
+                    if not self.camera.IsGrabbing():
+                        self.camera.StartGrabbing(pylon.GrabStrategy_LatestImageOnly)
+                    wait_object = self.camera.GetGrabResultWaitObject()
+
+                # Wait for the next frame without the lock, so requests are not held up
+                if not wait_object.Wait(100):
+                    continue
+
+                with self.lock:
+                    if not self.is_connected() or not self.camera.IsGrabbing():
+                        continue
+                    grab_result = self.camera.RetrieveResult(
+                        0, pylon.TimeoutHandling_Return
+                    )
+                    try:
+                        if grab_result.IsValid() and grab_result.GrabSucceeded():
+                            with grab_result.GetArrayZeroCopy() as array:
+                                ring.put(array, grab_result.TimeStamp)
+                    finally:
+                        grab_result.Release()
+            except Exception as e:
+                logger.error("Error in continuous grab: %s", e)
+                self._continuous_stop.wait(0.1)
+        logger.info("Continuous grab stopped")
+
+    @_with_camera_lock
+    def acquire_preview_frame(
+        self, max_width: int = 640, timeout_ms: int = 1000
+    ) -> Optional[Any]:
+        """
+        Grab the newest frame and return a downscaled copy of it.
+
+        Unlike acquire_image, the grab engine is left running between calls
+        (LatestImageOnly strategy), so a preview loop only pays for one frame
+        period per call. The frame is subsampled while the grab buffer is
+        still attached, so only the small copy leaves this method.
+
+        Args:
+            max_width (int, optional): Maximum width of the returned frame. Defaults to 640.
+            timeout_ms (int, optional): Grab timeout in milliseconds. Defaults to 1000.
+
+        Returns:
+            Optional[Any]: Downscaled image as a numpy array, or None if the grab failed
+
+        Raises:
+            RuntimeError: If the camera is not connected
+        """
+        if not self.camera:
+            logger.error("Camera not connected. Call Connect() first.")
+            raise RuntimeError("Camera not connected. Call Connect() first.")
+
+        if self.is_continuous():
+            # The continuous grab owns the camera, the preview shares its newest frame
+            frame = self._ring.latest(copy=False)
+            if frame is None:
+                return None
+            step = max(1, -(-frame.image.shape[1] // max_width))
+            return frame.image[::step, ::step].copy()
+
+        try:
+            if not self.camera.IsGrabbing():
+                self.camera.StartGrabbing(pylon.GrabStrategy_LatestImageOnly)
+
+            with self.camera.RetrieveResult(
+                timeout_ms, pylon.TimeoutHandling_ThrowException
+            ) as grab_result:
+                if not grab_result.GrabSucceeded():
+                    logger.warning(
+                        "Preview grab failed: %s", grab_result.ErrorDescription
+                    )
+                    return None
+
+                image = grab_result.Array
+                step = max(1, -(-image.shape[1] // max_width))
+                return image[::step, ::step].copy()
+        except Exception as e:
+            logger.error("Error acquiring preview frame: %s", e)
+            return None
+
+    @_with_camera_lock
     def capture_image(
         self,
         path: str,
@@ -129,6 +885,13 @@ class RGB_Camera_Controller:
         count: int = 1,
         quality: int = 100,
         image_format: Literal["tiff", "png", "raw"] = "png",
+        analyze: bool = False,
+        quality_gate: Optional[Frame_Quality_Gate] = None,
+        delta_writer: Optional[Delta_Frame_Writer] = None,
+        bayer: bool = False,
+        on_file: Optional[Callable[[str], Any]] = None,
+        progress: Optional[Callable[[int, str], Any]] = None,
+        should_stop: Optional[Callable[[], bool]] = None,
     ) -> Dict[str, Any]:
         """
         Capture and save images from the camera.
@@ -139,12 +902,29 @@ class RGB_Camera_Controller:
             count (int, optional): Number of images to capture. Defaults to 1.
             quality (int, optional): Image quality (0-100). Defaults to 100.
             image_format (Literal["tiff", "png", "raw"], optional): Format of the saved image. Defaults to "png".
+            analyze (bool, optional): Add per-frame statistics to the result. Defaults to False.
+            quality_gate (Optional[Frame_Quality_Gate], optional): Skip frames failing the gate
+                before they are encoded. Defaults to None.
+            delta_writer (Optional[Delta_Frame_Writer], optional): Store the frames as keyframes
+                and tile deltas instead of image_format files. Defaults to None.
+            bayer (bool, optional): Grab in the camera's Bayer format and store the raw
+                mosaics for later demosaicing. Defaults to False.
+            on_file (Optional[Callable[[str], Any]], optional): Called with each image file
+                right after it is written, e.g. to queue thumbnails. Defaults to None.
+            progress (Optional[Callable[[int, str], Any]], optional): Called with the frame
+                number and file after each stored frame, in every storage mode. Defaults to None.
+            should_stop (Optional[Callable[[], bool]], optional): Polled before each frame;
+                when it returns True the capture ends early with the frames stored so far
+                and "stopped" set in the result. Defaults to None.
 
         Returns:
-            Dict[str, Any]: Dictionary with status and file information
+            Dict[str, Any]: Dictionary with status and file information, the per-frame
+            statistics table under "analysis", the rejection report under
+            "quality_gate" and the delta or Bayer sequence metadata under "storage"
+            if requested
 
         Raises:
-            ValueError: If an unsupported image format is specified
+            ValueError: If an unsupported image format or storage combination is specified
             RuntimeError: If the camera is not connected
         """
         if not self.camera:
@@ -152,7 +932,7 @@ class RGB_Camera_Controller:
             raise RuntimeError("Camera not connected. Call Connect() first.")
 
         if image_format not in self.save_functions:
-            logger.error(f"Unsupported image format: {image_format}")
+            logger.error("Unsupported image format: %s", image_format)
             raise ValueError(
                 f"Unsupported image format: {image_format}. Supported formats: {list(self.save_functions.keys())}"
             )
@@ -165,62 +945,304 @@ class RGB_Camera_Controller:
             "format": image_format,
         }
 
+        if bayer and delta_writer:
+            raise ValueError("Bayer capture cannot be combined with delta storage")
+
+        analyzer = Frame_Analyzer() if analyze else None
+        sequence_writer = delta_writer
+        original_format = None
+        if bayer:
+            snapshot = self.get_snapshot()
+            original_format = snapshot.value("PixelFormat")
+            sequence_writer = Bayer_Sequence_Writer(
+                path, name, self.select_bayer_format(snapshot), original_format
+            )
+
         try:
             img = pylon.PylonImage()
-            self.camera.StartGrabbing()
+            if self.camera.IsGrabbing():
+                self.camera.StopGrabbing()
+            if bayer and original_format != sequence_writer.pixel_format:
+                self.set_features({"PixelFormat": sequence_writer.pixel_format})
+            with span("rgb.start_grabbing"):
+                self.camera.StartGrabbing()
 
             captured_count = 0
             for i in range(count):
+                if should_stop and should_stop():
+                    logger.info("Capture stopped after %s/%s frames", i, count)
+                    result["stopped"] = True
+                    break
                 try:
-                    with self.camera.RetrieveResult(2000) as result_obj:
+                    with span("rgb.retrieve_result", frame=i + 1):
+                        result_obj = self.camera.RetrieveResult(2000)
+                    with result_obj:
                         if not result_obj.GrabSucceeded():
                             logger.warning(
-                                f"Failed to grab image {i + 1}/{count}: {result_obj.ErrorDescription}"
+                                "Failed to grab image %s/%s: %s",
+                                i + 1,
+                                count,
+                                result_obj.ErrorDescription,
                             )
                             continue
 
-                        # Attach grab result buffer to prevent reuse for grabbing
-                        img.AttachGrabResultBuffer(result_obj)
-
-                        # Generate filename and determine format
-                        filename = (
-                            f"{path}{name}_{i + 1}.{image_format}"
-                            if count > 1
-                            else f"{path}{name}.{image_format}"
-                        )
-                        format_value = self.save_functions[image_format]
+                        if analyzer or quality_gate or sequence_writer:
+                            image = result_obj.Array
+                        if analyzer:
+                            with span("rgb.analyze", frame=i + 1):
+                                analyzer.add(image, frame=i + 1)
+                        if quality_gate:
+                            with span("rgb.quality_gate", frame=i + 1):
+                                rejected = quality_gate.check(image, frame=i + 1)
+                            if rejected:
+                                continue
 
-                        # Configure and save the image
-                        ipo = pylon.ImagePersistenceOptions()
-                        ipo.SetQuality(quality)
-                        img.Save(format_value, filename, ipo)
+                        if sequence_writer:
+                            with span("rgb.store_sequence", frame=i + 1):
+                                filename = sequence_writer.add(image, frame=i + 1)
+                        else:
+                            # Generate filename and save the image
+                            filename = (
+                                f"{path}{name}_{i + 1}.{image_format}"
+                                if count > 1
+                                else f"{path}{name}.{image_format}"
+                            )
+                            self.save_grab_result(
+                                img, result_obj, filename, image_format, quality
+                            )
+                            if on_file:
+                                on_file(filename)
 
                         result["files"].append(filename)
                         captured_count += 1
-
-                        # Release image to make buffer available again
-                        img.Release()
+                        logger.debug("Stored frame %d/%d in %s", i + 1, count, filename)
+                        if progress:
+                            progress(i + 1, filename)
                 except Exception as e:
-                    logger.error(f"Error capturing image {i + 1}/{count}: {str(e)}")
+                    logger.error("Error capturing image %s/%s: %s", i + 1, count, e)
                     continue
 
             self.camera.StopGrabbing()
 
             result["success"] = captured_count > 0
             result["count"] = captured_count
+            if analyzer:
+                result["analysis"] = analyzer.result()
+            if quality_gate:
+                result["quality_gate"] = quality_gate.summary()
+            if sequence_writer:
+                result["storage"] = sequence_writer.close()
+                result["format"] = "bayer" if bayer else "delta"
 
             logger.info(
-                f"Captured {captured_count}/{count} images in {image_format} format"
+                "Captured %s/%s images in %s format", captured_count, count, image_format
             )
             return result
         except Exception as e:
-            logger.error(f"Error in capture_image: {str(e)}")
+            logger.error("Error in capture_image: %s", e)
             self.camera.StopGrabbing()
             raise
         finally:
             # Don't automatically close the camera - let the caller decide when to release
-            pass
+            if bayer and original_format != sequence_writer.pixel_format:
+                self.set_features({"PixelFormat": original_format})
+
+    @classmethod
+    def save_grab_result(
+        cls,
+        img: Any,
+        result_obj: Any,
+        filename: str,
+        image_format: str,
+        quality: int,
+    ) -> None:
+        """
+        Save a grab result to disk through a reusable PylonImage.
+
+        Args:
+            img (Any): pylon.PylonImage used to attach the grab buffer
+            result_obj (Any): Successful grab result
+            filename (str): Target file name including extension
+            image_format (str): Key of save_functions
+            quality (int): Image quality (0-100)
+        """
+        # Attach grab result buffer to prevent reuse for grabbing
+        img.AttachGrabResultBuffer(result_obj)
+        try:
+            format_value = cls.save_functions[image_format]
+            with span("rgb.save", format=image_format):
+                if format_value in cls.quality_formats:
+                    # Configure and save the image
+                    ipo = pylon.ImagePersistenceOptions()
+                    ipo.SetQuality(quality)
+                    img.Save(format_value, filename, ipo)
+                else:
+                    # Lossless formats reject persistence options
+                    img.Save(format_value, filename)
+        finally:
+            # Release image to make buffer available again
+            img.Release()
+
+    @_with_camera_lock
+    def capture_latest_image(
+        self,
+        filename: str,
+        quality: int = 100,
+        image_format: Literal["tiff", "png", "raw"] = "png",
+        timeout_ms: int = 2000,
+    ) -> Dict[str, Any]:
+        """
+        Save the newest frame of a continuously running grab to disk.
+
+        The grab engine is started once (LatestImageOnly) and kept running
+        between calls, so periodic callers such as the capture scheduler do
+        not pay the grab start and first-frame latency for every frame.
+
+        Args:
+            filename (str): Target file name including extension
+            quality (int, optional): Image quality (0-100). Defaults to 100.
+            image_format (Literal["tiff", "png", "raw"], optional): Format of the saved image. Defaults to "png".
+            timeout_ms (int, optional): Grab timeout in milliseconds. Defaults to 2000.
+
+        Returns:
+            Dict[str, Any]: Saved file name and the camera timestamp of the frame
+
+        Raises:
+            ValueError: If an unsupported image format is specified
+            RuntimeError: If the camera is not connected or the grab fails
+        """
+        if not self.camera:
+            logger.error("Camera not connected. Call Connect() first.")
+            raise RuntimeError("Camera not connected. Call Connect() first.")
+
+        if image_format not in self.save_functions:
+            raise ValueError(
+                f"Unsupported image format: {image_format}. Supported formats: {list(self.save_functions.keys())}"
+            )
+
+        if not self.camera.IsGrabbing():
+            self.camera.StartGrabbing(pylon.GrabStrategy_LatestImageOnly)
+
+        with self.camera.RetrieveResult(
+            timeout_ms, pylon.TimeoutHandling_ThrowException
+        ) as result_obj:
+            if not result_obj.GrabSucceeded():
+                raise RuntimeError(
+                    f"Image acquisition failed: {result_obj.ErrorDescription}"
+                )
+            self.save_grab_result(
+                pylon.PylonImage(), result_obj, filename, image_format, quality
+            )
+            return {"file": filename, "camera_timestamp": result_obj.TimeStamp}
+
+    @_with_camera_lock
+    def arm_frame_trigger(self) -> bool:
+        """
+        Prepare the camera so that the next frame is exposed on demand.
+
+        The camera is switched to software-triggered FrameStart and the grab
+        engine is started, so fire_frame_trigger only has to execute the
+        trigger. Cameras without a software trigger keep free-running.
 
+        Returns:
+            bool: True if a software trigger is armed, False if the camera is free-running
+
+        Raises:
+            RuntimeError: If the camera is not connected
+        """
+        if not self.camera:
+            logger.error("Camera not connected. Call Connect() first.")
+            raise RuntimeError("Camera not connected. Call Connect() first.")
+
+        if self.camera.IsGrabbing():
+            self.camera.StopGrabbing()
+
+        try:
+            self.camera.TriggerSelector.Value = "FrameStart"
+            self.camera.TriggerMode.Value = "On"
+            self.camera.TriggerSource.Value = "Software"
+            triggered = True
+        except Exception as e:
+            logger.warning("Software trigger not available, free-running: %s", e)
+            triggered = False
+
+        self.camera.StartGrabbing(pylon.GrabStrategy_OneByOne)
+        if triggered:
+            self.camera.WaitForFrameTriggerReady(
+                1000, pylon.TimeoutHandling_ThrowException
+            )
+        self._frame_trigger_armed = triggered
+        return triggered
+
+    @_with_camera_lock
+    def fire_frame_trigger(
+        self,
+        filename: str,
+        quality: int = 100,
+        image_format: Literal["tiff", "png", "raw"] = "png",
+        timeout_ms: int = 2000,
+    ) -> Dict[str, Any]:
+        """
+        Fire the armed trigger, then retrieve and save the resulting frame.
+
+        Args:
+            filename (str): Target file name including extension
+            quality (int, optional): Image quality (0-100). Defaults to 100.
+            image_format (Literal["tiff", "png", "raw"], optional): Format of the saved image. Defaults to "png".
+            timeout_ms (int, optional): Grab timeout in milliseconds. Defaults to 2000.
+
+        Returns:
+            Dict[str, Any]: File name, host time of the trigger, host time the frame
+            arrived and the camera timestamp of the frame
+
+        Raises:
+            RuntimeError: If the camera is not armed or the grab fails
+        """
+        if not self.camera or not self.camera.IsGrabbing():
+            raise RuntimeError("Camera not armed. Call arm_frame_trigger() first.")
+
+        triggered = self._frame_trigger_armed
+        if triggered:
+            self.camera.WaitForFrameTriggerReady(
+                timeout_ms, pylon.TimeoutHandling_ThrowException
+            )
+        trigger_time = time.time()
+        if triggered:
+            self.camera.ExecuteSoftwareTrigger()
+
+        with self.camera.RetrieveResult(
+            timeout_ms, pylon.TimeoutHandling_ThrowException
+        ) as result_obj:
+            received_time = time.time()
+            if not result_obj.GrabSucceeded():
+                raise RuntimeError(
+                    f"Image acquisition failed: {result_obj.ErrorDescription}"
+                )
+            self.save_grab_result(
+                pylon.PylonImage(), result_obj, filename, image_format, quality
+            )
+            return {
+                "file": filename,
+                "trigger_host_time": trigger_time if triggered else None,
+                "received_host_time": received_time,
+                "camera_timestamp": result_obj.TimeStamp,
+            }
+
+    @_with_camera_lock
+    def disarm_frame_trigger(self) -> None:
+        """Stop grabbing and return the camera to free-running acquisition."""
+        if not self.camera:
+            return
+        if self.camera.IsGrabbing():
+            self.camera.StopGrabbing()
+        if self._frame_trigger_armed:
+            self._frame_trigger_armed = False
+            try:
+                self.camera.TriggerMode.Value = "Off"
+            except Exception as e:
+                logger.warning("Failed to disable trigger mode: %s", e)
+
+    @_with_camera_lock
     def grab(self, count: int = 100) -> List[Dict[str, Any]]:
         """
         Demonstrate feature access by grabbing multiple images and analyzing them.
@@ -230,6 +1252,7 @@ class RGB_Camera_Controller:
 
         Returns:
             List[Dict[str, Any]]: List of dictionaries containing image information
+            and per-frame statistics
 
         Raises:
             RuntimeError: If the camera is not connected
@@ -239,11 +1262,13 @@ class RGB_Camera_Controller:
             raise RuntimeError("Camera not connected. Call Connect() first.")
 
         results = []
+        analyzer = Frame_Analyzer()
         try:
             # Demonstrate feature access
             new_width = self.camera.Width.GetValue() - self.camera.Width.GetInc()
             if new_width >= self.camera.Width.GetMin():
                 self.camera.Width.SetValue(new_width)
+                self.refresh_snapshot()
 
             self.camera.StartGrabbingMax(count)
 
@@ -257,22 +1282,27 @@ class RGB_Camera_Controller:
                     img_info = {
                         "width": grabResult.Width,
                         "height": grabResult.Height,
-                        "first_pixel_value": int(img[0, 0]),
+                        "first_pixel_value": img[0, 0].tolist(),
                     }
+                    analyzer.add(img)
                     results.append(img_info)
-                    logger.debug(f"Grabbed image: {img_info}")
+                    logger.debug("Grabbed image: %s", img_info)
 
                 grabResult.Release()
 
-            logger.info(f"Completed grabbing {len(results)} images")
+            for index, img_info in enumerate(results):
+                img_info["stats"] = analyzer.frame_stats(index)
+
+            logger.info("Completed grabbing %s images", len(results))
             return results
         except Exception as e:
-            logger.error(f"Error in grab method: {str(e)}")
+            logger.error("Error in grab method: %s", e)
             raise
         finally:
             if self.camera and self.camera.IsGrabbing():
                 self.camera.StopGrabbing()
 
+    @_with_camera_lock
     def release_camera(self) -> None:
         """
         Release camera resources.
@@ -280,13 +1310,16 @@ class RGB_Camera_Controller:
         This method should be called when done with the camera to properly release resources.
         """
         try:
+            # The grab thread notices the closed camera and exits on its own
+            self._continuous_stop.set()
+            self._stop_snapshot_refresher()
             if self.camera:
                 if self.camera.IsGrabbing():
                     self.camera.StopGrabbing()
                 self.camera.Close()
                 logger.info("Camera released successfully")
         except Exception as e:
-            logger.error(f"Error releasing camera: {str(e)}")
+            logger.error("Error releasing camera: %s", e)
             raise
 
 
@@ -0,0 +1,219 @@
+################################################
+## Project: ASS/NSS API
+## Author: David Michalica, Team 1
+## Date: 2024
+##
+## Documentation: https://docs.opencv.org/4.x/d4/da8/group__imgcodecs.html
+#################################################
+
+import itertools
+import logging
+import threading
+import time
+from typing import Dict, Iterator, Optional
+
+import cv2
+
+from BussinessLayer.RGB_Camera_Controller import RGB_Camera_Controller
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+MJPEG_BOUNDARY = "frame"
+
+
+class RGB_Preview_Streamer:
+    """
+    Shared live preview of an RGB camera as an MJPEG stream.
+
+    One background thread grabs frames from the shared camera controller,
+    downscales and JPEG-encodes each frame once, and publishes it to every
+    connected viewer. The grab loop waits until all viewers have taken the
+    current frame, so the frame rate follows the slowest viewer, but it never
+    waits longer than max_lag seconds, so a stuck viewer cannot stall the
+    others. A viewer that falls behind simply skips to the newest frame.
+
+    The loop only grabs when the camera lock is free, so a full-resolution
+    capture running on the same controller always takes precedence.
+
+    Attributes:
+        camera_controller (RGB_Camera_Controller): Shared camera controller
+        max_width (int): Maximum width of preview frames in pixels
+        jpeg_quality (int): JPEG quality of preview frames (0-100)
+        max_fps (float): Upper bound on the preview frame rate
+        max_lag (float): Longest time in seconds the loop waits for a slow viewer
+        idle_timeout (float): Seconds without viewers before the grab loop stops
+    """
+
+    def __init__(
+        self,
+        camera_controller: RGB_Camera_Controller,
+        max_width: int = 640,
+        jpeg_quality: int = 70,
+        max_fps: float = 10.0,
+        max_lag: float = 1.0,
+        idle_timeout: float = 5.0,
+    ):
+        """
+        Initialize the preview streamer.
+
+        Args:
+            camera_controller (RGB_Camera_Controller): Shared, connected camera controller
+            max_width (int, optional): Maximum width of preview frames. Defaults to 640.
+            jpeg_quality (int, optional): JPEG quality (0-100). Defaults to 70.
+            max_fps (float, optional): Upper bound on the frame rate. Defaults to 10.0.
+            max_lag (float, optional): Longest wait for a slow viewer in seconds. Defaults to 1.0.
+            idle_timeout (float, optional): Seconds without viewers before stopping. Defaults to 5.0.
+        """
+        self.camera_controller = camera_controller
+        self.max_width = max_width
+        self.jpeg_quality = jpeg_quality
+        self.max_fps = max_fps
+        self.max_lag = max_lag
+        self.idle_timeout = idle_timeout
+
+        self._condition = threading.Condition()
+        self._frame: Optional[bytes] = None
+        self._sequence = 0
+        self._viewers: Dict[int, int] = {}
+        self._viewer_ids = itertools.count(1)
+        self._thread: Optional[threading.Thread] = None
+        self._skipped_frames = 0
+
+    def stream(self) -> Iterator[bytes]:
+        """
+        Yield multipart/x-mixed-replace chunks for one viewer.
+
+        Returns:
+            Iterator[bytes]: MJPEG multipart chunks, one per preview frame
+        """
+        viewer_id = self._add_viewer()
+        last_sequence = 0
+        try:
+            while True:
+                with self._condition:
+                    self._condition.wait_for(
+                        lambda: self._sequence > last_sequence, timeout=self.max_lag
+                    )
+                    if self._sequence <= last_sequence:
+                        continue
+                    frame = self._frame
+                    last_sequence = self._sequence
+                    self._viewers[viewer_id] = last_sequence
+                    self._condition.notify_all()
+
+                yield (
+                    f"--{MJPEG_BOUNDARY}\r\n"
+                    f"Content-Type: image/jpeg\r\n"
+                    f"Content-Length: {len(frame)}\r\n\r\n"
+                ).encode("ascii") + frame + b"\r\n"
+        finally:
+            self._remove_viewer(viewer_id)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Return the current streamer state.
+
+        Returns:
+            Dict[str, int]: Number of viewers, frames published and grabs skipped
+        """
+        with self._condition:
+            return {
+                "viewers": len(self._viewers),
+                "frames": self._sequence,
+                "skipped_frames": self._skipped_frames,
+            }
+
+    def _add_viewer(self) -> int:
+        with self._condition:
+            viewer_id = next(self._viewer_ids)
+            self._viewers[viewer_id] = self._sequence
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="rgb-preview", daemon=True
+                )
+                self._thread.start()
+            self._condition.notify_all()
+        logger.info("Preview viewer %s connected", viewer_id)
+        return viewer_id
+
+    def _remove_viewer(self, viewer_id: int) -> None:
+        with self._condition:
+            self._viewers.pop(viewer_id, None)
+            self._condition.notify_all()
+        logger.info("Preview viewer %s disconnected", viewer_id)
+
+    def _all_viewers_served(self) -> bool:
+        return all(seen >= self._sequence for seen in self._viewers.values())
+
+    def _run(self) -> None:
+        """Grab, downscale and encode frames while at least one viewer is connected."""
+        frame_interval = 1.0 / self.max_fps if self.max_fps > 0 else 0.0
+        next_frame_at = time.monotonic()
+
+        while True:
+            with self._condition:
+                if not self._viewers:
+                    self._condition.wait_for(
+                        lambda: bool(self._viewers), timeout=self.idle_timeout
+                    )
+                    if not self._viewers:
+                        self._thread = None
+                        logger.info("Preview loop stopped, no viewers left")
+                        return
+                self._condition.wait_for(self._all_viewers_served, timeout=self.max_lag)
+
+            delay = next_frame_at - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            next_frame_at = max(next_frame_at + frame_interval, time.monotonic())
+
+            frame = self._grab_frame()
+            if frame is None:
+                continue
+
+            with self._condition:
+                self._frame = frame
+                self._sequence += 1
+                self._condition.notify_all()
+
+    def _grab_frame(self) -> Optional[bytes]:
+        """
+        Grab and encode one preview frame without waiting for a running capture.
+
+        Returns:
+            Optional[bytes]: JPEG encoded frame, or None if no frame was grabbed
+        """
+        controller = self.camera_controller
+        if not controller.lock.acquire(blocking=False):
+            # A full-resolution capture owns the camera, try again next period
+            self._skipped_frames += 1
+            return None
+        try:
+            if not controller.is_connected():
+                controller.Connect()
+            image = controller.acquire_preview_frame(max_width=self.max_width)
+        except Exception as e:
+            logger.error("Preview grab failed: %s", e)
+            image = None
+        finally:
+            controller.lock.release()
+
+        if image is None:
+            return None
+
+        if image.shape[1] > self.max_width:
+            height = max(1, image.shape[0] * self.max_width // image.shape[1])
+            image = cv2.resize(
+                image, (self.max_width, height), interpolation=cv2.INTER_AREA
+            )
+        if image.ndim == 3 and image.shape[2] == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+
+        ok, encoded = cv2.imencode(
+            ".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality]
+        )
+        if not ok:
+            logger.warning("Failed to encode preview frame")
+            return None
+        return encoded.tobytes()
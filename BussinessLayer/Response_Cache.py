@@ -0,0 +1,220 @@
+################################################
+## Project: ASS/NSS API
+## Author: David Michalica, Team 1
+## Date: 2024
+##
+## Documentation: https://developer.mozilla.org/en-US/docs/Web/HTTP/Conditional_requests
+#################################################
+
+import gzip
+import itertools
+import json
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+# Content encodings offered for cached bodies, in order of preference
+ENCODINGS = ("gzip", "deflate")
+
+# Versions are unique within the process, so a version is never reused for other content
+_versions = itertools.count(1)
+
+
+def next_version() -> int:
+    """
+    Return a new content version.
+
+    Returns:
+        int: Version never returned before in this process
+    """
+    return next(_versions)
+
+
+class Versioned_Cache:
+    """
+    Device reads cached for a while, with a version that changes with the content.
+
+    A read is fetched again once it is older than ttl seconds or was
+    invalidated. The version only changes when the fetched content differs
+    from the cached one, so ETags derived from it stay valid while the
+    device reports the same thing, and a fresh entry answers conditional
+    requests without calling the device.
+
+    Attributes:
+        ttl (float): Seconds a read is served from the cache, 0 to fetch every time
+    """
+
+    def __init__(self, ttl: float):
+        """
+        Initialize the cache.
+
+        Args:
+            ttl (float): Seconds a read is served from the cache
+        """
+        self.ttl = ttl
+        self._entries: Dict[Hashable, Tuple[Any, Any, int, float]] = {}
+        self._lock = threading.Lock()
+
+    def version(self, key: Hashable) -> Optional[int]:
+        """
+        Return the version of a fresh entry.
+
+        Args:
+            key (Hashable): Cache key
+
+        Returns:
+            Optional[int]: Version of the cached content, None if it must be fetched
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or time.monotonic() - entry[3] >= self.ttl:
+            return None
+        return entry[2]
+
+    def get(
+        self,
+        key: Hashable,
+        fetch: Callable[[], Any],
+        significant: Callable[[Any], Any] = lambda value: value,
+    ) -> Tuple[Any, int]:
+        """
+        Return a read from the cache or fetch it.
+
+        Args:
+            key (Hashable): Cache key
+            fetch (Callable[[], Any]): Reads the value from the device
+            significant (Callable[[Any], Any], optional): Part of the value that decides
+                whether it changed, e.g. without a timestamp. Defaults to the whole value.
+
+        Returns:
+            Tuple[Any, int]: The value and its version
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry[3] < self.ttl:
+            return entry[0], entry[2]
+
+        value = fetch()
+        compared = significant(value)
+        with self._lock:
+            previous = self._entries.get(key)
+            if previous is not None and previous[1] == compared:
+                version = previous[2]
+            else:
+                version = next_version()
+            self._entries[key] = (value, compared, version, time.monotonic())
+        return value, version
+
+    def invalidate(self, match: Callable[[Hashable], bool]) -> None:
+        """
+        Fetch the matching entries again on their next read.
+
+        Their versions are kept, so unchanged content keeps its ETag.
+
+        Args:
+            match (Callable[[Hashable], bool]): Selects the keys to invalidate
+        """
+        with self._lock:
+            for key, (value, compared, version, _) in list(self._entries.items()):
+                if match(key):
+                    self._entries[key] = (value, compared, version, float("-inf"))
+
+
+class Encoded_Body_Cache:
+    """
+    Least recently used cache of encoded JSON bodies by ETag, with a byte budget.
+
+    Each version of a resource is serialized once and compressed once per
+    content encoding; polls of unchanged content then cost a lookup.
+
+    Attributes:
+        max_bytes (int): Largest total size of the cached bodies
+        min_compress_size (int): Bodies smaller than this are sent uncompressed
+        compress_level (int): gzip/zlib compression level
+    """
+
+    def __init__(self, max_bytes: int, min_compress_size: int = 1024, compress_level: int = 6):
+        """
+        Initialize the cache.
+
+        Args:
+            max_bytes (int): Largest total size of the cached bodies
+            min_compress_size (int, optional): Smallest body that is compressed. Defaults to 1024.
+            compress_level (int, optional): Compression level (1-9). Defaults to 6.
+        """
+        self.max_bytes = max_bytes
+        self.min_compress_size = min_compress_size
+        self.compress_level = compress_level
+        self._entries: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    def body(self, etag: str, encoding: str, build: Callable[[], Any]) -> Tuple[bytes, str]:
+        """
+        Return the encoded body of a resource version.
+
+        Args:
+            etag (str): ETag of the version
+            encoding (str): Accepted encoding, 'gzip', 'deflate' or 'identity'
+            build (Callable[[], Any]): Builds the JSON payload if it is not cached
+
+        Returns:
+            Tuple[bytes, str]: The body and its content encoding; small bodies are
+            returned as 'identity' whatever was accepted
+        """
+        cached = self._get((etag, encoding))
+        if cached is not None:
+            return cached, encoding
+
+        identity = self._get((etag, "identity"))
+        if identity is None:
+            payload = json.dumps(build(), default=str, sort_keys=True, separators=(",", ":"))
+            identity = (payload + "\n").encode("utf-8")
+            self._put((etag, "identity"), identity)
+        if encoding == "identity" or len(identity) < self.min_compress_size:
+            return identity, "identity"
+
+        if encoding == "gzip":
+            encoded = gzip.compress(identity, self.compress_level, mtime=0)
+        else:
+            encoded = zlib.compress(identity, self.compress_level)
+        self._put((etag, encoding), encoded)
+        return encoded, encoding
+
+    def stats(self) -> Dict[str, int]:
+        """Return the number of entries, their size and the hit/miss counters."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+            }
+
+    def _get(self, key: Tuple[str, str]) -> Optional[bytes]:
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return data
+
+    def _put(self, key: Tuple[str, str], data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+            self._entries[key] = data
+            self._bytes += len(data)
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
@@ -0,0 +1,164 @@
+################################################
+## Project: ASS/NSS API
+## Author: David Michalica, Team 1
+## Date: 2024
+##
+## Documentation: https://docs.python.org/3/library/sys.html#sys._current_frames
+#################################################
+
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Python functions a thread sits in while it waits for work, by file and function name
+_IDLE_FUNCTIONS = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"),
+    ("socket.py", "accept"),
+    ("queue.py", "get"),
+    ("handlers.py", "dequeue"),
+    ("thread.py", "_worker"),
+    ("connection.py", "_recv"),
+    ("connection.py", "_poll"),
+    ("connection.py", "wait"),
+}
+
+Frame_Key = Tuple[str, int, str]
+
+
+class Sampling_Profiler:
+    """
+    Statistical profiler sampling the stacks of all threads of the process.
+
+    The calling thread reads sys._current_frames() every interval seconds
+    and counts the functions on each stack, so the API keeps serving its live
+    load at full speed while it is profiled; nothing is instrumented. Threads
+    waiting for work (idle pool workers, the log writer, the HTTP accept
+    loop) are left out unless include_idle is set. Only one profile runs at
+    a time.
+
+    Samples are wall-clock: a thread blocked in a native call (a grab
+    timeout, an image encoder, time.sleep) is counted in the Python function
+    that made the call, which is where a slow request spends its time.
+    """
+
+    def __init__(self):
+        """Initialize the profiler."""
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        """Whether a profile is being recorded."""
+        return self._lock.locked()
+
+    def profile(
+        self,
+        seconds: float,
+        interval: float = 0.005,
+        include_idle: bool = False,
+        limit: int = 50,
+    ) -> Dict[str, Any]:
+        """
+        Sample all threads for a while and return the report.
+
+        Args:
+            seconds (float): How long to sample
+            interval (float, optional): Seconds between samples. Defaults to 0.005.
+            include_idle (bool, optional): Count threads waiting for work. Defaults to False.
+            limit (int, optional): Number of functions in the report. Defaults to 50.
+
+        Returns:
+            Dict[str, Any]: Sample counts per thread, the functions with the most
+            samples (self: on top of the stack, total: anywhere on the stack) and
+            the collapsed stacks, ready for flamegraph tools
+
+        Raises:
+            RuntimeError: If another profile is running
+        """
+        if not self._lock.acquire(blocking=False):
+            raise RuntimeError("A profile is already running")
+        try:
+            return self._sample(seconds, interval, include_idle, limit)
+        finally:
+            self._lock.release()
+
+    def _sample(
+        self, seconds: float, interval: float, include_idle: bool, limit: int
+    ) -> Dict[str, Any]:
+        own_thread = threading.get_ident()
+        stacks: Counter = Counter()
+        self_counts: Counter = Counter()
+        total_counts: Counter = Counter()
+        thread_counts: Counter = Counter()
+        thread_names: Dict[int, str] = {}
+        rounds = 0
+
+        logger.info("Profiling for %s s every %s s", seconds, interval)
+        start = time.perf_counter()
+        deadline = start + seconds
+        while True:
+            for ident, frame in sys._current_frames().items():
+                if ident == own_thread:
+                    continue
+                if ident not in thread_names:
+                    thread_names.update((t.ident, t.name) for t in threading.enumerate())
+                    thread_names.setdefault(ident, str(ident))
+                stack: List[Frame_Key] = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+                    frame = frame.f_back
+                leaf = (os.path.basename(stack[0][0]), stack[0][2])
+                if not include_idle and leaf in _IDLE_FUNCTIONS:
+                    continue
+
+                thread = thread_names[ident]
+                thread_counts[thread] += 1
+                stacks[(thread, tuple(reversed(stack)))] += 1
+                self_counts[stack[0]] += 1
+                total_counts.update(set(stack))
+            rounds += 1
+            if time.perf_counter() >= deadline:
+                break
+            time.sleep(interval)
+        duration = time.perf_counter() - start
+
+        samples = sum(thread_counts.values())
+        return {
+            "duration": duration,
+            "interval": interval,
+            "rounds": rounds,
+            "samples": samples,
+            "threads": dict(thread_counts.most_common()),
+            "functions": [
+                {
+                    "function": _describe(key),
+                    "self": self_counts[key],
+                    "total": count,
+                    "self_percent": 100 * self_counts[key] / samples,
+                    "total_percent": 100 * count / samples,
+                }
+                for key, count in sorted(
+                    total_counts.items(),
+                    key=lambda item: (self_counts[item[0]], item[1]),
+                    reverse=True,
+                )[:limit]
+            ],
+            "collapsed": [
+                f"{thread};{';'.join(_describe(key) for key in stack)} {count}"
+                for (thread, stack), count in stacks.most_common()
+            ],
+        }
+
+
+def _describe(key: Frame_Key) -> str:
+    filename, line, name = key
+    return f"{name} ({os.path.basename(filename)}:{line})"
@@ -11,6 +11,8 @@ import datetime
 import json
 import socket
 
+from BussinessLayer.Tracing import span
+
 
 class SensorController:
     methods = {
@@ -62,7 +64,12 @@ class SensorController:
         self.client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
 
     def Connect(self):
-        self.client_socket.connect((self.IP_ADDR, self.PORT))
+        with span("zdaemon.connect", address=f"{self.IP_ADDR}:{self.PORT}"):
+            self.client_socket.connect((self.IP_ADDR, self.PORT))
+
+    def Close(self):
+        # Uzavření spojení se ZDaemonem
+        self.client_socket.close()
 
     def Call(self, method, id, params={}):
         # Vytvoření slovníku s hodnotami pro volání
@@ -74,11 +81,12 @@ class SensorController:
         # Převod řetězce JSON na bajty
         bytes_to_send = json_string.encode("utf-8")
 
-        # Odeslání bajtů přes socket
-        self.client_socket.send(bytes_to_send)
-        response = self.client_socket.recv(
-            4096
-        )  # Přečte až 4096 bajtů (můžete upravit podle potřeby)
+        # Odeslání bajtů přes socket (round trip měřen jako span "zdaemon.call")
+        with span("zdaemon.call", method=method):
+            self.client_socket.send(bytes_to_send)
+            response = self.client_socket.recv(
+                4096
+            )  # Přečte až 4096 bajtů (můžete upravit podle potřeby)
 
         # Převod bajtů na řetězec
         response_string = response.decode("utf-8")
@@ -0,0 +1,201 @@
+################################################
+## Project: ASS/NSS API
+## Author: David Michalica, Team 1
+## Date: 2024
+##
+## Documentation: https://numpy.org/doc/stable/reference/generated/numpy.lib.format.open_memmap.html
+#################################################
+
+import json
+import os
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+CUBE_METADATA_SUFFIX = ".cube.json"
+
+
+class Spectral_Cube_Writer:
+    """
+    Preallocated memory-mapped storage of a multispectral capture sequence.
+
+    All frames of a sequence go into one .npy file of shape
+    (frames, bands, height, width), allocated up front. The camera backend
+    fills frame_buffer() views in place, so every pixel is written once,
+    straight into the page cache, without per-band files or intermediate
+    copies. A metadata file records the wavelengths and timestamps.
+
+    Attributes:
+        path (str): Directory path of the sequence files
+        name (str): Name prefix of the sequence files
+        wavelengths (List[float]): Center wavelength of each band in nm
+    """
+
+    def __init__(
+        self,
+        path: str,
+        name: str,
+        count: int,
+        bands: int,
+        height: int,
+        width: int,
+        dtype: Any,
+        wavelengths: Sequence[float],
+    ):
+        """
+        Initialize the writer and allocate the cube file.
+
+        Args:
+            path (str): Directory path of the sequence files
+            name (str): Name prefix of the sequence files
+            count (int): Number of frames
+            bands (int): Number of spectral bands
+            height (int): Frame height in pixels
+            width (int): Frame width in pixels
+            dtype (Any): NumPy dtype of the pixels
+            wavelengths (Sequence[float]): Center wavelength of each band in nm
+
+        Raises:
+            ValueError: If the number of wavelengths does not match the bands
+        """
+        if len(wavelengths) != bands:
+            raise ValueError(f"Expected {bands} wavelengths, got {len(wavelengths)}")
+        self.path = path
+        self.name = name
+        self.wavelengths = list(wavelengths)
+        self._cube = np.lib.format.open_memmap(
+            self.cube_file, mode="w+", dtype=dtype, shape=(count, bands, height, width)
+        )
+        self._frames: List[Dict[str, Any]] = []
+
+    @property
+    def cube_file(self) -> str:
+        return f"{self.path}{self.name}.cube.npy"
+
+    @property
+    def metadata_file(self) -> str:
+        return f"{self.path}{self.name}{CUBE_METADATA_SUFFIX}"
+
+    def frame_buffer(self, index: int) -> np.ndarray:
+        """
+        Return the writable (bands, height, width) view of one frame slot.
+
+        Args:
+            index (int): Slot index, 0-based
+
+        Returns:
+            np.ndarray: View into the memory-mapped cube
+        """
+        return self._cube[index]
+
+    def commit(self, index: int, frame: int, timestamp: int) -> None:
+        """
+        Record that a slot holds a complete frame.
+
+        Args:
+            index (int): Slot index, 0-based
+            frame (int): Frame number
+            timestamp (int): Device timestamp of the frame
+        """
+        self._frames.append({"frame": frame, "index": index, "timestamp": timestamp})
+
+    def close(self) -> Dict[str, Any]:
+        """
+        Flush the cube and write the metadata file.
+
+        Returns:
+            Dict[str, Any]: The metadata including the paths of the cube and metadata file
+        """
+        self._cube.flush()
+        metadata = {
+            "version": 1,
+            "cube_file": os.path.basename(self.cube_file),
+            "layout": "frames,bands,height,width",
+            "shape": list(self._cube.shape),
+            "dtype": self._cube.dtype.str,
+            "wavelengths": self.wavelengths,
+            "frames": self._frames,
+        }
+        del self._cube
+
+        tmp_file = f"{self.metadata_file}.tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(metadata, f)
+        os.replace(tmp_file, self.metadata_file)
+
+        metadata["cube_file"] = self.cube_file
+        metadata["metadata_file"] = self.metadata_file
+        return metadata
+
+
+class Spectral_Cube_Reader:
+    """
+    Read access to a stored multispectral sequence.
+
+    The cube is memory-mapped read-only, so frames and bands are returned as
+    zero-copy NumPy views and only the pages actually touched are read.
+
+    Attributes:
+        metadata (Dict[str, Any]): Contents of the metadata file
+        wavelengths (List[float]): Center wavelength of each band in nm
+    """
+
+    def __init__(self, metadata_file: str):
+        """
+        Open a stored sequence.
+
+        Args:
+            metadata_file (str): Path of the .cube.json file
+
+        Raises:
+            ValueError: If the file is not the metadata of a cube
+        """
+        with open(metadata_file, "r", encoding="utf-8") as f:
+            self.metadata = json.load(f)
+        try:
+            self.wavelengths: List[float] = self.metadata["wavelengths"]
+            cube_file = self.metadata["cube_file"]
+            self._index = {entry["frame"]: entry["index"] for entry in self.metadata["frames"]}
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"Invalid cube metadata in {metadata_file}: missing {e}")
+        self._cube = np.load(os.path.join(os.path.dirname(metadata_file), cube_file), mmap_mode="r")
+
+    def frames(self) -> List[int]:
+        """Return the numbers of the stored frames."""
+        return sorted(self._index)
+
+    def read(self, frame: int) -> np.ndarray:
+        """
+        Return one frame as a (bands, height, width) view.
+
+        Args:
+            frame (int): Frame number
+
+        Returns:
+            np.ndarray: Read-only view into the memory-mapped cube
+
+        Raises:
+            KeyError: If the frame is not part of the sequence
+        """
+        return self._cube[self._index[frame]]
+
+    def band(self, frame: int, band: Optional[int] = None, wavelength: Optional[float] = None) -> np.ndarray:
+        """
+        Return one band of a frame as a (height, width) view.
+
+        Args:
+            frame (int): Frame number
+            band (Optional[int], optional): Band index
+            wavelength (Optional[float], optional): Select the band closest to this wavelength instead
+
+        Returns:
+            np.ndarray: Read-only view into the memory-mapped cube
+
+        Raises:
+            ValueError: If neither or both of band and wavelength are given
+        """
+        if (band is None) == (wavelength is None):
+            raise ValueError("Give either a band index or a wavelength")
+        if wavelength is not None:
+            band = int(np.argmin(np.abs(np.asarray(self.wavelengths) - wavelength)))
+        return self.read(frame)[band]
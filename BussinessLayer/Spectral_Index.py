@@ -0,0 +1,356 @@
+################################################
+## Project: ASS/NSS API
+## Author: David Michalica, Team 1
+## Date: 2024
+##
+## Documentation: https://numpy.org/doc/stable/reference/ufuncs.html#optional-keyword-arguments
+#################################################
+
+import ast
+import contextlib
+import json
+import logging
+import os
+import re
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple, Union
+
+import numpy as np
+
+from BussinessLayer.Spectral_Cube import CUBE_METADATA_SUFFIX, Spectral_Cube_Reader
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Named indices; wNNN selects the band closest to NNN nm
+INDEX_PRESETS = {
+    "ndvi": "(w800 - w670) / (w800 + w670)",
+    "gndvi": "(w800 - w550) / (w800 + w550)",
+    "ndwi": "(w560 - w860) / (w560 + w860)",
+}
+
+_BINARY_OPERATORS = {
+    ast.Add: np.add,
+    ast.Sub: np.subtract,
+    ast.Mult: np.multiply,
+    ast.Div: np.divide,
+    ast.Pow: np.power,
+}
+
+_UNARY_OPERATORS = {
+    ast.USub: np.negative,
+    ast.UAdd: np.positive,
+}
+
+_FUNCTIONS = {
+    "abs": np.absolute,
+    "sqrt": np.sqrt,
+    "log": np.log,
+    "exp": np.exp,
+}
+
+_BAND_NAME = re.compile(r"^(?:b(\d+)|w(\d+))$")
+
+_INDEX_NAME = re.compile(r"^[A-Za-z0-9_-]+$")
+
+# Operand of an instruction: ("band", index), ("const", value) or ("reg", number)
+_Operand = Tuple[str, Union[int, float]]
+
+
+class Band_Formula:
+    """
+    Band arithmetic formula compiled for tile-wise evaluation.
+
+    Formulas use + - * / **, unary minus, numbers, abs/sqrt/log/exp and
+    band references: bN is band index N, wNNN the band closest to NNN nm.
+    They are parsed with ast, never evaluated as Python.
+
+    The formula is compiled into a short list of NumPy ufunc calls that
+    write into a few scratch buffers reused for every tile, so evaluation
+    allocates nothing per tile. Band tiles are fed to the ufuncs as they
+    are; the conversion to float32 happens inside the ufunc loops. The last
+    call writes straight into the output array.
+
+    Attributes:
+        formula (str): Source formula
+        bands (List[int]): Band indices the formula reads
+        registers (int): Number of scratch buffers needed
+    """
+
+    def __init__(self, formula: str, wavelengths: Sequence[float]):
+        """
+        Compile a formula for a cube with the given bands.
+
+        Args:
+            formula (str): Formula, e.g. "(w800 - w670) / (w800 + w670)"
+            wavelengths (Sequence[float]): Center wavelength of each band in nm
+
+        Raises:
+            ValueError: If the formula is malformed, uses unsupported syntax or
+                references no or unknown bands
+        """
+        self.formula = formula
+        self._wavelengths = np.asarray(wavelengths, dtype=float)
+        self._program: List[Tuple[Callable, List[_Operand], int]] = []
+        self._free: List[int] = []
+        self._bands: Set[int] = set()
+        self.registers = 0
+
+        try:
+            tree = ast.parse(formula, mode="eval")
+        except SyntaxError as e:
+            raise ValueError(f"Invalid formula: {e.msg}")
+        self._result = self._compile(tree.body)
+        if not self._bands:
+            raise ValueError("Formula must reference at least one band")
+        self.bands = sorted(self._bands)
+
+    def scratch(self, shape: Tuple[int, ...]) -> List[np.ndarray]:
+        """Allocate the scratch buffers for tiles of the given shape."""
+        return [np.empty(shape, dtype=np.float32) for _ in range(self.registers)]
+
+    def evaluate(self, tile: np.ndarray, scratch: List[np.ndarray], out: np.ndarray) -> None:
+        """
+        Evaluate the formula on a tile.
+
+        Args:
+            tile (np.ndarray): (bands, rows, width) tile of a frame
+            scratch (List[np.ndarray]): Buffers from scratch() with the shape of out
+            out (np.ndarray): float32 (rows, width) output, e.g. a view of the index map
+        """
+        if not self._program:
+            # The formula is a single band
+            np.copyto(out, tile[self._result[1]], casting="unsafe")
+            return
+
+        def resolve(operand: _Operand) -> Any:
+            kind, value = operand
+            if kind == "band":
+                return tile[value]
+            if kind == "reg":
+                return scratch[value]
+            return value
+
+        last = len(self._program) - 1
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            for step, (ufunc, operands, register) in enumerate(self._program):
+                target = out if step == last else scratch[register]
+                ufunc(*[resolve(operand) for operand in operands], out=target, dtype=np.float32)
+
+    def _compile(self, node: ast.AST) -> _Operand:
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+            return ("const", float(node.value))
+        if isinstance(node, ast.Name):
+            return ("band", self._band(node.id))
+        if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPERATORS:
+            return self._emit(
+                _BINARY_OPERATORS[type(node.op)],
+                [self._compile(node.left), self._compile(node.right)],
+            )
+        if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPERATORS:
+            return self._emit(_UNARY_OPERATORS[type(node.op)], [self._compile(node.operand)])
+        if (
+            isinstance(node, ast.Call)
+            and isinstance(node.func, ast.Name)
+            and node.func.id in _FUNCTIONS
+            and len(node.args) == 1
+            and not node.keywords
+        ):
+            return self._emit(_FUNCTIONS[node.func.id], [self._compile(node.args[0])])
+        raise ValueError(f"Unsupported expression in formula: {ast.dump(node)}")
+
+    def _emit(self, ufunc: Callable, operands: List[_Operand]) -> _Operand:
+        if all(kind == "const" for kind, _ in operands):
+            # Fold constant subexpressions at compile time
+            return ("const", float(ufunc(*[value for _, value in operands])))
+        # Registers of the operands are dead after this instruction and can hold its result
+        for kind, value in operands:
+            if kind == "reg":
+                self._free.append(value)
+        if self._free:
+            register = self._free.pop()
+        else:
+            register = self.registers
+            self.registers += 1
+        self._program.append((ufunc, operands, register))
+        return ("reg", register)
+
+    def _band(self, name: str) -> int:
+        match = _BAND_NAME.match(name)
+        if not match:
+            raise ValueError(f"Unknown name in formula: {name}. Use bN or wNNN")
+        if match.group(1) is not None:
+            band = int(match.group(1))
+            if band >= len(self._wavelengths):
+                raise ValueError(f"Band {band} out of range 0..{len(self._wavelengths) - 1}")
+        else:
+            band = int(np.argmin(np.abs(self._wavelengths - float(match.group(2)))))
+        self._bands.add(band)
+        return band
+
+
+class Spectral_Index_Pipeline:
+    """
+    Tile-wise computation of spectral index maps over stored cubes.
+
+    Every frame is split into stripes of tile_rows rows. Worker threads
+    evaluate the compiled formula on a stripe of the memory-mapped cube and
+    write the result straight into a memory-mapped float32 index map of
+    shape (frames, height, width), flushed after each frame. NumPy releases
+    the GIL inside the ufunc loops, so stripes run in parallel. At most
+    2 * workers stripes are in flight and each thread keeps its own scratch
+    buffers, so memory use depends on tile_rows and the frame width, not on
+    the size of the cube.
+
+    Attributes:
+        workers (Optional[int]): Number of worker threads, None for one per CPU
+        tile_rows (int): Rows per tile
+    """
+
+    def __init__(self, workers: Optional[int] = None, tile_rows: int = 64):
+        """
+        Initialize the pipeline.
+
+        Args:
+            workers (Optional[int], optional): Number of worker threads. Defaults to one per CPU.
+            tile_rows (int, optional): Rows per tile. Defaults to 64.
+
+        Raises:
+            ValueError: If tile_rows is not positive
+        """
+        if tile_rows < 1:
+            raise ValueError("tile_rows must be a positive integer")
+        self.workers = workers or os.cpu_count() or 1
+        self.tile_rows = tile_rows
+
+    def compute(
+        self,
+        metadata_file: str,
+        formula: str,
+        name: Optional[str] = None,
+        frames: Optional[Sequence[int]] = None,
+        progress: Optional[Callable[[int, int], Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Compute an index map for frames of a stored cube.
+
+        Args:
+            metadata_file (str): Path of the .cube.json file
+            formula (str): Key of INDEX_PRESETS or a band formula
+            name (Optional[str], optional): Index name used in the output file names.
+                Defaults to the preset name or "index".
+            frames (Optional[Sequence[int]], optional): Frame numbers. Defaults to all frames.
+            progress (Optional[Callable[[int, int], Any]], optional): Called with the
+                number of finished and total tiles. Defaults to None.
+
+        Returns:
+            Dict[str, Any]: Output files, formula, bands used, frames and tile counts
+
+        Raises:
+            ValueError: If the file is not a cube metadata file, the formula or name is
+                invalid or a frame is not part of the cube
+        """
+        if not metadata_file.endswith(CUBE_METADATA_SUFFIX):
+            raise ValueError(f"The cube must be a {CUBE_METADATA_SUFFIX} metadata file")
+        preset = formula.lower() if formula.lower() in INDEX_PRESETS else None
+        name = name or preset or "index"
+        if not _INDEX_NAME.match(name):
+            raise ValueError("Index name may only contain letters, digits, '_' and '-'")
+        reader = Spectral_Cube_Reader(metadata_file)
+        band_formula = Band_Formula(INDEX_PRESETS.get(preset, formula), reader.wavelengths)
+
+        stored = reader.frames()
+        frames = list(frames) if frames is not None else stored
+        available = set(stored)
+        missing = [frame for frame in frames if frame not in available]
+        if missing:
+            raise ValueError(f"Frames not in the cube: {missing}")
+
+        _, height, width = reader.read(frames[0]).shape if frames else (0, 0, 0)
+        prefix = metadata_file[: -len(CUBE_METADATA_SUFFIX)]
+        output_file = f"{prefix}.{name}.npy"
+        # A fresh file is renamed over the previous map at the end; truncating a
+        # mapped file that still has cached pages is far slower than writing a new one
+        tmp_output = f"{output_file}.tmp"
+        index_map = np.lib.format.open_memmap(
+            tmp_output, mode="w+", dtype=np.float32, shape=(len(frames), height, width)
+        )
+
+        try:
+            tiles = [
+                (slot, frame, start)
+                for slot, frame in enumerate(frames)
+                for start in range(0, height, self.tile_rows)
+            ]
+            tiles_per_frame = -(-height // self.tile_rows)
+            local = threading.local()
+
+            def run(tile: Tuple[int, int, int]) -> int:
+                slot, frame, start = tile
+                stop = min(start + self.tile_rows, height)
+                out = index_map[slot, start:stop]
+                if not hasattr(local, "scratch"):
+                    local.scratch = band_formula.scratch((self.tile_rows, width))
+                scratch = [buffer[: stop - start] for buffer in local.scratch]
+                band_formula.evaluate(reader.read(frame)[:, start:stop], scratch, out)
+                return slot
+
+            finished = 0
+            finished_per_frame = [0] * len(frames)
+            pending: Set[Future] = set()
+            remaining = iter(tiles)
+            with ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="spectral-index"
+            ) as executor:
+                while True:
+                    for tile in remaining:
+                        pending.add(executor.submit(run, tile))
+                        if len(pending) >= 2 * self.workers:
+                            break
+                    if not pending:
+                        break
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        slot = future.result()
+                        finished += 1
+                        finished_per_frame[slot] += 1
+                        if finished_per_frame[slot] == tiles_per_frame:
+                            index_map.flush()
+                        if progress:
+                            progress(finished, len(tiles))
+
+            index_map.flush()
+            os.replace(tmp_output, output_file)
+        except BaseException:
+            # Never leave a partial map behind
+            with contextlib.suppress(OSError):
+                os.remove(tmp_output)
+            raise
+
+        result = {
+            "index_file": output_file,
+            "name": name,
+            "formula": band_formula.formula,
+            "bands": band_formula.bands,
+            "wavelengths": [reader.wavelengths[band] for band in band_formula.bands],
+            "frames": frames,
+            "shape": [len(frames), height, width],
+            "tiles": len(tiles),
+            "cube_metadata_file": metadata_file,
+        }
+        metadata_output = f"{prefix}.{name}.json"
+        tmp_file = f"{metadata_output}.tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump({**result, "index_file": os.path.basename(output_file)}, f)
+        os.replace(tmp_file, metadata_output)
+        result["metadata_file"] = metadata_output
+
+        logger.info(
+            "Computed %s for %s frames of %s in %s tiles",
+            name,
+            len(frames),
+            metadata_file,
+            len(tiles),
+        )
+        return result
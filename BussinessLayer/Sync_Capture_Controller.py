@@ -0,0 +1,290 @@
+################################################
+## Project: ASS/NSS API
+## Author: David Michalica, Team 1
+## Date: 2024
+##
+## Documentation: https://bitbucket.org/dakel/node-zedo-rpc/src/master/API.md
+#################################################
+
+import json
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Literal, Optional
+
+from BussinessLayer.RGB_Camera_Controller import RGB_Camera_Controller
+from BussinessLayer.SensorController import SensorController
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Field of the GetSystemTime result holding the hardware time in nanoseconds
+SENSOR_TIME_FIELD = "time_ns"
+
+
+def parse_sensor_time_ns(response: str, field: str = SENSOR_TIME_FIELD) -> Optional[int]:
+    """
+    Extract the hardware nanosecond time from a GetSystemTime response.
+
+    Args:
+        response (str): Raw JSON-RPC response string
+        field (str, optional): Name of the nanosecond field in the result.
+            Defaults to SENSOR_TIME_FIELD.
+
+    Returns:
+        Optional[int]: Sensor time in nanoseconds, or None if it cannot be found
+    """
+    try:
+        result = json.loads(response).get("result")
+    except (ValueError, AttributeError):
+        return None
+    if not isinstance(result, dict):
+        return None
+    value = result.get(field)
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return int(value)
+
+
+class Sync_Capture_Controller:
+    """
+    Synchronized RGB camera and acoustic (ZDaemon) acquisition.
+
+    Both devices are armed concurrently: the camera is switched to a software
+    frame trigger with the grab engine running, and the ZDaemon connection is
+    opened and its clock offset to the host is measured with GetSystemTime.
+    A barrier then releases the camera trigger and StartRecording at the same
+    moment. Every frame gets a host timestamp and the matching sensor time,
+    and the skew between the first frame and the recording start is returned.
+    If the camera fails after the recording has started, the recording is
+    stopped again.
+
+    Attributes:
+        camera_controller (RGB_Camera_Controller): Shared, connected camera controller
+        sensor_controller (SensorController): Connected ZDaemon controller
+        clock_samples (int): Number of GetSystemTime round trips per clock measurement
+        time_field (str): Field of the GetSystemTime result with the nanosecond time
+    """
+
+    def __init__(
+        self,
+        camera_controller: RGB_Camera_Controller,
+        sensor_controller: SensorController,
+        clock_samples: int = 5,
+        time_field: str = SENSOR_TIME_FIELD,
+    ):
+        """
+        Initialize the synchronized capture controller.
+
+        Args:
+            camera_controller (RGB_Camera_Controller): Shared, connected camera controller
+            sensor_controller (SensorController): Connected ZDaemon controller
+            clock_samples (int, optional): GetSystemTime round trips per clock measurement. Defaults to 5.
+            time_field (str, optional): Field of the GetSystemTime result with the nanosecond
+                time. Defaults to SENSOR_TIME_FIELD.
+        """
+        self.camera_controller = camera_controller
+        self.sensor_controller = sensor_controller
+        self.clock_samples = clock_samples
+        self.time_field = time_field
+
+    def measure_sensor_clock(self, request_id: str) -> Dict[str, Any]:
+        """
+        Measure the offset of the ZDaemon clock against the host clock.
+
+        The sample with the shortest round trip is used, and the sensor time
+        is assumed to have been taken halfway through that round trip.
+
+        Args:
+            request_id (str): JSON-RPC request id
+
+        Returns:
+            Dict[str, Any]: Offset in seconds (sensor minus host, None if the sensor
+            time cannot be parsed), round trip time and the raw response
+        """
+        best: Optional[Dict[str, Any]] = None
+        for _ in range(max(1, self.clock_samples)):
+            sent_at = time.time()
+            response = self.sensor_controller.GetSystemTime(request_id)
+            received_at = time.time()
+
+            rtt = received_at - sent_at
+            if best is None or rtt < best["rtt"]:
+                sensor_ns = parse_sensor_time_ns(response, self.time_field)
+                best = {
+                    "offset": (
+                        sensor_ns / 1e9 - (sent_at + received_at) / 2
+                        if sensor_ns is not None
+                        else None
+                    ),
+                    "rtt": rtt,
+                    "host_time": (sent_at + received_at) / 2,
+                    "response": response,
+                }
+        return best
+
+    def capture(
+        self,
+        path: str,
+        name: str,
+        count: int = 1,
+        period: float = 0.0,
+        quality: int = 100,
+        image_format: Literal["tiff", "png", "raw"] = "png",
+        measurement_name: str = "001",
+    ) -> Dict[str, Any]:
+        """
+        Start the acoustic recording and capture camera frames in sync.
+
+        Args:
+            path (str): Directory path where to save the images
+            name (str): Name of the image files (without extension)
+            count (int, optional): Number of frames to capture. Defaults to 1.
+            period (float, optional): Seconds between frames, 0 for back to back. Defaults to 0.0.
+            quality (int, optional): Image quality (0-100). Defaults to 100.
+            image_format (Literal["tiff", "png", "raw"], optional): Format of the saved images. Defaults to "png".
+            measurement_name (str, optional): Request id passed to the ZDaemon calls. Defaults to "001".
+
+        Returns:
+            Dict[str, Any]: Frames with host and sensor timestamps, recording start
+            information, clock measurements and the measured skew
+
+        Raises:
+            ValueError: If an unsupported image format is specified
+            RuntimeError: If arming or firing either device fails
+        """
+        if image_format not in self.camera_controller.save_functions:
+            raise ValueError(
+                f"Unsupported image format: {image_format}. Supported formats: {list(self.camera_controller.save_functions.keys())}"
+            )
+
+        camera = self.camera_controller
+        barrier = threading.Barrier(2, timeout=10)
+        recording: Dict[str, Any] = {}
+
+        def arm_and_start_recording():
+            try:
+                recording["clock_before"] = self.measure_sensor_clock(measurement_name)
+                barrier.wait()
+                recording["sent_at"] = time.time()
+                recording["response"] = self.sensor_controller.StartRecording(
+                    measurement_name
+                )
+                recording["acknowledged_at"] = time.time()
+            except Exception as e:
+                recording["error"] = str(e)
+                barrier.abort()
+
+        frames: List[Dict[str, Any]] = []
+        released = False
+        completed = False
+        with camera.lock:
+            sensor_thread = threading.Thread(
+                target=arm_and_start_recording, name="sync-acoustic-arm"
+            )
+            sensor_thread.start()
+            try:
+                triggered = camera.arm_frame_trigger()
+                barrier.wait()
+                released = True
+
+                fired_at = time.time()
+                for i in range(count):
+                    if period > 0:
+                        delay = fired_at + i * period - time.time()
+                        if delay > 0:
+                            time.sleep(delay)
+                    filename = (
+                        f"{path}{name}_{i + 1}.{image_format}"
+                        if count > 1
+                        else f"{path}{name}.{image_format}"
+                    )
+                    frames.append(
+                        camera.fire_frame_trigger(
+                            filename, quality=quality, image_format=image_format
+                        )
+                    )
+                completed = True
+            except threading.BrokenBarrierError:
+                raise RuntimeError(
+                    f"Failed to arm acoustic recording: {recording.get('error', 'timeout')}"
+                )
+            finally:
+                # Aborting a barrier that was passed could still fail the sensor thread
+                if not released:
+                    barrier.abort()
+                sensor_thread.join()
+                camera.disarm_frame_trigger()
+                if not completed and "response" in recording:
+                    self._stop_recording(measurement_name)
+
+        if "error" in recording:
+            raise RuntimeError(f"Failed to start acoustic recording: {recording['error']}")
+
+        clock_after = self.measure_sensor_clock(measurement_name)
+        return self._build_result(frames, triggered, recording, clock_after)
+
+    def _stop_recording(self, measurement_name: str) -> None:
+        """Stop a recording started for a capture that failed."""
+        logger.warning("Camera capture failed, stopping the acoustic recording")
+        try:
+            self.sensor_controller.StopRecording(measurement_name)
+        except Exception as e:
+            logger.error("Failed to stop the acoustic recording: %s", e)
+
+    @staticmethod
+    def _build_result(
+        frames: List[Dict[str, Any]],
+        triggered: bool,
+        recording: Dict[str, Any],
+        clock_after: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        clock_before = recording["clock_before"]
+        offsets = [
+            c["offset"] for c in (clock_before, clock_after) if c["offset"] is not None
+        ]
+        offset = sum(offsets) / len(offsets) if offsets else None
+
+        for frame in frames:
+            frame["host_timestamp"] = (
+                frame["trigger_host_time"]
+                if frame["trigger_host_time"] is not None
+                else frame["received_host_time"]
+            )
+            frame["sensor_timestamp"] = (
+                frame["host_timestamp"] + offset if offset is not None else None
+            )
+
+        # The recording starts somewhere within the StartRecording round trip
+        start_rtt = recording["acknowledged_at"] - recording["sent_at"]
+        recording_start = recording["sent_at"] + start_rtt / 2
+        skew = frames[0]["host_timestamp"] - recording_start if frames else None
+
+        return {
+            "success": bool(frames),
+            "count": len(frames),
+            "frames": frames,
+            "software_trigger": triggered,
+            "recording": {
+                "response": recording["response"],
+                "host_start_time": recording_start,
+                "sensor_start_time": (
+                    recording_start + offset if offset is not None else None
+                ),
+                "round_trip": start_rtt,
+            },
+            "clock": {
+                "offset": offset,
+                "drift": (
+                    clock_after["offset"] - clock_before["offset"]
+                    if len(offsets) == 2
+                    else None
+                ),
+                "round_trip_before": clock_before["rtt"],
+                "round_trip_after": clock_after["rtt"],
+                "sensor_time_before": clock_before["response"],
+                "sensor_time_after": clock_after["response"],
+            },
+            "skew": skew,
+            "skew_uncertainty": start_rtt / 2,
+        }
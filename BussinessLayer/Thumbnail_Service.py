@@ -0,0 +1,298 @@
+################################################
+## Project: ASS/NSS API
+## Author: David Michalica, Team 1
+## Date: 2024
+##
+## Documentation: https://docs.opencv.org/4.x/da/d54/group__imgproc__transform.html
+#################################################
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from BussinessLayer.Image_Files import is_image_file
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_DIRECTORY = ".thumbnails"
+
+
+def thumbnail_path(image_file: str, size: int) -> str:
+    """
+    Return where the thumbnail of an image is stored.
+
+    Thumbnails live in a .thumbnails directory next to the original, e.g.
+    run1/frame_1.png -> run1/.thumbnails/frame_1.png.160.jpg.
+
+    Args:
+        image_file (str): Path of the original image
+        size (int): Longest side of the thumbnail in pixels
+
+    Returns:
+        str: Path of the JPEG thumbnail
+    """
+    directory, basename = os.path.split(image_file)
+    return os.path.join(directory, THUMBNAIL_DIRECTORY, f"{basename}.{size}.jpg")
+
+
+def make_thumbnails(image_file: str, sizes: Iterable[int], quality: int = 80) -> List[str]:
+    """
+    Write a pyramid of JPEG thumbnails of an image.
+
+    Levels are reduced from the next larger level instead of the original,
+    so each level only touches the pixels of the one before.
+
+    Args:
+        image_file (str): Path of the original image
+        sizes (Iterable[int]): Longest sides of the thumbnails in pixels
+        quality (int, optional): JPEG quality (0-100). Defaults to 80.
+
+    Returns:
+        List[str]: Paths of the written thumbnails, largest first
+
+    Raises:
+        ValueError: If the image cannot be read
+    """
+    image = cv2.imread(image_file, cv2.IMREAD_UNCHANGED)
+    if image is None:
+        raise ValueError(f"Cannot read image {image_file}")
+    if image.dtype != np.uint8:
+        image = (image >> (8 * image.dtype.itemsize - 8)).astype(np.uint8)
+    if image.ndim == 3 and image.shape[2] == 4:
+        image = cv2.cvtColor(image, cv2.COLOR_BGRA2BGR)
+
+    os.makedirs(os.path.join(os.path.dirname(image_file), THUMBNAIL_DIRECTORY), exist_ok=True)
+    written = []
+    for size in sorted(set(sizes), reverse=True):
+        scale = size / max(image.shape[:2])
+        if scale < 1:
+            width = max(1, round(image.shape[1] * scale))
+            height = max(1, round(image.shape[0] * scale))
+            image = cv2.resize(image, (width, height), interpolation=cv2.INTER_AREA)
+
+        ok, encoded = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        if not ok:
+            raise RuntimeError(f"Failed to encode thumbnail of {image_file}")
+        output_file = thumbnail_path(image_file, size)
+        tmp_file = f"{output_file}.tmp"
+        with open(tmp_file, "wb") as f:
+            f.write(encoded.tobytes())
+        os.replace(tmp_file, output_file)
+        written.append(output_file)
+    return written
+
+
+class Thumbnail_Cache:
+    """
+    Least recently used cache of encoded thumbnails with a byte budget.
+
+    Attributes:
+        max_bytes (int): Largest total size of the cached thumbnails
+    """
+
+    def __init__(self, max_bytes: int):
+        """
+        Initialize the cache.
+
+        Args:
+            max_bytes (int): Largest total size of the cached thumbnails
+        """
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[Any, ...], bytes]" = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[Any, ...]) -> Optional[bytes]:
+        """Return a cached thumbnail and mark it as recently used."""
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return data
+
+    def put(self, key: Tuple[Any, ...], data: bytes) -> None:
+        """Cache a thumbnail, evicting the least recently used ones beyond the budget."""
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+            self._entries[key] = data
+            self._bytes += len(data)
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def stats(self) -> Dict[str, int]:
+        """Return the number of entries, their size and the hit/miss counters."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+            }
+
+
+class Thumbnail_Service:
+    """
+    Thumbnail pyramids of captured images.
+
+    Thumbnails are generated in a thread pool as soon as an image is
+    submitted, written next to the original and served from a Thumbnail_Cache.
+    OpenCV releases the GIL while decoding, resizing and encoding, so
+    threads run in parallel without the pickling of a process pool, and the
+    workers can fill the cache directly. Images nobody submitted (e.g. older
+    captures) get their thumbnails on first request.
+
+    Attributes:
+        sizes (Tuple[int, ...]): Longest sides of the pyramid levels, smallest first
+        quality (int): JPEG quality of the thumbnails
+        cache (Thumbnail_Cache): In-memory cache of encoded thumbnails
+    """
+
+    def __init__(
+        self,
+        sizes: Iterable[int] = (160, 640),
+        workers: Optional[int] = None,
+        cache_bytes: int = 64 * 1024 * 1024,
+        quality: int = 80,
+    ):
+        """
+        Initialize the service.
+
+        Args:
+            sizes (Iterable[int], optional): Longest sides of the pyramid levels. Defaults to (160, 640).
+            workers (Optional[int], optional): Number of worker threads. Defaults to the
+                ThreadPoolExecutor default.
+            cache_bytes (int, optional): Byte budget of the cache. Defaults to 64 MiB.
+            quality (int, optional): JPEG quality (0-100). Defaults to 80.
+
+        Raises:
+            ValueError: If no or a non-positive size is given
+        """
+        self.sizes = tuple(sorted(set(sizes)))
+        if not self.sizes or self.sizes[0] < 1:
+            raise ValueError("Thumbnail sizes must be positive integers")
+        self.quality = quality
+        self.cache = Thumbnail_Cache(cache_bytes)
+        self.workers = workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, image_file: str) -> Optional[Future]:
+        """
+        Queue thumbnail generation for a newly written image.
+
+        Args:
+            image_file (str): Path of the original image
+
+        Returns:
+            Optional[Future]: Resolves to the thumbnail paths, None for non-image files
+        """
+        if not is_image_file(image_file):
+            return None
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="thumbnail"
+                )
+            future = self._pending.get(image_file)
+            if future is not None:
+                return future
+            future = self._executor.submit(self._generate, image_file)
+            self._pending[image_file] = future
+        # Outside the lock, the callback runs right away if the thumbnails are already done
+        future.add_done_callback(lambda done: self._finished(image_file, done))
+        return future
+
+    def get(self, image_file: str, size: Optional[int] = None) -> bytes:
+        """
+        Return a JPEG thumbnail of an image.
+
+        Served from the cache, else from the stored thumbnail if it is newer
+        than the original, else generated now.
+
+        Args:
+            image_file (str): Path of the original image
+            size (Optional[int], optional): Pyramid level. Defaults to the smallest.
+
+        Returns:
+            bytes: The JPEG thumbnail
+
+        Raises:
+            ValueError: If the size is not a pyramid level or the file is not an image
+            FileNotFoundError: If the original does not exist
+        """
+        size = self.sizes[0] if size is None else size
+        if size not in self.sizes:
+            raise ValueError(f"Unsupported thumbnail size: {size}. Supported sizes: {list(self.sizes)}")
+        if not is_image_file(image_file):
+            raise ValueError(f"{os.path.basename(image_file)} is not an image")
+
+        key = self._key(image_file, size)
+        data = self.cache.get(key)
+        if data is not None:
+            return data
+
+        with self._lock:
+            future = self._pending.get(image_file)
+        if future is not None:
+            future.result()
+
+        stored = thumbnail_path(image_file, size)
+        if not self._is_current(stored, key[2]):
+            self._generate(image_file)
+        with open(stored, "rb") as f:
+            data = f.read()
+        self.cache.put(key, data)
+        return data
+
+    def shutdown(self) -> None:
+        """Wait for queued images and stop the worker threads."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def _generate(self, image_file: str) -> List[str]:
+        key_time = os.stat(image_file).st_mtime_ns
+        written = make_thumbnails(image_file, self.sizes, self.quality)
+        # The smallest level is what galleries request, keep it hot
+        with open(thumbnail_path(image_file, self.sizes[0]), "rb") as f:
+            self.cache.put((image_file, self.sizes[0], key_time), f.read())
+        return written
+
+    def _finished(self, image_file: str, future: Future) -> None:
+        with self._lock:
+            if self._pending.get(image_file) is future:
+                del self._pending[image_file]
+        if not future.cancelled() and future.exception() is not None:
+            logger.error("Thumbnail generation failed for %s: %s", image_file, future.exception())
+
+    @staticmethod
+    def _key(image_file: str, size: int) -> Tuple[str, int, int]:
+        # The modification time makes overwritten originals miss the cache
+        return (image_file, size, os.stat(image_file).st_mtime_ns)
+
+    @staticmethod
+    def _is_current(stored: str, original_mtime_ns: int) -> bool:
+        try:
+            return os.stat(stored).st_mtime_ns >= original_mtime_ns
+        except FileNotFoundError:
+            return False
@@ -0,0 +1,222 @@
+################################################
+## Project: ASS/NSS API
+## Author: David Michalica, Team 1
+## Date: 2024
+##
+## Documentation: https://www.w3.org/TR/server-timing/
+#################################################
+
+import contextlib
+import re
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar, Token
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from data.Trace import Request_Trace, Trace_Span
+
+# Upper bound of spans kept per trace; long captures record a few spans per frame
+MAX_SPANS = 2000
+
+_current_trace: ContextVar[Optional[Request_Trace]] = ContextVar("current_trace", default=None)
+_current_span: ContextVar[Optional[int]] = ContextVar("current_span", default=None)
+_NO_SPAN = contextlib.nullcontext()
+# Characters not allowed in a Server-Timing metric name
+_METRIC_NAME = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+class _Span:
+    """Context manager recording one span in the current trace."""
+
+    __slots__ = ("trace", "name", "attributes", "index", "token", "start")
+
+    def __init__(self, trace: Request_Trace, name: str, attributes: Dict[str, Any]):
+        self.trace = trace
+        self.name = name
+        self.attributes = attributes
+        self.index: Optional[int] = None
+
+    def __enter__(self) -> "_Span":
+        trace = self.trace
+        self.start = time.perf_counter()
+        if len(trace.spans) >= MAX_SPANS:
+            trace.dropped_spans += 1
+            return self
+        trace.spans.append(
+            Trace_Span(
+                self.name,
+                (self.start - trace.start_counter) * 1000,
+                parent=_current_span.get(),
+                attributes=self.attributes,
+            )
+        )
+        self.index = len(trace.spans) - 1
+        self.token = _current_span.set(self.index)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if self.index is not None:
+            record = self.trace.spans[self.index]
+            record.duration = (time.perf_counter() - self.start) * 1000
+            if exc is not None:
+                record.error = f"{exc_type.__name__}: {exc}"
+            _current_span.reset(self.token)
+        return False
+
+
+def span(name: str, **attributes: Any) -> contextlib.AbstractContextManager:
+    """
+    Time a phase of the current trace.
+
+    Outside of a trace this returns a shared no-op context manager, so
+    instrumented code costs a context variable lookup when nobody traces.
+
+    Args:
+        name (str): Phase name, e.g. 'rgb.start_grabbing'
+        **attributes: Details stored with the span, e.g. frame=3
+
+    Returns:
+        contextlib.AbstractContextManager: Context manager timing the enclosed block
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        return _NO_SPAN
+    return _Span(trace, name, attributes)
+
+
+def server_timing(trace: Request_Trace) -> str:
+    """
+    Render a trace as a Server-Timing header value.
+
+    Spans are aggregated by name, so a capture of 100 frames yields one
+    'rgb.retrieve_result' entry with the summed duration and the count.
+
+    Args:
+        trace (Request_Trace): Finished or running trace
+
+    Returns:
+        str: Header value, e.g. 'rgb.open;dur=41.20;desc="x1", total;dur=52.03'
+    """
+    entries = [
+        f'{_METRIC_NAME.sub("_", name)};dur={total["duration"]:.2f};desc="x{total["count"]}"'
+        for name, total in trace.summary().items()
+    ]
+    duration = trace.duration
+    if duration is None:
+        duration = (time.perf_counter() - trace.start_counter) * 1000
+    entries.append(f"total;dur={duration:.2f}")
+    return ", ".join(entries)
+
+
+class Tracer:
+    """
+    Starts traces and keeps the most recent ones.
+
+    A trace is bound to the current context (the request thread or a
+    capture job), so span() calls deep inside controllers attach to it
+    without passing it around. Work handed to other threads is not traced.
+    Finished traces go into a ring buffer of history entries.
+
+    Attributes:
+        history (int): Number of finished traces kept, 0 to keep none
+    """
+
+    def __init__(self, history: int = 200):
+        """
+        Initialize the tracer.
+
+        Args:
+            history (int, optional): Number of finished traces kept. Defaults to 200.
+        """
+        self.history = history
+        self._traces: "deque[Request_Trace]" = deque(maxlen=max(history, 1))
+        self._lock = threading.Lock()
+
+    def start(self, name: str) -> Tuple[Request_Trace, Tuple[Token, Token]]:
+        """
+        Start a trace in the current context.
+
+        Args:
+            name (str): What is traced, e.g. 'POST /sensor/rgb/start'
+
+        Returns:
+            Tuple[Request_Trace, Tuple[Token, Token]]: The trace and the tokens
+            to pass to finish()
+        """
+        trace = Request_Trace(name)
+        return trace, (_current_trace.set(trace), _current_span.set(None))
+
+    def finish(
+        self, trace: Request_Trace, tokens: Tuple[Token, Token], status: Optional[int] = None
+    ) -> None:
+        """
+        Finish a trace, detach it from the context and keep it in the history.
+
+        Args:
+            trace (Request_Trace): Trace returned by start()
+            tokens (Tuple[Token, Token]): Tokens returned by start()
+            status (Optional[int], optional): HTTP status of the response. Defaults to None.
+        """
+        if trace.duration is None:
+            trace.duration = (time.perf_counter() - trace.start_counter) * 1000
+            trace.status = status
+            if self.history:
+                with self._lock:
+                    self._traces.append(trace)
+        # Tokens of another context (e.g. a different thread) cannot be reset
+        trace_token, span_token = tokens
+        with contextlib.suppress(ValueError):
+            _current_span.reset(span_token)
+        with contextlib.suppress(ValueError):
+            _current_trace.reset(trace_token)
+
+    @contextlib.contextmanager
+    def trace(self, name: str) -> Iterator[Request_Trace]:
+        """
+        Trace the enclosed block, e.g. a capture job.
+
+        Args:
+            name (str): What is traced
+
+        Yields:
+            Request_Trace: The running trace
+        """
+        trace, tokens = self.start(name)
+        try:
+            yield trace
+        finally:
+            self.finish(trace, tokens)
+
+    def recent(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Return the most recent traces without their individual spans.
+
+        Args:
+            limit (Optional[int], optional): Maximum number of traces. Defaults to all.
+
+        Returns:
+            List[Dict[str, Any]]: Trace summaries, newest first
+        """
+        with self._lock:
+            traces = list(self._traces)[::-1] if self.history else []
+        return [trace.to_dict(include_spans=False) for trace in traces[:limit]]
+
+    def get(self, trace_id: str) -> Dict[str, Any]:
+        """
+        Return one trace including its spans.
+
+        Args:
+            trace_id (str): Trace identifier
+
+        Returns:
+            Dict[str, Any]: The trace
+
+        Raises:
+            KeyError: If the trace is unknown or no longer kept
+        """
+        with self._lock:
+            for trace in self._traces:
+                if trace.trace_id == trace_id:
+                    return trace.to_dict()
+        raise KeyError(trace_id)
@@ -0,0 +1,195 @@
+"""
+Tests for batched device operations.
+"""
+
+import os
+import sys
+import threading
+import unittest
+from unittest import mock
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import app as app_module
+from BussinessLayer.Batch_Runner import Batch_Runner
+from data.Batch import Batch_Step
+from data.RGB_camera import RGB_Camera_Snapshot
+
+
+class BatchRunnerTestCase(unittest.TestCase):
+    """Test case for Batch_Runner."""
+
+    def test_independent_steps_overlap(self):
+        """Steps on different devices run together, steps on one device in order."""
+        both_running = threading.Barrier(2, timeout=5)
+        order = []
+
+        def meet(label):
+            def work(session, should_stop):
+                both_running.wait()
+                order.append(label)
+                return label
+
+            return work
+
+        steps = [
+            Batch_Step("a", "test", meet("a"), device="acoustic:1"),
+            Batch_Step("b", "test", meet("b"), device="rgb:1", after=[]),
+            Batch_Step("c", "test", lambda s, stop: order.append("c"), device="acoustic:1"),
+        ]
+        data = Batch_Runner(max_parallel=4).run(steps)
+
+        self.assertEqual(data["succeeded"], 3)
+        self.assertEqual(order[-1], "c")
+        self.assertEqual(data["steps"][1]["result"], "b")
+        self.assertGreaterEqual(data["steps"][2]["start_ms"], data["steps"][0]["start_ms"])
+
+    def test_stop_on_error(self):
+        """The first failure skips the remaining steps and stops running ones."""
+        stopped = threading.Event()
+
+        def capture(session, should_stop):
+            while not should_stop():
+                stopped.wait(0.01)
+            stopped.set()
+
+        def fail(session, should_stop):
+            raise RuntimeError("sensor unreachable")
+
+        steps = [
+            Batch_Step("capture", "rgb.capture", capture, device="rgb:1"),
+            Batch_Step("configure", "acoustic.configure", fail, device="acoustic:1", after=[]),
+            Batch_Step("start", "acoustic.start", lambda s, stop: None, device="acoustic:1"),
+        ]
+        data = Batch_Runner().run(steps)
+
+        self.assertTrue(data["stopped"])
+        self.assertTrue(stopped.is_set())
+        self.assertEqual(
+            [step["status"] for step in data["steps"]], ["succeeded", "failed", "skipped"]
+        )
+        self.assertEqual(data["steps"][1]["error"], "sensor unreachable")
+
+        # Without stop_on_error only the dependent steps are skipped
+        steps = [
+            Batch_Step("configure", "acoustic.configure", fail, device="acoustic:1"),
+            Batch_Step(
+                "start",
+                "acoustic.start",
+                lambda s, stop: 1,
+                device="acoustic:1",
+                after=["configure"],
+            ),
+            Batch_Step("info", "acoustic.info", lambda s, stop: 2, device="acoustic:1"),
+        ]
+        data = Batch_Runner().run(steps, stop_on_error=False)
+        self.assertEqual(
+            [step["status"] for step in data["steps"]], ["failed", "skipped", "succeeded"]
+        )
+
+
+class BatchApiTestCase(unittest.TestCase):
+    """Test case for the /batch endpoint."""
+
+    def setUp(self):
+        self.client = app_module.app.test_client()
+        self.sensor = mock.Mock()
+        self.sensor.AllPulsersOff.return_value = '{"result": []}'
+        self.sensor.ClearLiveData.return_value = '{"status": 0}'
+        self.sensor.StartRecording.return_value = '{"status": 0}'
+        patches = [
+            mock.patch.object(app_module, "get_sensor_controller", return_value=self.sensor),
+            mock.patch.object(app_module.drivers, "is_enabled", return_value=True),
+            mock.patch.object(app_module.drivers, "require"),
+        ]
+        self.get_sensor_controller = [patch.start() for patch in patches][0]
+        for patch in patches:
+            self.addCleanup(patch.stop)
+
+    def test_steps_share_the_sensor_connection(self):
+        """Acoustic steps use one connection, closed after the batch."""
+        response = self.client.post(
+            "/batch",
+            json={
+                "steps": [
+                    {"id": "pulsers", "operation": "acoustic.pulsers_off"},
+                    {"operation": "acoustic.clear_live_data"},
+                    {"operation": "wait", "params": {"seconds": 0}},
+                    {"id": "record", "operation": "acoustic.start",
+                     "params": {"measurement_name": "run1"}},
+                ]
+            },
+        )
+        data = response.get_json()
+        self.assertTrue(data["success"])
+        self.assertEqual(
+            [step["id"] for step in data["data"]["steps"]], ["pulsers", "1", "2", "record"]
+        )
+        self.assertEqual(data["data"]["steps"][3]["result"], '{"status": 0}')
+        self.get_sensor_controller.assert_called_once()
+        self.sensor.AllPulsersOff.assert_called_once_with("pulsers", False)
+        self.sensor.StartRecording.assert_called_once_with("record", measurement_name="run1")
+        self.sensor.Close.assert_called_once()
+
+    def test_invalid_step_runs_nothing(self):
+        """A batch with an invalid step is rejected before any step runs."""
+        response = self.client.post(
+            "/batch",
+            json={
+                "steps": [
+                    {"operation": "acoustic.pulsers_off"},
+                    {"operation": "acoustic.set_pulser", "params": {"name": "A"}},
+                ]
+            },
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("pulser", response.get_json()["error"])
+
+        response = self.client.post(
+            "/batch", json={"steps": [{"operation": "acoustic.stop", "after": ["later"]}]}
+        )
+        self.assertEqual(response.status_code, 400)
+        self.get_sensor_controller.assert_not_called()
+
+        for stop_on_error in ("false", 0, None):
+            response = self.client.post(
+                "/batch",
+                json={"steps": [{"operation": "acoustic.stop"}], "stop_on_error": stop_on_error},
+            )
+            self.assertEqual(response.status_code, 400)
+            self.assertIn("stop_on_error", response.get_json()["error"])
+        self.get_sensor_controller.assert_not_called()
+
+    def test_default_camera_resolved_after_validation(self):
+        """RGB steps are validated without enumerating the cameras, then resolved once."""
+        steps = [{"operation": "rgb.config"}, {"operation": "rgb.config", "after": []}]
+        controller = mock.Mock(save_functions={"png": None})
+        controller.get_snapshot.return_value = RGB_Camera_Snapshot(version=1)
+        with mock.patch.object(
+            app_module, "get_default_rgb_camera_serial", return_value="0815-0000"
+        ) as default_serial, mock.patch.object(
+            app_module, "get_shared_rgb_camera_controller", return_value=controller
+        ):
+            response = self.client.post("/batch", json={"steps": [*steps, {"operation": "x"}]})
+            self.assertEqual(response.status_code, 400)
+            default_serial.assert_not_called()
+
+            data = self.client.post("/batch", json={"steps": steps}).get_json()
+            self.assertTrue(data["success"])
+            self.assertEqual(
+                [step["device"] for step in data["data"]["steps"]], ["rgb:0815-0000"] * 2
+            )
+            default_serial.assert_called_once()
+
+        with mock.patch.object(
+            app_module,
+            "get_default_rgb_camera_serial",
+            side_effect=RuntimeError("Camera connection failed: no camera found"),
+        ):
+            response = self.client.post("/batch", json={"steps": steps})
+            self.assertEqual(response.status_code, 503)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+"""
+Tests for raw Bayer storage and deferred demosaicing.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+import cv2
+import numpy as np
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from BussinessLayer.Bayer_Storage import (
+    Bayer_Demosaic_Pool,
+    Bayer_Sequence_Writer,
+    bayer_pattern,
+    demosaic,
+    read_bayer_frame,
+)
+from BussinessLayer.RGB_Camera_Controller import RGB_Camera_Controller
+from data.RGB_camera import RGB_Camera_Snapshot
+
+
+# 2x2 cell of each GenICam Bayer pattern, row by row
+CELLS = {"RG": "RGGB", "BG": "BGGR", "GR": "GRBG", "GB": "GBRG"}
+
+
+def _mosaic(pattern, red=200, green=100, blue=50):
+    """Mosaic of a uniformly colored image in the given GenICam pattern."""
+    colors = {"R": red, "G": green, "B": blue}
+    cell = [colors[c] for c in CELLS[pattern]]
+    return np.tile(np.array(cell, dtype=np.uint8).reshape(2, 2), (4, 4))
+
+
+class BayerStorageTestCase(unittest.TestCase):
+    """Test case for Bayer storage and demosaicing."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = self.tmp_dir.name + os.sep
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_patterns(self):
+        """Every GenICam pattern demosaics to the right colors."""
+        self.assertEqual(bayer_pattern("BayerGB12"), "GB")
+        self.assertIsNone(bayer_pattern("RGB8"))
+        for pattern in CELLS:
+            rgb = demosaic(_mosaic(pattern), pattern)
+            self.assertEqual(rgb[4, 4].tolist(), [200, 100, 50], pattern)
+
+    def test_deferred_and_background_demosaicing(self):
+        """Stored mosaics are demosaiced lazily and in the process pool."""
+        writer = Bayer_Sequence_Writer(self.path, "seq", "BayerRG8", "RGB8")
+        for frame in (1, 2):
+            writer.add(_mosaic("RG"), frame)
+        metadata = writer.close()
+        self.assertEqual(metadata["bayer_pattern"], "RG")
+        self.assertEqual(metadata["original_format"], "RGB8")
+
+        self.assertEqual(read_bayer_frame(metadata["metadata_file"], 2)[4, 4].tolist(), [200, 100, 50])
+
+        pool = Bayer_Demosaic_Pool(workers=2)
+        try:
+            files = [f.result(timeout=30) for f in pool.submit_sequence(metadata["metadata_file"])]
+        finally:
+            pool.shutdown()
+        self.assertEqual(len(files), 2)
+        self.assertEqual(cv2.imread(files[0])[4, 4].tolist(), [50, 100, 200])
+
+    def test_select_bayer_format(self):
+        """8-bit Bayer formats are preferred; cameras without Bayer are refused."""
+        snapshot = RGB_Camera_Snapshot(
+            features={
+                "PixelFormat": {
+                    "value": "RGB8",
+                    "symbolics": ["Mono8", "RGB8", "BayerGR12", "BayerGR8"],
+                }
+            }
+        )
+        self.assertEqual(RGB_Camera_Controller.select_bayer_format(snapshot), "BayerGR8")
+        snapshot.features["PixelFormat"]["symbolics"] = ["Mono8", "RGB8"]
+        with self.assertRaises(ValueError):
+            RGB_Camera_Controller.select_bayer_format(snapshot)
+
+
+if __name__ == "__main__":
+    unittest.main()
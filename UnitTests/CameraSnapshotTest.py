@@ -0,0 +1,69 @@
+"""
+Tests for the cached node-map snapshot of the RGB camera.
+
+The tests run on pylon's camera emulation (PYLON_CAMEMU).
+"""
+
+import os
+import sys
+import threading
+import time
+import unittest
+from unittest import mock
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from BussinessLayer.RGB_Camera_Controller import RGB_Camera_Controller
+
+
+class EmulatedSnapshotTestCase(unittest.TestCase):
+    """Test case for the snapshot of an emulated camera."""
+
+    def setUp(self):
+        emulation = mock.patch.dict(os.environ, {"PYLON_CAMEMU": "1"})
+        emulation.start()
+        self.addCleanup(emulation.stop)
+
+    def connect(self, **kwargs):
+        controller = RGB_Camera_Controller(camera_width=640, camera_height=480, **kwargs)
+        controller.Connect()
+        self.addCleanup(controller.release_camera)
+        return controller
+
+    def test_version_follows_the_features(self):
+        """Refreshing unchanged features keeps the version, a write changes it."""
+        controller = self.connect()
+        snapshot = controller.get_snapshot()
+        self.assertEqual(snapshot.value("Width"), 640)
+        self.assertGreater(snapshot.version, 0)
+
+        refreshed = controller.refresh_snapshot()
+        self.assertEqual(refreshed.version, snapshot.version)
+        self.assertGreaterEqual(refreshed.taken_at, snapshot.taken_at)
+
+        written = controller.set_features({"Width": 320})
+        self.assertEqual(written.value("Width"), 320)
+        self.assertNotEqual(written.version, snapshot.version)
+        self.assertIs(controller.get_snapshot(), written)
+
+    def test_refresher_stops_on_release(self):
+        """The background refresher updates the snapshot and exits when the camera is released."""
+        controller = self.connect(snapshot_interval=0.05)
+        first = controller.get_snapshot()
+        thread = controller._snapshot_thread
+        self.assertTrue(thread.is_alive())
+
+        deadline = time.monotonic() + 5
+        while controller.get_snapshot() is first and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertIsNot(controller.get_snapshot(), first)
+
+        controller.release_camera()
+        self.assertFalse(thread.is_alive())
+        self.assertIsNone(controller._snapshot_thread)
+        self.assertNotIn("rgb-snapshot", [t.name for t in threading.enumerate()])
+
+
+if __name__ == "__main__":
+    unittest.main()
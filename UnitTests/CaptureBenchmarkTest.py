@@ -0,0 +1,77 @@
+"""
+Regression tests for the RGB capture path on pylon's camera emulation.
+
+The emulated camera is provided by pylon itself (PYLON_CAMEMU), so these
+tests run on any Linux machine with pypylon installed.
+"""
+
+import os
+import sys
+import unittest
+from unittest import mock
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from Benchmarks.RGB_Capture_Benchmark import camera_emulation, compare, run_suite
+
+
+class BaselineComparisonTestCase(unittest.TestCase):
+    """Test case for the baseline comparison."""
+
+    def test_direction_of_metrics(self):
+        """Lower latency and higher throughput are improvements."""
+        report = compare(
+            {"a.capture_fps": 50.0, "a.acquire_image_median_s": 0.5, "a.writer_mb_per_s": 50.0},
+            {"a.capture_fps": 100.0, "a.acquire_image_median_s": 0.25, "a.writer_mb_per_s": 25.0},
+            tolerance=0.2,
+        )
+        regressions = {r["metric"]: r["regression"] for r in report}
+        self.assertTrue(regressions["a.capture_fps"])
+        self.assertTrue(regressions["a.acquire_image_median_s"])
+        self.assertFalse(regressions["a.writer_mb_per_s"])
+
+    def test_noise_floor(self):
+        """Tiny absolute changes in memory are not regressions."""
+        report = compare(
+            {"a.capture_python_peak_mb": 0.004}, {"a.capture_python_peak_mb": 0.002}, 0.2
+        )
+        self.assertFalse(report[0]["regression"])
+
+
+class EmulatedCaptureTestCase(unittest.TestCase):
+    """Smoke run of the benchmark suite on an emulated camera."""
+
+    def setUp(self):
+        emulation = mock.patch.dict(os.environ, {"PYLON_CAMEMU": "1"})
+        emulation.start()
+        self.addCleanup(emulation.stop)
+
+    def test_camera_emulation_is_restored(self):
+        """The emulation is set for the run only and a configured one is kept."""
+        del os.environ["PYLON_CAMEMU"]
+        with camera_emulation(cameras=2):
+            self.assertEqual(os.environ["PYLON_CAMEMU"], "2")
+        self.assertNotIn("PYLON_CAMEMU", os.environ)
+
+        os.environ["PYLON_CAMEMU"] = "3"
+        with camera_emulation():
+            self.assertEqual(os.environ["PYLON_CAMEMU"], "3")
+        self.assertEqual(os.environ["PYLON_CAMEMU"], "3")
+
+    def test_suite_produces_metrics(self):
+        """Every measurement yields a positive metric."""
+        results = run_suite(["640x480"], ["raw"], frames=3, repeat=1)
+        metrics = results["metrics"]
+
+        self.assertGreater(metrics["connect_median_s"], 0)
+        self.assertGreater(metrics["640x480.acquire_image_median_s"], 0)
+        self.assertGreater(metrics["640x480.acquire_image_continuous_median_s"], 0)
+        self.assertGreater(metrics["640x480.raw.capture_fps"], 0)
+        self.assertGreater(metrics["640x480.raw.writer_mb_per_s"], 0)
+        self.assertGreater(metrics["process_rss_peak_mb"], 0)
+        self.assertEqual(results["environment"]["camera_emulation"], os.environ["PYLON_CAMEMU"])
+
+
+if __name__ == "__main__":
+    unittest.main()
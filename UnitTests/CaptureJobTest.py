@@ -0,0 +1,174 @@
+"""
+Tests for background capture jobs.
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import app as app_module
+from BussinessLayer.Capture_Job_Manager import Capture_Job_Manager
+from data.Capture_job import Capture_Job
+
+
+def frames_work(path, count, release=None):
+    """Capture stand-in writing one small file per frame."""
+
+    def work(progress, should_stop):
+        files = []
+        for i in range(count):
+            if should_stop():
+                return {"count": len(files), "stopped": True}
+            if release is not None:
+                release.wait(5)
+            filename = os.path.join(path, f"frame_{i + 1}.raw")
+            with open(filename, "wb") as f:
+                f.write(b"\0" * 100)
+            files.append(filename)
+            progress(i + 1, filename)
+        return {"count": len(files)}
+
+    return work
+
+
+class CaptureJobManagerTestCase(unittest.TestCase):
+    """Test case for Capture_Job_Manager."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.manager = Capture_Job_Manager(workers=1, history=2)
+
+    def tearDown(self):
+        self.manager.shutdown()
+        self.tmp.cleanup()
+
+    def wait_finished(self, job_id):
+        progress = self.manager.wait_for_progress(job_id, -1, timeout=0)
+        while progress["state"] in ("queued", "running"):
+            progress = self.manager.wait_for_progress(job_id, progress["version"], timeout=5)
+        return self.manager.get_job(job_id)
+
+    def test_progress_and_result(self):
+        """Frames, bytes and files are counted and the result is kept."""
+        job = Capture_Job("rgb", {}, total=5)
+        queued = self.manager.submit(job, frames_work(self.tmp.name, 5))
+        self.assertNotIn("files", queued)
+
+        finished = self.wait_finished(job.job_id)
+        self.assertEqual(finished["state"], "completed")
+        self.assertEqual(finished["frames_done"], 5)
+        self.assertEqual(finished["bytes_written"], 500)
+        self.assertEqual(len(finished["files"]), 5)
+        self.assertEqual(finished["result"], {"count": 5})
+        self.assertGreater(finished["progress"]["fps"], 0)
+
+    def test_cancel_running_and_queued(self):
+        """A running job stops between frames, a queued job never starts."""
+        release = threading.Event()
+        running = Capture_Job("rgb", {}, total=100)
+        queued = Capture_Job("rgb", {}, total=100)
+        self.manager.submit(running, frames_work(self.tmp.name, 100, release))
+        self.manager.submit(queued, frames_work(self.tmp.name, 100))
+
+        progress = self.manager.wait_for_progress(running.job_id, -1, timeout=0)
+        while progress["state"] == "queued":
+            progress = self.manager.wait_for_progress(running.job_id, progress["version"], 5)
+
+        self.assertEqual(self.manager.cancel_job(queued.job_id)["state"], "cancelled")
+        self.manager.cancel_job(running.job_id)
+        release.set()
+
+        finished = self.wait_finished(running.job_id)
+        self.assertEqual(finished["state"], "cancelled")
+        self.assertTrue(finished["result"]["stopped"])
+        self.assertLess(finished["frames_done"], 100)
+        self.assertIsNone(self.manager.get_job(queued.job_id)["started_at"])
+
+    def test_failure_and_bounded_history(self):
+        """Failed jobs keep their error; only the newest finished jobs are retained."""
+
+        def failing(progress, should_stop):
+            raise RuntimeError("camera unplugged")
+
+        job_ids = []
+        for _ in range(3):
+            job = Capture_Job("rgb", {}, total=1)
+            self.manager.submit(job, failing)
+            job_ids.append(job.job_id)
+            self.wait_finished(job.job_id)
+
+        self.assertEqual([job["job_id"] for job in self.manager.list_jobs()], job_ids[1:])
+        with self.assertRaises(KeyError):
+            self.manager.get_job(job_ids[0])
+        failed = self.manager.get_job(job_ids[-1])
+        self.assertEqual(failed["state"], "failed")
+        self.assertEqual(failed["error"], "camera unplugged")
+
+
+class CaptureJobApiTestCase(unittest.TestCase):
+    """Test case for the /jobs endpoints on the simulated multispectral camera."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.client = app_module.app.test_client()
+        for name, value in (
+            ("DEFAULT_STORAGE_PATH", self.tmp.name),
+            ("MULTISPECTRAL_BACKEND", "simulated"),
+        ):
+            patch = mock.patch.object(app_module.Config, name, value)
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_job_lifecycle(self):
+        """POST answers 202 at once; events stream until the job ended."""
+        response = self.client.post(
+            "/jobs",
+            json={
+                "type": "multispectral",
+                "path": "run1",
+                "name": "cube",
+                "count": 3,
+            },
+        )
+        self.assertEqual(response.status_code, 202)
+        job_id = response.get_json()["job"]["job_id"]
+        self.assertEqual(response.headers["Location"], f"/jobs/{job_id}")
+
+        events = self.client.get(f"/jobs/{job_id}/events?interval=0").get_data(as_text=True)
+        self.assertIn("event: end", events)
+
+        job = self.client.get(f"/jobs/{job_id}").get_json()["job"]
+        self.assertEqual(job["state"], "completed")
+        self.assertEqual(job["frames_done"], 3)
+        self.assertEqual(job["bytes_written"], 3 * 8 * 512 * 640 * 2)
+        self.assertEqual(job["result"]["count"], 3)
+        self.assertTrue(os.path.isfile(os.path.join(self.tmp.name, "run1", "cube.cube.npy")))
+
+    def test_invalid_jobs(self):
+        """Unknown types, invalid bodies and unknown jobs are rejected."""
+        self.assertEqual(self.client.post("/jobs", json={"type": "lidar"}).status_code, 400)
+        self.assertEqual(
+            self.client.post("/jobs", json={"type": "multispectral", "count": 2}).status_code, 400
+        )
+        rgb = {"type": "rgb", "path": "run1", "name": "img", "quality": 90, "image_format": "png"}
+        jobs = len(self.client.get("/jobs").get_json()["jobs"])
+        for count in (0, -2, "3", 1.5, True):
+            response = self.client.post("/jobs", json={**rgb, "count": count})
+            self.assertEqual(response.status_code, 400, count)
+        self.assertEqual(len(self.client.get("/jobs").get_json()["jobs"]), jobs)
+        self.assertEqual(self.client.get("/jobs/missing").status_code, 404)
+        self.assertEqual(self.client.delete("/jobs/missing").status_code, 404)
+        self.assertEqual(self.client.get("/jobs/missing/events").status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
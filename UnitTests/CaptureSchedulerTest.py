@@ -0,0 +1,171 @@
+"""
+Unit tests for the interval capture scheduler.
+
+The camera controller is replaced by a stub, so these tests run without hardware.
+"""
+
+import os
+import sys
+import tempfile
+import json
+import time
+import unittest
+from unittest import mock
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from BussinessLayer.Capture_Scheduler import Capture_Scheduler
+from data.Capture_schedule import Interval_Capture_Job
+
+
+class StubCameraController:
+    """Camera controller stand-in recording the requested file names."""
+
+    def __init__(self):
+        self.files = []
+
+    def capture_latest_image(self, filename, quality=100, image_format="png"):
+        self.files.append(filename)
+        return {"file": filename, "camera_timestamp": 0}
+
+
+class CaptureSchedulerTestCase(unittest.TestCase):
+    """Test case for Capture_Scheduler."""
+
+    def setUp(self):
+        """Create a scheduler persisting into a temporary directory."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.state_file = os.path.join(self.tmp_dir.name, "jobs.json")
+        self.controller = StubCameraController()
+        self.scheduler = Capture_Scheduler(self.state_file, lambda: self.controller)
+
+    def tearDown(self):
+        """Stop the scheduler and remove the temporary directory."""
+        self.scheduler.stop()
+        self.tmp_dir.cleanup()
+
+    def test_job_validation(self):
+        """Invalid periods and windows are rejected."""
+        with self.assertRaises(ValueError):
+            Interval_Capture_Job(path="./", name="tl", period=0)
+        with self.assertRaises(ValueError):
+            Interval_Capture_Job(path="./", name="tl", period=1, start_at=10, end_at=5)
+        for invalid in (
+            {"period": True},
+            {"period": float("nan")},
+            {"count": True},
+            {"start_at": "tomorrow"},
+            {"start_at": False},
+            {"end_at": "later"},
+        ):
+            with self.assertRaises(ValueError):
+                Interval_Capture_Job(path="./", name="tl", **{"period": 1, **invalid})
+
+    def test_invalid_job_leaves_the_scheduler_running(self):
+        """A job with an invalid start time answers 400 and later jobs still run."""
+        import app as app_module
+
+        self.scheduler.start()
+        with mock.patch.object(app_module, "get_capture_scheduler", return_value=self.scheduler), \
+                mock.patch.object(app_module.drivers, "is_enabled", return_value=True):
+            client = app_module.app.test_client()
+            response = client.post(
+                "/scheduler/jobs",
+                json={"path": "./", "name": "tl", "period": 0.02, "start_at": "tomorrow"},
+            )
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(self.scheduler.list_jobs(), [])
+
+            response = client.post(
+                "/scheduler/jobs", json={"path": "./", "name": "tl", "period": 0.02, "count": 2}
+            )
+            job_id = response.get_json()["job"]["job_id"]
+        deadline = time.time() + 2
+        while self.scheduler.get_job(job_id)["state"] != "completed":
+            self.assertLess(time.time(), deadline)
+            time.sleep(0.01)
+        self.assertTrue(self.scheduler._thread.is_alive())
+
+    def test_job_runs_to_completion(self):
+        """A counted job captures every slot and reports its statistics."""
+        self.scheduler.start()
+        job = self.scheduler.add_job(
+            Interval_Capture_Job(path="./", name="tl", period=0.02, count=5)
+        )
+        deadline = time.time() + 2
+        while self.scheduler.get_job(job["job_id"])["state"] != "completed":
+            self.assertLess(time.time(), deadline)
+            time.sleep(0.01)
+
+        stats = self.scheduler.get_job(job["job_id"])["stats"]
+        self.assertEqual(stats["captured"] + stats["missed_slots"], 5)
+        self.assertIsNotNone(stats["jitter"])
+        self.assertIn("./tl_5.png", self.controller.files)
+
+    def test_jobs_survive_restart(self):
+        """Persisted jobs are reloaded and late slots are counted as missed."""
+        job = self.scheduler.add_job(
+            Interval_Capture_Job(
+                path="./", name="tl", period=0.05, count=10, start_at=time.time() - 1
+            )
+        )
+
+        restarted = Capture_Scheduler(self.state_file, lambda: self.controller)
+        restarted.start()
+        deadline = time.time() + 2
+        while restarted.get_job(job["job_id"])["state"] != "completed":
+            self.assertLess(time.time(), deadline)
+            time.sleep(0.01)
+        restarted.stop()
+
+        stats = restarted.get_job(job["job_id"])["stats"]
+        self.assertEqual(stats["missed_slots"], 10)
+        self.assertEqual(stats["captured"], 0)
+
+    def test_wall_clock_jump(self):
+        """Moving the wall clock neither delays slots nor makes missed ones burst."""
+        self.scheduler.start()
+        job = self.scheduler.add_job(
+            Interval_Capture_Job(path="./", name="tl", period=0.05, count=4)
+        )
+        wall_clock = time.time
+        with mock.patch("time.time", lambda: wall_clock() + 3600):
+            deadline = time.monotonic() + 2
+            while self.scheduler.get_job(job["job_id"])["state"] != "completed":
+                self.assertLess(time.monotonic(), deadline)
+                time.sleep(0.01)
+
+        stats = self.scheduler.get_job(job["job_id"])["stats"]
+        self.assertEqual(stats["captured"], 4)
+        self.assertEqual(stats["missed_slots"], 0)
+        self.assertLess(stats["max_lateness"], 1)
+
+
+class CaptureJobResumeTestCase(unittest.TestCase):
+    """Test case for resuming persisted jobs at startup."""
+
+    def test_resume_at_startup(self):
+        """The scheduler starts at startup only when persisted jobs are active."""
+        import app as app_module
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            state_file = os.path.join(tmp_dir, "jobs.json")
+            with mock.patch.object(app_module.Config, "SCHEDULER_STATE_FILE", state_file), \
+                    mock.patch.object(app_module.Config, "HARDWARE_OWNER_ADDRESS", ""), \
+                    mock.patch.object(app_module.drivers, "is_enabled", return_value=True), \
+                    mock.patch.object(app_module, "get_capture_scheduler") as get_scheduler:
+                app_module.resume_capture_jobs()
+                with open(state_file, "w", encoding="utf-8") as f:
+                    json.dump([{"state": "completed"}], f)
+                app_module.resume_capture_jobs()
+                get_scheduler.assert_not_called()
+
+                with open(state_file, "w", encoding="utf-8") as f:
+                    json.dump([{"state": "completed"}, {"state": "scheduled"}], f)
+                app_module.resume_capture_jobs()
+                get_scheduler.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
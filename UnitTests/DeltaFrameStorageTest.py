@@ -0,0 +1,76 @@
+"""
+Tests for the keyframe + tile-delta sequence storage.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from BussinessLayer.Delta_Frame_Storage import Delta_Frame_Reader, Delta_Frame_Writer
+
+
+class DeltaFrameStorageTestCase(unittest.TestCase):
+    """Test case for Delta_Frame_Writer and Delta_Frame_Reader."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = self.tmp_dir.name + os.sep
+        rng = np.random.default_rng(0)
+        # Width and height are no multiple of the tile size on purpose
+        self.background = rng.integers(0, 256, (100, 150, 3), dtype=np.uint8)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _frames(self, count):
+        frames = []
+        for i in range(count):
+            frame = self.background.copy()
+            frame[10 + i : 20 + i, 140:150] = 255
+            frames.append(frame)
+        return frames
+
+    def test_lossless_round_trip(self):
+        """Every frame is rebuilt exactly and unchanged tiles are not stored."""
+        frames = self._frames(7)
+        writer = Delta_Frame_Writer(self.path, "seq", keyframe_interval=4, tile_size=16)
+        for number, frame in enumerate(frames, start=1):
+            writer.add(frame, number)
+        summary = writer.close()
+
+        self.assertEqual(summary["keyframes"], 2)
+        self.assertEqual(summary["deltas"], 5)
+        self.assertLess(summary["storage_ratio"], 0.5)
+
+        reader = Delta_Frame_Reader(summary["index_file"], cache_size=1)
+        self.assertEqual(reader.frames(), list(range(1, 8)))
+        for number, frame in enumerate(frames, start=1):
+            np.testing.assert_array_equal(reader.read(number), frame)
+
+    def test_large_change_forces_keyframe(self):
+        """A frame that differs almost everywhere is stored as a keyframe."""
+        writer = Delta_Frame_Writer(self.path, "seq", tile_size=16)
+        writer.add(self.background, 1)
+        writer.add(255 - self.background, 2)
+        self.assertEqual(writer.close()["keyframes"], 2)
+
+    def test_mono_frames(self):
+        """Two-dimensional frames keep their shape."""
+        writer = Delta_Frame_Writer(self.path, "mono", tile_size=8)
+        mono = self.background[:, :, 0]
+        changed = mono.copy()
+        changed[0, 0] ^= 1
+        writer.add(mono, 1)
+        writer.add(changed, 2)
+        reader = Delta_Frame_Reader(writer.close()["index_file"])
+        np.testing.assert_array_equal(reader.read(2), changed)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+"""
+Tests for per-device admission control.
+"""
+
+import os
+import sys
+import threading
+import time
+import unittest
+from unittest import mock
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import app as app_module
+from BussinessLayer.Device_Scheduler import (
+    BULK,
+    INTERACTIVE,
+    Device_Busy_Error,
+    Device_Scheduler,
+)
+
+
+class DeviceSchedulerTestCase(unittest.TestCase):
+    """Test case for Device_Scheduler."""
+
+    def setUp(self):
+        self.scheduler = Device_Scheduler(max_waiting=8, max_waiting_per_client=4, timeout=5)
+        self.order = []
+        self.threads = []
+
+    def tearDown(self):
+        for thread in self.threads:
+            thread.join(5)
+
+    def queue(self, device, client, priority, label):
+        """Start a request that records its label once admitted."""
+
+        def run():
+            with self.scheduler.admit([device], client, priority):
+                self.order.append(label)
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        self.threads.append(thread)
+        # Wait until the request is queued, so the arrival order is defined
+        while self.scheduler.metrics()[device]["waiting"] < len(self.threads):
+            time.sleep(0.005)
+
+    def test_priority_and_client_fairness(self):
+        """Interactive requests go first, then clients take turns in arrival order."""
+        with self.scheduler.admit(["rgb:1"], "holder"):
+            self.queue("rgb:1", "a", BULK, "a1")
+            self.queue("rgb:1", "a", BULK, "a2")
+            self.queue("rgb:1", "a", BULK, "a3")
+            self.queue("rgb:1", "b", BULK, "b1")
+            self.queue("rgb:1", "c", INTERACTIVE, "c1")
+        for thread in self.threads:
+            thread.join(5)
+        self.assertEqual(self.order, ["c1", "a1", "b1", "a2", "a3"])
+
+        metrics = self.scheduler.metrics()["rgb:1"]
+        self.assertFalse(metrics["busy"])
+        self.assertEqual(metrics["admitted"], 6)
+        self.assertGreater(metrics["wait_ms"]["max"], 0)
+
+    def test_bounded_queue_and_timeout(self):
+        """Full queues and per-client limits reject at once; long waits time out."""
+        scheduler = Device_Scheduler(max_waiting=1, max_waiting_per_client=1, timeout=0.1)
+        self.scheduler = scheduler
+        with scheduler.admit(["acoustic:sensor"], "holder"):
+            with self.assertRaises(Device_Busy_Error) as timeout:
+                with scheduler.admit(["acoustic:sensor"], "a"):
+                    pass
+            self.assertGreaterEqual(timeout.exception.retry_after, 1)
+
+            release = threading.Event()
+            self.queue_blocking(scheduler, release)
+            with self.assertRaises(Device_Busy_Error) as full:
+                with scheduler.admit(["acoustic:sensor"], "b"):
+                    pass
+            self.assertIn("queue is full", str(full.exception))
+        release.set()
+
+        metrics = scheduler.metrics()["acoustic:sensor"]
+        self.assertEqual(metrics["rejected"], 1)
+        self.assertGreaterEqual(metrics["timed_out"], 1)
+
+    def queue_blocking(self, scheduler, release):
+        """Queue a request that waits for the device and then for release."""
+        scheduler.timeout = 5
+
+        def run():
+            with scheduler.admit(["acoustic:sensor"], "waiting"):
+                release.wait(5)
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        self.threads.append(thread)
+        while scheduler.metrics()["acoustic:sensor"]["waiting"] < 1:
+            time.sleep(0.005)
+
+    def test_several_devices(self):
+        """A failed admission releases the devices acquired before it."""
+        scheduler = Device_Scheduler(max_waiting=0)
+        with scheduler.admit(["rgb:2"], "holder"):
+            with self.assertRaises(Device_Busy_Error):
+                with scheduler.admit(["rgb:2", "acoustic:sensor"], "sync"):
+                    pass
+            self.assertFalse(scheduler.metrics()["acoustic:sensor"]["busy"])
+
+
+class DeviceAdmissionApiTestCase(unittest.TestCase):
+    """Test case for the admission of device endpoints."""
+
+    def test_busy_device_answers_429(self):
+        """A request for a busy device with a full queue gets 429 and Retry-After."""
+        client = app_module.app.test_client()
+        scheduler = Device_Scheduler(max_waiting=0)
+        config = app_module.Config
+        device = f"acoustic:{config.DEFAULT_SENSOR_IP}:{config.DEFAULT_SENSOR_PORT}"
+        with mock.patch.object(app_module, "device_scheduler", scheduler), \
+                mock.patch.object(app_module.drivers, "is_enabled", return_value=True):
+            with scheduler.admit([device], "holder"):
+                response = client.get("/sensor/acoustic/state")
+            self.assertEqual(response.status_code, 429)
+            self.assertEqual(response.headers["Retry-After"], "1")
+            self.assertEqual(response.get_json()["device"], device)
+
+            metrics = client.get("/metrics/devices").get_json()["devices"][device]
+            self.assertEqual(metrics["rejected"], 1)
+            self.assertFalse(metrics["busy"])
+
+    def test_body_that_is_not_an_object_answers_400(self):
+        """A JSON body that is not an object is refused before the devices are resolved."""
+        client = app_module.app.test_client()
+        with mock.patch.object(app_module.drivers, "is_enabled", return_value=True):
+            for body in ([1, 2], "run1", 3, False):
+                response = client.post("/sensor/acoustic/start", json=body)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("object", response.get_json()["error"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+"""
+Tests for lazy driver loading.
+"""
+
+import os
+import sys
+import types
+import unittest
+from unittest import mock
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import app as app_module
+from Benchmarks.Startup_Benchmark import measure_once
+from BussinessLayer.Driver_Registry import DRIVERS, Driver_Disabled_Error, Driver_Registry
+
+
+class DriverRegistryTestCase(unittest.TestCase):
+    """Test case for Driver_Registry and its use by the API."""
+
+    def test_disabled_driver(self):
+        """Drivers that are not enabled cannot be loaded."""
+        registry = Driver_Registry(["acoustic"])
+        self.assertEqual(registry.enabled, ("acoustic",))
+        with self.assertRaises(Driver_Disabled_Error):
+            registry.load("rgb")
+        with self.assertRaises(ValueError):
+            Driver_Registry(["rgb", "lidar"])
+
+    def test_load_on_first_use(self):
+        """Modules are imported once and reported in the status."""
+        registry = Driver_Registry(["multispectral"])
+        self.assertFalse(registry.status()["multispectral"]["loaded"])
+        module = registry.load("multispectral")
+        self.assertIs(registry.load("multispectral"), module)
+        self.assertTrue(hasattr(module, "Multispectral_Camera_Controller"))
+        status = registry.status()["multispectral"]
+        self.assertTrue(status["loaded"])
+        self.assertIn(DRIVERS["multispectral"].module, status["load_time_s"])
+
+    def test_auto_enables_installed_drivers(self):
+        """auto enables every driver whose packages are installed."""
+        installed = {"numpy", "cv2"}
+        with mock.patch(
+            "importlib.util.find_spec",
+            side_effect=lambda package: object() if package in installed else None,
+        ) as find_spec:
+            self.assertEqual(Driver_Registry(["auto"]).enabled, ("multispectral", "acoustic"))
+            installed.add("pypylon")
+            self.assertEqual(Driver_Registry(["auto"]).enabled, tuple(DRIVERS))
+        find_spec.assert_any_call("pypylon")
+
+    def test_missing_settings(self):
+        """A driver whose required settings are empty cannot be used until they are set."""
+        config = types.SimpleNamespace(MULTISPECTRAL_BACKEND="")
+        registry = Driver_Registry(["multispectral"], config)
+        self.assertFalse(registry.is_enabled("multispectral"))
+        self.assertEqual(registry.missing_settings("multispectral"), ["MULTISPECTRAL_BACKEND"])
+        with self.assertRaises(Driver_Disabled_Error):
+            registry.load("multispectral")
+
+        config.MULTISPECTRAL_BACKEND = "simulated"
+        self.assertTrue(registry.is_enabled("multispectral"))
+        self.assertEqual(registry.status()["multispectral"]["missing_settings"], [])
+
+    def test_unconfigured_multispectral_routes(self):
+        """Without MULTISPECTRAL_BACKEND the multispectral endpoints answer 503."""
+        client = app_module.app.test_client()
+        with mock.patch.object(app_module.Config, "MULTISPECTRAL_BACKEND", ""):
+            response = client.get("/sensor/multispectral/config")
+        self.assertEqual(response.status_code, 503)
+
+    def test_disabled_routes(self):
+        """Endpoints of disabled drivers answer 503 without touching the driver."""
+        drivers = app_module.drivers
+        app_module.drivers = Driver_Registry(["acoustic"])
+        try:
+            client = app_module.app.test_client()
+            self.assertEqual(client.get("/sensor/rgb/devices").status_code, 503)
+            self.assertEqual(client.post("/sensor/sync/start", json={}).status_code, 503)
+            health = client.get("/health").get_json()
+            self.assertFalse(health["drivers"]["rgb"]["enabled"])
+        finally:
+            app_module.drivers = drivers
+
+    def test_cold_start_skips_native_libraries(self):
+        """Importing the API loads neither pylon, OpenCV nor NumPy."""
+        self.assertEqual(measure_once()["loaded"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
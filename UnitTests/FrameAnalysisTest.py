@@ -0,0 +1,123 @@
+"""
+Tests for the vectorized per-frame statistics.
+"""
+
+import os
+import sys
+import unittest
+from unittest import mock
+
+import numpy as np
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import app as app_module
+from BussinessLayer.Frame_Analysis import Frame_Analyzer, Frame_Quality_Gate
+
+
+class FrameAnalyzerTestCase(unittest.TestCase):
+    """Test case for Frame_Analyzer."""
+
+    def test_batched_stats_match_per_frame_numpy(self):
+        """Batched statistics equal the straightforward per-frame computation."""
+        rng = np.random.default_rng(0)
+        frames = [rng.integers(0, 256, (48, 64, 3), dtype=np.uint8) for _ in range(5)]
+        analyzer = Frame_Analyzer(subsample=2, batch_size=2, bins=16)
+        for frame in frames:
+            analyzer.add(frame)
+        table = analyzer.result()
+
+        self.assertEqual(len(table["rows"]), 5)
+        for index, frame in enumerate(frames):
+            view = frame[::2, ::2]
+            stats = analyzer.frame_stats(index)
+            self.assertEqual(stats["frame"], index + 1)
+            self.assertAlmostEqual(stats["mean_c1"], view[:, :, 1].mean(), places=3)
+            self.assertAlmostEqual(
+                stats["p95_c2"], np.percentile(view[:, :, 2], 95), places=3
+            )
+            expected, _ = np.histogram(view[:, :, 0], bins=16, range=(0, 256))
+            self.assertEqual(stats["histogram"][0], expected.tolist())
+
+    def test_saturation_and_sharpness(self):
+        """Clipped pixels are counted and a sharp edge scores higher than a flat frame."""
+        flat = np.full((32, 32), 100, dtype=np.uint8)
+        edge = flat.copy()
+        edge[:, 16:] = 255
+        analyzer = Frame_Analyzer(subsample=1)
+        analyzer.add(flat)
+        analyzer.add(edge)
+
+        flat_stats, edge_stats = analyzer.frame_stats(0), analyzer.frame_stats(1)
+        self.assertEqual(flat_stats["saturation_ratio"], 0)
+        self.assertAlmostEqual(edge_stats["saturation_ratio"], 0.5)
+        self.assertEqual(flat_stats["sharpness"], 0)
+        self.assertGreater(edge_stats["sharpness"], 0)
+
+
+class FrameQualityGateTestCase(unittest.TestCase):
+    """Test case for Frame_Quality_Gate."""
+
+    def test_rejection_reasons(self):
+        """Blurry, saturated and duplicate frames are rejected and counted."""
+        rng = np.random.default_rng(1)
+        sharp = rng.integers(0, 200, (64, 64, 3), dtype=np.uint8)
+        gate = Frame_Quality_Gate(
+            min_sharpness=10, max_clipped_ratio=0.1, min_difference=2, subsample=2
+        )
+
+        self.assertEqual(gate.check(sharp), [])
+        self.assertEqual(gate.check(sharp.copy()), ["duplicate"])
+        self.assertIn("blurry", gate.check(np.full((64, 64, 3), 90, dtype=np.uint8)))
+        self.assertIn("saturated", gate.check(np.full((64, 64, 3), 255, dtype=np.uint8)))
+        self.assertEqual(gate.check(255 - sharp), [])
+
+        summary = gate.summary()
+        self.assertEqual(summary["checked"], 5)
+        self.assertEqual(summary["rejected"], 3)
+        self.assertEqual(summary["reasons"]["duplicate"], 1)
+        self.assertEqual(summary["rejected_frames"][0], {"frame": 2, "reasons": ["duplicate"]})
+
+    def test_unknown_setting(self):
+        """Unknown thresholds in a request are refused."""
+        with self.assertRaises(ValueError):
+            Frame_Quality_Gate.from_config({"min_focus": 3})
+
+    def test_invalid_values(self):
+        """Settings of the wrong type or range are refused with ValueError."""
+        for config in (
+            ["min_sharpness"],
+            {"min_sharpness": "high"},
+            {"min_difference": True},
+            {"max_clipped_ratio": 1.5},
+            {"min_sharpness": -1},
+            {"subsample": 2.5},
+            {"subsample": 0},
+        ):
+            with self.assertRaises(ValueError, msg=config):
+                Frame_Quality_Gate.from_config(config)
+        gate = Frame_Quality_Gate.from_config({"min_sharpness": 10, "max_clipped_ratio": None})
+        self.assertEqual(gate.min_sharpness, 10)
+
+    def test_invalid_values_rejected_by_the_endpoint(self):
+        """A capture request with an invalid quality gate answers 400."""
+        client = app_module.app.test_client()
+        with mock.patch.object(app_module.drivers, "is_enabled", return_value=True):
+            response = client.post(
+                "/sensor/rgb/start",
+                json={
+                    "path": "./",
+                    "name": "gate",
+                    "quality": 100,
+                    "image_format": "png",
+                    "serial_number": "0815-0000",
+                    "quality_gate": {"min_sharpness": "high"},
+                },
+            )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("min_sharpness", response.get_json()["error"])
+
+
+if __name__ == "__main__":
+    unittest.main()
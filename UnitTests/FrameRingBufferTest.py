@@ -0,0 +1,93 @@
+"""
+Tests for the continuous-grab ring buffer.
+
+The device test runs on pylon's camera emulation (PYLON_CAMEMU).
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+import numpy as np
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from BussinessLayer.Frame_Ring_Buffer import Frame_Ring_Buffer
+from BussinessLayer.RGB_Camera_Controller import RGB_Camera_Controller
+
+
+class FrameRingBufferTestCase(unittest.TestCase):
+    """Test case for Frame_Ring_Buffer."""
+
+    def test_latest_and_views(self):
+        """The newest frame is returned; a view is invalid once its slot is reused."""
+        ring = Frame_Ring_Buffer(size=3)
+        self.assertIsNone(ring.latest())
+        for value in range(1, 4):
+            ring.put(np.full((2, 2), value, dtype=np.uint8), camera_timestamp=value)
+
+        view = ring.latest(copy=False)
+        self.assertEqual(view.sequence, 3)
+        self.assertEqual(view.image[0, 0], 3)
+        self.assertFalse(view.image.flags.writeable)
+
+        ring.put(np.full((2, 2), 4, dtype=np.uint8), camera_timestamp=4)
+        ring.put(np.full((2, 2), 5, dtype=np.uint8), camera_timestamp=5)
+        self.assertTrue(ring.is_valid(view))
+        ring.put(np.full((2, 2), 6, dtype=np.uint8), camera_timestamp=6)
+        self.assertFalse(ring.is_valid(view))
+
+    def test_wait_after(self):
+        """The first frame after a point in time is returned, waiting for it if needed."""
+        ring = Frame_Ring_Buffer(size=4)
+        ring.put(np.zeros(1), 1, host_time=10.0)
+        ring.put(np.ones(1), 2, host_time=20.0)
+        ring.put(np.ones(1), 3, host_time=30.0)
+        self.assertEqual(ring.wait_after(15.0).camera_timestamp, 2)
+
+        timer = threading.Timer(0.05, ring.put, (np.ones(1), 4, 40.0))
+        timer.start()
+        self.assertEqual(ring.wait_after(35.0, timeout=2).camera_timestamp, 4)
+        self.assertIsNone(ring.wait_after(50.0, timeout=0.01))
+
+
+class EmulatedContinuousGrabTestCase(unittest.TestCase):
+    """Continuous grab on an emulated camera."""
+
+    def setUp(self):
+        emulation = mock.patch.dict(os.environ, {"PYLON_CAMEMU": "1"})
+        emulation.start()
+        self.addCleanup(emulation.stop)
+        self.controller = RGB_Camera_Controller(camera_width=640, camera_height=480)
+        self.controller.Connect()
+
+    def tearDown(self):
+        self.controller.stop_continuous()
+        self.controller.release_camera()
+
+    def test_frames_from_ring_and_capture_in_between(self):
+        """Frames come from the ring, and a capture in between does not stop the grab."""
+        self.controller.start_continuous(ring_size=3)
+        start = time.time()
+        frame = self.controller.acquire_ring_frame(after=start)
+        self.assertIsNotNone(frame)
+        self.assertGreater(frame.host_time, start)
+        self.assertEqual(frame.image.shape[:2], (480, 640))
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            result = self.controller.capture_image(tmp_dir + os.sep, "c", count=2, image_format="raw")
+        self.assertEqual(result["count"], 2)
+
+        after_capture = time.time()
+        frame = self.controller.acquire_ring_frame(after=after_capture)
+        self.assertIsNotNone(frame)
+        self.assertIsNotNone(self.controller.acquire_image())
+
+
+if __name__ == "__main__":
+    unittest.main()
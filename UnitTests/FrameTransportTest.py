@@ -0,0 +1,156 @@
+"""
+Tests for returning frames in HTTP responses.
+
+The device test runs on pylon's camera emulation (PYLON_CAMEMU).
+"""
+
+import os
+import sys
+import time
+import unittest
+from unittest import mock
+
+import cv2
+import numpy as np
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import app as app_module
+from BussinessLayer.Frame_Transport import (
+    FRAME_BOUNDARY,
+    frame_encoder,
+    frame_headers,
+    multipart_frames,
+)
+from BussinessLayer.RGB_Camera_Controller import RGB_Camera_Controller
+
+META = {
+    "shape": [4, 6, 3],
+    "dtype": "uint8",
+    "pixel_format": "RGB8",
+    "camera_timestamp": 123,
+    "host_time": 1.5,
+}
+
+
+class FrameTransportTestCase(unittest.TestCase):
+    """Test case for the frame encoders and the multipart body."""
+
+    def setUp(self):
+        self.image = np.zeros((4, 6, 3), dtype=np.uint8)
+        self.image[:, :, 0] = 255
+
+    def test_raw_round_trip(self):
+        """Raw bytes and the headers rebuild the frame."""
+        headers = frame_headers(META)
+        payload = frame_encoder("raw")(self.image[:, ::1], "RGB8")
+        shape = [int(n) for n in headers["X-Frame-Shape"].split(",")]
+        rebuilt = np.frombuffer(payload, dtype=headers["X-Frame-Dtype"]).reshape(shape)
+        np.testing.assert_array_equal(rebuilt, self.image)
+
+    def test_jpeg_keeps_colors(self):
+        """RGB frames are reordered for OpenCV, so red stays red."""
+        payload = frame_encoder("jpeg", 95)(self.image, "RGB8")
+        decoded = cv2.imdecode(np.frombuffer(payload, np.uint8), cv2.IMREAD_COLOR)
+        self.assertGreater(decoded[2, 3, 2], 200)
+        self.assertLess(decoded[2, 3, 0], 50)
+
+    def test_unknown_encoding(self):
+        """Unsupported encodings are refused."""
+        with self.assertRaises(ValueError):
+            frame_encoder("gif")
+
+    def test_invalid_jpeg_quality(self):
+        """JPEG qualities that are not integers from 0 to 100 are refused."""
+        for quality in (101, -1, 90.5, "90", True):
+            with self.assertRaises(ValueError, msg=quality):
+                frame_encoder("jpeg", quality)
+
+    def test_multipart(self):
+        """Every frame becomes one part with its own headers."""
+        body = b"".join(multipart_frames([(b"abc", META), (b"defg", META)], "raw"))
+        parts = body.split(f"--{FRAME_BOUNDARY}".encode())
+        self.assertEqual(len(parts), 4)
+        self.assertIn(b"Content-Length: 4\r\n", parts[2])
+        self.assertIn(b"X-Frame-Camera-Timestamp: 123\r\n", parts[1])
+        self.assertTrue(parts[2].endswith(b"\r\n\r\ndefg\r\n"))
+        self.assertEqual(parts[3], b"--\r\n")
+
+
+class EmulatedReadFrameTestCase(unittest.TestCase):
+    """Frames read outside continuous mode on an emulated camera."""
+
+    def setUp(self):
+        emulation = mock.patch.dict(os.environ, {"PYLON_CAMEMU": "1"})
+        emulation.start()
+        self.addCleanup(emulation.stop)
+        self.controller = RGB_Camera_Controller(camera_width=320, camera_height=240)
+        self.controller.Connect()
+        self.addCleanup(self.controller.release_camera)
+        self.controller.camera = mock.Mock(wraps=self.controller.camera)
+
+    def test_after_restarts_a_stale_grab(self):
+        """A frame newer than 'after' is read from a new grab unless the buffer is newer already."""
+        encode = frame_encoder("raw")
+        _, meta = self.controller.read_frame(encode)
+        self.controller.read_frame(encode)
+        self.assertEqual(self.controller.camera.StartGrabbing.call_count, 1)
+
+        # Frames queued since the last read are newer than that read
+        _, meta = self.controller.read_frame(encode, after=meta["host_time"])
+        self.assertEqual(self.controller.camera.StartGrabbing.call_count, 1)
+
+        time.sleep(0.05)
+        after = time.time()
+        _, meta = self.controller.read_frame(encode, after=after)
+        self.assertEqual(self.controller.camera.StartGrabbing.call_count, 2)
+        self.assertGreater(meta["host_time"], after)
+
+
+class EmulatedFramesApiTestCase(unittest.TestCase):
+    """The /sensor/rgb/frames endpoint on an emulated camera in continuous mode."""
+
+    def setUp(self):
+        emulation = mock.patch.dict(os.environ, {"PYLON_CAMEMU": "1"})
+        emulation.start()
+        self.addCleanup(emulation.stop)
+        self.controller = RGB_Camera_Controller(camera_width=320, camera_height=240)
+        self.controller.Connect()
+        self.addCleanup(self.controller.release_camera)
+        self.controller.start_continuous(2)
+        self.addCleanup(self.controller.stop_continuous)
+        patches = [
+            mock.patch.object(app_module.drivers, "is_enabled", return_value=True),
+            mock.patch.object(
+                app_module, "get_shared_rgb_camera_controller", return_value=self.controller
+            ),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_frame_read_with_the_roi_applied(self):
+        """The ROI is applied and the frame read under the camera lock, in the new shape."""
+        read_frame = self.controller.read_frame
+        held = []
+
+        def locked_read_frame(*args, **kwargs):
+            held.append(self.controller.lock._is_owned())
+            return read_frame(*args, **kwargs)
+
+        client = app_module.app.test_client()
+        with mock.patch.object(self.controller, "read_frame", side_effect=locked_read_frame):
+            started = time.monotonic()
+            response = client.post(
+                "/sensor/rgb/frames", json={"roi": {"width": 160, "height": 120}}
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["X-Frame-Shape"].split(",")[:2], ["120", "160"])
+        self.assertEqual(held, [True])
+        # Reading under the lock must not wait for the continuous grab, which needs the lock
+        self.assertLess(time.monotonic() - started, 1.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
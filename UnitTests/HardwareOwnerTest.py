@@ -0,0 +1,161 @@
+"""
+Tests for the hardware-owner IPC channel.
+"""
+
+import os
+import stat
+import sys
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from flask import Flask, Response, jsonify, request
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import app as app_module
+from BussinessLayer.Hardware_Owner import (
+    SHARED_MEMORY_THRESHOLD,
+    Hardware_Owner_Client,
+    Hardware_Owner_Error,
+    Hardware_Owner_Server,
+)
+
+AUTHKEY = b"test-key"
+
+
+def make_owner_app(closed: threading.Event) -> Flask:
+    """Small app standing in for the device endpoints of the hardware owner."""
+    owner_app = Flask("owner")
+
+    @owner_app.route("/sensor/acoustic/state", methods=["GET", "POST"])
+    def state():
+        return jsonify({"pid": os.getpid(), "json": request.get_json(silent=True)})
+
+    @owner_app.route("/sensor/multispectral/frames", methods=["POST"])
+    def frame():
+        size = int(request.args.get("size", 0))
+        return Response(bytes(range(256)) * (size // 256), mimetype="application/octet-stream")
+
+    @owner_app.route("/sensor/rgb/preview")
+    def preview():
+        def stream():
+            try:
+                while True:
+                    yield b"x" * 16
+            finally:
+                closed.set()
+
+        return Response(stream(), mimetype="text/plain")
+
+    return owner_app
+
+
+class HardwareOwnerTestCase(unittest.TestCase):
+    """Test case for Hardware_Owner_Server, Hardware_Owner_Client and request forwarding."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.address = os.path.join(self.tmp.name, "owner.sock")
+        self.closed = threading.Event()
+        self.server = self.start_server()
+
+    def tearDown(self):
+        self.server.close()
+        self.tmp.cleanup()
+
+    def start_server(self) -> Hardware_Owner_Server:
+        server = Hardware_Owner_Server(
+            make_owner_app(self.closed).wsgi_app, self.address, AUTHKEY
+        )
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+    def test_request_roundtrip(self):
+        """Status, headers and body of the owner's response reach the worker."""
+        client = Hardware_Owner_Client(self.address, AUTHKEY)
+        status, headers, body = client.request(
+            "POST",
+            "/sensor/acoustic/state",
+            headers=[("Content-Type", "application/json")],
+            body=b'{"a": 1}',
+        )
+        self.assertEqual(status, "200 OK")
+        self.assertIn(("Content-Type", "application/json"), headers)
+        self.assertIn(b'"json":{"a":1}', b"".join(body).replace(b" ", b""))
+
+    def test_large_body_through_shared_memory(self):
+        """Chunks above the threshold arrive intact, also when the segment grows."""
+        client = Hardware_Owner_Client(self.address, AUTHKEY)
+        for size in (SHARED_MEMORY_THRESHOLD * 4, SHARED_MEMORY_THRESHOLD * 40):
+            _, _, body = client.request("POST", "/sensor/multispectral/frames", b"size=%d" % size)
+            payload = b"".join(body)
+            self.assertEqual(len(payload), size)
+            self.assertEqual(payload[:256], bytes(range(256)))
+
+    def test_abandoned_stream_is_closed(self):
+        """Closing an unfinished stream stops it in the owner and keeps the connection usable."""
+        client = Hardware_Owner_Client(self.address, AUTHKEY)
+        _, _, body = client.request("GET", "/sensor/rgb/preview")
+        next(body)
+        body.close()
+        self.assertTrue(self.closed.wait(5))
+
+        # A response that is never read is replaced by a fresh connection
+        client.request("GET", "/sensor/rgb/preview")
+        status, _, body = client.request("GET", "/sensor/acoustic/state")
+        self.assertEqual(status, "200 OK")
+        b"".join(body)
+
+    def test_owner_restart_and_authentication(self):
+        """Workers reconnect after a restart and wrong keys are rejected."""
+        client = Hardware_Owner_Client(self.address, AUTHKEY)
+        b"".join(client.request("GET", "/sensor/acoustic/state")[2])
+        self.server.close()
+        self.server = self.start_server()
+        status, _, body = client.request("GET", "/sensor/acoustic/state")
+        self.assertEqual(status, "200 OK")
+        b"".join(body)
+
+        with self.assertRaises(Exception):
+            Hardware_Owner_Client(self.address, b"wrong").request("GET", "/sensor/acoustic/state")
+
+    def test_api_forwards_device_routes(self):
+        """With an owner configured, only device endpoints are forwarded."""
+        with mock.patch.object(app_module.Config, "HARDWARE_OWNER_ADDRESS", self.address), \
+                mock.patch.object(app_module.Config, "HARDWARE_OWNER_AUTHKEY", AUTHKEY.decode()), \
+                mock.patch.object(app_module.Config, "MULTISPECTRAL_BACKEND", "simulated"), \
+                mock.patch.object(app_module, "_hardware_owner_client", None):
+            client = app_module.app.test_client()
+            response = client.get("/sensor/acoustic/state")
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.get_json()["pid"], os.getpid())
+
+            response = client.post("/sensor/multispectral/frames?size=1048576")
+            self.assertEqual(len(response.data), 1048576)
+
+            # Not a device endpoint: answered by the API itself
+            self.assertEqual(client.get("/health").get_json()["hardware_owner"], self.address)
+
+            self.server.close()
+            self.assertEqual(client.get("/sensor/acoustic/state").status_code, 503)
+
+    def test_socket_and_key(self):
+        """The socket is private to the owner's user and an empty key is refused."""
+        self.assertEqual(stat.S_IMODE(os.stat(self.address).st_mode), 0o600)
+        with self.assertRaises(ValueError):
+            Hardware_Owner_Client(self.address, b"")
+        with self.assertRaises(ValueError):
+            Hardware_Owner_Server(make_owner_app(self.closed).wsgi_app, self.address, b"")
+
+    def test_unknown_owner(self):
+        """A missing owner is reported as Hardware_Owner_Error."""
+        client = Hardware_Owner_Client(os.path.join(self.tmp.name, "missing.sock"), AUTHKEY)
+        with self.assertRaises(Hardware_Owner_Error):
+            client.request("GET", "/sensor/acoustic/state")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,170 @@
+"""
+Tests for the queue-based log writer.
+"""
+
+import json
+import logging
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from BussinessLayer import Log_Writer
+from BussinessLayer.Log_Writer import (
+    Deferred_Queue_Handler,
+    JSON_Formatter,
+    Sampling_Filter,
+    configure_logging,
+    parse_sampling,
+)
+
+
+class Lazy:
+    """Argument that counts how often it was formatted."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __str__(self):
+        self.calls += 1
+        return "lazy"
+
+
+class LogWriterTestCase(unittest.TestCase):
+    """Test case for Log_Writer."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = logging.getLogger()
+        self.saved = (self.root.handlers[:], self.root.level)
+        self.listener = None
+
+    def tearDown(self):
+        if self.listener is not None:
+            self.listener.stop()
+        for handler in self.root.handlers[:]:
+            self.root.removeHandler(handler)
+            handler.close()
+        handlers, level = self.saved
+        for handler in handlers:
+            self.root.addHandler(handler)
+        self.root.setLevel(level)
+        logging.getLogger("test.sampled").filters.clear()
+        self.tmp.cleanup()
+
+    def read_log(self, name="app.log"):
+        self.listener.stop()
+        self.listener = None
+        with open(os.path.join(self.tmp.name, name), encoding="utf-8") as f:
+            return f.read().splitlines()
+
+    def test_formatting_is_deferred_to_writer(self):
+        """The message is built by the writer thread, once, and not for filtered levels."""
+        handler = Deferred_Queue_Handler(None)
+        record = logging.makeLogRecord({"msg": "value %s", "args": (Lazy(),)})
+        self.assertIs(handler.prepare(record), record)
+        self.assertEqual(record.args[0].calls, 0)
+
+        self.listener = configure_logging(
+            logging.INFO,
+            "%(message)s",
+            log_file=os.path.join(self.tmp.name, "app.log"),
+            stderr=False,
+        )
+        skipped = Lazy()
+        logging.getLogger("test").debug("skipped %s", skipped)
+        logging.getLogger("test").info("value %s", Lazy())
+        self.assertEqual(self.read_log(), ["value lazy"])
+        self.assertEqual(skipped.calls, 0)
+
+    def test_json_records_with_extra_fields(self):
+        """JSON lines carry the message, level, logger and extra= fields."""
+        self.listener = configure_logging(
+            logging.INFO,
+            "",
+            log_file=os.path.join(self.tmp.name, "app.log"),
+            json_format=True,
+            stderr=False,
+        )
+        logging.getLogger("test").info("Captured %d frames", 3, extra={"job_id": "abc"})
+        record = json.loads(self.read_log()[0])
+        self.assertEqual(record["message"], "Captured 3 frames")
+        self.assertEqual(record["level"], "INFO")
+        self.assertEqual(record["logger"], "test")
+        self.assertEqual(record["job_id"], "abc")
+
+        try:
+            raise ValueError("broken")
+        except ValueError:
+            formatted = JSON_Formatter().format(
+                logging.makeLogRecord({"msg": "failed", "exc_info": sys.exc_info()})
+            )
+        self.assertIn("ValueError: broken", json.loads(formatted)["exception"])
+
+    def test_sampling(self):
+        """Debug records of sampled loggers are thinned out, warnings always pass."""
+        self.listener = configure_logging(
+            logging.DEBUG,
+            "%(levelname)s %(message)s",
+            log_file=os.path.join(self.tmp.name, "app.log"),
+            sampling=parse_sampling(" test.sampled=0.1 ,"),
+            stderr=False,
+        )
+        logger = logging.getLogger("test.sampled")
+        for i in range(100):
+            logger.debug("frame %d", i)
+        logger.warning("dropped frame")
+        lines = self.read_log()
+        self.assertEqual(len(lines), 11)
+        self.assertEqual(lines[1], "DEBUG frame 10")
+        self.assertEqual(lines[-1], "WARNING dropped frame")
+
+        with self.assertRaises(ValueError):
+            parse_sampling("test.sampled")
+        with self.assertRaises(ValueError):
+            parse_sampling("test.sampled=fast")
+        with self.assertRaises(ValueError):
+            Sampling_Filter(0)
+
+    def test_size_rotation(self):
+        """The log file is rotated at max_bytes and backup_count files are kept."""
+        self.listener = configure_logging(
+            logging.INFO,
+            "%(message)s",
+            log_file=os.path.join(self.tmp.name, "app.log"),
+            max_bytes=1000,
+            backup_count=2,
+            stderr=False,
+        )
+        for i in range(400):
+            logging.getLogger("test").info("line %03d", i)
+        lines = self.read_log()
+        self.assertEqual(lines[-1], "line 399")
+        self.assertEqual(
+            sorted(os.listdir(self.tmp.name)), ["app.log", "app.log.1", "app.log.2"]
+        )
+        self.assertLessEqual(os.path.getsize(os.path.join(self.tmp.name, "app.log.1")), 1000)
+
+    def test_reconfiguring_replaces_the_listener(self):
+        """A second call stops the first listener; the exit and fork hooks are registered once."""
+        log_file = os.path.join(self.tmp.name, "app.log")
+        with mock.patch.dict(Log_Writer._current, clear=True), mock.patch.object(
+            Log_Writer.atexit, "register"
+        ) as register_exit, mock.patch.object(Log_Writer.os, "register_at_fork") as register_fork:
+            first = configure_logging(logging.INFO, "%(message)s", log_file=log_file, stderr=False)
+            self.listener = configure_logging(
+                logging.INFO, "%(message)s", log_file=log_file, stderr=False
+            )
+            self.assertIsNone(first._thread)
+            self.assertIs(Log_Writer._current["listener"], self.listener)
+        register_exit.assert_called_once()
+        register_fork.assert_called_once()
+        self.assertEqual(self.listener.handlers[0].baseFilename, log_file)
+
+
+if __name__ == "__main__":
+    unittest.main()
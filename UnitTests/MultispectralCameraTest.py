@@ -0,0 +1,106 @@
+"""
+Tests for the multispectral camera controller and spectral cube storage.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import app as app_module
+from BussinessLayer.MultiSpectral_Camera_Controller import Multispectral_Camera_Controller
+from BussinessLayer.Multispectral_Backend import (
+    Simulated_Multispectral_Backend,
+    create_multispectral_backend,
+)
+from BussinessLayer.Spectral_Cube import Spectral_Cube_Reader
+
+WAVELENGTHS = [450.0, 550.0, 650.0, 850.0]
+
+
+class MultispectralCameraTestCase(unittest.TestCase):
+    """Test case for Multispectral_Camera_Controller on the simulated backend."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = self.tmp.name + "/"
+        backend = Simulated_Multispectral_Backend(
+            width=64, height=48, wavelengths=WAVELENGTHS, frame_rate=0
+        )
+        self.controller = Multispectral_Camera_Controller(backend)
+        self.controller.Connect()
+
+    def tearDown(self):
+        self.controller.release_camera()
+        self.tmp.cleanup()
+
+    def test_capture_cube(self):
+        """Frames are stored in one cube file and read back as memory-mapped views."""
+        result = self.controller.capture_cube(self.path, "cube", count=3)
+        self.assertTrue(result["success"])
+        self.assertEqual(result["count"], 3)
+        self.assertEqual(sorted(os.listdir(self.path)), ["cube.cube.json", "cube.cube.npy"])
+
+        reader = Spectral_Cube_Reader(result["storage"]["metadata_file"])
+        self.assertEqual(reader.frames(), [1, 2, 3])
+        frame = reader.read(2)
+        self.assertEqual(frame.shape, (4, 48, 64))
+        self.assertIsInstance(frame.base, np.memmap)
+        self.assertFalse(frame.flags.writeable)
+        self.assertFalse(np.array_equal(reader.read(1), frame))
+
+        nir = reader.band(1, wavelength=840)
+        red = reader.band(1, band=2)
+        # Vegetation on the left half reflects far more near infrared than red
+        self.assertGreater(nir[10, 5], 4 * red[10, 5])
+
+    def test_read_frame_bands(self):
+        """Selected bands are returned as raw bytes with their wavelengths."""
+        payload, meta = self.controller.read_frame(bands=[3, 0])
+        self.assertEqual(meta["shape"], [2, 48, 64])
+        self.assertEqual(meta["wavelengths"], [850.0, 450.0])
+        frame = np.frombuffer(payload, dtype=meta["dtype"]).reshape(meta["shape"])
+        self.assertGreater(int(frame[0, 0, 0]), int(frame[1, 0, 0]))
+
+        with self.assertRaises(ValueError):
+            self.controller.read_frame(bands=[4])
+        for bands in (3, "03", [True], [1.0]):
+            with self.assertRaises(ValueError, msg=bands):
+                self.controller.read_frame(bands=bands)
+
+    def test_acquire_view(self):
+        """Views of the reusable buffer are read-only."""
+        view = self.controller.acquire_cube(copy=False)
+        self.assertFalse(view.flags.writeable)
+        self.assertEqual(view.dtype, np.uint16)
+
+    def test_unknown_backend(self):
+        """Unknown backend names are rejected."""
+        with self.assertRaises(ValueError):
+            create_multispectral_backend("missing")
+
+
+class MultispectralFramesApiTestCase(unittest.TestCase):
+    """Test case for the /sensor/multispectral/frames endpoint."""
+
+    def test_invalid_count(self):
+        """Counts that are not positive integers, booleans included, are refused."""
+        client = app_module.app.test_client()
+        with mock.patch.object(app_module.drivers, "is_enabled", return_value=True), \
+                mock.patch.object(
+                    app_module, "get_shared_multispectral_camera_controller"
+                ) as get_controller:
+            for count in (True, False, 0, "2"):
+                response = client.post("/sensor/multispectral/frames", json={"count": count})
+                self.assertEqual(response.status_code, 400, count)
+            get_controller.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+"""
+Unit tests for the shared RGB live preview.
+
+The camera controller is replaced by a stub, so these tests run without hardware.
+"""
+
+import os
+import sys
+import threading
+import unittest
+
+import cv2
+import numpy as np
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from BussinessLayer.RGB_Preview_Streamer import RGB_Preview_Streamer
+
+
+class StubCameraController:
+    """Camera controller stand-in returning a synthetic frame."""
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.grabs = 0
+
+    def is_connected(self):
+        return True
+
+    def acquire_preview_frame(self, max_width=640, timeout_ms=1000):
+        self.grabs += 1
+        return np.full((480, 1280, 3), self.grabs % 255, dtype=np.uint8)
+
+
+class PreviewStreamerTestCase(unittest.TestCase):
+    """Test case for RGB_Preview_Streamer."""
+
+    def setUp(self):
+        """Create a streamer on top of the stub controller."""
+        self.controller = StubCameraController()
+        self.streamer = RGB_Preview_Streamer(
+            self.controller, max_width=320, max_fps=100.0, idle_timeout=0.1
+        )
+
+    def test_stream_yields_downscaled_jpeg_parts(self):
+        """Each chunk is a multipart JPEG part no wider than max_width."""
+        stream = self.streamer.stream()
+        chunk = next(stream)
+        stream.close()
+
+        header, _, body = chunk.partition(b"\r\n\r\n")
+        self.assertTrue(header.startswith(b"--frame\r\nContent-Type: image/jpeg"))
+        self.assertTrue(body.startswith(b"\xff\xd8"))
+
+        decoded = cv2.imdecode(np.frombuffer(body[:-2], np.uint8), cv2.IMREAD_COLOR)
+        self.assertEqual(decoded.shape[1], 320)
+
+    def test_viewers_share_encoded_frames(self):
+        """Two viewers receive frames from a single grab loop."""
+        first = self.streamer.stream()
+        second = self.streamer.stream()
+        next(first)
+        next(second)
+        self.assertEqual(self.streamer.stats()["viewers"], 2)
+        self.assertLessEqual(self.controller.grabs, 2)
+        first.close()
+        second.close()
+        self.assertEqual(self.streamer.stats()["viewers"], 0)
+
+    def test_grab_skipped_while_capture_holds_camera(self):
+        """The preview never waits for the camera lock."""
+        acquired = threading.Event()
+        release = threading.Event()
+
+        def hold_camera():
+            with self.controller.lock:
+                acquired.set()
+                release.wait(1)
+
+        holder = threading.Thread(target=hold_camera)
+        holder.start()
+        acquired.wait(1)
+        self.assertIsNone(self.streamer._grab_frame())
+        self.assertEqual(self.controller.grabs, 0)
+        release.set()
+        holder.join()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,158 @@
+"""
+Tests for conditional and compressed responses.
+"""
+
+import gzip
+import json
+import os
+import sys
+import unittest
+import zlib
+from unittest import mock
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import app as app_module
+from BussinessLayer.Response_Cache import Encoded_Body_Cache, Versioned_Cache
+
+
+class VersionedCacheTestCase(unittest.TestCase):
+    """Test case for Versioned_Cache."""
+
+    def test_version_follows_content(self):
+        """Refetching the same content keeps the version, different content changes it."""
+        cache = Versioned_Cache(ttl=60)
+        reads = iter([{"a": 1, "time": 1}, {"a": 1, "time": 2}, {"a": 2, "time": 3}])
+        fetch = mock.Mock(side_effect=lambda: next(reads))
+        significant = lambda value: value["a"]
+
+        self.assertIsNone(cache.version("key"))
+        value, version = cache.get("key", fetch, significant)
+        self.assertEqual(cache.get("key", fetch, significant), (value, version))
+        self.assertEqual(cache.version("key"), version)
+        self.assertEqual(fetch.call_count, 1)
+
+        cache.invalidate(lambda key: key == "key")
+        self.assertIsNone(cache.version("key"))
+        value, same_version = cache.get("key", fetch, significant)
+        self.assertEqual(value["time"], 2)
+        self.assertEqual(same_version, version)
+
+        cache.invalidate(lambda key: True)
+        _, new_version = cache.get("key", fetch, significant)
+        self.assertNotEqual(new_version, version)
+        self.assertEqual(fetch.call_count, 3)
+
+
+class EncodedBodyCacheTestCase(unittest.TestCase):
+    """Test case for Encoded_Body_Cache."""
+
+    def test_encodings_are_built_once(self):
+        """Large bodies are compressed once per encoding, small ones are not compressed."""
+        cache = Encoded_Body_Cache(max_bytes=1 << 20, min_compress_size=100)
+        payload = {"values": list(range(200))}
+        build = mock.Mock(return_value=payload)
+
+        body, encoding = cache.body("v1", "gzip", build)
+        self.assertEqual(encoding, "gzip")
+        self.assertEqual(json.loads(gzip.decompress(body)), payload)
+        self.assertEqual(cache.body("v1", "gzip", build), (body, "gzip"))
+        body, encoding = cache.body("v1", "deflate", build)
+        self.assertEqual(json.loads(zlib.decompress(body)), payload)
+        identity, encoding = cache.body("v1", "identity", build)
+        self.assertEqual(json.loads(identity), payload)
+        self.assertGreater(len(identity), len(body))
+        self.assertEqual(build.call_count, 1)
+
+        self.assertEqual(cache.body("small", "gzip", lambda: {"a": 1}), (b'{"a":1}\n', "identity"))
+
+    def test_byte_budget(self):
+        """The least recently used bodies are evicted to stay within the budget."""
+        cache = Encoded_Body_Cache(max_bytes=40)
+        cache.body("a", "identity", lambda: "a" * 15)
+        cache.body("b", "identity", lambda: "b" * 15)
+        cache.body("a", "identity", lambda: "unused")
+        cache.body("c", "identity", lambda: "c" * 15)
+        stats = cache.stats()
+        self.assertEqual(stats["entries"], 2)
+        self.assertLessEqual(stats["bytes"], 40)
+        self.assertEqual(cache.body("a", "identity", lambda: "rebuilt")[0], b'"' + b"a" * 15 + b'"\n')
+
+
+class ConditionalResponseApiTestCase(unittest.TestCase):
+    """Test case for the versioned GET endpoints."""
+
+    def setUp(self):
+        self.client = app_module.app.test_client()
+
+    def test_config_etag_and_compression(self):
+        """/config answers 304 to its ETag and gzip to clients accepting it."""
+        response = self.client.get("/config")
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers["ETag"]
+        self.assertTrue(etag.startswith('W/"config-'))
+        self.assertEqual(response.headers["Vary"], "Accept-Encoding")
+
+        response = self.client.get("/config", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b"")
+
+        response = self.client.get("/config", headers={"Accept-Encoding": "gzip, deflate"})
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        config = json.loads(gzip.decompress(response.data))["config"]
+        self.assertEqual(config["ADMIN_TOKEN"], "***REDACTED***")
+
+    def test_acoustic_config_not_modified_without_device_call(self):
+        """Fresh acoustic reads answer 304 without contacting the sensor until a command."""
+        sensor = mock.Mock()
+        sensor.GetConfiguration.return_value = {"channels": 4}
+        sensor.StopRecording.return_value = {"stopped": True}
+        cache = Versioned_Cache(ttl=60)
+        with mock.patch.object(app_module, "acoustic_cache", cache), \
+                mock.patch.object(app_module, "get_sensor_controller", return_value=sensor), \
+                mock.patch.object(app_module.drivers, "is_enabled", return_value=True):
+            response = self.client.get("/sensor/acoustic/config")
+            self.assertEqual(response.get_json(), {"config": {"channels": 4}})
+            etag = response.headers["ETag"]
+            sensor.Close.assert_called_once()
+            sensor.GetConfiguration.assert_called_once_with("config", "001", "all")
+
+            response = self.client.get("/sensor/acoustic/config", headers={"If-None-Match": etag})
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(sensor.GetConfiguration.call_count, 1)
+
+            self.client.post("/sensor/acoustic/stop", json={})
+            response = self.client.get("/sensor/acoustic/config", headers={"If-None-Match": etag})
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(sensor.GetConfiguration.call_count, 2)
+
+            sensor.GetConfiguration.return_value = {"channels": 8}
+            cache.invalidate(lambda key: True)
+            response = self.client.get("/sensor/acoustic/config", headers={"If-None-Match": etag})
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response.headers["ETag"], etag)
+
+    def test_acoustic_info_follows_the_sensor_clock(self):
+        """A read in which only the sensor time changed is served with the new time."""
+        sensor = mock.Mock()
+        sensor.GetSensors.return_value = {"sensors": ["A"]}
+        sensor.GetSystemTime.return_value = {"time_ns": 1}
+        cache = Versioned_Cache(ttl=60)
+        with mock.patch.object(app_module, "acoustic_cache", cache), \
+                mock.patch.object(app_module, "get_sensor_controller", return_value=sensor), \
+                mock.patch.object(app_module.drivers, "is_enabled", return_value=True):
+            response = self.client.get("/sensor/acoustic/info")
+            self.assertEqual(response.get_json()["time"], {"time_ns": 1})
+            etag = response.headers["ETag"]
+
+            sensor.GetSystemTime.return_value = {"time_ns": 2}
+            cache.invalidate(lambda key: True)
+            response = self.client.get("/sensor/acoustic/info", headers={"If-None-Match": etag})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.get_json()["time"], {"time_ns": 2})
+            self.assertNotEqual(response.headers["ETag"], etag)
+
+
+if __name__ == "__main__":
+    unittest.main()
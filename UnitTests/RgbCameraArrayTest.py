@@ -0,0 +1,171 @@
+"""
+Tests for parallel capture from several RGB cameras.
+
+The capture test runs on pylon's camera emulation (PYLON_CAMEMU) with two
+emulated cameras.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import app as app_module
+from BussinessLayer.RGB_Camera_Array_Controller import RGB_Camera_Array_Controller
+
+
+class StubGrabResult:
+    """Grab result of a camera of StubCameraArray."""
+
+    def __init__(self, context, succeeded=True, valid=True):
+        self.context = context
+        self.succeeded = succeeded
+        self.valid = valid
+        self.ErrorDescription = "" if succeeded else "Buffer incompletely grabbed"
+
+    def IsValid(self):
+        return self.valid
+
+    def GetCameraContext(self):
+        return self.context
+
+    def GrabSucceeded(self):
+        return self.succeeded
+
+    def Release(self):
+        pass
+
+
+class StubCameraArray:
+    """Camera array whose second camera never delivers a complete frame."""
+
+    def __init__(self, timeout_after=None):
+        self.retrieved = 0
+        self.timeout_after = timeout_after
+
+    def StartGrabbing(self):
+        pass
+
+    def StopGrabbing(self):
+        pass
+
+    def RetrieveResult(self, timeout, handling):
+        self.retrieved += 1
+        if self.timeout_after is not None and self.retrieved > self.timeout_after:
+            return StubGrabResult(0, valid=False)
+        context = self.retrieved % 2
+        return StubGrabResult(context, succeeded=context == 0)
+
+
+class EmulatedCameraArrayTestCase(unittest.TestCase):
+    """Capture from two emulated cameras."""
+
+    def setUp(self):
+        emulation = mock.patch.dict(os.environ, {"PYLON_CAMEMU": "2"})
+        emulation.start()
+        self.addCleanup(emulation.stop)
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def test_capture_from_every_camera(self):
+        """Every camera of the array saves count images."""
+        controller = RGB_Camera_Array_Controller(camera_width=320, camera_height=240)
+        self.assertEqual(len(controller.serial_numbers), 2)
+        controller.Connect()
+        try:
+            results = controller.capture_images(
+                self.directory.name + "/", "array", count=2, image_format="png"
+            )
+        finally:
+            controller.release_cameras()
+
+        self.assertEqual(set(results), set(controller.serial_numbers))
+        for serial, result in results.items():
+            self.assertTrue(result["success"])
+            self.assertEqual(result["count"], 2)
+            for filename in result["files"]:
+                self.assertIn(serial, filename)
+                self.assertTrue(os.path.isfile(filename))
+
+    def test_unknown_camera(self):
+        """Connecting to a camera that is not attached fails."""
+        controller = RGB_Camera_Array_Controller(["0815-0000", "missing"])
+        with self.assertRaises(RuntimeError):
+            controller.Connect()
+
+
+class FailingCameraArrayTestCase(unittest.TestCase):
+    """A camera that keeps failing does not hold up the capture."""
+
+    def capture(self, cameras):
+        controller = RGB_Camera_Array_Controller(["good", "bad"])
+        controller.cameras = cameras
+        with mock.patch(
+            "BussinessLayer.RGB_Camera_Controller.RGB_Camera_Controller.save_grab_result"
+        ):
+            return controller.capture_images("./", "array", count=3, max_failures=2)
+
+    def test_failing_camera_is_given_up(self):
+        """After max_failures failed grabs in a row the camera is reported as failed."""
+        results = self.capture(StubCameraArray())
+        self.assertFalse(results["bad"]["success"])
+        self.assertIn("2 times", results["bad"]["error"])
+        self.assertTrue(results["good"]["success"])
+        self.assertEqual(results["good"]["count"], 3)
+
+    def test_timeout_ends_the_capture(self):
+        """Without any frame within the timeout the unfinished cameras are reported as failed."""
+        results = self.capture(StubCameraArray(timeout_after=1))
+        self.assertIn("No frame", results["bad"]["error"])
+        self.assertIn("No frame", results["good"]["error"])
+
+
+class CameraArrayApiTestCase(unittest.TestCase):
+    """Test case for the /sensor/rgb/array/start endpoint."""
+
+    def setUp(self):
+        self.client = app_module.app.test_client()
+        patch = mock.patch.object(app_module.drivers, "is_enabled", return_value=True)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def test_invalid_request(self):
+        """Serial numbers that are not a list of strings and bad counts are refused."""
+        config = {"path": "./", "name": "array", "quality": 100, "image_format": "png"}
+        for serial_numbers in ("0815-0000", [1, 2], []):
+            response = self.client.post(
+                "/sensor/rgb/array/start", json={**config, "serial_numbers": serial_numbers}
+            )
+            self.assertEqual(response.status_code, 400)
+            self.assertIn("serial_numbers", response.get_json()["error"])
+
+        response = self.client.post(
+            "/sensor/rgb/array/start",
+            json={**config, "serial_numbers": ["0815-0000"], "count": 0},
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_invalid_image_options(self):
+        """Bad qualities and formats are refused before any camera is connected."""
+        config = {"path": "./", "name": "array", "serial_numbers": ["0815-0000"]}
+        with mock.patch(
+            "BussinessLayer.RGB_Camera_Array_Controller.RGB_Camera_Array_Controller.Connect"
+        ) as connect:
+            for invalid in (
+                {"quality": 101, "image_format": "png"},
+                {"quality": "100", "image_format": "png"},
+                {"quality": True, "image_format": "png"},
+                {"quality": 100, "image_format": "gif"},
+                {"quality": 100, "image_format": ["png"]},
+            ):
+                response = self.client.post("/sensor/rgb/array/start", json={**config, **invalid})
+                self.assertEqual(response.status_code, 400, invalid)
+            connect.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+"""
+Tests for the ROI, binning and decimation negotiation of the RGB camera.
+
+The device test runs on pylon's camera emulation (PYLON_CAMEMU).
+"""
+
+import os
+import sys
+import unittest
+from unittest import mock
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from BussinessLayer.RGB_Camera_Controller import RGB_Camera_Controller
+from data.RGB_camera import RGB_Camera_ROI, RGB_Camera_Snapshot
+
+
+def _snapshot(**values):
+    features = {
+        "Width": {"value": 1920, "min": 16, "max": 2448, "inc": 8},
+        "Height": {"value": 1080, "min": 16, "max": 2048, "inc": 2},
+        "OffsetX": {"value": 0, "min": 0, "max": 528, "inc": 4},
+        "OffsetY": {"value": 0, "min": 0, "max": 968, "inc": 2},
+        "SensorWidth": {"value": 2448},
+        "SensorHeight": {"value": 2048},
+        "BinningHorizontal": {"value": 1, "min": 1, "max": 4, "inc": 1},
+        "BinningVertical": {"value": 1, "min": 1, "max": 4, "inc": 1},
+    }
+    for name, value in values.items():
+        features[name]["value"] = value
+    return RGB_Camera_Snapshot(features=features)
+
+
+class RoiPlanTestCase(unittest.TestCase):
+    """Test case for RGB_Camera_Controller.plan_roi."""
+
+    def plan(self, snapshot=None, **roi):
+        return RGB_Camera_Controller.plan_roi(
+            RGB_Camera_ROI(**roi), snapshot or _snapshot(), 1920, 1080
+        )
+
+    def test_default_size_scales_with_binning(self):
+        """Without a size the configured size is divided by the binning factor."""
+        targets = self.plan(binning_horizontal=2, binning_vertical=2)
+        self.assertEqual(targets["Width"], 960)
+        self.assertEqual(targets["Height"], 540)
+        self.assertEqual(targets["BinningHorizontal"], 2)
+
+    def test_center(self):
+        """A centered region is aligned to the offset increment."""
+        targets = self.plan(width=800, height=600, center=True)
+        self.assertEqual(targets["OffsetX"], 824)
+        self.assertEqual(targets["OffsetY"], 724)
+
+    def test_limits_and_increments(self):
+        """Sizes and offsets outside the limits or off the increment are refused."""
+        with self.assertRaises(ValueError):
+            self.plan(width=804)
+        with self.assertRaises(ValueError):
+            self.plan(width=800, offset_x=1650)
+        with self.assertRaises(ValueError):
+            self.plan(width=800, offset_x=2)
+        with self.assertRaises(ValueError):
+            self.plan(width=1600, binning_horizontal=2)
+
+    def test_unsupported_decimation(self):
+        """Decimation on a camera without the feature is refused."""
+        with self.assertRaises(ValueError):
+            self.plan(decimation_horizontal=2)
+
+    def test_sensor_size_from_binned_maximum(self):
+        """Without SensorWidth the sensor size is derived from WidthMax and the current binning."""
+        snapshot = _snapshot(BinningHorizontal=2)
+        del snapshot.features["SensorWidth"]
+        snapshot.features["WidthMax"] = {"value": 1224}
+        self.assertEqual(self.plan(snapshot, width=2448)["Width"], 2448)
+
+
+class EmulatedRoiTestCase(unittest.TestCase):
+    """Apply ROI presets on an emulated camera."""
+
+    def setUp(self):
+        emulation = mock.patch.dict(os.environ, {"PYLON_CAMEMU": "1"})
+        emulation.start()
+        self.addCleanup(emulation.stop)
+        self.controller = RGB_Camera_Controller(camera_width=640, camera_height=480)
+        self.controller.Connect()
+
+    def tearDown(self):
+        self.controller.release_camera()
+
+    def test_only_changed_features_are_written(self):
+        """Switching presets writes the differing features only, in a valid order."""
+        first = self.controller.apply_roi(RGB_Camera_ROI(width=320, height=240, center=True))
+        self.assertEqual(first["changed"], ["Width", "OffsetX", "Height", "OffsetY"])
+
+        self.assertEqual(
+            self.controller.apply_roi(RGB_Camera_ROI(width=320, height=240, center=True))["changed"],
+            [],
+        )
+
+        second = self.controller.apply_roi(RGB_Camera_ROI(width=320, height=240))
+        self.assertEqual(second["changed"], ["OffsetX", "OffsetY"])
+
+        image = self.controller.acquire_image()
+        self.assertEqual(image.shape[:2], (240, 320))
+
+
+if __name__ == "__main__":
+    unittest.main()
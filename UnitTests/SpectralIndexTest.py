@@ -0,0 +1,158 @@
+"""
+Tests for the tiled spectral-index pipeline.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import app as app_module
+from BussinessLayer.MultiSpectral_Camera_Controller import Multispectral_Camera_Controller
+from BussinessLayer.Multispectral_Backend import Simulated_Multispectral_Backend
+from BussinessLayer.Spectral_Cube import Spectral_Cube_Reader
+from BussinessLayer.Spectral_Index import Band_Formula, Spectral_Index_Pipeline
+
+WAVELENGTHS = [450.0, 550.0, 670.0, 800.0]
+
+
+class SpectralIndexTestCase(unittest.TestCase):
+    """Test case for Band_Formula and Spectral_Index_Pipeline."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        controller = Multispectral_Camera_Controller(
+            Simulated_Multispectral_Backend(
+                width=50, height=37, wavelengths=WAVELENGTHS, frame_rate=0
+            )
+        )
+        controller.Connect()
+        cls.metadata_file = controller.capture_cube(cls.tmp.name + "/", "cube", count=3)[
+            "storage"
+        ]["metadata_file"]
+        controller.release_camera()
+        cls.cube = np.asarray(Spectral_Cube_Reader(cls.metadata_file).read(1), dtype=np.float64)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def test_ndvi_matches_full_computation(self):
+        """Tiles computed in parallel match the index of the whole frame."""
+        progress = []
+        result = Spectral_Index_Pipeline(workers=3, tile_rows=7).compute(
+            self.metadata_file, "NDVI", progress=lambda done, total: progress.append((done, total))
+        )
+        self.assertEqual(result["bands"], [2, 3])
+        self.assertEqual(result["tiles"], 3 * 6)
+        self.assertEqual(progress[-1], (18, 18))
+
+        index_map = np.load(result["index_file"], mmap_mode="r")
+        self.assertEqual(index_map.shape, (3, 37, 50))
+        nir, red = self.cube[3], self.cube[2]
+        np.testing.assert_allclose(index_map[0], (nir - red) / (nir + red), rtol=1e-5)
+        # Vegetation on the left, soil on the right
+        self.assertGreater(index_map[0, 0, 0], 0.5)
+        self.assertLess(index_map[0, 0, -1], 0.3)
+
+    def test_custom_formula(self):
+        """Custom formulas with constants and functions are evaluated per pixel."""
+        result = Spectral_Index_Pipeline(workers=2, tile_rows=10).compute(
+            self.metadata_file, "sqrt(b3) / (b0 + 1) - 2", name="ratio", frames=[1]
+        )
+        index_map = np.load(result["index_file"])
+        expected = np.sqrt(self.cube[3]) / (self.cube[0] + 1) - 2
+        np.testing.assert_allclose(index_map[0], expected, rtol=1e-5)
+        self.assertTrue(os.path.isfile(result["metadata_file"]))
+
+    def test_rejects_unsafe_input(self):
+        """Formulas are never executed as Python and names cannot leave the directory."""
+        for formula in ("__import__('os').system('true')", "b0.real", "b7", "1 + 2"):
+            with self.assertRaises(ValueError):
+                Band_Formula(formula, WAVELENGTHS)
+        with self.assertRaises(ValueError):
+            Spectral_Index_Pipeline().compute(self.metadata_file, "ndvi", name="../x")
+
+    def test_invalid_cube_files(self):
+        """Files that are not cube metadata are refused with ValueError."""
+        with self.assertRaises(ValueError):
+            Spectral_Index_Pipeline().compute(self.metadata_file[: -len(".json")], "ndvi")
+
+        broken = os.path.join(self.tmp.name, "broken.cube.json")
+        with open(broken, "w", encoding="utf-8") as f:
+            json.dump({"wavelengths": WAVELENGTHS}, f)
+        with self.assertRaises(ValueError):
+            Spectral_Index_Pipeline().compute(broken, "ndvi")
+
+    def test_failure_removes_the_partial_map(self):
+        """A computation that fails leaves neither the map nor its temporary file."""
+
+        def fail(done, total):
+            raise RuntimeError("disk full")
+
+        with self.assertRaises(RuntimeError):
+            Spectral_Index_Pipeline(workers=2, tile_rows=10).compute(
+                self.metadata_file, "ndvi", name="failed", progress=fail
+            )
+        self.assertEqual(
+            [name for name in os.listdir(self.tmp.name) if ".failed." in name], []
+        )
+
+    def test_scratch_reuse(self):
+        """Dead intermediate results share scratch buffers."""
+        formula = Band_Formula("(b0 - b1) / (b0 + b1) * (b2 - b3) / (b2 + b3)", WAVELENGTHS)
+        # Seven operations, two buffers
+        self.assertEqual(formula.registers, 2)
+
+        out = np.empty(self.cube.shape[1:], dtype=np.float32)
+        formula.evaluate(self.cube.astype(np.uint16), formula.scratch(out.shape), out)
+        b0, b1, b2, b3 = self.cube
+        np.testing.assert_allclose(out, (b0 - b1) / (b0 + b1) * (b2 - b3) / (b2 + b3), rtol=1e-5)
+
+
+class SpectralIndexApiTestCase(unittest.TestCase):
+    """Test case for capturing a cube and indexing it through the API."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        for name, value in (
+            ("DEFAULT_STORAGE_PATH", self.tmp.name),
+            ("MULTISPECTRAL_BACKEND", "simulated"),
+        ):
+            patch = mock.patch.object(app_module.Config, name, value)
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.client = app_module.app.test_client()
+
+    def test_captured_cube_can_be_indexed(self):
+        """Both endpoints resolve paths below the storage directory."""
+        response = self.client.post(
+            "/sensor/multispectral/start", json={"path": "field/run1", "name": "cube"}
+        )
+        self.assertEqual(response.status_code, 200)
+        cube = response.get_json()["data"]["cube"]
+        self.assertEqual(cube, os.path.join("field", "run1", "cube.cube.json"))
+
+        response = self.client.post(
+            "/sensor/multispectral/index", json={"cube": cube, "formula": "ndvi"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(os.path.isfile(response.get_json()["data"]["index_file"]))
+
+        response = self.client.post(
+            "/sensor/multispectral/start", json={"path": "../outside", "name": "cube"}
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
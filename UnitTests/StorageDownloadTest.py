@@ -0,0 +1,117 @@
+"""
+Tests for the storage listing and download endpoints.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app import app
+from config import Config
+
+
+class StorageDownloadTestCase(unittest.TestCase):
+    """Test case for /storage/files and /storage/list."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.outside = tempfile.TemporaryDirectory()
+        self.storage_path = Config.DEFAULT_STORAGE_PATH
+        Config.DEFAULT_STORAGE_PATH = self.tmp.name
+
+        os.makedirs(os.path.join(self.tmp.name, "run1"))
+        self.content = bytes(range(256)) * 4
+        with open(os.path.join(self.tmp.name, "run1", "frame_0.raw"), "wb") as f:
+            f.write(self.content)
+        with open(os.path.join(self.outside.name, "secret.txt"), "w") as f:
+            f.write("secret")
+        os.symlink(self.outside.name, os.path.join(self.tmp.name, "escape"))
+
+        self.client = app.test_client()
+
+    def tearDown(self):
+        Config.DEFAULT_STORAGE_PATH = self.storage_path
+        self.tmp.cleanup()
+        self.outside.cleanup()
+
+    def test_download(self):
+        """The whole file is returned with validators."""
+        response = self.client.get("/storage/files/run1/frame_0.raw")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, self.content)
+        self.assertIn("ETag", response.headers)
+        self.assertIn("Last-Modified", response.headers)
+        self.assertEqual(response.headers["Accept-Ranges"], "bytes")
+        response.close()
+
+    def test_range(self):
+        """A byte range returns 206 with only the requested bytes."""
+        response = self.client.get(
+            "/storage/files/run1/frame_0.raw", headers={"Range": "bytes=100-199"}
+        )
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.data, self.content[100:200])
+        self.assertEqual(response.headers["Content-Range"], f"bytes 100-199/{len(self.content)}")
+        response.close()
+
+    def test_conditional_get(self):
+        """A matching ETag returns 304 without a body."""
+        response = self.client.get("/storage/files/run1/frame_0.raw")
+        etag = response.headers["ETag"]
+        response.close()
+
+        response = self.client.get(
+            "/storage/files/run1/frame_0.raw", headers={"If-None-Match": etag}
+        )
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b"")
+        response.close()
+
+    def test_traversal(self):
+        """Paths leaving the storage directory are not served."""
+        for path in ("../secret.txt", "escape/secret.txt", "run1/../../secret.txt"):
+            response = self.client.get(f"/storage/files/{path}")
+            self.assertEqual(response.status_code, 404, path)
+        self.assertEqual(self.client.get("/storage/list/escape").status_code, 404)
+
+    def test_list(self):
+        """Directories are listed with sizes and download URLs, paged by offset/limit."""
+        data = self.client.get("/storage/list/run1").get_json()
+        self.assertEqual(data["total"], 1)
+        entry = data["entries"][0]
+        self.assertEqual(entry["name"], "frame_0.raw")
+        self.assertEqual(entry["size"], len(self.content))
+        self.assertEqual(entry["url"], "/storage/files/run1/frame_0.raw")
+
+        data = self.client.get("/storage/list?offset=1&limit=1").get_json()
+        self.assertEqual(data["total"], 2)
+        self.assertEqual([e["name"] for e in data["entries"]], ["run1"])
+
+    def test_list_skips_unreadable_entries_and_rejects_negative_paging(self):
+        """Dangling symlinks are left out and negative offsets or limits answer 400."""
+        os.symlink(
+            os.path.join(self.tmp.name, "missing"), os.path.join(self.tmp.name, "run1", "dangling")
+        )
+        data = self.client.get("/storage/list/run1").get_json()
+        self.assertEqual([e["name"] for e in data["entries"]], ["frame_0.raw"])
+
+        self.assertEqual(self.client.get("/storage/list?offset=-1").status_code, 400)
+        self.assertEqual(self.client.get("/storage/list?limit=-5").status_code, 400)
+
+    def test_x_sendfile(self):
+        """With USE_X_SENDFILE the file is left to the front server."""
+        with mock.patch.dict(app.config, {"USE_X_SENDFILE": True}):
+            response = self.client.get("/storage/files/run1/frame_0.raw")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["X-Sendfile"].endswith("frame_0.raw"))
+        self.assertEqual(response.data, b"")
+        response.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
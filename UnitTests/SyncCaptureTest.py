@@ -0,0 +1,163 @@
+"""
+Unit tests for synchronized RGB and acoustic capture.
+
+The camera and the ZDaemon are replaced by stubs, so these tests run without hardware.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+import unittest
+from unittest import mock
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import app as app_module
+from BussinessLayer.Sync_Capture_Controller import Sync_Capture_Controller, parse_sensor_time_ns
+
+# Sensor clock ahead of the host clock, in seconds
+SENSOR_OFFSET = 5.0
+
+
+class StubSensorController:
+    """ZDaemon stand-in whose clock runs SENSOR_OFFSET seconds ahead of the host."""
+
+    def __init__(self):
+        self.calls = []
+
+    def GetSystemTime(self, id):
+        self.calls.append("GetSystemTime")
+        sensor_ns = int((time.time() + SENSOR_OFFSET) * 1e9)
+        return json.dumps({"jsonrpc": "2.0", "id": id, "result": {"time_ns": sensor_ns}})
+
+    def StartRecording(self, id):
+        self.calls.append("StartRecording")
+        return '{"jsonrpc": "2.0", "result": {"status": 0}}'
+
+    def StopRecording(self, id):
+        self.calls.append("StopRecording")
+        return '{"jsonrpc": "2.0", "result": {"status": 0}}'
+
+
+class StubCameraController:
+    """Camera stand-in firing software triggers, optionally failing at a frame."""
+
+    def __init__(self, fail_at=None):
+        self.save_functions = {"png": None}
+        self.lock = threading.RLock()
+        self.fail_at = fail_at
+        self.fired = 0
+        self.disarmed = False
+
+    def arm_frame_trigger(self):
+        return True
+
+    def fire_frame_trigger(self, filename, quality=100, image_format="png"):
+        self.fired += 1
+        if self.fired == self.fail_at:
+            raise RuntimeError("Grab timed out")
+        now = time.time()
+        return {"file": filename, "trigger_host_time": now, "received_host_time": now}
+
+    def disarm_frame_trigger(self):
+        self.disarmed = True
+
+
+class SensorTimeParsingTestCase(unittest.TestCase):
+    """Test case for parse_sensor_time_ns."""
+
+    def test_exact_field(self):
+        """Only the configured field is read, not any key containing 'ns'."""
+        response = json.dumps({"result": {"sensors": 4, "time_ns": 1500000000}})
+        self.assertEqual(parse_sensor_time_ns(response), 1500000000)
+        self.assertIsNone(parse_sensor_time_ns(json.dumps({"result": {"sensors": 4}})))
+        self.assertEqual(
+            parse_sensor_time_ns(json.dumps({"result": {"hw_ns": 7}}), field="hw_ns"), 7
+        )
+
+    def test_invalid_responses(self):
+        """Malformed responses and non-numeric times give None."""
+        self.assertIsNone(parse_sensor_time_ns("not json"))
+        self.assertIsNone(parse_sensor_time_ns('{"error": {"code": 3}}'))
+        self.assertIsNone(parse_sensor_time_ns('{"result": {"time_ns": "now"}}'))
+        self.assertIsNone(parse_sensor_time_ns('{"result": {"time_ns": true}}'))
+
+
+class SyncCaptureTestCase(unittest.TestCase):
+    """Test case for Sync_Capture_Controller."""
+
+    def test_clock_offset(self):
+        """The sensor clock offset is measured and applied to the frame timestamps."""
+        sensor = StubSensorController()
+        controller = Sync_Capture_Controller(StubCameraController(), sensor, clock_samples=3)
+
+        clock = controller.measure_sensor_clock("001")
+        self.assertAlmostEqual(clock["offset"], SENSOR_OFFSET, delta=0.05)
+
+        result = controller.capture("./", "sync", count=2, image_format="png")
+        self.assertEqual(result["count"], 2)
+        self.assertAlmostEqual(result["clock"]["offset"], SENSOR_OFFSET, delta=0.05)
+        for frame in result["frames"]:
+            self.assertAlmostEqual(
+                frame["sensor_timestamp"] - frame["host_timestamp"],
+                result["clock"]["offset"],
+                delta=1e-6,
+            )
+        self.assertNotIn("StopRecording", sensor.calls)
+
+    def test_recording_stopped_when_camera_fails(self):
+        """A camera failure after StartRecording stops the recording again."""
+        sensor = StubSensorController()
+        camera = StubCameraController(fail_at=2)
+        controller = Sync_Capture_Controller(camera, sensor, clock_samples=1)
+
+        with self.assertRaises(RuntimeError):
+            controller.capture("./", "sync", count=3, image_format="png")
+        self.assertEqual(sensor.calls.count("StartRecording"), 1)
+        self.assertEqual(sensor.calls[-1], "StopRecording")
+        self.assertTrue(camera.disarmed)
+
+
+class SyncCaptureApiTestCase(unittest.TestCase):
+    """Test case for the /sensor/sync/start endpoint."""
+
+    def setUp(self):
+        self.client = app_module.app.test_client()
+        patches = [
+            mock.patch.object(app_module.drivers, "is_enabled", return_value=True),
+            mock.patch.object(
+                app_module, "get_default_rgb_camera_serial", return_value="0815-0000"
+            ),
+            mock.patch.object(app_module, "get_shared_rgb_camera_controller"),
+            mock.patch.object(app_module, "get_sensor_controller"),
+        ]
+        mocks = [patch.start() for patch in patches]
+        self.get_camera, self.get_sensor = mocks[2:]
+        for patch in patches:
+            self.addCleanup(patch.stop)
+
+    def test_invalid_parameters(self):
+        """Bad counts, periods, qualities and formats are refused before any device is used."""
+        config = {"path": "./", "name": "sync", "quality": 100, "image_format": "png"}
+        for invalid in (
+            {"count": "3"},
+            {"count": 0},
+            {"count": True},
+            {"period": -1},
+            {"period": "1"},
+            {"period": True},
+            {"quality": 101},
+            {"quality": "high"},
+            {"image_format": "gif"},
+        ):
+            response = self.client.post("/sensor/sync/start", json={**config, **invalid})
+            self.assertEqual(response.status_code, 400, invalid)
+        self.get_camera.assert_not_called()
+        self.get_sensor.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+"""
+Tests for the thumbnail pyramid and its cache.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+import cv2
+import numpy as np
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from BussinessLayer.Thumbnail_Service import (
+    Thumbnail_Cache,
+    Thumbnail_Service,
+    thumbnail_path,
+)
+
+
+class ThumbnailServiceTestCase(unittest.TestCase):
+    """Test case for Thumbnail_Service and Thumbnail_Cache."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.image_file = os.path.join(self.tmp.name, "frame_1.png")
+        image = np.zeros((540, 960, 3), dtype=np.uint8)
+        image[:, :480] = (0, 0, 255)
+        cv2.imwrite(self.image_file, image)
+        self.service = Thumbnail_Service(sizes=(64, 256))
+
+    def tearDown(self):
+        self.service.shutdown()
+        self.tmp.cleanup()
+
+    def test_background_pyramid(self):
+        """Submitted images get every pyramid level written next to them."""
+        written = self.service.submit(self.image_file).result(timeout=10)
+        self.assertEqual(written, [thumbnail_path(self.image_file, s) for s in (256, 64)])
+
+        thumbnail = cv2.imread(thumbnail_path(self.image_file, 64))
+        self.assertEqual(thumbnail.shape, (36, 64, 3))
+        self.assertGreater(thumbnail[18, 10, 2], 200)
+        self.assertIsNone(self.service.submit(os.path.join(self.tmp.name, "frame.npy")))
+
+    def test_get_uses_cache(self):
+        """Thumbnails are generated on demand once and then served from memory."""
+        data = self.service.get(self.image_file, 256)
+        self.assertEqual(cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR).shape, (144, 256, 3))
+
+        os.remove(thumbnail_path(self.image_file, 256))
+        self.assertEqual(self.service.get(self.image_file, 256), data)
+        self.assertGreaterEqual(self.service.cache.stats()["hits"], 1)
+
+        with self.assertRaises(ValueError):
+            self.service.get(self.image_file, 100)
+
+    def test_cache_budget(self):
+        """The least recently used entries are evicted beyond the byte budget."""
+        cache = Thumbnail_Cache(max_bytes=10)
+        cache.put(("a",), b"1234")
+        cache.put(("b",), b"1234")
+        cache.get(("a",))
+        cache.put(("c",), b"1234")
+        self.assertIsNone(cache.get(("b",)))
+        self.assertEqual(cache.get(("a",)), b"1234")
+        self.assertEqual(cache.stats()["bytes"], 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
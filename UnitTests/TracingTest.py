@@ -0,0 +1,174 @@
+"""
+Tests for request tracing and the sampling profiler.
+"""
+
+import os
+import sys
+import threading
+import time
+import unittest
+from unittest import mock
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import app as app_module
+from BussinessLayer import Tracing
+from BussinessLayer.Sampling_Profiler import Sampling_Profiler
+from BussinessLayer.Tracing import Tracer, server_timing, span
+
+
+def busy_loop(stop):
+    """Burns CPU in a recognizable function until stopped."""
+    while not stop.is_set():
+        sum(range(1000))
+
+
+class TracerTestCase(unittest.TestCase):
+    """Test case for Tracer and span()."""
+
+    def test_nested_spans_and_errors(self):
+        """Spans record their parent, duration and the exception that ended them."""
+        tracer = Tracer(history=10)
+        with tracer.trace("capture") as trace:
+            with span("rgb.open"):
+                with span("rgb.set_size", width=640):
+                    pass
+            with self.assertRaises(ValueError):
+                with span("rgb.save", frame=1):
+                    raise ValueError("disk full")
+
+        self.assertEqual([s.name for s in trace.spans], ["rgb.open", "rgb.set_size", "rgb.save"])
+        self.assertEqual(trace.spans[1].parent, 0)
+        self.assertIsNone(trace.spans[2].parent)
+        self.assertEqual(trace.spans[1].attributes, {"width": 640})
+        self.assertEqual(trace.spans[2].error, "ValueError: disk full")
+        self.assertGreaterEqual(trace.duration, trace.spans[0].duration)
+
+        # Outside of a trace spans are shared no-ops
+        self.assertIs(span("rgb.open"), span("rgb.save"))
+
+    def test_history_and_span_limit(self):
+        """Only the newest traces are kept and long traces drop spans beyond the limit."""
+        tracer = Tracer(history=2)
+        with mock.patch.object(Tracing, "MAX_SPANS", 3):
+            for name in ("a", "b", "c"):
+                with tracer.trace(name):
+                    for frame in range(5):
+                        with span("rgb.retrieve_result", frame=frame):
+                            pass
+
+        recent = tracer.recent()
+        self.assertEqual([trace["name"] for trace in recent], ["c", "b"])
+        self.assertEqual(recent[0]["dropped_spans"], 2)
+        self.assertEqual(recent[0]["summary"]["rgb.retrieve_result"]["count"], 3)
+        self.assertNotIn("spans", recent[0])
+        self.assertEqual(len(tracer.get(recent[0]["trace_id"])["spans"]), 3)
+        with self.assertRaises(KeyError):
+            tracer.get("missing")
+
+    def test_server_timing(self):
+        """Spans are aggregated per name into Server-Timing entries."""
+        tracer = Tracer(history=0)
+        with tracer.trace("capture") as trace:
+            for _ in range(2):
+                with span("zdaemon.call", method="GetSensors"):
+                    pass
+            with span("odd name!"):
+                pass
+
+        header = server_timing(trace)
+        self.assertRegex(header, r'^zdaemon\.call;dur=[\d.]+;desc="x2", odd_name_;dur=[\d.]+')
+        self.assertTrue(header.endswith(f"total;dur={trace.duration:.2f}"))
+        self.assertEqual(tracer.recent(), [])
+
+
+class SamplingProfilerTestCase(unittest.TestCase):
+    """Test case for Sampling_Profiler."""
+
+    def test_profile_finds_busy_function(self):
+        """A busy thread shows up with self samples; idle pool threads are left out."""
+        stop = threading.Event()
+        idle = threading.Event()
+        busy = threading.Thread(target=busy_loop, args=(stop,), name="busy")
+        waiting = threading.Thread(target=idle.wait, name="waiting")
+        busy.start()
+        waiting.start()
+        try:
+            report = Sampling_Profiler().profile(0.3, interval=0.002)
+        finally:
+            stop.set()
+            idle.set()
+            busy.join()
+            waiting.join()
+
+        self.assertGreater(report["rounds"], 10)
+        self.assertIn("busy", report["threads"])
+        self.assertNotIn("waiting", report["threads"])
+        functions = {f["function"].split(" ")[0]: f for f in report["functions"]}
+        self.assertGreater(functions["busy_loop"]["total"], 0)
+        self.assertTrue(any(line.startswith("busy;") for line in report["collapsed"]))
+
+    def test_one_profile_at_a_time(self):
+        """A second profile is rejected while one is running."""
+        profiler = Sampling_Profiler()
+        thread = threading.Thread(target=profiler.profile, args=(0.5,))
+        thread.start()
+        while not profiler.running:
+            time.sleep(0.01)
+        with self.assertRaises(RuntimeError):
+            profiler.profile(0.1)
+        thread.join()
+
+
+class TracingApiTestCase(unittest.TestCase):
+    """Test case for the trace headers and the /admin endpoints."""
+
+    def setUp(self):
+        self.client = app_module.app.test_client()
+        patch = mock.patch.object(app_module.Config, "ADMIN_TOKEN", "secret")
+        patch.start()
+        self.addCleanup(patch.stop)
+        self.auth = {"Authorization": "Bearer secret"}
+
+    def test_debug_header(self):
+        """Timings are attached only on request and the trace can be fetched."""
+        self.assertNotIn("Server-Timing", self.client.get("/health").headers)
+
+        response = self.client.get("/health", headers={"X-Debug-Trace": "1"})
+        self.assertIn("total;dur=", response.headers["Server-Timing"])
+        trace_id = response.headers["X-Trace-Id"]
+
+        trace = self.client.get(f"/admin/traces/{trace_id}", headers=self.auth).get_json()["trace"]
+        self.assertEqual(trace["name"], "GET /health")
+        self.assertEqual(trace["status"], 200)
+        traces = self.client.get("/admin/traces?limit=5", headers=self.auth).get_json()["traces"]
+        self.assertIn(trace_id, [t["trace_id"] for t in traces])
+        response = self.client.get("/admin/traces/missing", headers=self.auth)
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get("/admin/traces?limit=-1", headers=self.auth)
+        self.assertEqual(response.status_code, 400)
+
+    def test_admin_endpoints(self):
+        """The profile endpoint validates its parameters and honours ADMIN_TOKEN."""
+        for body in ({"seconds": 0}, {"seconds": "soon"}):
+            response = self.client.post("/admin/profile", json=body, headers=self.auth)
+            self.assertEqual(response.status_code, 400)
+        response = self.client.post(
+            "/admin/profile?seconds=0.1&format=collapsed", headers=self.auth
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, "text/plain")
+
+        self.assertEqual(self.client.get("/admin/traces").status_code, 401)
+        response = self.client.get("/admin/traces", headers={"Authorization": "Bearer wrong"})
+        self.assertEqual(response.status_code, 401)
+
+        # Without ADMIN_TOKEN the admin endpoints do not exist
+        with mock.patch.object(app_module.Config, "ADMIN_TOKEN", ""):
+            self.assertEqual(self.client.get("/admin/traces", headers=self.auth).status_code, 404)
+            self.assertEqual(self.client.post("/admin/profile").status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
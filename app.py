@@ -6,163 +6,1665 @@
 ## Documentation: https://medium.com/@asvinjangid.kumar/creating-your-own-api-in-python-a-beginners-guide-59f4dd18d301
 #################################################
 
+import contextlib
+import hashlib
+import hmac
+import json
 import logging
 import os
-
-from flask import Flask, Response, jsonify, request
+import signal
+import sys
+import threading
+import time
+import uuid
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+from flask import Flask, Response, g, jsonify, request, send_file, url_for
 from flask_cors import CORS
-
-from BussinessLayer.RGB_Camera_Controller import RGB_Camera_Controller
-from BussinessLayer.SensorController import SensorController
+from werkzeug.security import safe_join
+
+from BussinessLayer.Batch_Runner import Batch_Runner, Batch_Session
+from BussinessLayer.Device_Scheduler import BULK, INTERACTIVE, Device_Busy_Error, Device_Scheduler
+from BussinessLayer.Driver_Registry import Driver_Disabled_Error, Driver_Registry
+from BussinessLayer.Log_Writer import configure_logging, parse_sampling
+from BussinessLayer.Response_Cache import ENCODINGS, Encoded_Body_Cache, Versioned_Cache
+from BussinessLayer.Tracing import Tracer, server_timing, span
 from config import Config
-
-# Set up logging
-logging.basicConfig(
+from data.Batch import Batch_Step
+from data.Capture_job import Capture_Job
+from data.Capture_schedule import Interval_Capture_Job
+from data.RGB_camera import RGB_Camera_ROI, RGB_Camera_Snapshot
+
+# Device drivers and the libraries behind them (pylon, OpenCV, NumPy) are
+# imported on first use through the driver registry, not at startup
+if TYPE_CHECKING:
+    from BussinessLayer.Bayer_Storage import Bayer_Demosaic_Pool
+    from BussinessLayer.Capture_Job_Manager import Capture_Job_Manager
+    from BussinessLayer.Capture_Scheduler import Capture_Scheduler
+    from BussinessLayer.Hardware_Owner import Hardware_Owner_Client
+    from BussinessLayer.MultiSpectral_Camera_Controller import Multispectral_Camera_Controller
+    from BussinessLayer.RGB_Camera_Controller import RGB_Camera_Controller
+    from BussinessLayer.RGB_Preview_Streamer import RGB_Preview_Streamer
+    from BussinessLayer.Sampling_Profiler import Sampling_Profiler
+    from BussinessLayer.SensorController import SensorController
+    from BussinessLayer.Thumbnail_Service import Thumbnail_Service
+
+# Set up logging; records are written by a background thread, not in the request
+configure_logging(
     level=Config.get_log_level(),
-    format=Config.LOG_FORMAT,
-    handlers=[logging.StreamHandler(), logging.FileHandler("app.log")],
+    fmt=Config.LOG_FORMAT,
+    log_file=Config.LOG_FILE or None,
+    max_bytes=Config.LOG_MAX_BYTES,
+    backup_count=Config.LOG_BACKUP_COUNT,
+    rotate_when=Config.LOG_ROTATE_WHEN or None,
+    json_format=Config.LOG_JSON,
+    sampling=parse_sampling(Config.LOG_SAMPLING),
 )
 logger = logging.getLogger(__name__)
 
 # Create Flask application
 app = Flask(__name__)
 app.config.from_object(Config)
+# send_file only reads the setting from the Flask config
+app.config["USE_X_SENDFILE"] = Config.USE_X_SENDFILE
 CORS(app)  # Enable CORS for all routes
 
 # Create data directory if it doesn't exist
 os.makedirs(Config.DEFAULT_STORAGE_PATH, exist_ok=True)
 
+# Neither the hardware owner nor its workers run with a key anyone could know
+if Config.HARDWARE_OWNER_ADDRESS and not Config.HARDWARE_OWNER_AUTHKEY:
+    raise SystemExit("HARDWARE_OWNER_AUTHKEY must be set when HARDWARE_OWNER_ADDRESS is set")
+
+drivers = Driver_Registry(Config.ENABLED_DRIVERS, Config)
+logger.info("Enabled drivers: %s", ", ".join(drivers.enabled) or "none")
+for driver_name in drivers.enabled:
+    missing_settings = drivers.missing_settings(driver_name)
+    if missing_settings:
+        logger.warning(
+            "The %s driver is unusable until %s is set", driver_name, ", ".join(missing_settings)
+        )
+
+tracer = Tracer(Config.TRACE_HISTORY)
+# Request header asking for the span timings in the Server-Timing response header
+TRACE_HEADER = "X-Debug-Trace"
+
+# Endpoint prefixes and the drivers they need
+_route_drivers = {
+    "/sensor/rgb/": ("rgb",),
+    "/sensor/multispectral/": ("multispectral",),
+    "/sensor/acoustic/": ("acoustic",),
+    "/sensor/sync/": ("rgb", "acoustic"),
+    "/scheduler/": ("rgb",),
+    # Capture jobs check the driver of their type
+    "/jobs": (),
+    "/metrics/devices": (),
+    # Batches check the drivers of their steps
+    "/batch": (),
+}
+
+# Endpoints under those prefixes that do not touch a device and run in any worker
+_local_routes = ("/sensor/multispectral/index",)
+
+# Device requests are admitted one at a time per physical device
+device_scheduler = Device_Scheduler(
+    max_waiting=Config.DEVICE_QUEUE_LIMIT,
+    max_waiting_per_client=Config.DEVICE_QUEUE_CLIENT_LIMIT,
+    timeout=Config.DEVICE_QUEUE_TIMEOUT,
+)
+
+# Encoded bodies of versioned GET responses, and acoustic sensor reads behind them
+response_cache = Encoded_Body_Cache(Config.RESPONSE_CACHE_BYTES, Config.COMPRESS_MIN_SIZE)
+acoustic_cache = Versioned_Cache(Config.ACOUSTIC_CACHE_TTL)
+# Content versions are counted per process, so their ETags carry the process identity
+_PROCESS_ETAG = uuid.uuid4().hex[:12]
+_config_etag: Optional[str] = None
+
+# Each camera is a single physical device, so requests share one controller per camera
+_shared_rgb_camera_controllers: Dict[str, "RGB_Camera_Controller"] = {}
+_default_rgb_camera_serial: Optional[str] = Config.DEFAULT_RGB_CAMERA_SERIAL
+_rgb_preview_streamer: Optional["RGB_Preview_Streamer"] = None
+_capture_scheduler: Optional["Capture_Scheduler"] = None
+_capture_job_manager: Optional["Capture_Job_Manager"] = None
+_bayer_demosaic_pool: Optional["Bayer_Demosaic_Pool"] = None
+_thumbnail_service: Optional["Thumbnail_Service"] = None
+_multispectral_camera_controller: Optional["Multispectral_Camera_Controller"] = None
+_hardware_owner_client: Optional["Hardware_Owner_Client"] = None
+_sampling_profiler: Optional["Sampling_Profiler"] = None
+# Set in the hardware-owner process, which handles device requests itself
+_is_hardware_owner = False
+_shared_rgb_lock = threading.Lock()
+
+
+def get_sensor_controller(ip: str, port: int) -> "SensorController":
+    """
+    Creates and returns a SensorController instance.
+
+    Args:
+        ip (str): The IP address of the sensor
+        port (int): The port to connect to
+
+    Returns:
+        SensorController: A configured SensorController instance
+    """
+    try:
+        controller = drivers.load("acoustic").SensorController(ip, port)
+        controller.Connect()
+        return controller
+    except Exception as e:
+        logger.error("Failed to create SensorController: %s", e)
+        raise
+
+
+def get_rgb_camera_controller(
+    serial_number: Optional[str] = None,
+) -> "RGB_Camera_Controller":
+    """
+    Creates and returns an RGB_Camera_Controller instance.
+
+    Args:
+        serial_number (Optional[str]): Serial number of the camera, None for the first camera found
+
+    Returns:
+        RGB_Camera_Controller: A configured RGB_Camera_Controller instance
+    """
+    try:
+        return drivers.load("rgb").RGB_Camera_Controller(
+            camera_width=Config.DEFAULT_RGB_CAMERA_WIDTH,
+            camera_height=Config.DEFAULT_RGB_CAMERA_HEIGHT,
+            camera_format=Config.DEFAULT_RGB_CAMERA_FORMAT,
+            serial_number=serial_number,
+            snapshot_interval=Config.RGB_SNAPSHOT_INTERVAL,
+        )
+    except Exception as e:
+        logger.error("Failed to create RGB_Camera_Controller: %s", e)
+        raise
+
+
+def get_default_rgb_camera_serial() -> str:
+    """
+    Returns the serial number of the default RGB camera.
+
+    The configured default, or else the first camera found, resolved once
+    so the default camera is shared with requests naming its serial.
+
+    Returns:
+        str: Serial number of the default camera
+
+    Raises:
+        RuntimeError: If no camera is found
+    """
+    global _default_rgb_camera_serial
+    with _shared_rgb_lock:
+        if _default_rgb_camera_serial is None:
+            devices = drivers.load("rgb").RGB_Camera_Controller.enumerate_devices()
+            if not devices:
+                raise RuntimeError("Camera connection failed: no camera found")
+            _default_rgb_camera_serial = devices[0]["serial_number"]
+        return _default_rgb_camera_serial
+
+
+def get_shared_rgb_camera_controller(
+    serial_number: Optional[str] = None,
+) -> "RGB_Camera_Controller":
+    """
+    Returns the connected RGB_Camera_Controller shared by all requests for one camera.
+
+    The controller is created and connected on first use and reconnected if
+    the camera was closed in the meantime. Without a serial number the
+    configured default camera (or the first camera found) is used.
+
+    Args:
+        serial_number (Optional[str]): Serial number of the camera
+
+    Returns:
+        RGB_Camera_Controller: The shared, connected RGB_Camera_Controller
+    """
+    if serial_number is None:
+        serial_number = get_default_rgb_camera_serial()
+    with _shared_rgb_lock:
+        controller = _shared_rgb_camera_controllers.get(serial_number)
+        if controller is None:
+            controller = get_rgb_camera_controller(serial_number)
+            _shared_rgb_camera_controllers[serial_number] = controller
+        if not controller.is_connected():
+            controller.Connect()
+            if Config.RGB_CONTINUOUS_GRAB:
+                controller.start_continuous(Config.RGB_RING_SIZE)
+        return controller
+
+
+def get_shared_multispectral_camera_controller() -> "Multispectral_Camera_Controller":
+    """
+    Returns the connected Multispectral_Camera_Controller shared by all requests.
+
+    The backend is selected by MULTISPECTRAL_BACKEND. The controller is
+    created and connected on first use and reconnected if it was released.
+
+    Returns:
+        Multispectral_Camera_Controller: The shared, connected controller
+    """
+    global _multispectral_camera_controller
+    with _shared_rgb_lock:
+        if _multispectral_camera_controller is None:
+            backends = drivers.load("multispectral", "BussinessLayer.Multispectral_Backend")
+            backend = backends.create_multispectral_backend(
+                Config.MULTISPECTRAL_BACKEND,
+                width=Config.MULTISPECTRAL_WIDTH,
+                height=Config.MULTISPECTRAL_HEIGHT,
+                wavelengths=Config.MULTISPECTRAL_WAVELENGTHS,
+            )
+            _multispectral_camera_controller = drivers.load(
+                "multispectral"
+            ).Multispectral_Camera_Controller(backend)
+        if not _multispectral_camera_controller.is_connected():
+            _multispectral_camera_controller.Connect()
+        return _multispectral_camera_controller
+
+
+def get_rgb_preview_streamer() -> "RGB_Preview_Streamer":
+    """
+    Returns the RGB_Preview_Streamer shared by all preview viewers.
+
+    Returns:
+        RGB_Preview_Streamer: The shared preview streamer
+    """
+    global _rgb_preview_streamer
+    controller = get_shared_rgb_camera_controller()
+    with _shared_rgb_lock:
+        if _rgb_preview_streamer is None:
+            preview = drivers.load("rgb", "BussinessLayer.RGB_Preview_Streamer")
+            _rgb_preview_streamer = preview.RGB_Preview_Streamer(
+                controller,
+                max_width=Config.PREVIEW_MAX_WIDTH,
+                jpeg_quality=Config.PREVIEW_JPEG_QUALITY,
+                max_fps=Config.PREVIEW_MAX_FPS,
+            )
+        return _rgb_preview_streamer
+
+
+def get_capture_scheduler() -> "Capture_Scheduler":
+    """
+    Returns the running Capture_Scheduler, starting it on first use.
+
+    Returns:
+        Capture_Scheduler: The shared capture scheduler
+    """
+    global _capture_scheduler
+    with _shared_rgb_lock:
+        if _capture_scheduler is None:
+            scheduler = drivers.load("rgb", "BussinessLayer.Capture_Scheduler")
+            _capture_scheduler = scheduler.Capture_Scheduler(
+                Config.SCHEDULER_STATE_FILE, get_shared_rgb_camera_controller
+            )
+            _capture_scheduler.start()
+        return _capture_scheduler
+
+
+def get_capture_job_manager() -> "Capture_Job_Manager":
+    """
+    Returns the manager running background capture jobs.
+
+    Returns:
+        Capture_Job_Manager: The shared capture job manager
+    """
+    from BussinessLayer.Capture_Job_Manager import Capture_Job_Manager
+
+    global _capture_job_manager
+    with _shared_rgb_lock:
+        if _capture_job_manager is None:
+            _capture_job_manager = Capture_Job_Manager(
+                workers=Config.CAPTURE_JOB_WORKERS,
+                history=Config.CAPTURE_JOB_HISTORY,
+                tracer=tracer,
+            )
+        return _capture_job_manager
+
+
+def get_sampling_profiler() -> "Sampling_Profiler":
+    """
+    Returns the sampling profiler behind POST /admin/profile.
+
+    Returns:
+        Sampling_Profiler: The shared profiler
+    """
+    from BussinessLayer.Sampling_Profiler import Sampling_Profiler
+
+    global _sampling_profiler
+    with _shared_rgb_lock:
+        if _sampling_profiler is None:
+            _sampling_profiler = Sampling_Profiler()
+        return _sampling_profiler
+
+
+def get_bayer_demosaic_pool() -> "Bayer_Demosaic_Pool":
+    """
+    Returns the process pool demosaicing stored Bayer sequences.
+
+    Returns:
+        Bayer_Demosaic_Pool: The shared demosaicing pool
+    """
+    global _bayer_demosaic_pool
+    with _shared_rgb_lock:
+        if _bayer_demosaic_pool is None:
+            bayer = drivers.load("rgb", "BussinessLayer.Bayer_Storage")
+            _bayer_demosaic_pool = bayer.Bayer_Demosaic_Pool(Config.BAYER_DEMOSAIC_WORKERS)
+        return _bayer_demosaic_pool
+
+
+def get_thumbnail_service() -> "Thumbnail_Service":
+    """
+    Returns the service generating and caching thumbnails of captured images.
+
+    Returns:
+        Thumbnail_Service: The shared thumbnail service
+    """
+    from BussinessLayer.Thumbnail_Service import Thumbnail_Service
+
+    global _thumbnail_service
+    with _shared_rgb_lock:
+        if _thumbnail_service is None:
+            _thumbnail_service = Thumbnail_Service(
+                sizes=Config.THUMBNAIL_SIZES,
+                workers=Config.THUMBNAIL_WORKERS,
+                cache_bytes=Config.THUMBNAIL_CACHE_MB * 1024 * 1024,
+            )
+        return _thumbnail_service
+
+
+def get_hardware_owner_client() -> "Hardware_Owner_Client":
+    """
+    Returns the client forwarding device requests to the hardware-owner process.
+
+    Returns:
+        Hardware_Owner_Client: The shared client of this worker
+    """
+    from BussinessLayer.Hardware_Owner import Hardware_Owner_Client
+
+    global _hardware_owner_client
+    with _shared_rgb_lock:
+        if _hardware_owner_client is None:
+            _hardware_owner_client = Hardware_Owner_Client(
+                Config.HARDWARE_OWNER_ADDRESS, Config.HARDWARE_OWNER_AUTHKEY.encode()
+            )
+        return _hardware_owner_client
+
+
+@app.route("/")
+def hello_world() -> str:
+    """
+    Root endpoint for the API.
+
+    Returns:
+        str: A greeting message
+    """
+    return "<p>Hello, World! Welcome to the ASS/NSS API</p>"
+
+
+@app.route("/health")
+def health_check() -> Response:
+    """
+    Health check endpoint for the API.
+
+    Returns:
+        Response: JSON response with health status
+    """
+    return jsonify(
+        {
+            "status": "ok",
+            "environment": os.environ.get("FLASK_ENV", "development"),
+            "drivers": drivers.status(),
+            "hardware_owner": Config.HARDWARE_OWNER_ADDRESS or None,
+        }
+    )
+
+
+def _trace_requested() -> bool:
+    return request.headers.get(TRACE_HEADER, "").lower() in ("1", "true", "yes")
+
+
+@app.before_request
+def start_trace() -> None:
+    """
+    Start tracing the request.
+
+    Every request is traced while TRACE_HISTORY is above 0; otherwise only
+    requests sending the X-Debug-Trace header are.
+    """
+    if Config.TRACE_HISTORY > 0 or _trace_requested():
+        g.trace = tracer.start(f"{request.method} {request.path}")
+
+
+@app.after_request
+def finish_trace(response: Response) -> Response:
+    """
+    Finish the trace of the request and, if asked for, attach its timings.
+
+    With X-Debug-Trace: 1 the response carries the spans aggregated by name
+    in a Server-Timing header and the trace ID in X-Trace-Id. Streamed
+    bodies (previews, frames, job events) are traced up to their headers.
+
+    Args:
+        response (Response): The response
+
+    Returns:
+        Response: The response with the trace headers added if requested
+    """
+    active = g.pop("trace", None)
+    if active is not None:
+        trace, tokens = active
+        tracer.finish(trace, tokens, response.status_code)
+        if _trace_requested():
+            # Forwarded responses already carry the timings of the hardware owner
+            response.headers.add("Server-Timing", server_timing(trace))
+            response.headers.setdefault("X-Trace-Id", trace.trace_id)
+    return response
+
+
+@app.teardown_request
+def discard_trace(error: Optional[BaseException]) -> None:
+    """Finish the trace of a request that ended without a response."""
+    active = g.pop("trace", None)
+    if active is not None:
+        tracer.finish(*active, status=500)
+
+
+@app.before_request
+def require_admin_token() -> Optional[Response]:
+    """
+    Reject /admin requests without the bearer token.
+
+    The admin endpoints expose traces and the profiler, so they are
+    disabled unless ADMIN_TOKEN is set.
+
+    Returns:
+        Optional[Response]: 404 JSON response without ADMIN_TOKEN, 401 without the
+        token, or None to handle the request
+    """
+    if not request.path.startswith("/admin/"):
+        return None
+    if not Config.ADMIN_TOKEN:
+        return jsonify({"error": "Admin endpoints are disabled; set ADMIN_TOKEN"}), 404
+    expected = f"Bearer {Config.ADMIN_TOKEN}"
+    if not hmac.compare_digest(request.headers.get("Authorization", ""), expected):
+        return jsonify({"error": "Admin token required"}), 401
+    return None
+
+
+@app.before_request
+def require_drivers() -> Optional[Response]:
+    """
+    Reject requests for devices whose driver is not enabled on this node.
+
+    Returns:
+        Optional[Response]: 503 JSON response, or None to handle the request
+    """
+    for prefix, names in _route_drivers.items():
+        if request.path.startswith(prefix):
+            disabled = [name for name in names if not drivers.is_enabled(name)]
+            if disabled:
+                return (
+                    jsonify({"error": f"Driver not enabled on this node: {', '.join(disabled)}"}),
+                    503,
+                )
+    return None
+
+
+@app.before_request
+def forward_device_requests() -> Optional[Response]:
+    """
+    Forward device requests to the hardware-owner process if one is configured.
+
+    Only the hardware owner opens cameras and sensors, so any number of
+    worker processes can serve the API while device access stays exclusive.
+    The response is streamed back; frames arrive through shared memory.
+
+    Returns:
+        Optional[Response]: The owner's response, a 503 JSON response if it cannot
+        be reached, or None to handle the request in this process
+    """
+    if not Config.HARDWARE_OWNER_ADDRESS or _is_hardware_owner:
+        return None
+    # Admin endpoints describe this worker unless the owner is asked for
+    to_owner = request.path.startswith("/admin/") and request.args.get("process") == "owner"
+    if not to_owner and (
+        request.path in _local_routes or not request.path.startswith(tuple(_route_drivers))
+    ):
+        return None
+
+    try:
+        with span("hardware_owner.request"):
+            status, headers, body = get_hardware_owner_client().request(
+                request.method,
+                request.path,
+                request.query_string,
+                list(request.headers.items()),
+                request.get_data(),
+                request.remote_addr,
+            )
+    except Exception as e:
+        logger.error("Error forwarding %s to the hardware owner: %s", request.path, e)
+        return jsonify({"error": str(e)}), 503
+    return Response(body, status=status, headers=headers, direct_passthrough=True)
+
+
+def _request_data() -> Dict[str, Any]:
+    data = request.get_json(silent=True)
+    if data is not None and not isinstance(data, dict):
+        raise ValueError("The JSON body must be an object")
+    return data or request.args or request.form or {}
+
+
+def _rgb_device() -> str:
+    return f"rgb:{_request_data().get('serial_number') or get_default_rgb_camera_serial()}"
+
+
+def _rgb_array_serials(data: Dict[str, Any]) -> List[str]:
+    serial_numbers = data.get("serial_numbers")
+    if serial_numbers is None:
+        return [
+            device["serial_number"]
+            for device in drivers.load("rgb").RGB_Camera_Controller.enumerate_devices()
+        ]
+    if (
+        not isinstance(serial_numbers, list)
+        or not serial_numbers
+        or not all(isinstance(serial, str) for serial in serial_numbers)
+    ):
+        raise ValueError("serial_numbers must be a non-empty list of strings")
+    return serial_numbers
+
+
+def _rgb_save_options(config: Dict[str, Any]) -> Tuple[int, str]:
+    quality = config["quality"]
+    if isinstance(quality, bool) or not isinstance(quality, int) or not 0 <= quality <= 100:
+        raise ValueError("quality must be an integer between 0 and 100")
+    image_format = config["image_format"]
+    formats = drivers.load("rgb").RGB_Camera_Controller.save_functions
+    if not isinstance(image_format, str) or image_format not in formats:
+        raise ValueError(f"image_format must be one of: {', '.join(formats)}")
+    return quality, image_format
+
+
+def _rgb_array_devices() -> List[str]:
+    return [f"rgb:{serial_number}" for serial_number in _rgb_array_serials(_request_data())]
+
+
+def _acoustic_device() -> str:
+    data = _request_data()
+    if "ip" in data and "port" in data:
+        return f"acoustic:{data['ip']}:{data['port']}"
+    return f"acoustic:{Config.DEFAULT_SENSOR_IP}:{Config.DEFAULT_SENSOR_PORT}"
+
+
+def _request_client() -> str:
+    return request.headers.get("X-Client-Id") or request.remote_addr or ""
+
+
+def _busy_response(error: Device_Busy_Error) -> Response:
+    response = jsonify(
+        {"error": str(error), "device": error.device, "retry_after": error.retry_after}
+    )
+    response.status_code = 429
+    response.headers["Retry-After"] = str(error.retry_after)
+    return response
+
+
+def _versioned_json(etag: str, build: Callable[[], Any]) -> Response:
+    """
+    Answer a GET of a versioned resource conditionally and compressed.
+
+    A request whose If-None-Match lists the ETag gets 304 without a body
+    being built. Otherwise the body is taken from the response cache in the
+    best accepted encoding, so it is serialized and compressed once per
+    version.
+
+    Args:
+        etag (str): ETag of the current version of the resource
+        build (Callable[[], Any]): Builds the JSON payload if it is not cached
+
+    Returns:
+        Response: 304 or 200 response with a weak ETag
+    """
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        encoding = request.accept_encodings.best_match(ENCODINGS, default="identity")
+        body, encoding = response_cache.body(etag, encoding, build)
+        response = Response(body, mimetype="application/json")
+        if encoding != "identity":
+            response.headers["Content-Encoding"] = encoding
+    response.set_etag(etag, weak=True)
+    response.headers["Vary"] = "Accept-Encoding"
+    # Clients may keep the body but must revalidate it on every poll
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+# Endpoints admitted through the device scheduler and the devices they use. Cached
+# reads (RGB and multispectral config, acoustic config and info) and streams
+# (preview, frames) bypass it; acoustic reads are admitted when the cache misses.
+_admitted_endpoints: Dict[str, Callable[[], List[str]]] = {
+    "camera_rgb_start": lambda: [_rgb_device()],
+    "camera_rgb_array_start": _rgb_array_devices,
+    "camera_multispectral_start": lambda: ["multispectral"],
+    "sensor_acoustic_start": lambda: [_acoustic_device()],
+    "sensor_acoustic_stop": lambda: [_acoustic_device()],
+    "sensor_acoustic_pause": lambda: [_acoustic_device()],
+    "sensor_acoustic_state": lambda: [_acoustic_device()],
+    "sensor_config_set": lambda: [_acoustic_device()],
+    "sensor_sync_start": lambda: [_rgb_device(), _acoustic_device()],
+}
+
+
+@app.before_request
+def admit_device_requests() -> Optional[Response]:
+    """
+    Wait until the devices of the request are free.
+
+    Reads (GET) are admitted before captures and commands, and clients,
+    identified by X-Client-Id or their address, take turns. The devices are
+    held until the request is torn down.
+
+    Returns:
+        Optional[Response]: 429 JSON response with Retry-After if the device queue is
+        full or the wait timed out, or None to handle the request
+    """
+    resolve = _admitted_endpoints.get(request.endpoint)
+    if resolve is None:
+        return None
+
+    admission = contextlib.ExitStack()
+    try:
+        devices = resolve()
+        admission.enter_context(
+            device_scheduler.admit(
+                devices,
+                _request_client(),
+                INTERACTIVE if request.method == "GET" else BULK,
+            )
+        )
+    except Device_Busy_Error as e:
+        return _busy_response(e)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logger.error("Error admitting %s: %s", request.path, e)
+        return jsonify({"error": str(e)}), 500
+    g.admission = admission
+    g.admitted_devices = devices
+    return None
+
+
+@app.teardown_request
+def release_devices(error: Optional[BaseException]) -> None:
+    """
+    Release the devices held by the request.
+
+    Commands may have changed what an acoustic sensor reports, so its cached
+    reads are fetched again on the next poll.
+    """
+    admission = g.pop("admission", None)
+    if admission is not None:
+        admission.close()
+        if request.method != "GET":
+            devices = set(g.pop("admitted_devices", ()))
+            acoustic_cache.invalidate(lambda key: key[0] in devices)
+
+
+def _rgb_capture_task(config: Dict[str, Any]) -> Callable[..., Dict[str, Any]]:
+    """
+    Validate an RGB capture request and return the function running it.
+
+    Used by /sensor/rgb/start, which runs the capture in the request, and by
+    capture jobs, which run it in the background.
+
+    Args:
+        config (Dict[str, Any]): Request body of /sensor/rgb/start
+
+    Returns:
+        Callable[..., Dict[str, Any]]: Runs the capture and returns its result; takes
+        the optional progress and should_stop callbacks of capture_image
+
+    Raises:
+        ValueError: If the request is invalid
+    """
+    from BussinessLayer.Delta_Frame_Storage import Delta_Frame_Writer
+    from BussinessLayer.Frame_Analysis import Frame_Quality_Gate
+
+    required_fields = ["path", "name", "quality", "image_format"]
+    missing_fields = [field for field in required_fields if field not in config]
+    if missing_fields:
+        raise ValueError(f"Missing required fields: {missing_fields}")
+    count = config.get("count", 1)
+    if not isinstance(count, int) or isinstance(count, bool) or count < 1:
+        raise ValueError("Count must be a positive integer")
+
+    quality_gate = None
+    if config.get("quality_gate"):
+        quality_gate = Frame_Quality_Gate.from_config(config["quality_gate"])
+
+    delta_writer = None
+    if config.get("storage_mode", "full") == "delta":
+        try:
+            delta_writer = Delta_Frame_Writer(
+                config["path"], config["name"], **config.get("delta", {})
+            )
+        except TypeError as e:
+            raise ValueError(str(e))
+
+    try:
+        roi = RGB_Camera_ROI(**config.get("roi", {}))
+    except TypeError as e:
+        raise ValueError(str(e))
+
+    def run(progress=None, should_stop=None) -> Dict[str, Any]:
+        rgb_camera_controller = get_shared_rgb_camera_controller(
+            config.get("serial_number")
+        )
+
+        # Hold the camera between applying the ROI and capturing, so no other request changes it
+        with rgb_camera_controller.lock:
+            applied_roi = rgb_camera_controller.apply_roi(roi)
+            data = rgb_camera_controller.capture_image(
+                path=config["path"],
+                name=config["name"],
+                count=count,
+                quality=config["quality"],
+                image_format=config["image_format"],
+                analyze=bool(config.get("analyze", False)),
+                quality_gate=quality_gate,
+                delta_writer=delta_writer,
+                bayer=bool(config.get("bayer", False)),
+                on_file=get_thumbnail_service().submit,
+                progress=progress,
+                should_stop=should_stop,
+            )
+        data["roi"] = applied_roi["features"]
+
+        if data.get("format") == "bayer" and config.get("demosaic") == "background":
+            # RGB images are written next to the mosaics, in png unless tiff was requested
+            rgb_format = "tiff" if config["image_format"] == "tiff" else "png"
+            thumbnails = get_thumbnail_service()
+
+            def queue_thumbnails(done) -> None:
+                if not done.cancelled() and done.exception() is None:
+                    thumbnails.submit(done.result())
+
+            for future in get_bayer_demosaic_pool().submit_sequence(
+                data["storage"]["metadata_file"], rgb_format
+            ):
+                future.add_done_callback(queue_thumbnails)
+            data["demosaic"] = {"mode": "background", "format": rgb_format}
+        return data
+
+    return run
+
+
+# RGB camera endpoints
+@app.route("/sensor/rgb/start", methods=["POST"])
+def camera_rgb_start() -> Response:
+    """
+    Endpoint to start RGB camera and capture image.
+
+    The request waits for the whole capture; use POST /jobs for long captures.
+
+    Returns:
+        Response: JSON response with image capture results
+    """
+    try:
+        config = request.json
+        if not config:
+            return jsonify({"error": "No configuration provided"}), 400
+
+        try:
+            data = _rgb_capture_task(config)()
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        return jsonify({"success": True, "data": data})
+    except Exception as e:
+        logger.error("Error in camera_rgb_start: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/sensor/rgb/config", methods=["GET"])
+def camera_rgb_config() -> Response:
+    """
+    Endpoint to get RGB camera configuration.
+
+    The configuration is answered from the cached node-map snapshot, so it
+    does not touch the device and works while a capture is running. The
+    ETag follows the snapshot version. The body is cached per version, so
+    snapshot_time is the time of the snapshot the body was first built
+    from; refreshes that read the same features do not update it.
+
+    Returns:
+        Response: JSON response with camera configuration, or 304 if it did not change
+    """
+    try:
+        rgb_camera_controller = get_shared_rgb_camera_controller(
+            request.args.get("serial_number")
+        )
+        snapshot = rgb_camera_controller.get_snapshot()
+
+        return _versioned_json(
+            f"{_PROCESS_ETAG}-rgb-{snapshot.version}",
+            lambda: _rgb_config_data(rgb_camera_controller, snapshot),
+        )
+    except Exception as e:
+        logger.error("Error in camera_rgb_config: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+
+def _rgb_config_data(
+    rgb_camera_controller: "RGB_Camera_Controller", snapshot: RGB_Camera_Snapshot
+) -> Dict[str, Any]:
+    return {
+        "data_types": list(rgb_camera_controller.save_functions.keys()),
+        "width": snapshot.value("Width"),
+        "height": snapshot.value("Height"),
+        "features": snapshot.features,
+        "snapshot_time": snapshot.taken_at,
+        "default_config": {
+            "width": Config.DEFAULT_RGB_CAMERA_WIDTH,
+            "height": Config.DEFAULT_RGB_CAMERA_HEIGHT,
+            "format": Config.DEFAULT_RGB_CAMERA_FORMAT,
+        },
+    }
+
+
+@app.route("/sensor/rgb/devices", methods=["GET"])
+def camera_rgb_devices() -> Response:
+    """
+    Endpoint to list the RGB cameras attached to this node.
+
+    Returns:
+        Response: JSON response with the serial number and model of each camera
+    """
+    try:
+        return jsonify({"devices": drivers.load("rgb").RGB_Camera_Controller.enumerate_devices()})
+    except Exception as e:
+        logger.error("Error in camera_rgb_devices: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/sensor/rgb/array/start", methods=["POST"])
+def camera_rgb_array_start() -> Response:
+    """
+    Endpoint to capture images from several RGB cameras in parallel.
+
+    Returns:
+        Response: JSON response with image capture results per camera
+    """
+    from BussinessLayer.RGB_Camera_Array_Controller import RGB_Camera_Array_Controller
+
+    try:
+        config = request.json
+        if not config:
+            return jsonify({"error": "No configuration provided"}), 400
+
+        required_fields = ["path", "name", "quality", "image_format"]
+        missing_fields = [field for field in required_fields if field not in config]
+        if missing_fields:
+            return jsonify({"error": f"Missing required fields: {missing_fields}"}), 400
+
+        try:
+            serial_numbers = _rgb_array_serials(config)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        count = config.get("count", 1)
+        if not isinstance(count, int) or isinstance(count, bool) or count < 1:
+            return jsonify({"error": "count must be a positive integer"}), 400
+        try:
+            quality, image_format = _rgb_save_options(config)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        with contextlib.ExitStack() as stack:
+            # Take the selected cameras away from their shared controllers for the run;
+            # the shared controllers reconnect on their next use
+            with _shared_rgb_lock:
+                shared = [
+                    _shared_rgb_camera_controllers[serial]
+                    for serial in serial_numbers
+                    if serial in _shared_rgb_camera_controllers
+                ]
+            for controller in shared:
+                stack.enter_context(controller.lock)
+                if controller.is_connected():
+                    controller.release_camera()
+
+            array_controller = RGB_Camera_Array_Controller(
+                serial_numbers,
+                camera_width=Config.DEFAULT_RGB_CAMERA_WIDTH,
+                camera_height=Config.DEFAULT_RGB_CAMERA_HEIGHT,
+            )
+            array_controller.Connect()
+            stack.callback(array_controller.release_cameras)
+
+            data = array_controller.capture_images(
+                path=config["path"],
+                name=config["name"],
+                count=count,
+                quality=quality,
+                image_format=image_format,
+            )
+
+        return jsonify({"success": True, "data": data})
+    except Exception as e:
+        logger.error("Error in camera_rgb_array_start: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/sensor/rgb/preview", methods=["GET"])
+def camera_rgb_preview() -> Response:
+    """
+    Endpoint to stream a downscaled live preview of the RGB camera.
+
+    All viewers share one grab loop; each frame is downscaled and encoded once.
+
+    Returns:
+        Response: multipart/x-mixed-replace stream of JPEG frames
+    """
+    from BussinessLayer.RGB_Preview_Streamer import MJPEG_BOUNDARY
+
+    try:
+        streamer = get_rgb_preview_streamer()
+        return Response(
+            streamer.stream(),
+            mimetype=f"multipart/x-mixed-replace; boundary={MJPEG_BOUNDARY}",
+            headers={"Cache-Control": "no-cache, no-store"},
+        )
+    except Exception as e:
+        logger.error("Error in camera_rgb_preview: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/sensor/rgb/frames", methods=["POST"])
+def camera_rgb_frames() -> Response:
+    """
+    Endpoint to return captured frames directly in the response, without files.
+
+    A single frame is returned as the body, described by X-Frame-* headers
+    (shape, dtype, pixel format, timestamps). Several frames are streamed as
+    multipart/mixed, one part per frame, each grabbed when the client is
+    ready for it.
+
+    Returns:
+        Response: Raw pixels or JPEG, or a multipart/mixed stream of them
+    """
+    from BussinessLayer.Frame_Transport import (
+        FRAME_BOUNDARY,
+        content_type,
+        frame_encoder,
+        frame_headers,
+        multipart_frames,
+    )
+
+    try:
+        config = request.get_json(silent=True) or {}
+        count = config.get("count", 1)
+        if not isinstance(count, int) or isinstance(count, bool) or count < 1:
+            return jsonify({"error": "Count must be a positive integer"}), 400
+        encoding = config.get("encoding", "raw")
+        try:
+            encode = frame_encoder(encoding, config.get("jpeg_quality", 90))
+            roi = RGB_Camera_ROI(**config.get("roi", {}))
+        except (TypeError, ValueError) as e:
+            return jsonify({"error": str(e)}), 400
+
+        rgb_camera_controller = get_shared_rgb_camera_controller(
+            config.get("serial_number")
+        )
+        # Hold the camera between applying the ROI and reading, so the frame has that ROI
+        with rgb_camera_controller.lock:
+            try:
+                applied_roi = rgb_camera_controller.apply_roi(roi)
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+            # After a geometry change only frames grabbed from now on have the new size
+            after = time.time() if applied_roi["changed"] else None
+            payload, meta = rgb_camera_controller.read_frame(encode, after=after, use_ring=False)
+        if count == 1:
+            return Response(
+                payload,
+                mimetype=content_type(encoding),
+                headers={**frame_headers(meta), "Cache-Control": "no-store"},
+            )
+
+        def frames():
+            yield payload, meta
+            last_host_time = meta["host_time"]
+            for _ in range(count - 1):
+                try:
+                    frame = rgb_camera_controller.read_frame(encode, after=last_host_time)
+                except Exception as e:
+                    logger.error("Error in camera_rgb_frames stream: %s", e)
+                    return
+                last_host_time = frame[1]["host_time"]
+                yield frame
+
+        return Response(
+            multipart_frames(frames(), encoding),
+            mimetype=f"multipart/mixed; boundary={FRAME_BOUNDARY}",
+            headers={"Cache-Control": "no-store"},
+        )
+    except Exception as e:
+        logger.error("Error in camera_rgb_frames: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+
+# Multispectral camera endpoints
+@app.route("/sensor/multispectral/config", methods=["GET"])
+def camera_multispectral_config() -> Response:
+    """
+    Endpoint to get the multispectral camera configuration.
+
+    Returns:
+        Response: JSON response with backend, band wavelengths, size and pixel type
+    """
+    try:
+        controller = get_shared_multispectral_camera_controller()
+        return jsonify(
+            {
+                "data_types": ["cube"],
+                "backend": Config.MULTISPECTRAL_BACKEND,
+                **controller.get_frame_format().to_dict(),
+            }
+        )
+    except Exception as e:
+        logger.error("Error in camera_multispectral_config: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/sensor/multispectral/devices", methods=["GET"])
+def camera_multispectral_devices() -> Response:
+    """
+    Endpoint to list the multispectral cameras of the configured backend.
+
+    Returns:
+        Response: JSON response with the serial number and model of each camera
+    """
+    from BussinessLayer.Multispectral_Backend import MULTISPECTRAL_BACKENDS
+
+    try:
+        backend = MULTISPECTRAL_BACKENDS.get(Config.MULTISPECTRAL_BACKEND)
+        if backend is None:
+            return jsonify({"error": f"Unknown backend: {Config.MULTISPECTRAL_BACKEND}"}), 500
+        return jsonify({"devices": backend.enumerate_devices()})
+    except Exception as e:
+        logger.error("Error in camera_multispectral_devices: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/sensor/multispectral/start", methods=["POST"])
+def camera_multispectral_start() -> Response:
+    """
+    Endpoint to capture multispectral frames into a spectral cube.
+
+    Returns:
+        Response: JSON response with the cube and metadata files
+    """
+    try:
+        config = request.json
+        if not config:
+            return jsonify({"error": "No configuration provided"}), 400
+
+        try:
+            run = _multispectral_capture_task(config)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        return jsonify({"success": True, "data": run()})
+    except Exception as e:
+        logger.error("Error in camera_multispectral_start: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+
+def _multispectral_capture_task(config: Dict[str, Any]) -> Callable[..., Dict[str, Any]]:
+    """
+    Validate a multispectral capture request and return the function running it.
+
+    Args:
+        config (Dict[str, Any]): Request body of /sensor/multispectral/start
+
+    Returns:
+        Callable[..., Dict[str, Any]]: Runs the capture and returns its result; takes
+        the optional progress and should_stop callbacks of capture_cube
+
+    Raises:
+        ValueError: If the request is invalid
+    """
+    required_fields = ["path", "name"]
+    missing_fields = [field for field in required_fields if field not in config]
+    if missing_fields:
+        raise ValueError(f"Missing required fields: {missing_fields}")
+    count = config.get("count", 1)
+    if not isinstance(count, int) or isinstance(count, bool) or count < 1:
+        raise ValueError("Count must be a positive integer")
+    # Same rule as /sensor/multispectral/index, so the cube of a capture can be indexed
+    directory = _storage_path(config["path"]) if isinstance(config["path"], str) else None
+    if directory is None:
+        raise ValueError("path must be a directory below the storage directory")
+
+    def run(progress=None, should_stop=None) -> Dict[str, Any]:
+        controller = get_shared_multispectral_camera_controller()
+        result = controller.capture_cube(
+            directory + os.sep,
+            config["name"],
+            count,
+            progress=progress,
+            should_stop=should_stop,
+        )
+        result["cube"] = os.path.relpath(
+            result["storage"]["metadata_file"], os.path.realpath(Config.DEFAULT_STORAGE_PATH)
+        )
+        return result
+
+    return run
+
+
+@app.route("/sensor/multispectral/frames", methods=["POST"])
+def camera_multispectral_frames() -> Response:
+    """
+    Endpoint to return multispectral frames directly in the response, without files.
+
+    Frames are raw (bands, height, width) pixels described by X-Frame-*
+    headers including the band wavelengths; several frames are streamed as
+    multipart/mixed.
+
+    Returns:
+        Response: Raw pixels, or a multipart/mixed stream of them
+    """
+    from BussinessLayer.Frame_Transport import (
+        FRAME_BOUNDARY,
+        content_type,
+        frame_headers,
+        multipart_frames,
+    )
+
+    try:
+        config = request.get_json(silent=True) or {}
+        count = config.get("count", 1)
+        if isinstance(count, bool) or not isinstance(count, int) or count < 1:
+            return jsonify({"error": "Count must be a positive integer"}), 400
+        bands = config.get("bands")
+
+        controller = get_shared_multispectral_camera_controller()
+        try:
+            payload, meta = controller.read_frame(bands)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        if count == 1:
+            return Response(
+                payload,
+                mimetype=content_type("raw"),
+                headers={**frame_headers(meta), "Cache-Control": "no-store"},
+            )
+
+        def frames():
+            yield payload, meta
+            for _ in range(count - 1):
+                try:
+                    yield controller.read_frame(bands)
+                except Exception as e:
+                    logger.error("Error in camera_multispectral_frames stream: %s", e)
+                    return
+
+        return Response(
+            multipart_frames(frames(), "raw"),
+            mimetype=f"multipart/mixed; boundary={FRAME_BOUNDARY}",
+            headers={"Cache-Control": "no-store"},
+        )
+    except Exception as e:
+        logger.error("Error in camera_multispectral_frames: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/sensor/multispectral/index", methods=["POST"])
+def camera_multispectral_index() -> Response:
+    """
+    Endpoint to compute a spectral index map over a stored cube.
+
+    The cube is processed tile by tile in parallel and the index map is
+    written next to it as <cube>.<name>.npy of shape (frames, height, width).
+
+    Returns:
+        Response: JSON response with the index map and metadata files
+    """
+    from BussinessLayer.Spectral_Index import Spectral_Index_Pipeline
+
+    try:
+        config = request.json
+        if not config:
+            return jsonify({"error": "No configuration provided"}), 400
+
+        required_fields = ["cube", "formula"]
+        missing_fields = [field for field in required_fields if field not in config]
+        if missing_fields:
+            return jsonify({"error": f"Missing required fields: {missing_fields}"}), 400
+
+        metadata_file = _storage_path(config["cube"])
+        if metadata_file is None or not os.path.isfile(metadata_file):
+            return jsonify({"error": "Cube not found"}), 404
+
+        try:
+            pipeline = Spectral_Index_Pipeline(
+                workers=Config.SPECTRAL_INDEX_WORKERS,
+                tile_rows=config.get("tile_rows", 64),
+            )
+            data = pipeline.compute(
+                metadata_file,
+                config["formula"],
+                name=config.get("name"),
+                frames=config.get("frames"),
+            )
+        except (TypeError, ValueError) as e:
+            return jsonify({"error": str(e)}), 400
+        return jsonify({"success": True, "data": data})
+    except Exception as e:
+        logger.error("Error in camera_multispectral_index: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+
+def _storage_path(subpath: str) -> Optional[str]:
+    """
+    Resolve a client path below the storage root.
+
+    Args:
+        subpath (str): Path relative to DEFAULT_STORAGE_PATH
+
+    Returns:
+        Optional[str]: Absolute path, or None if it leaves the storage root
+    """
+    root = os.path.realpath(Config.DEFAULT_STORAGE_PATH)
+    joined = safe_join(root, subpath) if subpath else root
+    if joined is None:
+        return None
+    # safe_join only checks the path text, symlinks may still point outside the root
+    resolved = os.path.realpath(joined)
+    if os.path.commonpath([root, resolved]) != root:
+        return None
+    return resolved
+
+
+# Storage endpoints
+@app.route("/storage/files/<path:subpath>", methods=["GET"])
+def storage_file_get(subpath: str) -> Response:
+    """
+    Endpoint to download a file from the storage directory.
+
+    Supports Range requests and conditional GETs (ETag, Last-Modified). The
+    file is handed to the WSGI server as a file object, so servers with
+    wsgi.file_wrapper (e.g. gunicorn) send it with sendfile; with
+    USE_X_SENDFILE a front server delivers it.
+
+    Args:
+        subpath (str): File path relative to the storage directory
+
+    Returns:
+        Response: File content, 206 for ranges, 304 if unchanged
+    """
+    try:
+        path = _storage_path(subpath)
+        if path is None or not os.path.isfile(path):
+            return jsonify({"error": "File not found"}), 404
+        return send_file(path, conditional=True, etag=True, max_age=0)
+    except Exception as e:
+        logger.error("Error in storage_file_get: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/storage/thumbnails/<path:subpath>", methods=["GET"])
+def storage_thumbnail_get(subpath: str) -> Response:
+    """
+    Endpoint to get a JPEG thumbnail of a captured image.
+
+    Thumbnails come from the in-memory cache or the pyramid stored next to
+    the image and are generated on first request for older captures. The
+    ETag changes with the original, so browsers revalidate with a 304.
+
+    Args:
+        subpath (str): Image path relative to the storage directory
+
+    Returns:
+        Response: JPEG thumbnail (optional query parameter size, default smallest level)
+    """
+    try:
+        path = _storage_path(subpath)
+        if path is None or not os.path.isfile(path):
+            return jsonify({"error": "File not found"}), 404
+        thumbnails = get_thumbnail_service()
+        size = request.args.get("size", thumbnails.sizes[0], type=int)
+
+        info = os.stat(path)
+        response = Response(mimetype="image/jpeg")
+        response.set_etag(f"{info.st_mtime_ns:x}-{info.st_size:x}-{size}")
+        response.make_conditional(request)
+        if response.status_code == 304:
+            return response
+
+        try:
+            response.set_data(thumbnails.get(path, size))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        return response
+    except Exception as e:
+        logger.error("Error in storage_thumbnail_get: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/storage/list", methods=["GET"], defaults={"subpath": ""})
+@app.route("/storage/list/<path:subpath>", methods=["GET"])
+def storage_list(subpath: str) -> Response:
+    """
+    Endpoint to list a directory of the storage directory.
+
+    Query parameters offset and limit page through large directories.
+
+    Args:
+        subpath (str): Directory path relative to the storage directory
+
+    Returns:
+        Response: JSON response with the entries sorted by name
+    """
+    from BussinessLayer.Image_Files import is_image_file
+
+    try:
+        path = _storage_path(subpath)
+        if path is None or not os.path.isdir(path):
+            return jsonify({"error": "Directory not found"}), 404
+        offset = request.args.get("offset", 0, type=int)
+        limit = request.args.get("limit", 1000, type=int)
+        if offset < 0 or limit < 0:
+            return jsonify({"error": "offset and limit must not be negative"}), 400
+
+        with os.scandir(path) as scanner:
+            entries = sorted(scanner, key=lambda entry: entry.name)
+        page = []
+        for entry in entries[offset : offset + limit]:
+            relative = os.path.join(subpath, entry.name) if subpath else entry.name
+            try:
+                info = entry.stat()
+            except OSError as e:
+                # Removed since the scan, or a dangling symlink
+                logger.debug("Skipping %s in storage_list: %s", relative, e)
+                continue
+            item = {
+                "name": entry.name,
+                "path": relative,
+                "type": "directory" if entry.is_dir() else "file",
+                "modified": info.st_mtime,
+            }
+            if entry.is_file():
+                item["size"] = info.st_size
+                item["url"] = url_for("storage_file_get", subpath=relative)
+                if is_image_file(entry.name):
+                    item["thumbnail_url"] = url_for("storage_thumbnail_get", subpath=relative)
+            page.append(item)
+
+        return jsonify(
+            {
+                "path": subpath,
+                "total": len(entries),
+                "offset": offset,
+                "limit": limit,
+                "entries": page,
+            }
+        )
+    except Exception as e:
+        logger.error("Error in storage_list: %s", e)
+        return jsonify({"error": str(e)}), 500
+
 
-def get_sensor_controller(ip: str, port: int) -> SensorController:
+# Capture scheduler endpoints
+@app.route("/scheduler/jobs", methods=["POST"])
+def scheduler_job_create() -> Response:
     """
-    Creates and returns a SensorController instance.
-
-    Args:
-        ip (str): The IP address of the sensor
-        port (int): The port to connect to
+    Endpoint to schedule an interval (timelapse) capture job.
 
     Returns:
-        SensorController: A configured SensorController instance
+        Response: JSON response with the scheduled job
     """
     try:
-        controller = SensorController(ip, port)
-        controller.Connect()
-        return controller
+        config = request.json
+        if not config:
+            return jsonify({"error": "No configuration provided"}), 400
+
+        required_fields = ["path", "name", "period"]
+        missing_fields = [field for field in required_fields if field not in config]
+        if missing_fields:
+            return jsonify({"error": f"Missing required fields: {missing_fields}"}), 400
+
+        try:
+            job = Interval_Capture_Job(
+                path=config["path"],
+                name=config["name"],
+                period=config["period"],
+                count=config.get("count"),
+                start_at=config.get("start_at"),
+                end_at=config.get("end_at"),
+                quality=config.get("quality", 100),
+                image_format=config.get("image_format", "png"),
+            )
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        return jsonify({"success": True, "job": get_capture_scheduler().add_job(job)})
     except Exception as e:
-        logger.error(f"Failed to create SensorController: {str(e)}")
-        raise
+        logger.error("Error in scheduler_job_create: %s", e)
+        return jsonify({"error": str(e)}), 500
 
 
-def get_rgb_camera_controller() -> RGB_Camera_Controller:
+@app.route("/scheduler/jobs", methods=["GET"])
+def scheduler_job_list() -> Response:
     """
-    Creates and returns an RGB_Camera_Controller instance.
+    Endpoint to list interval capture jobs.
 
     Returns:
-        RGB_Camera_Controller: A configured RGB_Camera_Controller instance
+        Response: JSON response with all jobs and their statistics
     """
     try:
-        return RGB_Camera_Controller(
-            camera_width=Config.DEFAULT_RGB_CAMERA_WIDTH,
-            camera_height=Config.DEFAULT_RGB_CAMERA_HEIGHT,
-            camera_format=Config.DEFAULT_RGB_CAMERA_FORMAT,
-        )
+        return jsonify({"jobs": get_capture_scheduler().list_jobs()})
     except Exception as e:
-        logger.error(f"Failed to create RGB_Camera_Controller: {str(e)}")
-        raise
+        logger.error("Error in scheduler_job_list: %s", e)
+        return jsonify({"error": str(e)}), 500
 
 
-@app.route("/")
-def hello_world() -> str:
+@app.route("/scheduler/jobs/<job_id>", methods=["GET"])
+def scheduler_job_get(job_id: str) -> Response:
     """
-    Root endpoint for the API.
+    Endpoint to get one interval capture job.
+
+    Args:
+        job_id (str): Job identifier
 
     Returns:
-        str: A greeting message
+        Response: JSON response with the job and its statistics
     """
-    return "<p>Hello, World! Welcome to the ASS/NSS API</p>"
+    try:
+        return jsonify({"job": get_capture_scheduler().get_job(job_id)})
+    except KeyError:
+        return jsonify({"error": f"Unknown job: {job_id}"}), 404
+    except Exception as e:
+        logger.error("Error in scheduler_job_get: %s", e)
+        return jsonify({"error": str(e)}), 500
 
 
-@app.route("/health")
-def health_check() -> Response:
+@app.route("/scheduler/jobs/<job_id>", methods=["DELETE"])
+def scheduler_job_cancel(job_id: str) -> Response:
     """
-    Health check endpoint for the API.
+    Endpoint to cancel an interval capture job.
+
+    Args:
+        job_id (str): Job identifier
 
     Returns:
-        Response: JSON response with health status
+        Response: JSON response with the cancelled job
     """
-    return jsonify(
-        {"status": "ok", "environment": os.environ.get("FLASK_ENV", "development")}
-    )
+    try:
+        return jsonify({"success": True, "job": get_capture_scheduler().cancel_job(job_id)})
+    except KeyError:
+        return jsonify({"error": f"Unknown job: {job_id}"}), 404
+    except Exception as e:
+        logger.error("Error in scheduler_job_cancel: %s", e)
+        return jsonify({"error": str(e)}), 500
 
 
-# RGB camera endpoints
-@app.route("/sensor/rgb/start", methods=["POST"])
-def camera_rgb_start() -> Response:
+# Capture job endpoints
+_capture_tasks = {
+    "rgb": _rgb_capture_task,
+    "multispectral": _multispectral_capture_task,
+}
+
+
+@app.route("/jobs", methods=["POST"])
+def capture_job_create() -> Response:
     """
-    Endpoint to start RGB camera and capture image.
+    Endpoint to start a capture in the background.
+
+    The body is that of /sensor/rgb/start or /sensor/multispectral/start
+    plus "type" ("rgb" or "multispectral"). The request is validated and
+    answered with the queued job right away.
 
     Returns:
-        Response: JSON response with image capture results
+        Response: 202 JSON response with the job, its URL in the Location header
     """
     try:
         config = request.json
         if not config:
             return jsonify({"error": "No configuration provided"}), 400
 
-        required_fields = ["path", "name", "quality", "image_format"]
-        missing_fields = [field for field in required_fields if field not in config]
-        if missing_fields:
-            return jsonify({"error": f"Missing required fields: {missing_fields}"}), 400
+        job_type = config.get("type")
+        if job_type not in _capture_tasks:
+            return jsonify({"error": f"Type must be one of: {', '.join(_capture_tasks)}"}), 400
+        try:
+            drivers.require(job_type)
+        except Driver_Disabled_Error as e:
+            return jsonify({"error": str(e)}), 503
+
+        try:
+            run = _capture_tasks[job_type](config)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        job = Capture_Job(job_type, config, total=config.get("count", 1))
+        description = get_capture_job_manager().submit(job, run)
+        response = jsonify({"success": True, "job": description})
+        response.headers["Location"] = url_for("capture_job_get", job_id=job.job_id)
+        return response, 202
+    except Exception as e:
+        logger.error("Error in capture_job_create: %s", e)
+        return jsonify({"error": str(e)}), 500
 
-        rgb_camera_controller = get_rgb_camera_controller()
-        rgb_camera_controller.Connect()
 
-        data = rgb_camera_controller.capture_image(
-            path=config["path"],
-            name=config["name"],
-            count=config.get("count", 1),
-            quality=config["quality"],
-            image_format=config["image_format"],
-        )
+@app.route("/jobs", methods=["GET"])
+def capture_job_list() -> Response:
+    """
+    Endpoint to list capture jobs.
 
-        return jsonify({"success": True, "data": data})
+    Returns:
+        Response: JSON response with the active and retained finished jobs
+    """
+    try:
+        return jsonify({"jobs": get_capture_job_manager().list_jobs()})
     except Exception as e:
-        logger.error(f"Error in camera_rgb_start: {str(e)}")
+        logger.error("Error in capture_job_list: %s", e)
         return jsonify({"error": str(e)}), 500
 
 
-@app.route("/sensor/rgb/config", methods=["GET"])
-def camera_rgb_config() -> Response:
+@app.route("/jobs/<job_id>", methods=["GET"])
+def capture_job_get(job_id: str) -> Response:
     """
-    Endpoint to get RGB camera configuration.
+    Endpoint to get one capture job.
+
+    Args:
+        job_id (str): Job identifier
 
     Returns:
-        Response: JSON response with camera configuration
+        Response: JSON response with the job, its progress, the files written
+        so far and, once finished, the capture result
     """
     try:
-        rgb_camera_controller = get_rgb_camera_controller()
-        rgb_camera_controller.Connect()
+        return jsonify({"job": get_capture_job_manager().get_job(job_id)})
+    except KeyError:
+        return jsonify({"error": f"Unknown job: {job_id}"}), 404
+    except Exception as e:
+        logger.error("Error in capture_job_get: %s", e)
+        return jsonify({"error": str(e)}), 500
 
-        config_data = {
-            "data_types": list(rgb_camera_controller.save_functions.keys()),
-            "width": rgb_camera_controller.camera.Width.Value,
-            "height": rgb_camera_controller.camera.Height.Value,
-            "default_config": {
-                "width": Config.DEFAULT_RGB_CAMERA_WIDTH,
-                "height": Config.DEFAULT_RGB_CAMERA_HEIGHT,
-                "format": Config.DEFAULT_RGB_CAMERA_FORMAT,
-            },
-        }
 
-        # Properly release the camera
-        rgb_camera_controller.release_camera()
+@app.route("/jobs/<job_id>", methods=["DELETE"])
+def capture_job_cancel(job_id: str) -> Response:
+    """
+    Endpoint to cancel a capture job.
+
+    Args:
+        job_id (str): Job identifier
 
-        return jsonify(config_data)
+    Returns:
+        Response: JSON response with the job
+    """
+    try:
+        return jsonify({"success": True, "job": get_capture_job_manager().cancel_job(job_id)})
+    except KeyError:
+        return jsonify({"error": f"Unknown job: {job_id}"}), 404
     except Exception as e:
-        logger.error(f"Error in camera_rgb_config: {str(e)}")
+        logger.error("Error in capture_job_cancel: %s", e)
         return jsonify({"error": str(e)}), 500
 
 
+@app.route("/jobs/<job_id>/events", methods=["GET"])
+def capture_job_events(job_id: str) -> Response:
+    """
+    Endpoint streaming the progress of a capture job as server-sent events.
+
+    A "progress" event is sent whenever the job changed, at most every
+    "interval" seconds (query parameter, default 0.5), and an "end" event
+    once the job finished. Comments keep idle connections open.
+
+    Args:
+        job_id (str): Job identifier
+
+    Returns:
+        Response: text/event-stream response
+    """
+    try:
+        manager = get_capture_job_manager()
+        progress = manager.get_job(job_id, include_files=False)["progress"]
+        interval = max(0.0, float(request.args.get("interval", 0.5)))
+    except KeyError:
+        return jsonify({"error": f"Unknown job: {job_id}"}), 404
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    def stream():
+        nonlocal progress
+        version = None
+        while True:
+            if progress["version"] == version:
+                yield ": keepalive\n\n"
+            else:
+                version = progress["version"]
+                yield f"event: progress\ndata: {json.dumps(progress)}\n\n"
+                if progress["state"] not in ("queued", "running"):
+                    yield f"event: end\ndata: {json.dumps(progress)}\n\n"
+                    return
+                time.sleep(interval)
+            try:
+                progress = manager.wait_for_progress(job_id, version, timeout=15)
+            except KeyError:
+                # The job record was dropped from the history
+                return
+
+    return Response(
+        stream(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-store", "X-Accel-Buffering": "no"},
+    )
+
+
 # Acoustic Sensor endpoints
 @app.route("/sensor/acoustic/start", methods=["POST"])
 def sensor_acoustic_start() -> Response:
@@ -178,7 +1680,7 @@ def sensor_acoustic_start() -> Response:
             # Use default configuration if not provided
             ip = Config.DEFAULT_SENSOR_IP
             port = Config.DEFAULT_SENSOR_PORT
-            logger.info(f"Using default sensor configuration: {ip}:{port}")
+            logger.info("Using default sensor configuration: %s:%s", ip, port)
         else:
             ip = data["ip"]
             port = int(data["port"])
@@ -189,7 +1691,7 @@ def sensor_acoustic_start() -> Response:
         result = sensor_controller.StartRecording(measurement_name)
         return jsonify(result)
     except Exception as e:
-        logger.error(f"Error in sensor_acoustic_start: {str(e)}")
+        logger.error("Error in sensor_acoustic_start: %s", e)
         return jsonify({"error": str(e)}), 500
 
 
@@ -207,7 +1709,7 @@ def sensor_acoustic_stop() -> Response:
             # Use default configuration if not provided
             ip = Config.DEFAULT_SENSOR_IP
             port = Config.DEFAULT_SENSOR_PORT
-            logger.info(f"Using default sensor configuration: {ip}:{port}")
+            logger.info("Using default sensor configuration: %s:%s", ip, port)
         else:
             ip = data["ip"]
             port = int(data["port"])
@@ -218,7 +1720,7 @@ def sensor_acoustic_stop() -> Response:
         result = sensor_controller.StopRecording(measurement_name)
         return jsonify(result)
     except Exception as e:
-        logger.error(f"Error in sensor_acoustic_stop: {str(e)}")
+        logger.error("Error in sensor_acoustic_stop: %s", e)
         return jsonify({"error": str(e)}), 500
 
 
@@ -236,7 +1738,7 @@ def sensor_acoustic_pause() -> Response:
             # Use default configuration if not provided
             ip = Config.DEFAULT_SENSOR_IP
             port = Config.DEFAULT_SENSOR_PORT
-            logger.info(f"Using default sensor configuration: {ip}:{port}")
+            logger.info("Using default sensor configuration: %s:%s", ip, port)
         else:
             ip = data["ip"]
             port = int(data["port"])
@@ -247,7 +1749,7 @@ def sensor_acoustic_pause() -> Response:
         result = sensor_controller.PauseRecording(measurement_name)
         return jsonify(result)
     except Exception as e:
-        logger.error(f"Error in sensor_acoustic_pause: {str(e)}")
+        logger.error("Error in sensor_acoustic_pause: %s", e)
         return jsonify({"error": str(e)}), 500
 
 
@@ -265,7 +1767,7 @@ def sensor_acoustic_state() -> Response:
             # Use default configuration if not provided
             ip = Config.DEFAULT_SENSOR_IP
             port = Config.DEFAULT_SENSOR_PORT
-            logger.info(f"Using default sensor configuration: {ip}:{port}")
+            logger.info("Using default sensor configuration: %s:%s", ip, port)
         else:
             ip = data["ip"]
             port = int(data["port"])
@@ -276,7 +1778,7 @@ def sensor_acoustic_state() -> Response:
         result = sensor_controller.GetRecordingState(measurement_name)
         return jsonify(result)
     except Exception as e:
-        logger.error(f"Error in sensor_acoustic_state: {str(e)}")
+        logger.error("Error in sensor_acoustic_state: %s", e)
         return jsonify({"error": str(e)}), 500
 
 
@@ -285,8 +1787,11 @@ def sensor_acoustic_info() -> Response:
     """
     Endpoint to get acoustic sensor information.
 
+    Reads are cached for ACOUSTIC_CACHE_TTL seconds. The payload includes
+    the sensor clock, so every read from the sensor is a new version.
+
     Returns:
-        Response: JSON response with sensor information
+        Response: JSON response with sensor information, or 304 if it did not change
     """
     try:
         data = request.args or request.form
@@ -294,20 +1799,25 @@ def sensor_acoustic_info() -> Response:
             # Use default configuration if not provided
             ip = Config.DEFAULT_SENSOR_IP
             port = Config.DEFAULT_SENSOR_PORT
-            logger.info(f"Using default sensor configuration: {ip}:{port}")
+            logger.info("Using default sensor configuration: %s:%s", ip, port)
         else:
             ip = data["ip"]
             port = int(data["port"])
 
-        sensor_controller = get_sensor_controller(ip, port)
-
-        result = {
-            "sensors": sensor_controller.GetSensors("info"),
-            "time": sensor_controller.GetSystemTime("time"),
-        }
-        return jsonify(result)
+        etag, result = _cached_acoustic_read(
+            ip,
+            port,
+            ("info",),
+            lambda sensor_controller: {
+                "sensors": sensor_controller.GetSensors("info"),
+                "time": sensor_controller.GetSystemTime("time"),
+            },
+        )
+        return _versioned_json(etag, lambda: result)
+    except Device_Busy_Error as e:
+        return _busy_response(e)
     except Exception as e:
-        logger.error(f"Error in sensor_acoustic_info: {str(e)}")
+        logger.error("Error in sensor_acoustic_info: %s", e)
         return jsonify({"error": str(e)}), 500
 
 
@@ -316,8 +1826,11 @@ def sensor_config_get() -> Response:
     """
     Endpoint to get acoustic sensor configuration.
 
+    Reads are cached for ACOUSTIC_CACHE_TTL seconds and after commands to
+    the sensor, so polls with the ETag get 304 without contacting it.
+
     Returns:
-        Response: JSON response with sensor configuration
+        Response: JSON response with sensor configuration, or 304 if it did not change
     """
     try:
         data = request.args or request.form
@@ -325,24 +1838,71 @@ def sensor_config_get() -> Response:
             # Use default configuration if not provided
             ip = Config.DEFAULT_SENSOR_IP
             port = Config.DEFAULT_SENSOR_PORT
-            logger.info(f"Using default sensor configuration: {ip}:{port}")
+            logger.info("Using default sensor configuration: %s:%s", ip, port)
         else:
             ip = data["ip"]
             port = int(data["port"])
 
-        sensor_controller = get_sensor_controller(ip, port)
         measurement_name = data.get("measurement_name", "001")
         verbosity = data.get("verbosity", "all")
 
-        result = {
-            "config": sensor_controller.GetConfiguration(measurement_name, verbosity)
-        }
-        return jsonify(result)
+        etag, result = _cached_acoustic_read(
+            ip,
+            port,
+            ("config", measurement_name, verbosity),
+            lambda sensor_controller: {
+                "config": sensor_controller.GetConfiguration(
+                    "config", measurement_name, verbosity
+                )
+            },
+        )
+        return _versioned_json(etag, lambda: result)
+    except Device_Busy_Error as e:
+        return _busy_response(e)
     except Exception as e:
-        logger.error(f"Error in sensor_config_get: {str(e)}")
+        logger.error("Error in sensor_config_get: %s", e)
         return jsonify({"error": str(e)}), 500
 
 
+def _cached_acoustic_read(
+    ip: str,
+    port: int,
+    key: Tuple[str, ...],
+    read: Callable[["SensorController"], Dict[str, Any]],
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    Read from an acoustic sensor through the acoustic cache.
+
+    While the cached read is fresh the sensor is not contacted; otherwise
+    the read is admitted to the sensor like any other request and its
+    connection is closed afterwards.
+
+    Args:
+        ip (str): Sensor IP address
+        port (int): Sensor port
+        key (Tuple[str, ...]): What is read, e.g. ('config', measurement_name, verbosity)
+        read (Callable[[SensorController], Dict[str, Any]]): Reads the payload
+
+    Returns:
+        Tuple[str, Dict[str, Any]]: The ETag of the read and its payload
+
+    Raises:
+        Device_Busy_Error: If the read was not admitted to the sensor
+    """
+    device = f"acoustic:{ip}:{port}"
+
+    def fetch() -> Dict[str, Any]:
+        with device_scheduler.admit([device], _request_client(), INTERACTIVE):
+            sensor_controller = get_sensor_controller(ip, port)
+            try:
+                return read(sensor_controller)
+            finally:
+                sensor_controller.Close()
+
+    result, version = acoustic_cache.get((device, *key), fetch)
+    return f"{_PROCESS_ETAG}-acoustic-{version}", result
+
+
 @app.route("/sensor/acoustic/config", methods=["POST"])
 def sensor_config_set() -> Response:
     """
@@ -367,7 +1927,411 @@ def sensor_config_set() -> Response:
         }
         return jsonify(result)
     except Exception as e:
-        logger.error(f"Error in sensor_config_set: {str(e)}")
+        logger.error("Error in sensor_config_set: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+
+# Synchronized acquisition endpoints
+@app.route("/sensor/sync/start", methods=["POST"])
+def sensor_sync_start() -> Response:
+    """
+    Endpoint to start acoustic recording and capture RGB frames in sync.
+
+    Returns:
+        Response: JSON response with frames, timestamps and the measured skew
+    """
+    from BussinessLayer.Sync_Capture_Controller import Sync_Capture_Controller
+
+    sensor_controller = None
+    try:
+        config = request.json
+        if not config:
+            return jsonify({"error": "No configuration provided"}), 400
+
+        required_fields = ["path", "name", "quality", "image_format"]
+        missing_fields = [field for field in required_fields if field not in config]
+        if missing_fields:
+            return jsonify({"error": f"Missing required fields: {missing_fields}"}), 400
+
+        if "ip" not in config or "port" not in config:
+            ip = Config.DEFAULT_SENSOR_IP
+            port = Config.DEFAULT_SENSOR_PORT
+            logger.info("Using default sensor configuration: %s:%s", ip, port)
+        else:
+            ip = config["ip"]
+            port = int(config["port"])
+
+        count = config.get("count", 1)
+        if isinstance(count, bool) or not isinstance(count, int) or count < 1:
+            return jsonify({"error": "count must be a positive integer"}), 400
+        period = config.get("period", 0.0)
+        if isinstance(period, bool) or not isinstance(period, (int, float)) or not period >= 0:
+            return jsonify({"error": "period must be a number of seconds, 0 or more"}), 400
+        try:
+            quality, image_format = _rgb_save_options(config)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        rgb_camera_controller = get_shared_rgb_camera_controller()
+        sensor_controller = get_sensor_controller(ip, port)
+
+        data = Sync_Capture_Controller(
+            rgb_camera_controller, sensor_controller, time_field=Config.SYNC_SENSOR_TIME_FIELD
+        ).capture(
+            path=config["path"],
+            name=config["name"],
+            count=count,
+            period=period,
+            quality=quality,
+            image_format=image_format,
+            measurement_name=config.get("measurement_name", "001"),
+        )
+
+        return jsonify({"success": True, "data": data})
+    except Exception as e:
+        logger.error("Error in sensor_sync_start: %s", e)
+        return jsonify({"error": str(e)}), 500
+    finally:
+        if sensor_controller is not None:
+            sensor_controller.Close()
+
+
+# Acoustic operations of /batch: required parameters and the call, made with the
+# shared sensor connection, the step ID as RPC ID and the step parameters
+_batch_acoustic_operations: Dict[
+    str, Tuple[Tuple[str, ...], Callable[["SensorController", str, Dict[str, Any]], Any]]
+] = {
+    "acoustic.info": (
+        (),
+        lambda sensor, rpc_id, params: {
+            "sensors": sensor.GetSensors(rpc_id, params.get("verbosity", "all")),
+            "time": sensor.GetSystemTime(rpc_id),
+        },
+    ),
+    "acoustic.get_config": (
+        ("name",),
+        lambda sensor, rpc_id, params: sensor.GetConfiguration(
+            rpc_id, params["name"], params.get("verbosity", "all")
+        ),
+    ),
+    "acoustic.configure": (
+        ("config",),
+        lambda sensor, rpc_id, params: sensor.Configure(
+            rpc_id, params["config"], params.get("verbosity", "all")
+        ),
+    ),
+    "acoustic.pulsers_off": (
+        (),
+        lambda sensor, rpc_id, params: sensor.AllPulsersOff(
+            rpc_id, bool(params.get("passives_too", False))
+        ),
+    ),
+    "acoustic.set_pulser": (
+        ("name", "pulser"),
+        lambda sensor, rpc_id, params: sensor.SetPulser(rpc_id, params["name"], params["pulser"]),
+    ),
+    "acoustic.clear_live_data": ((), lambda sensor, rpc_id, params: sensor.ClearLiveData(rpc_id)),
+    "acoustic.start": (
+        (),
+        lambda sensor, rpc_id, params: sensor.StartRecording(
+            rpc_id,
+            **{
+                key: params[key]
+                for key in ("measurement_name", "record_history_secs")
+                if key in params
+            },
+        ),
+    ),
+    "acoustic.pause": ((), lambda sensor, rpc_id, params: sensor.PauseRecording(rpc_id)),
+    "acoustic.stop": ((), lambda sensor, rpc_id, params: sensor.StopRecording(rpc_id)),
+    "acoustic.state": ((), lambda sensor, rpc_id, params: sensor.GetRecordingState(rpc_id)),
+}
+
+# Camera operations of /batch and the capture task validating their parameters
+_batch_capture_operations = {
+    "rgb.capture": "rgb",
+    "multispectral.capture": "multispectral",
+}
+
+BATCH_OPERATIONS = (
+    *_batch_acoustic_operations,
+    *_batch_capture_operations,
+    "rgb.config",
+    "wait",
+)
+
+
+# Device of the RGB steps using the default camera until the batch is valid; validation
+# does not enumerate the cameras
+_DEFAULT_RGB_DEVICE = "rgb:default"
+
+
+def _batch_rgb_device(params: Dict[str, Any]) -> str:
+    serial_number = params.get("serial_number")
+    return f"rgb:{serial_number}" if serial_number else _DEFAULT_RGB_DEVICE
+
+
+def _batch_step(spec: Dict[str, Any], index: int, earlier: List[str]) -> Batch_Step:
+    """
+    Validate one step of a /batch request and bind it to its device.
+
+    Args:
+        spec (Dict[str, Any]): The step: operation, optional id, params and after
+        index (int): Position of the step in the batch
+        earlier (List[str]): IDs of the steps before it
+
+    Returns:
+        Batch_Step: The step, ready to run
+
+    Raises:
+        ValueError: If the step is invalid
+        Driver_Disabled_Error: If its device driver is not enabled on this node
+    """
+    if not isinstance(spec, dict):
+        raise ValueError(f"Step {index} must be an object")
+    operation = spec.get("operation")
+    if operation not in BATCH_OPERATIONS:
+        raise ValueError(f"Step {index}: operation must be one of: {', '.join(BATCH_OPERATIONS)}")
+    step_id = str(spec.get("id", index))
+    if step_id in earlier:
+        raise ValueError(f"Step {index}: duplicate id {step_id}")
+    params = spec.get("params") or {}
+    if not isinstance(params, dict):
+        raise ValueError(f"Step {step_id}: params must be an object")
+
+    # Without 'after' a step waits for all earlier steps; 'after': [] lets it run at once
+    after = spec.get("after")
+    if after is None:
+        after = list(earlier)
+    elif not isinstance(after, list) or any(str(name) not in earlier for name in after):
+        raise ValueError(f"Step {step_id}: after must list ids of earlier steps")
+    after = [str(name) for name in after]
+
+    if operation == "wait":
+        seconds = params.get("seconds")
+        if not isinstance(seconds, (int, float)) or not 0 <= seconds <= Config.BATCH_MAX_WAIT:
+            raise ValueError(
+                f"Step {step_id}: seconds must be between 0 and {Config.BATCH_MAX_WAIT}"
+            )
+
+        def wait_step(session: Batch_Session, should_stop: Callable[[], bool]) -> Dict[str, Any]:
+            deadline = time.monotonic() + seconds
+            while not should_stop() and time.monotonic() < deadline:
+                time.sleep(min(0.05, max(0.0, deadline - time.monotonic())))
+            return {"waited": seconds}
+
+        return Batch_Step(step_id, operation, wait_step, after=after)
+
+    drivers.require(operation.split(".")[0])
+
+    if operation in _batch_acoustic_operations:
+        required, call = _batch_acoustic_operations[operation]
+        missing = [name for name in required if name not in params]
+        if missing:
+            raise ValueError(f"Step {step_id}: missing params {missing}")
+        ip = params.get("ip", Config.DEFAULT_SENSOR_IP)
+        port = int(params.get("port", Config.DEFAULT_SENSOR_PORT))
+        device = f"acoustic:{ip}:{port}"
+
+        def acoustic(session: Batch_Session, should_stop: Callable[[], bool]) -> Any:
+            sensor_controller = session.connection(
+                device, lambda: get_sensor_controller(ip, port), lambda sensor: sensor.Close()
+            )
+            return call(sensor_controller, step_id, params)
+
+        return Batch_Step(step_id, operation, acoustic, device=device, after=after)
+
+    if operation == "rgb.config":
+        serial_number = params.get("serial_number")
+
+        def rgb_config(session: Batch_Session, should_stop: Callable[[], bool]) -> Dict[str, Any]:
+            rgb_camera_controller = get_shared_rgb_camera_controller(serial_number)
+            return _rgb_config_data(rgb_camera_controller, rgb_camera_controller.get_snapshot())
+
+        return Batch_Step(
+            step_id, operation, rgb_config, device=_batch_rgb_device(params), after=after
+        )
+
+    run = _capture_tasks[_batch_capture_operations[operation]](params)
+    if operation == "rgb.capture":
+        device = _batch_rgb_device(params)
+    else:
+        device = "multispectral"
+    return Batch_Step(
+        step_id,
+        operation,
+        lambda session, should_stop: run(should_stop=should_stop),
+        device=device,
+        after=after,
+    )
+
+
+@app.route("/batch", methods=["POST"])
+def batch_run() -> Response:
+    """
+    Endpoint to run a list of camera and acoustic operations in one request.
+
+    The steps run in order on shared device connections. A step without
+    "after" waits for every earlier step; one listing the steps it depends
+    on ("after": [] for none) runs as soon as they succeeded, in parallel
+    with steps on other devices. Steps on the same device never overlap.
+    With "stop_on_error" (default true) the first failure skips the
+    remaining steps and stops running captures after their current frame.
+    All devices of the batch are admitted together before the first step.
+
+    Returns:
+        Response: JSON response with the status, result or error and timings of each
+        step; 400 if a step is invalid or 503 if a device is unavailable, nothing
+        being run then
+    """
+    try:
+        config = request.json
+        if (
+            not isinstance(config, dict)
+            or not isinstance(config.get("steps"), list)
+            or not config["steps"]
+        ):
+            return jsonify({"error": "No steps provided"}), 400
+        if len(config["steps"]) > Config.BATCH_MAX_STEPS:
+            return jsonify({"error": f"At most {Config.BATCH_MAX_STEPS} steps allowed"}), 400
+        stop_on_error = config.get("stop_on_error", True)
+        if not isinstance(stop_on_error, bool):
+            return jsonify({"error": "stop_on_error must be true or false"}), 400
+
+        steps: List[Batch_Step] = []
+        try:
+            for index, spec in enumerate(config["steps"]):
+                steps.append(_batch_step(spec, index, [step.step_id for step in steps]))
+        except Driver_Disabled_Error as e:
+            return jsonify({"error": str(e)}), 503
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        if any(step.device == _DEFAULT_RGB_DEVICE for step in steps):
+            try:
+                default_device = f"rgb:{get_default_rgb_camera_serial()}"
+            except RuntimeError as e:
+                return jsonify({"error": str(e)}), 503
+            for step in steps:
+                if step.device == _DEFAULT_RGB_DEVICE:
+                    step.device = default_device
+
+        devices = {step.device for step in steps if step.device is not None}
+        try:
+            with device_scheduler.admit(devices, _request_client(), BULK):
+                data = Batch_Runner(Config.BATCH_MAX_PARALLEL).run(
+                    steps, stop_on_error=stop_on_error
+                )
+        except Device_Busy_Error as e:
+            return _busy_response(e)
+        finally:
+            # Commands may have changed what the sensors report
+            acoustic_cache.invalidate(lambda key: key[0] in devices)
+
+        return jsonify({"success": data["failed"] == 0 and data["skipped"] == 0, "data": data})
+    except Exception as e:
+        logger.error("Error in batch_run: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/metrics/devices", methods=["GET"])
+def device_metrics() -> Response:
+    """
+    Endpoint to get the admission queues of the devices.
+
+    Returns:
+        Response: JSON response with, per device, whether it is busy, the waiting
+        requests, admission and rejection counters and wait and service times
+    """
+    try:
+        return jsonify({"devices": device_scheduler.metrics()})
+    except Exception as e:
+        logger.error("Error in device_metrics: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+
+# Admin endpoints; with a hardware owner, add ?process=owner to ask the owner
+@app.route("/admin/traces", methods=["GET"])
+def admin_traces() -> Response:
+    """
+    Endpoint to list the most recent request and capture job traces.
+
+    Returns:
+        Response: JSON response with the traces, newest first, each with its
+        duration, status and time per span name
+    """
+    try:
+        limit = request.args.get("limit", type=int)
+        if limit is not None and limit < 0:
+            return jsonify({"error": "limit must not be negative"}), 400
+        return jsonify({"traces": tracer.recent(limit)})
+    except Exception as e:
+        logger.error("Error in admin_traces: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/admin/traces/<trace_id>", methods=["GET"])
+def admin_trace_get(trace_id: str) -> Response:
+    """
+    Endpoint to get one trace with all its spans.
+
+    Args:
+        trace_id (str): Trace identifier, e.g. from the X-Trace-Id header
+
+    Returns:
+        Response: JSON response with the trace
+    """
+    try:
+        return jsonify({"trace": tracer.get(trace_id)})
+    except KeyError:
+        return jsonify({"error": f"Unknown trace: {trace_id}"}), 404
+    except Exception as e:
+        logger.error("Error in admin_trace_get: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/admin/profile", methods=["POST"])
+def admin_profile() -> Response:
+    """
+    Endpoint to profile the process under its current load.
+
+    Samples the stacks of all threads for `seconds` (default 5, at most
+    PROFILER_MAX_SECONDS) every `interval` seconds (default 0.005) and
+    answers when done. `include_idle` also counts threads waiting for work;
+    `format=collapsed` returns the collapsed stacks as text for flamegraph
+    tools instead of the JSON report. Parameters are read from the JSON body
+    or the query string.
+
+    Returns:
+        Response: JSON report with the samples per thread and the hottest functions,
+        409 if a profile is already running
+    """
+    try:
+        data = {**request.args, **(request.get_json(silent=True) or {})}
+        try:
+            seconds = float(data.get("seconds", 5))
+            interval = float(data.get("interval", 0.005))
+        except (TypeError, ValueError):
+            return jsonify({"error": "seconds and interval must be numbers"}), 400
+        if not 0 < seconds <= Config.PROFILER_MAX_SECONDS or not 0 < interval <= 1:
+            return jsonify(
+                {
+                    "error": f"seconds must be in (0, {Config.PROFILER_MAX_SECONDS}] "
+                    "and interval in (0, 1]"
+                }
+            ), 400
+        include_idle = str(data.get("include_idle", "false")).lower() in ("true", "1", "yes")
+
+        try:
+            report = get_sampling_profiler().profile(seconds, interval, include_idle)
+        except RuntimeError as e:
+            return jsonify({"error": str(e)}), 409
+
+        if data.get("format") == "collapsed":
+            return Response("\n".join(report["collapsed"]) + "\n", mimetype="text/plain")
+        return jsonify({"profile": report})
+    except Exception as e:
+        logger.error("Error in admin_profile: %s", e)
         return jsonify({"error": str(e)}), 500
 
 
@@ -377,8 +2341,21 @@ def get_app_config() -> Response:
     Endpoint to get the current application configuration (excluding sensitive info).
 
     Returns:
-        Response: JSON response with application configuration
+        Response: JSON response with application configuration, or 304 if the client
+        has it already
     """
+    global _config_etag
+
+    if _config_etag is None:
+        # The configuration is fixed at startup, so its version is computed once
+        digest = hashlib.sha256(
+            json.dumps(_public_config(), default=str, sort_keys=True).encode("utf-8")
+        ).hexdigest()
+        _config_etag = f"config-{digest[:16]}"
+    return _versioned_json(_config_etag, lambda: {"config": _public_config()})
+
+
+def _public_config() -> Dict[str, Any]:
     # Filter out private attributes and functions
     config_dict = {
         k: v
@@ -387,21 +2364,87 @@ def get_app_config() -> Response:
     }
 
     # Remove any sensitive information if needed
-    # sensitive_keys = ["API_KEY", "SECRET_KEY"]
-    # for key in sensitive_keys:
-    #     if key in config_dict:
-    #         config_dict[key] = "***REDACTED***"
+    sensitive_keys = ["HARDWARE_OWNER_AUTHKEY", "ADMIN_TOKEN"]
+    for key in sensitive_keys:
+        if key in config_dict:
+            config_dict[key] = "***REDACTED***"
+    return config_dict
+
 
-    return jsonify({"config": config_dict})
+def resume_capture_jobs() -> None:
+    """
+    Resume persisted interval capture jobs at startup.
+
+    The capture scheduler is started when its state file holds scheduled or
+    running jobs, so they continue after a restart without waiting for a
+    scheduler request. With a hardware owner the jobs run in the owner, so
+    API workers leave them alone.
+    """
+    if not drivers.is_enabled("rgb"):
+        return
+    if Config.HARDWARE_OWNER_ADDRESS and not _is_hardware_owner:
+        return
+    try:
+        with open(Config.SCHEDULER_STATE_FILE, "r", encoding="utf-8") as f:
+            stored_jobs = json.load(f)
+    except FileNotFoundError:
+        return
+    except Exception as e:
+        logger.error("Failed to read capture jobs from %s: %s", Config.SCHEDULER_STATE_FILE, e)
+        return
+
+    if any(job.get("state") in ("scheduled", "running") for job in stored_jobs):
+        try:
+            get_capture_scheduler()
+        except Exception as e:
+            logger.error("Failed to resume capture jobs: %s", e)
+
+
+def run_hardware_owner() -> None:
+    """
+    Run this process as the hardware owner.
+
+    The owner holds the camera and sensor connections and the capture
+    scheduler, and serves the device requests that API workers forward
+    over HARDWARE_OWNER_ADDRESS until it is interrupted.
+    """
+    from BussinessLayer.Hardware_Owner import Hardware_Owner_Server
+
+    global _is_hardware_owner
+    _is_hardware_owner = True
+    if not Config.HARDWARE_OWNER_ADDRESS:
+        raise SystemExit("HARDWARE_OWNER_ADDRESS must be set to run the hardware owner")
 
+    server = Hardware_Owner_Server(
+        app.wsgi_app, Config.HARDWARE_OWNER_ADDRESS, Config.HARDWARE_OWNER_AUTHKEY.encode()
+    )
+    # Stop on SIGTERM like on Ctrl+C, so the shared memory is released
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    resume_capture_jobs()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
 
-if __name__ == "__main__":
+
+if __name__ == "__main__" and sys.argv[1:] == ["--hardware-owner"]:
+    run_hardware_owner()
+elif __name__ == "__main__":
     # Get port and host from config
     port = Config.PORT
     host = Config.HOST
 
-    logger.info(f"Starting ASS/NSS API on {host}:{port}")
-    logger.info(f"Environment: {os.environ.get('FLASK_ENV', 'development')}")
-    logger.info(f"Debug mode: {'enabled' if Config.DEBUG else 'disabled'}")
+    logger.info("Starting ASS/NSS API on %s:%s", host, port)
+    logger.info("Environment: %s", os.environ.get("FLASK_ENV", "development"))
+    logger.info("Debug mode: %s", "enabled" if Config.DEBUG else "disabled")
+
+    # Resume persisted capture jobs only in the serving process under the reloader
+    if not Config.DEBUG or os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        resume_capture_jobs()
 
     app.run(debug=Config.DEBUG, host=host, port=port)
+else:
+    # Imported by a WSGI server: resume at startup, not on the first scheduler request
+    resume_capture_jobs()
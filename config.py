@@ -8,7 +8,7 @@ import logging
 import os
 from dataclasses import asdict, dataclass, field
 from enum import Enum
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 from dotenv import load_dotenv
 
@@ -39,6 +39,55 @@ class AppConfig:
     PORT: int = field(default_factory=lambda: int(os.environ.get("PORT", 5005)))
     HOST: str = field(default_factory=lambda: os.environ.get("HOST", "0.0.0.0"))
     
+    # Device drivers loaded on this node, "auto" for all whose packages are installed
+    ENABLED_DRIVERS: List[str] = field(
+        default_factory=lambda: os.environ.get("ENABLED_DRIVERS", "auto").split(",")
+    )
+
+    # Unix socket of the hardware-owner process; when set, device endpoints are
+    # forwarded to that process and the API can run with several workers
+    HARDWARE_OWNER_ADDRESS: str = field(
+        default_factory=lambda: os.environ.get("HARDWARE_OWNER_ADDRESS", "")
+    )
+    HARDWARE_OWNER_AUTHKEY: str = field(
+        default_factory=lambda: os.environ.get("HARDWARE_OWNER_AUTHKEY", "")
+    )
+
+    # Finished request traces kept for GET /admin/traces, 0 to trace only
+    # requests sending the X-Debug-Trace header
+    TRACE_HISTORY: int = field(
+        default_factory=lambda: int(os.environ.get("TRACE_HISTORY", 200))
+    )
+    # Longest profile POST /admin/profile may record, in seconds
+    PROFILER_MAX_SECONDS: float = field(
+        default_factory=lambda: float(os.environ.get("PROFILER_MAX_SECONDS", 60))
+    )
+    # Bearer token required by the /admin endpoints, empty for none
+    ADMIN_TOKEN: str = field(default_factory=lambda: os.environ.get("ADMIN_TOKEN", ""))
+
+    # Device admission: requests waiting per device and per client and device,
+    # and the longest wait in seconds before answering 429
+    DEVICE_QUEUE_LIMIT: int = field(
+        default_factory=lambda: int(os.environ.get("DEVICE_QUEUE_LIMIT", 8))
+    )
+    DEVICE_QUEUE_CLIENT_LIMIT: int = field(
+        default_factory=lambda: int(os.environ.get("DEVICE_QUEUE_CLIENT_LIMIT", 4))
+    )
+    DEVICE_QUEUE_TIMEOUT: float = field(
+        default_factory=lambda: float(os.environ.get("DEVICE_QUEUE_TIMEOUT", 30))
+    )
+
+    # Response caching: encoded bodies of versioned GET responses and acoustic sensor reads
+    RESPONSE_CACHE_BYTES: int = field(
+        default_factory=lambda: int(os.environ.get("RESPONSE_CACHE_BYTES", 4 * 1024 * 1024))
+    )
+    COMPRESS_MIN_SIZE: int = field(
+        default_factory=lambda: int(os.environ.get("COMPRESS_MIN_SIZE", 1024))
+    )
+    ACOUSTIC_CACHE_TTL: float = field(
+        default_factory=lambda: float(os.environ.get("ACOUSTIC_CACHE_TTL", 5))
+    )
+
     # Camera settings
     DEFAULT_RGB_CAMERA_WIDTH: int = field(
         default_factory=lambda: int(os.environ.get("DEFAULT_RGB_CAMERA_WIDTH", 1920))
@@ -49,9 +98,91 @@ class AppConfig:
     DEFAULT_RGB_CAMERA_FORMAT: str = field(
         default_factory=lambda: os.environ.get("DEFAULT_RGB_CAMERA_FORMAT", "RGB8")
     )
+    DEFAULT_RGB_CAMERA_SERIAL: Optional[str] = field(
+        default_factory=lambda: os.environ.get("DEFAULT_RGB_CAMERA_SERIAL") or None
+    )
+    RGB_SNAPSHOT_INTERVAL: float = field(
+        default_factory=lambda: float(os.environ.get("RGB_SNAPSHOT_INTERVAL", 60))
+    )
+    RGB_CONTINUOUS_GRAB: bool = field(
+        default_factory=lambda: os.environ.get("RGB_CONTINUOUS_GRAB", "False").lower()
+        in ("true", "1", "yes")
+    )
+    RGB_RING_SIZE: int = field(
+        default_factory=lambda: int(os.environ.get("RGB_RING_SIZE", 4))
+    )
+    BAYER_DEMOSAIC_WORKERS: Optional[int] = field(
+        default_factory=lambda: int(os.environ["BAYER_DEMOSAIC_WORKERS"])
+        if os.environ.get("BAYER_DEMOSAIC_WORKERS")
+        else None
+    )
+    THUMBNAIL_SIZES: List[int] = field(
+        default_factory=lambda: [
+            int(size) for size in os.environ.get("THUMBNAIL_SIZES", "160,640").split(",")
+        ]
+    )
+    THUMBNAIL_WORKERS: Optional[int] = field(
+        default_factory=lambda: int(os.environ["THUMBNAIL_WORKERS"])
+        if os.environ.get("THUMBNAIL_WORKERS")
+        else None
+    )
+    THUMBNAIL_CACHE_MB: int = field(
+        default_factory=lambda: int(os.environ.get("THUMBNAIL_CACHE_MB", 64))
+    )
+    MULTISPECTRAL_BACKEND: str = field(
+        default_factory=lambda: os.environ.get("MULTISPECTRAL_BACKEND", "")
+    )
+    MULTISPECTRAL_WIDTH: int = field(
+        default_factory=lambda: int(os.environ.get("MULTISPECTRAL_WIDTH", 640))
+    )
+    MULTISPECTRAL_HEIGHT: int = field(
+        default_factory=lambda: int(os.environ.get("MULTISPECTRAL_HEIGHT", 512))
+    )
+    MULTISPECTRAL_WAVELENGTHS: Optional[List[float]] = field(
+        default_factory=lambda: [
+            float(w) for w in os.environ["MULTISPECTRAL_WAVELENGTHS"].split(",")
+        ]
+        if os.environ.get("MULTISPECTRAL_WAVELENGTHS")
+        else None
+    )
+    SPECTRAL_INDEX_WORKERS: Optional[int] = field(
+        default_factory=lambda: int(os.environ["SPECTRAL_INDEX_WORKERS"])
+        if os.environ.get("SPECTRAL_INDEX_WORKERS")
+        else None
+    )
+    # Background capture jobs (POST /jobs)
+    CAPTURE_JOB_WORKERS: int = field(
+        default_factory=lambda: int(os.environ.get("CAPTURE_JOB_WORKERS", 2))
+    )
+    CAPTURE_JOB_HISTORY: int = field(
+        default_factory=lambda: int(os.environ.get("CAPTURE_JOB_HISTORY", 100))
+    )
+
+    # Batches: steps per /batch request, steps running at the same time, longest wait step
+    BATCH_MAX_STEPS: int = field(
+        default_factory=lambda: int(os.environ.get("BATCH_MAX_STEPS", 100))
+    )
+    BATCH_MAX_PARALLEL: int = field(
+        default_factory=lambda: int(os.environ.get("BATCH_MAX_PARALLEL", 4))
+    )
+    BATCH_MAX_WAIT: float = field(
+        default_factory=lambda: float(os.environ.get("BATCH_MAX_WAIT", 300))
+    )
+
     CAMERA_DEVICE: str = field(
         default_factory=lambda: os.environ.get("CAMERA_DEVICE", "/dev/null")
     )
+
+    # Live preview settings
+    PREVIEW_MAX_WIDTH: int = field(
+        default_factory=lambda: int(os.environ.get("PREVIEW_MAX_WIDTH", 640))
+    )
+    PREVIEW_JPEG_QUALITY: int = field(
+        default_factory=lambda: int(os.environ.get("PREVIEW_JPEG_QUALITY", 70))
+    )
+    PREVIEW_MAX_FPS: float = field(
+        default_factory=lambda: float(os.environ.get("PREVIEW_MAX_FPS", 10))
+    )
     
     # Sensor settings
     DEFAULT_SENSOR_IP: str = field(
@@ -60,18 +191,53 @@ class AppConfig:
     DEFAULT_SENSOR_PORT: int = field(
         default_factory=lambda: int(os.environ.get("DEFAULT_SENSOR_PORT", 40999))
     )
+    # Field of the ZDaemon GetSystemTime result holding the hardware time in nanoseconds
+    SYNC_SENSOR_TIME_FIELD: str = field(
+        default_factory=lambda: os.environ.get("SYNC_SENSOR_TIME_FIELD", "time_ns")
+    )
     
     # Storage settings
     DEFAULT_STORAGE_PATH: str = field(
         default_factory=lambda: os.environ.get("DEFAULT_STORAGE_PATH", "./storage/")
     )
     
+    # Let a front server (Apache, lighttpd) deliver downloads via the X-Sendfile header
+    USE_X_SENDFILE: bool = field(
+        default_factory=lambda: os.environ.get("USE_X_SENDFILE", "False").lower()
+        in ("true", "1", "yes")
+    )
+
+    # Capture scheduler settings
+    SCHEDULER_STATE_FILE: str = field(
+        default_factory=lambda: os.environ.get(
+            "SCHEDULER_STATE_FILE",
+            os.path.join(
+                os.environ.get("DEFAULT_STORAGE_PATH", "./storage/"), "capture_jobs.json"
+            ),
+        )
+    )
+
     # Logging settings
     LOG_LEVEL: str = field(
         default_factory=lambda: 
         os.environ.get("LOG_LEVEL", "DEBUG" if os.environ.get("FLASK_ENV", "").lower() != "production" else "WARNING")
     )
     LOG_FORMAT: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    # Log file, rotated at LOG_MAX_BYTES or by time with LOG_ROTATE_WHEN (e.g. "midnight");
+    # empty to log to stderr only
+    LOG_FILE: str = field(default_factory=lambda: os.environ.get("LOG_FILE", "app.log"))
+    LOG_MAX_BYTES: int = field(
+        default_factory=lambda: int(os.environ.get("LOG_MAX_BYTES", 10 * 1024 * 1024))
+    )
+    LOG_BACKUP_COUNT: int = field(
+        default_factory=lambda: int(os.environ.get("LOG_BACKUP_COUNT", 5))
+    )
+    LOG_ROTATE_WHEN: str = field(default_factory=lambda: os.environ.get("LOG_ROTATE_WHEN", ""))
+    LOG_JSON: bool = field(
+        default_factory=lambda: os.environ.get("LOG_JSON", "False").lower() in ("true", "1", "yes")
+    )
+    # Fraction of debug records kept per logger, "logger=rate,..."
+    LOG_SAMPLING: str = field(default_factory=lambda: os.environ.get("LOG_SAMPLING", ""))
     
     # CORS settings
     CORS_ORIGINS: str = field(
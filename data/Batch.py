@@ -0,0 +1,61 @@
+"""
+Data models for batched device operations.
+
+This module contains the record of one step of a /batch request: the
+operation, the device it runs on, the steps it waits for and, once run,
+its result or error and timings.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+
+@dataclass
+class Batch_Step:
+    """
+    Operation of a batch.
+
+    Attributes:
+        step_id (str): Identifier unique within the batch, referenced by 'after'
+        operation (str): Operation name, e.g. 'acoustic.configure' or 'rgb.capture'
+        work (Callable[..., Any]): Runs the operation; called with the batch session
+            and a should_stop callback
+        device (str, optional): Device the step uses, e.g. 'acoustic:192.168.1.10:1234';
+            steps on the same device run one after another
+        after (List[str]): Steps that must have succeeded before this one starts
+        status (str): One of 'pending', 'running', 'succeeded', 'failed', 'skipped'
+        start (float, optional): Milliseconds from the start of the batch to the start of the step
+        duration (float, optional): Length of the step in milliseconds
+        result (Any, optional): Result of a succeeded step
+        error (str, optional): Why the step failed or was skipped
+    """
+
+    step_id: str
+    operation: str
+    work: Callable[..., Any] = field(repr=False)
+    device: Optional[str] = None
+    after: List[str] = field(default_factory=list)
+    status: str = "pending"
+    start: Optional[float] = None
+    duration: Optional[float] = None
+    result: Any = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert the step to a dictionary.
+
+        Returns:
+            Dict[str, Any]: The step without its work function
+        """
+        return {
+            "id": self.step_id,
+            "operation": self.operation,
+            "device": self.device,
+            "after": self.after,
+            "status": self.status,
+            "start_ms": self.start,
+            "duration_ms": self.duration,
+            "result": self.result,
+            "error": self.error,
+        }
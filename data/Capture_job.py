@@ -0,0 +1,102 @@
+"""
+Data models for asynchronous capture jobs.
+
+This module contains the record of a capture started through the job API,
+including its progress counters and the files written so far.
+"""
+
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+
+@dataclass
+class Capture_Job:
+    """
+    Capture running in the background on behalf of a job API request.
+
+    Attributes:
+        job_type (str): Kind of capture, e.g. 'rgb' or 'multispectral'
+        config (Dict[str, Any]): Request body the job was created from
+        total (int): Number of frames requested
+        job_id (str): Unique job identifier
+        state (str): One of 'queued', 'running', 'completed', 'failed', 'cancelled'
+        created_at (float): Unix time the job was created
+        started_at (float, optional): Unix time the capture started
+        finished_at (float, optional): Unix time the capture ended
+        frames_done (int): Number of frames stored so far
+        bytes_written (int): Size of the files written so far
+        files (List[str]): Files written so far, in order
+        cancel_requested (bool): Whether cancellation was requested
+        result (Dict[str, Any], optional): Result of the capture once finished
+        error (str, optional): Error message of a failed job
+        version (int): Incremented on every change, for progress watchers
+        trace_id (str, optional): Trace of the capture, see GET /admin/traces/<trace_id>
+    """
+
+    job_type: str
+    config: Dict[str, Any]
+    total: int
+    job_id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+    state: str = "queued"
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    frames_done: int = 0
+    bytes_written: int = 0
+    files: List[str] = field(default_factory=list)
+    cancel_requested: bool = False
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    version: int = 0
+    trace_id: Optional[str] = None
+
+    @property
+    def active(self) -> bool:
+        """Whether the job is queued or running."""
+        return self.state in ("queued", "running")
+
+    def progress(self) -> Dict[str, Any]:
+        """
+        Return the progress of the job.
+
+        Returns:
+            Dict[str, Any]: State, frame counters, frames per second, bytes written
+            and elapsed seconds
+        """
+        elapsed = None
+        fps = None
+        if self.started_at is not None:
+            elapsed = (self.finished_at or time.time()) - self.started_at
+            if elapsed > 0:
+                fps = self.frames_done / elapsed
+
+        return {
+            "job_id": self.job_id,
+            "state": self.state,
+            "frames_done": self.frames_done,
+            "total": self.total,
+            "fps": fps,
+            "bytes_written": self.bytes_written,
+            "elapsed": elapsed,
+            "version": self.version,
+        }
+
+    def to_dict(self, include_files: bool = True) -> Dict[str, Any]:
+        """
+        Convert the job to a dictionary.
+
+        Args:
+            include_files (bool, optional): Include the written files and the result.
+                Defaults to True.
+
+        Returns:
+            Dict[str, Any]: The job including its progress
+        """
+        data = asdict(self)
+        if not include_files:
+            data.pop("files")
+            data.pop("result")
+        data["progress"] = self.progress()
+        return data
@@ -0,0 +1,206 @@
+"""
+Data models for scheduled interval captures.
+
+This module contains the data model for timelapse / interval capture jobs,
+including the timing statistics persisted together with the job state.
+"""
+
+import math
+import time
+import uuid
+from dataclasses import asdict, dataclass, field, fields
+from typing import Any, Dict, Literal, Optional
+
+
+def _is_number(value: Any) -> bool:
+    # bool is an int subclass, but True is not a time or a period
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+@dataclass
+class Interval_Capture_Job:
+    """
+    Interval capture job run by the capture scheduler.
+
+    Slot k of a job is due at start_at + k * period (wall clock seconds), so
+    timing never drifts no matter how long individual captures take.
+
+    Attributes:
+        path (str): Directory path where to save the images
+        name (str): Name prefix of the image files
+        period (float): Interval between captures in seconds
+        count (int, optional): Number of images to capture, None for unlimited
+        start_at (float, optional): Unix time of the first slot. Defaults to now.
+        end_at (float, optional): Unix time after which no slot is captured
+        quality (int): Image quality (0-100). Defaults to 100.
+        image_format (str): Format of the saved images. Defaults to 'png'.
+        job_id (str): Unique job identifier
+        state (str): One of 'scheduled', 'running', 'completed', 'cancelled'
+        next_slot (int): Index of the next slot to capture
+        captured (int): Number of images captured so far
+        missed_slots (int): Slots skipped because they could not be served in time
+        failed_slots (int): Slots whose capture raised an error
+        first_capture_at (float, optional): Unix time of the first capture
+        last_capture_at (float, optional): Unix time of the last capture
+        last_file (str, optional): Most recently written file
+        lateness_mean (float): Mean capture delay behind the slot time in seconds
+        lateness_m2 (float): Running sum of squared deviations of the delay
+        lateness_max (float): Largest capture delay behind the slot time in seconds
+        error (str, optional): Last error message
+    """
+
+    path: str
+    name: str
+    period: float
+    count: Optional[int] = None
+    start_at: Optional[float] = None
+    end_at: Optional[float] = None
+    quality: int = 100
+    image_format: Literal["tiff", "png", "raw"] = "png"
+    job_id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+    state: str = "scheduled"
+    next_slot: int = 0
+    captured: int = 0
+    missed_slots: int = 0
+    failed_slots: int = 0
+    first_capture_at: Optional[float] = None
+    last_capture_at: Optional[float] = None
+    last_file: Optional[str] = None
+    lateness_mean: float = 0.0
+    lateness_m2: float = 0.0
+    lateness_max: float = 0.0
+    error: Optional[str] = None
+
+    def __post_init__(self):
+        """
+        Validate the job after initialization.
+
+        Raises:
+            ValueError: If any of the parameters are invalid
+        """
+        if not isinstance(self.path, str):
+            raise ValueError("Path must be a string")
+
+        if not isinstance(self.name, str) or not self.name:
+            raise ValueError("Name must be a non-empty string")
+
+        if not _is_number(self.period) or self.period <= 0:
+            raise ValueError("Period must be a positive number of seconds")
+        self.period = float(self.period)
+
+        if self.count is not None and (
+            isinstance(self.count, bool) or not isinstance(self.count, int) or self.count < 1
+        ):
+            raise ValueError("Count must be a positive integer")
+
+        if not isinstance(self.quality, int) or not (0 <= self.quality <= 100):
+            raise ValueError("Quality must be an integer between 0 and 100")
+
+        valid_formats = ["tiff", "png", "raw"]
+        if self.image_format not in valid_formats:
+            raise ValueError(f"Image format must be one of: {', '.join(valid_formats)}")
+
+        if self.start_at is not None and not _is_number(self.start_at):
+            raise ValueError("Start time must be a Unix time in seconds")
+        if self.end_at is not None and not _is_number(self.end_at):
+            raise ValueError("End time must be a Unix time in seconds")
+
+        if self.start_at is None:
+            self.start_at = time.time()
+        if self.end_at is not None and self.end_at <= self.start_at:
+            raise ValueError("End time must be after start time")
+
+    @property
+    def active(self) -> bool:
+        """Whether the job still has slots to capture."""
+        return self.state in ("scheduled", "running")
+
+    def slot_time(self, slot: int) -> float:
+        """
+        Return the wall clock time at which a slot is due.
+
+        Args:
+            slot (int): Slot index
+
+        Returns:
+            float: Unix time of the slot
+        """
+        return self.start_at + slot * self.period
+
+    def is_exhausted(self, slot: int) -> bool:
+        """
+        Check whether a slot lies beyond the job count or window.
+
+        Args:
+            slot (int): Slot index
+
+        Returns:
+            bool: True if the slot must not be captured
+        """
+        if self.count is not None and slot >= self.count:
+            return True
+        return self.end_at is not None and self.slot_time(slot) > self.end_at
+
+    def record_capture(self, slot_time: float, captured_at: float, filename: str) -> None:
+        """
+        Record a successful capture and update the timing statistics.
+
+        Args:
+            slot_time (float): Unix time the slot was due
+            captured_at (float): Unix time the frame was captured
+            filename (str): Written file
+        """
+        lateness = captured_at - slot_time
+        self.captured += 1
+        delta = lateness - self.lateness_mean
+        self.lateness_mean += delta / self.captured
+        self.lateness_m2 += delta * (lateness - self.lateness_mean)
+        self.lateness_max = max(self.lateness_max, lateness)
+
+        if self.first_capture_at is None:
+            self.first_capture_at = captured_at
+        self.last_capture_at = captured_at
+        self.last_file = filename
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the timing statistics of the job.
+
+        Returns:
+            Dict[str, Any]: Achieved period, jitter and slot counters
+        """
+        achieved_period = None
+        if self.captured > 1:
+            achieved_period = (self.last_capture_at - self.first_capture_at) / (
+                self.captured - 1
+            )
+        jitter = math.sqrt(self.lateness_m2 / self.captured) if self.captured else None
+
+        return {
+            "requested_period": self.period,
+            "achieved_period": achieved_period,
+            "jitter": jitter,
+            "mean_lateness": self.lateness_mean if self.captured else None,
+            "max_lateness": self.lateness_max if self.captured else None,
+            "captured": self.captured,
+            "missed_slots": self.missed_slots,
+            "failed_slots": self.failed_slots,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the job to a dictionary."""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Interval_Capture_Job":
+        """
+        Create a job from a dictionary, ignoring unknown keys.
+
+        Args:
+            data (Dict[str, Any]): Job dictionary, e.g. from to_dict()
+
+        Returns:
+            Interval_Capture_Job: The job
+        """
+        known = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in data.items() if k in known})
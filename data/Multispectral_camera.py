@@ -0,0 +1,64 @@
+"""
+Data models for multispectral camera operations.
+
+This module contains the frame format reported by multispectral camera
+backends and used to allocate spectral cubes.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Tuple
+
+
+@dataclass
+class Multispectral_Frame_Format:
+    """
+    Geometry and pixel type of a multispectral frame.
+
+    A frame is a (bands, height, width) array, one plane per spectral band.
+
+    Attributes:
+        wavelengths (List[float]): Center wavelength of each band in nm
+        width (int): Frame width in pixels
+        height (int): Frame height in pixels
+        dtype (str): NumPy dtype of the pixels, e.g. "uint16"
+        pixel_format (str): Pixel format name, e.g. "Mono12"
+    """
+
+    wavelengths: List[float]
+    width: int
+    height: int
+    dtype: str = "uint16"
+    pixel_format: str = "Mono12"
+
+    def __post_init__(self):
+        """
+        Validate the format after initialization.
+
+        Raises:
+            ValueError: If any of the parameters are invalid
+        """
+        if not self.wavelengths:
+            raise ValueError("At least one band is required")
+        for name in ("width", "height"):
+            value = getattr(self, name)
+            if not isinstance(value, int) or value < 1:
+                raise ValueError(f"{name} must be a positive integer")
+
+    @property
+    def bands(self) -> int:
+        return len(self.wavelengths)
+
+    @property
+    def shape(self) -> Tuple[int, int, int]:
+        return (self.bands, self.height, self.width)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the format to a dictionary."""
+        return {
+            "wavelengths": self.wavelengths,
+            "bands": self.bands,
+            "width": self.width,
+            "height": self.height,
+            "dtype": self.dtype,
+            "pixel_format": self.pixel_format,
+        }
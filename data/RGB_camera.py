@@ -5,8 +5,8 @@ This module contains data model classes for RGB camera operations,
 providing proper validation and data structure for camera requests.
 """
 
-from typing import Literal, Optional
-from dataclasses import dataclass
+from typing import Any, Dict, Literal, Optional
+from dataclasses import dataclass, field
 
 
 @dataclass
@@ -82,4 +82,109 @@ class RGB_Camera_Response:
     path: str
     format: str
     error: Optional[str] = None
-    
\ No newline at end of file
+    
+
+@dataclass
+class RGB_Camera_ROI:
+    """
+    Region of interest and on-sensor pixel reduction for a capture request.
+
+    Sizes and offsets are given in pixels after binning and decimation.
+    Limits and increments of the actual camera are checked by
+    RGB_Camera_Controller.apply_roi.
+
+    Attributes:
+        width (int, optional): Image width. Defaults to the controller width scaled by binning/decimation.
+        height (int, optional): Image height. Defaults to the controller height scaled by binning/decimation.
+        offset_x (int, optional): Horizontal offset. Defaults to 0.
+        offset_y (int, optional): Vertical offset. Defaults to 0.
+        center (bool): Center the region on the sensor instead of using offsets. Defaults to False.
+        binning_horizontal (int): Horizontal binning factor. Defaults to 1.
+        binning_vertical (int): Vertical binning factor. Defaults to 1.
+        decimation_horizontal (int): Horizontal decimation factor. Defaults to 1.
+        decimation_vertical (int): Vertical decimation factor. Defaults to 1.
+    """
+
+    width: Optional[int] = None
+    height: Optional[int] = None
+    offset_x: Optional[int] = None
+    offset_y: Optional[int] = None
+    center: bool = False
+    binning_horizontal: int = 1
+    binning_vertical: int = 1
+    decimation_horizontal: int = 1
+    decimation_vertical: int = 1
+
+    def __post_init__(self):
+        """
+        Validate the region after initialization.
+
+        Raises:
+            ValueError: If any of the parameters are invalid
+        """
+        for name in ("width", "height"):
+            value = getattr(self, name)
+            if value is not None and (not isinstance(value, int) or value < 1):
+                raise ValueError(f"{name} must be a positive integer")
+
+        for name in ("offset_x", "offset_y"):
+            value = getattr(self, name)
+            if value is not None and (not isinstance(value, int) or value < 0):
+                raise ValueError(f"{name} must be a non-negative integer")
+
+        for name in (
+            "binning_horizontal",
+            "binning_vertical",
+            "decimation_horizontal",
+            "decimation_vertical",
+        ):
+            value = getattr(self, name)
+            if not isinstance(value, int) or value < 1:
+                raise ValueError(f"{name} must be a positive integer")
+
+        if self.center and (self.offset_x is not None or self.offset_y is not None):
+            raise ValueError("Offsets cannot be combined with center")
+
+
+@dataclass
+class RGB_Camera_Snapshot:
+    """
+    Cached snapshot of the camera GenICam node map.
+
+    The snapshot lets configuration reads be answered from memory without any
+    traffic to the device. It is replaced as a whole whenever it is refreshed,
+    so readers never see a partially updated snapshot.
+
+    Attributes:
+        features (Dict[str, Dict[str, Any]]): Feature name to value, limits, increment,
+            unit, allowed symbolics and writability
+        taken_at (float): Unix time when the snapshot was read from the device
+        version (int): Changes whenever a refresh reads different features; unique
+            within the process, so it can serve as an ETag
+    """
+
+    features: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    taken_at: float = 0.0
+    version: int = 0
+
+    def value(self, name: str, default: Any = None) -> Any:
+        """
+        Return the cached value of a feature.
+
+        Args:
+            name (str): GenICam feature name, e.g. "Width"
+            default (Any, optional): Value returned if the feature is not cached. Defaults to None.
+
+        Returns:
+            Any: The cached value
+        """
+        feature = self.features.get(name)
+        return feature["value"] if feature is not None else default
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the snapshot to a dictionary."""
+        return {
+            "features": self.features,
+            "taken_at": self.taken_at,
+            "version": self.version,
+        }
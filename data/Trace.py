@@ -0,0 +1,91 @@
+"""
+Data models for request tracing.
+
+This module contains the record of a traced request or capture job and the
+timed spans (camera open, grab, save, ZDaemon call, ...) recorded in it.
+"""
+
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+
+@dataclass
+class Trace_Span:
+    """
+    Timed phase of a trace.
+
+    Attributes:
+        name (str): Phase name, e.g. 'rgb.retrieve_result'
+        start (float): Milliseconds since the start of the trace
+        duration (float, optional): Length of the phase in milliseconds, None while open
+        parent (int, optional): Index of the enclosing span in the trace
+        attributes (Dict[str, Any]): Details such as the frame number or RPC method
+        error (str, optional): Exception that ended the span
+    """
+
+    name: str
+    start: float
+    duration: Optional[float] = None
+    parent: Optional[int] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+
+@dataclass
+class Request_Trace:
+    """
+    Spans recorded while serving one request or running one capture job.
+
+    Attributes:
+        name (str): What was traced, e.g. 'POST /sensor/rgb/start'
+        trace_id (str): Unique trace identifier
+        started_at (float): Unix time the trace started
+        start_counter (float): time.perf_counter() at the start, for span offsets
+        duration (float, optional): Length of the trace in milliseconds once finished
+        status (int, optional): HTTP status of the response
+        spans (List[Trace_Span]): Spans in the order they were started
+        dropped_spans (int): Spans not recorded because the trace was full
+    """
+
+    name: str
+    trace_id: str = field(default_factory=lambda: uuid.uuid4().hex[:16])
+    started_at: float = field(default_factory=time.time)
+    start_counter: float = field(default_factory=time.perf_counter)
+    duration: Optional[float] = None
+    status: Optional[int] = None
+    spans: List[Trace_Span] = field(default_factory=list)
+    dropped_spans: int = 0
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Aggregate the spans by name.
+
+        Returns:
+            Dict[str, Dict[str, float]]: Count and total milliseconds per span name,
+            in the order the names first appeared
+        """
+        totals: Dict[str, Dict[str, float]] = {}
+        for span in self.spans:
+            total = totals.setdefault(span.name, {"count": 0, "duration": 0.0})
+            total["count"] += 1
+            total["duration"] += span.duration or 0.0
+        return totals
+
+    def to_dict(self, include_spans: bool = True) -> Dict[str, Any]:
+        """
+        Convert the trace to a dictionary.
+
+        Args:
+            include_spans (bool, optional): Include the individual spans. Defaults to True.
+
+        Returns:
+            Dict[str, Any]: The trace with its per-name summary
+        """
+        data = asdict(self)
+        data.pop("start_counter")
+        if not include_spans:
+            data.pop("spans")
+        data["summary"] = self.summary()
+        return data